@@ -0,0 +1,170 @@
+# backend/benchmark_grade_list.py
+"""
+Benchmark de grade_list sur une base de test (la base de développement n'est
+pas touchée).
+
+    python benchmark_grade_list.py [--rows 200000] [--repeat 5] [--full]
+
+Deux passes sur les mêmes données :
+- « avant » : index de grades_grade supprimés et ordre par
+  course__course_code (jointure sur courses_course), comme avant l'ajout de
+  la colonne dénormalisée ;
+- « après » : index de Grade.Meta.indexes et ordre par course_code.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import setup_test_environment
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from grades import views as grade_views
+from grades.models import Grade
+from students.models import Student
+from university_management.pagination import KeysetPaginator
+
+OLD_ORDERING = ('-academic_year', 'semester', 'course__course_code', 'id')
+NEW_ORDERING = grade_views.GRADE_ORDERING
+TERMS = [(2024, 'fall'), (2024, 'spring'), (2025, 'fall'), (2025, 'spring')]
+COURSES = 50
+
+
+def seed(rows):
+    students_count = max(1, rows // (COURSES * len(TERMS)))
+    print(f"📦 Création de {students_count} étudiants × {COURSES} cours × {len(TERMS)} semestres...")
+
+    users = User.objects.bulk_create([
+        User(username=f'bench{i}', first_name=f'Prénom{i}', last_name=f'Nom{i}', password='!')
+        for i in range(students_count)
+    ], batch_size=2000)
+    students = Student.objects.bulk_create([
+        Student(user=user, student_id=f'B{i:06d}', enrollment_date='2024-09-01',
+                faculty='Sciences', department='informatique')
+        for i, user in enumerate(users)
+    ], batch_size=2000)
+    courses = Course.objects.bulk_create([
+        Course(course_code=f'BEN{i:03d}', title=f'Cours {i}', description='', credits=3,
+               department='informatique', semester='fall', academic_year=2025)
+        for i in range(COURSES)
+    ])
+
+    random.seed(42)
+    batch = []
+    for year, semester in TERMS:
+        for course in courses:
+            for student in students:
+                score = round(random.uniform(0, 20), 2)
+                batch.append(Grade(
+                    student=student, course=course, course_code=course.course_code,
+                    score=score, grade_category=Grade.category_for_score(score),
+                    semester=semester, academic_year=year,
+                ))
+                if len(batch) == 10000:
+                    Grade.objects.bulk_create(batch)
+                    batch = []
+    if batch:
+        Grade.objects.bulk_create(batch)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    print(f"✅ {Grade.objects.count()} notes")
+    return students[0]
+
+
+def scenarios(student, ordering, include_full):
+    deep_row = Grade.objects.order_by(*NEW_ORDERING).values('academic_year', 'semester', 'course_code', 'id')[
+        int(Grade.objects.count() * 0.75)
+    ]
+    paginator = KeysetPaginator(ordering)
+    cursor = paginator.encode_cursor([
+        deep_row['academic_year'], deep_row['semester'], deep_row['course_code'], deep_row['id']
+    ])
+    result = [
+        ('première page (50)', '/api/grades/?page_size=50'),
+        ('première page sans count', '/api/grades/?page_size=50&count=false'),
+        ('page profonde (75 %)', f'/api/grades/?page_size=50&count=false&cursor={cursor}'),
+        ('année + semestre + catégorie', '/api/grades/?academic_year=2025&semester=fall&grade_category=good&page_size=50'),
+        ('plage de notes 15-18', '/api/grades/?min_score=15&max_score=18&page_size=50'),
+        ('notes d\'un étudiant', f'/api/grades/?student={student.pk}'),
+    ]
+    if include_full:
+        result.append(('liste complète', '/api/grades/'))
+    return result
+
+
+def run(client, urls, repeat):
+    timings = {}
+    for label, url in urls:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(url)
+            samples.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, (url, response.status_code)
+        timings[label] = statistics.median(samples)
+    return timings
+
+
+def drop_grade_indexes():
+    with connection.schema_editor() as schema_editor:
+        for index in Grade._meta.indexes:
+            schema_editor.remove_index(Grade, index)
+
+
+def create_grade_indexes():
+    with connection.schema_editor() as schema_editor:
+        for index in Grade._meta.indexes:
+            schema_editor.add_index(Grade, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--full', action='store_true', help="Inclure la liste complète non paginée")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    settings.STATS_CACHE = {**settings.STATS_CACHE, 'ENABLED': False}
+    settings.REQUEST_METRICS = {**settings.REQUEST_METRICS, 'ENABLED': False}
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        student = seed(args.rows)
+        admin = User.objects.create_user(username='bench-admin', password='!', user_type='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        print("⏱️ Passe « avant »...")
+        drop_grade_indexes()
+        grade_views.GRADE_ORDERING = OLD_ORDERING
+        before = run(client, scenarios(student, OLD_ORDERING, args.full), args.repeat)
+
+        print("⏱️ Passe « après »...")
+        create_grade_indexes()
+        grade_views.GRADE_ORDERING = NEW_ORDERING
+        after = run(client, scenarios(student, NEW_ORDERING, args.full), args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print()
+    print(f"{'scénario':32} {'avant (ms)':>12} {'après (ms)':>12} {'gain':>8}")
+    for label in before:
+        ratio = before[label] / after[label] if after[label] else float('inf')
+        print(f"{label:32} {before[label]:12.1f} {after[label]:12.1f} {ratio:7.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
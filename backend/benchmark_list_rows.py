@@ -0,0 +1,131 @@
+# backend/benchmark_list_rows.py
+"""
+Benchmark des listes de notes et de transactions sur une base de test (la
+base de développement n'est pas touchée).
+
+    python benchmark_list_rows.py [--rows 20000] [--repeat 5]
+
+Compare, pour chaque liste, la sérialisation d'origine (ModelSerializer
+avec select_related) et la lecture par ListRows, puis l'endpoint complet.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from finance.models import Transaction
+from finance.serializers import TRANSACTION_LIST_ROWS, TransactionSerializer
+from grades.models import Grade
+from grades.serializers import GRADE_LIST_ROWS, GradeSerializer
+from students.models import Student
+
+
+def seed(count):
+    print(f"📦 Création de {count} notes et {count} transactions...")
+    students_count = max(count // 20, 1)
+    users = User.objects.bulk_create([
+        User(username=f'etu{i}', password='!', first_name='Léa', last_name=f'Martin{i}')
+        for i in range(students_count)
+    ], batch_size=5000)
+    students = Student.objects.bulk_create([
+        Student(user=user, student_id=f'E{i:06d}', enrollment_date='2024-09-01',
+                faculty='Sciences', department='informatique')
+        for i, user in enumerate(users)
+    ], batch_size=5000)
+    courses = Course.objects.bulk_create([
+        Course(course_code=f'INF{i:03d}', title=f'Informatique {i}', description='', credits=3,
+               department='informatique', semester='fall', academic_year=2025)
+        for i in range(20)
+    ])
+    # bulk_create : pas de mise à jour des moyennes, inutile ici
+    Grade.objects.bulk_create([
+        Grade(student=students[i // 20], course=courses[i % 20], course_code=courses[i % 20].course_code,
+              score=Decimal(i % 2001) / 100, grade_category='good', semester='fall', academic_year=2025)
+        for i in range(count)
+    ], batch_size=5000)
+    today = date.today()
+    Transaction.objects.bulk_create([
+        Transaction(transaction_type='tuition', category='income', student=students[i % students_count],
+                    amount=Decimal('1500.000'), paid_amount=Decimal(i % 1500),
+                    status=['pending', 'partial', 'paid'][i % 3],
+                    date=today - timedelta(days=i % 365), due_date=today - timedelta(days=i % 90 - 30))
+        for i in range(count)
+    ], batch_size=5000)
+
+
+def measure(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    settings.STATS_CACHE = {**settings.STATS_CACHE, 'ENABLED': False}
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.rows)
+        admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        renderer = JSONRenderer()
+
+        grades = Grade.objects.select_related('student__user', 'course').order_by('id')
+        transactions = Transaction.objects.select_related(
+            'student__user', 'teacher__user').order_by('-date')
+        page_size = {'page_size': 100}
+        cases = [
+            ('notes : sérialisation',
+             lambda: renderer.render(GradeSerializer(grades, many=True).data),
+             lambda: renderer.render(GRADE_LIST_ROWS(grades))),
+            ('transactions : sérialisation',
+             lambda: renderer.render(TransactionSerializer(transactions, many=True).data),
+             lambda: renderer.render(TRANSACTION_LIST_ROWS(transactions))),
+            ('GET /api/grades/ (liste complète)',
+             None, lambda: client.get(reverse('grades:grade-list')).content),
+            ('GET /api/grades/?page_size=100',
+             None, lambda: client.get(reverse('grades:grade-list'), page_size).content),
+        ]
+        rows = []
+        for label, before, after in cases:
+            before_ms = measure(before, args.repeat) if before else None
+            rows.append((label, before_ms, measure(after, args.repeat)))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print()
+    print(f"{'liste':36} {'serializer (ms)':>16} {'ListRows (ms)':>14} {'gain':>6}")
+    for label, before, after in rows:
+        if before is None:
+            print(f"{label:36} {'':>16} {after:14.1f}")
+        else:
+            print(f"{label:36} {before:16.1f} {after:14.1f} {before / after:5.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# backend/benchmark_payroll.py
+"""
+Benchmark de la paie mensuelle sur une base de test (la base de
+développement n'est pas touchée).
+
+    python benchmark_payroll.py [--teachers 2000]
+
+Crée ``teachers`` enseignants actifs, puis mesure pour un mois la paie en
+un lot (finance/payroll.py), sa relance (rien à créer), et pour un autre
+mois la création ligne par ligne (``Transaction.save()`` puis
+``Salary.save()`` par enseignant) à titre de comparaison. Le temps base
+de données est mesuré autour de chaque exécution de requête
+(``connection.execute_wrapper``) ; le reste est du temps Python
+(préparation des lignes, compilation du SQL par l'ORM).
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+django.setup()
+
+from django.db import connection, transaction as db_transaction
+from django.test import override_settings
+from django.test.utils import setup_test_environment
+
+from accounts.models import User
+from finance.models import Salary, Transaction
+from finance.payroll import PayrollRun
+from teachers.models import Teacher
+
+RANKS = ['professor', 'associate', 'lecturer', 'assistant']
+
+# Barème fictif, identique au calcul ligne par ligne
+PAYROLL = {'BASE_SALARY': dict.fromkeys(RANKS, '3000'), 'DEDUCTION_RATE': '0.2'}
+
+
+def seed(count):
+    print(f"📦 Création de {count} enseignants...")
+    users = User.objects.bulk_create([
+        User(username=f'prof{i}', password='!', first_name='Paul', last_name=f'Durand{i}', user_type='teacher')
+        for i in range(count)
+    ], batch_size=5000)
+    Teacher.objects.bulk_create([
+        Teacher(user=user, teacher_id=f'T{i:06d}', hire_date='2020-09-01', department='sciences',
+                specialization='Physique', rank=RANKS[i % len(RANKS)])
+        for i, user in enumerate(users)
+    ], batch_size=5000)
+
+
+def row_by_row(year, month):
+    with db_transaction.atomic():
+        for teacher in Teacher.objects.filter(user__is_active=True):
+            base = Decimal('3000')
+            deductions = base * Decimal('0.2')
+            transaction = Transaction.objects.create(
+                transaction_type='salary', teacher=teacher, amount=base - deductions,
+                date=date(year, month, 1), due_date=date(year, month, 28), method='bank_transfer'
+            )
+            Salary.objects.create(teacher=teacher, year=year, month=month, base_salary=base,
+                                  deductions=deductions, net_salary=base - deductions, transaction=transaction)
+    return Salary.objects.filter(year=year, month=month).count()
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self.count += 1
+
+
+def timed(label, function):
+    timer = QueryTimer()
+    with connection.execute_wrapper(timer):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+    print(f"{label:24} {elapsed * 1000:9.1f} ms  base : {timer.elapsed * 1000:8.1f} ms  "
+          f"{timer.count:6d} requêtes  {result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teachers', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.teachers)
+        print()
+        summary = lambda payroll: {key: payroll.summary()[key] for key in ('created', 'linked', 'skipped')}
+        with override_settings(PAYROLL=PAYROLL):
+            timed('paie (simulation)', lambda: summary(PayrollRun(2026, 10, dry_run=True).run()))
+            timed('paie en un lot', lambda: summary(PayrollRun(2026, 10).run()))
+            timed('relance (même mois)', lambda: summary(PayrollRun(2026, 10).run()))
+        timed('ligne par ligne', lambda: row_by_row(2026, 9))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# backend/benchmark_reminders.py
+"""
+Benchmark des rappels de paiement sur une base de test (la base de
+développement n'est pas touchée).
+
+    python benchmark_reminders.py [--rows 50000] [--workers 4]
+
+Crée ``rows`` transactions en retard, puis mesure la génération des
+premiers rappels, leur envoi (FileSink dans un répertoire temporaire) et
+un second passage le même jour, qui ne doit rien créer ni envoyer.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+from accounts.models import User
+from finance import reminders
+from finance.models import PaymentReminder, Transaction
+from students.models import Student
+
+
+def seed(count):
+    print(f"📦 Création de {count} transactions en retard...")
+    students_count = max(count // 20, 1)
+    users = User.objects.bulk_create([
+        User(username=f'etu{i}', password='!', first_name='Léa', last_name=f'Martin{i}',
+             email=f'etu{i}@example.org')
+        for i in range(students_count)
+    ], batch_size=5000)
+    students = Student.objects.bulk_create([
+        Student(user=user, student_id=f'E{i:06d}', enrollment_date='2024-09-01',
+                faculty='Sciences', department='informatique')
+        for i, user in enumerate(users)
+    ], batch_size=5000)
+    today = date.today()
+    # bulk_create : le rollup n'est pas utile ici
+    Transaction.objects.bulk_create([
+        Transaction(transaction_number=f'TRN-B{i}', transaction_type='tuition', category='income',
+                    student=students[i % students_count], amount=Decimal('1500.000'),
+                    paid_amount=Decimal(i % 1500), status='overdue',
+                    date=today - timedelta(days=60), due_date=today - timedelta(days=1 + i % 30))
+        for i in range(count)
+    ], batch_size=5000)
+    # Transactions payées : la lecture des retards ne doit pas les parcourir
+    Transaction.objects.bulk_create([
+        Transaction(transaction_number=f'TRN-P{i}', transaction_type='tuition', category='income',
+                    amount=Decimal('1500.000'), paid_amount=Decimal('1500.000'), status='paid',
+                    date=today - timedelta(days=60), due_date=today - timedelta(days=30))
+        for i in range(count)
+    ], batch_size=5000)
+
+
+def timed(label, function):
+    started = time.perf_counter()
+    result = function()
+    print(f"{label:34} {(time.perf_counter() - started) * 1000:10.1f} ms  {result}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.rows)
+        with tempfile.TemporaryDirectory() as directory:
+            settings.PAYMENT_REMINDERS = {
+                **settings.PAYMENT_REMINDERS,
+                'SINKS': ['finance.reminders.FileSink'],
+                'FILE_PATH': Path(directory) / 'payment_reminders.jsonl',
+                'WORKERS': args.workers,
+            }
+            today = date.today()
+            print()
+            timed('génération', lambda: sum(reminders.generate(today).values()))
+            timed('envoi', lambda: reminders.dispatch(today))
+            timed('second passage (même jour)', lambda: reminders.run(today))
+            print(f"{'rappels en base':34} {PaymentReminder.objects.count():10d}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# backend/benchmark_renderers.py
+"""
+Benchmark du rendu JSON sur une base de test (la base de développement
+n'est pas touchée).
+
+    python benchmark_renderers.py [--rows 10000] [--repeat 5]
+
+Compare le JSONRenderer de DRF (json de la bibliothèque standard) et
+FastJSONRenderer sur les données de grade_list et de
+TransactionViewSet.list (lignes ListRows, et sortie des serializers avec
+leurs conversions float(Decimal)), puis l'endpoint grade_list complet avec
+chacun des renderers et en streaming.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from benchmark_list_rows import seed
+from finance.models import Transaction
+from finance.serializers import TRANSACTION_LIST_ROWS, TransactionSerializer
+from grades.models import Grade
+from grades.serializers import GRADE_LIST_ROWS, GradeSerializer
+from grades.views import grade_list
+from university_management.renderers import FastJSONRenderer, orjson
+
+
+def measure(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def endpoint(client, renderer, threshold):
+    def get():
+        # Les classes de rendu d'une vue @api_view sont fixées à l'import
+        grade_list.cls.renderer_classes = [renderer]
+        with override_settings(JSON_RENDERER={'STREAM_THRESHOLD': threshold}):
+            response = client.get(reverse('grades:grade-list'))
+            return b''.join(response.streaming_content) if response.streaming else response.content
+    return get
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("⚠️ orjson n'est pas installé : FastJSONRenderer utilise le rendu de DRF")
+
+    setup_test_environment()
+    settings.STATS_CACHE = {**settings.STATS_CACHE, 'ENABLED': False}
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.rows)
+        admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        grades = Grade.objects.select_related('student__user', 'course').order_by('id')
+        transactions = Transaction.objects.select_related('student__user', 'teacher__user').order_by('-date')
+        payloads = [
+            ('grade_list (ListRows)', {'success': True, 'count': args.rows, 'results': GRADE_LIST_ROWS(grades)}),
+            ('grade_list (GradeSerializer)', GradeSerializer(grades, many=True).data),
+            ('transactions (ListRows)', TRANSACTION_LIST_ROWS(transactions)),
+            ('transactions (TransactionSerializer)', TransactionSerializer(transactions, many=True).data),
+            ('transactions (.values(), Decimal)', list(Transaction.objects.values())),
+        ]
+        rows = []
+        for label, data in payloads:
+            assert FastJSONRenderer().render(data) == JSONRenderer().render(data), label
+            rows.append((label, measure(lambda: JSONRenderer().render(data), args.repeat),
+                         measure(lambda: FastJSONRenderer().render(data), args.repeat)))
+
+        drf = measure(endpoint(client, JSONRenderer, None), args.repeat)
+        fast = measure(endpoint(client, FastJSONRenderer, None), args.repeat)
+        rows.append(('GET /api/grades/ (réponse complète)', drf, fast))
+        streamed = measure(endpoint(client, FastJSONRenderer, 0), args.repeat)
+        rows.append(('GET /api/grades/ (streaming)', drf, streamed))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print()
+    print(f"{'rendu':40} {'JSONRenderer (ms)':>18} {'FastJSON (ms)':>14} {'gain':>6}")
+    for label, before, after in rows:
+        print(f"{label:40} {before:18.1f} {after:14.1f} {before / after:5.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
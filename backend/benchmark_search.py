@@ -0,0 +1,121 @@
+# backend/benchmark_search.py
+"""
+Benchmark de la recherche d'étudiants sur une base de test (la base de
+développement n'est pas touchée).
+
+    python benchmark_search.py [--students 100000] [--repeat 20]
+
+Compare, pour chaque requête, le filtre ``icontains`` d'origine (quatre OR
+avec jointure sur accounts_user) et search.engine.search() (limite 10).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import setup_test_environment
+
+from accounts.models import User
+from search import documents, engine
+from students.models import Student
+
+FIRST_NAMES = [
+    'Adam', 'Amine', 'Anaïs', 'Camille', 'Chloé', 'Clément', 'Emma', 'Fatima', 'Hugo', 'Inès',
+    'Jade', 'Julien', 'Karim', 'Léa', 'Louis', 'Lucas', 'Manon', 'Marie', 'Mohamed', 'Nathan',
+    'Nour', 'Océane', 'Paul', 'Rayan', 'Sarah', 'Sofia', 'Théo', 'Thomas', 'Yasmine', 'Zoé',
+]
+LAST_NAMES = [
+    'Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy',
+    'Moreau', 'Simon', 'Laurent', 'Lefèvre', 'Michel', 'Garcia', 'David', 'Bertrand', 'Roux',
+    'Vincent', 'Fournier', 'Morel', 'Girard', 'André', 'Mercier', 'Dupont', 'Lambert', 'Bonnet',
+    'François', 'Martinez', 'Benali', 'Haddad', 'Mansouri', 'Bouzid', 'Chaouch', 'Trabelsi',
+]
+QUERIES = [
+    ('identifiant exact', 'E054321'),
+    ('nom complet', 'Yasmine Trabelsi'),
+    ('préfixe court', 'du'),
+    ('préfixe', 'chao'),
+    ('nom courant', 'martin'),
+    ('faute de frappe', 'Trabelsu'),
+    ('sans accent', 'lefevre'),
+    ('aucun résultat', 'zzzzqx'),
+]
+
+
+def seed(count):
+    print(f"📦 Création de {count} étudiants...")
+    random.seed(42)
+    users = User.objects.bulk_create([
+        User(
+            username=f'etu{i}', password='!',
+            first_name=random.choice(FIRST_NAMES),
+            last_name=f"{random.choice(LAST_NAMES)}{'' if i % 10 else ' ' + random.choice(LAST_NAMES)}",
+            email=f'etu{i}@universite.fr',
+        )
+        for i in range(count)
+    ], batch_size=5000)
+    Student.objects.bulk_create([
+        Student(user=user, student_id=f'E{i:06d}', enrollment_date='2024-09-01',
+                faculty='Sciences', department='informatique')
+        for i, user in enumerate(users)
+    ], batch_size=5000)
+    print(f"🔎 Indexation : {documents.rebuild()} documents")
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def legacy(query):
+    return list(Student.objects.filter(
+        Q(student_id__icontains=query) |
+        Q(user__first_name__icontains=query) |
+        Q(user__last_name__icontains=query) |
+        Q(user__email__icontains=query)
+    ).values_list('id', flat=True)[:10])
+
+
+def measure(function, query, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    settings.STATS_CACHE = {**settings.STATS_CACHE, 'ENABLED': False}
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.students)
+        rows = []
+        for label, query in QUERIES:
+            before, before_count = measure(legacy, query, args.repeat)
+            after, after_count = measure(lambda q: engine.search('student', q, 10), query, args.repeat)
+            rows.append((label, query, before, before_count, after, after_count))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print()
+    print(f"{'requête':32} {'icontains (ms)':>15} {'index (ms)':>12} {'résultats':>10}")
+    for label, query, before, before_count, after, after_count in rows:
+        print(f"{label + ' « ' + query + ' »':32} {before:15.1f} {after:12.1f} {before_count:>4} / {after_count:<4}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
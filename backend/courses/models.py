@@ -43,6 +43,9 @@ class Enrollment(models.Model):
     
     class Meta:
         unique_together = ['student', 'course']
+        indexes = [
+            models.Index(fields=['-enrollment_date', 'id'], name='enrollment_date_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student} - {self.course}"
\ No newline at end of file
@@ -1,7 +1,10 @@
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Concat
 from rest_framework import serializers
 from .models import Course, Enrollment
 from teachers.models import Teacher
 from students.models import Student
+from university_management.list_rows import ListRows
 
 class CourseSerializer(serializers.ModelSerializer):
     teacher_name = serializers.SerializerMethodField()
@@ -22,7 +25,10 @@ class CourseSerializer(serializers.ModelSerializer):
         return "Non assigné"
     
     def get_enrollments_count(self, obj):
-        """Compte le nombre d'inscriptions"""
+        """Compte le nombre d'inscriptions (valeur annotée par la vue si disponible)"""
+        count = getattr(obj, 'enrollments_total', None)
+        if count is not None:
+            return count
         return obj.enrollments.count()
     
     def validate_course_code(self, value):
@@ -38,6 +44,32 @@ class CourseSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Ce code de cours existe déjà.")
         return value
 
+# Lecture rapide de la liste des cours : mêmes clés que CourseSerializer,
+# lues avec .values() (enrollments_total annoté par la vue)
+COURSE_LIST_ROWS = ListRows(
+    columns=[
+        ('id', 'id', None),
+        ('course_code', 'course_code', None),
+        ('title', 'title', None),
+        ('description', 'description', None),
+        ('credits', 'credits', None),
+        ('department', 'department', None),
+        ('semester', 'semester', None),
+        ('academic_year', 'academic_year', None),
+        ('teacher', 'teacher', None),
+        ('teacher_name', 'row_teacher_name', None),
+        ('max_students', 'max_students', None),
+        ('schedule', 'schedule', None),
+        ('enrollments_count', 'enrollments_total', None),
+    ],
+    annotations={
+        'row_teacher_name': Case(
+            When(teacher__isnull=True, then=Value('Non assigné')),
+            default=Concat(F('teacher__user__first_name'), Value(' '), F('teacher__user__last_name')),
+        ),
+    },
+)
+
 class EnrollmentSerializer(serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
     course_name = serializers.SerializerMethodField()
@@ -0,0 +1,18 @@
+# backend/courses/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from university_management import stats_cache
+from .models import Course, Enrollment
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, **kwargs):
+    """Invalider les statistiques en cache qui dépendent des cours"""
+    stats_cache.invalidate(sender)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, **kwargs):
+    """Invalider les statistiques en cache qui dépendent des inscriptions"""
+    stats_cache.invalidate(sender)
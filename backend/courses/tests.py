@@ -1,3 +1,74 @@
+from datetime import date
+
+from django.db.models import Count
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from students.models import Student
+from teachers.models import Teacher
+from .models import Course, Enrollment
+from .serializers import CourseSerializer
+
+
+class CourseListQueryCountTest(TestCase):
+    """La liste des cours ne doit pas faire une requête par cours"""
+
+    COURSES = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        teacher_user = User.objects.create_user(username='prof', first_name='Marie', last_name='Curie')
+        teacher = Teacher.objects.create(
+            user=teacher_user, teacher_id='T001', hire_date=date(2020, 1, 1),
+            department='sciences', specialization='Physique', rank='professor'
+        )
+        student_user = User.objects.create_user(username='etu', first_name='Paul', last_name='Durand')
+        student = Student.objects.create(
+            user=student_user, student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='physique'
+        )
+        courses = Course.objects.bulk_create([
+            Course(
+                course_code=f'PHY{i:04d}', title=f'Physique {i}', description='',
+                credits=3, department='sciences', semester='fall',
+                academic_year=2025, teacher=teacher
+            )
+            for i in range(cls.COURSES)
+        ])
+        Enrollment.objects.bulk_create([
+            Enrollment(student=student, course=course, status='enrolled' if i % 2 else 'dropped')
+            for i, course in enumerate(courses)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_course_list_query_count_is_constant(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('course-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), self.COURSES)
+        self.assertTrue(all(course['enrollments_count'] == 1 for course in response.data))
+
+    def test_list_rows_match_serializer(self):
+        Course.objects.filter(course_code='PHY0001').update(teacher=None, schedule='Lundi 8h')
+        response = self.client.get(reverse('course-list'))
+
+        courses = Course.objects.select_related('teacher__user').annotate(enrollments_total=Count('enrollments'))
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(response.data),
+            renderer.render(CourseSerializer(courses, many=True).data)
+        )
+
+    def test_course_detail_falls_back_to_query(self):
+        course = Course.objects.first()
+        response = self.client.get(reverse('course-detail', args=[course.pk]))
 
-# Create your tests here.
+        self.assertEqual(response.data['enrollments_count'], 1)
@@ -2,17 +2,29 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Count
 from .models import Course, Enrollment
-from .serializers import CourseSerializer, EnrollmentSerializer
+from .serializers import CourseSerializer, EnrollmentSerializer, COURSE_LIST_ROWS
+from university_management.pagination import paginated_list_response
+
+# Ordres stables des listes (clés de pagination par curseur)
+COURSE_ORDERING = ('course_code', 'id')
+ENROLLMENT_ORDERING = ('-enrollment_date', 'id')
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def course_list(request):
     """Récupère la liste des cours ou crée un nouveau cours"""
     if request.method == 'GET':
-        courses = Course.objects.select_related('teacher', 'teacher__user').all()
-        serializer = CourseSerializer(courses, many=True)
-        return Response(serializer.data)
+        courses = Course.objects.select_related('teacher', 'teacher__user').annotate(
+            enrollments_total=Count('enrollments')
+        )
+        response = paginated_list_response(request, courses, COURSE_ORDERING, list_rows=COURSE_LIST_ROWS)
+        if response is not None:
+            return response
+        
+        # Lignes lues avec .values(), sans instancier les cours
+        return Response(COURSE_LIST_ROWS(courses))
     
     elif request.method == 'POST':
         print("📋 Données reçues pour création de cours:", request.data)
@@ -63,6 +75,10 @@ def enrollment_list(request):
     """Récupère la liste des inscriptions ou crée une nouvelle inscription"""
     if request.method == 'GET':
         enrollments = Enrollment.objects.select_related('student', 'student__user', 'course').all()
+        response = paginated_list_response(request, enrollments, ENROLLMENT_ORDERING, EnrollmentSerializer)
+        if response is not None:
+            return response
+        
         serializer = EnrollmentSerializer(enrollments, many=True)
         return Response(serializer.data)
     
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ExamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'exams'
-    verbose_name = 'Examens et Notes'
\ No newline at end of file
+    verbose_name = 'Examens et Notes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
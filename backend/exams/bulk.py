@@ -0,0 +1,119 @@
+# backend/exams/bulk.py
+"""
+Saisie en masse des notes d'un examen (feuille complète en une requête).
+
+- les lignes viennent d'une liste JSON ou d'un fichier CSV
+  (colonnes ``student`` ou ``student_id``, ``score``, ``comments``) ;
+- tous les étudiants sont vérifiés contre les inscriptions au cours de
+  l'examen en une seule requête ;
+- les lettres de note sont calculées en une passe avec les seuils de
+  ``Grade.save()`` ;
+- l'écriture se fait avec ``bulk_create(update_conflicts=True)`` dans une
+  seule transaction : une note existante est mise à jour.
+"""
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from courses.models import Enrollment
+from university_management import csv_import, stats_cache
+from .models import Grade
+from .serializers import ExamGradeRowSerializer
+
+CSV_COLUMNS = ('student', 'student_id', 'score', 'comments')
+
+
+def read_csv_rows(uploaded_file):
+    """Lire un fichier CSV (séparateur ',' ou ';') en liste de dicts"""
+    return csv_import.read_csv_rows(uploaded_file, CSV_COLUMNS)
+
+
+class ExamGradeImporter:
+    """Crée ou met à jour les notes d'un examen pour un lot d'étudiants"""
+
+    def __init__(self, exam, rows):
+        self.exam = exam
+        self.rows = rows
+        self.errors = []
+        self.created = 0
+        self.updated = 0
+        self.grades = []
+
+    def _error(self, data, errors):
+        self.errors.append({
+            'student': data.get('student', data.get('student_id')),
+            'errors': errors,
+        })
+
+    def _enrolled_students(self, valid):
+        """
+        Étudiants inscrits au cours de l'examen parmi ceux du lot (une requête).
+
+        Retourne {pk: (matricule, note_existante)}.
+        """
+        pks = {row['student'] for _, row in valid if row.get('student') is not None}
+        codes = {row['student_id'] for _, row in valid if row.get('student') is None}
+        if not pks and not codes:
+            return {}
+
+        enrollments = Enrollment.objects.filter(
+            course_id=self.exam.course_id,
+            status='enrolled',
+        ).filter(
+            Q(student_id__in=pks) | Q(student__student_id__in=codes)
+        ).annotate(
+            has_grade=Exists(Grade.objects.filter(exam=self.exam, student=OuterRef('student')))
+        ).values_list('student_id', 'student__student_id', 'has_grade')
+
+        return {pk: (code, has_grade) for pk, code, has_grade in enrollments}
+
+    def run(self):
+        valid = []
+        for data in self.rows:
+            row = ExamGradeRowSerializer(data=data)
+            if row.is_valid():
+                valid.append((data, row.validated_data))
+            else:
+                self._error(data, row.errors)
+
+        enrolled = self._enrolled_students(valid)
+        by_code = {code: pk for pk, (code, _) in enrolled.items()}
+
+        grades = {}
+        for data, row in valid:
+            pk = row.get('student')
+            if pk is None:
+                pk = by_code.get(row['student_id'])
+            if pk not in enrolled:
+                self._error(data, {'student': ["L'étudiant n'est pas inscrit au cours de cet examen"]})
+                continue
+            if pk in grades:
+                self._error(data, {'student': ['Étudiant présent plusieurs fois dans le lot']})
+                continue
+            grades[pk] = Grade(
+                student_id=pk,
+                exam=self.exam,
+                score=row['score'],
+                grade=Grade.letter_for_score(row['score']),
+                comments=row.get('comments'),
+            )
+
+        if grades:
+            with transaction.atomic():
+                Grade.objects.bulk_create(
+                    list(grades.values()),
+                    update_conflicts=True,
+                    unique_fields=['student', 'exam'],
+                    update_fields=['score', 'grade', 'comments'],
+                    batch_size=500,
+                )
+                # bulk_create n'envoie pas de signaux
+                stats_cache.invalidate(Grade)
+
+            self.updated = sum(1 for pk in grades if enrolled[pk][1])
+            self.created = len(grades) - self.updated
+            self.grades = list(
+                Grade.objects.filter(exam=self.exam, student_id__in=list(grades))
+                .select_related('student__user', 'exam__course')
+            )
+        return self
@@ -47,7 +47,12 @@ class Exam(models.Model):
     @property
     def exam_code(self):
         """Génère un code d'examen automatique"""
-        return f"EXAM-{self.date.year}-{str(self.id).zfill(3)}"
+        return self.code_for(self.date, self.id)
+    
+    @staticmethod
+    def code_for(exam_date, exam_id):
+        """Code d'examen d'après sa date et son id (aussi utilisé par la liste rapide)"""
+        return f"EXAM-{exam_date.year}-{str(exam_id).zfill(3)}"
 
 
 class Grade(models.Model):
@@ -75,16 +80,21 @@ class Grade(models.Model):
     def __str__(self):
         return f"{self.student} - {self.exam} : {self.score}"
     
+    @staticmethod
+    def letter_for_score(score):
+        """Lettre de note correspondant à un score sur 100"""
+        if score >= 90:
+            return 'A'
+        elif score >= 80:
+            return 'B'
+        elif score >= 70:
+            return 'C'
+        elif score >= 60:
+            return 'D'
+        else:
+            return 'F'
+    
     def save(self, *args, **kwargs):
         """Calculer automatiquement la lettre de note basée sur le score"""
-        if self.score >= 90:
-            self.grade = 'A'
-        elif self.score >= 80:
-            self.grade = 'B'
-        elif self.score >= 70:
-            self.grade = 'C'
-        elif self.score >= 60:
-            self.grade = 'D'
-        else:
-            self.grade = 'F'
+        self.grade = self.letter_for_score(self.score)
         super().save(*args, **kwargs)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Exam, Grade
+from university_management.list_rows import ListRows, as_text, date_string, datetime_string
 from courses.models import Course
 from students.models import Student
 
@@ -27,6 +28,10 @@ class ExamSerializer(serializers.ModelSerializer):
         return obj.course.course_code if obj.course else ""
     
     def get_enrolled_students(self, obj):
+        # Valeur annotée par la vue (liste) ; sinon une requête pour l'objet seul
+        count = getattr(obj, 'enrolled_count', None)
+        if count is not None:
+            return count
         return obj.enrolled_students_count
     
     def get_exam_code(self, obj):
@@ -51,6 +56,36 @@ class ExamSerializer(serializers.ModelSerializer):
         return data
 
 
+# Lecture rapide de la liste des examens : mêmes clés et mêmes formats
+# qu'ExamSerializer, lus avec .values() (enrolled_count annoté par la vue)
+EXAM_LIST_ROWS = ListRows(
+    columns=[
+        ('id', 'id', None),
+        ('course', 'course', None),
+        ('course_name', 'course__title', None),
+        ('course_code', 'course__course_code', None),
+        ('exam_type', 'exam_type', None),
+        ('title', 'title', None),
+        ('description', 'description', None),
+        ('date', 'date', date_string),
+        ('time', 'time', date_string),
+        ('duration', 'duration', None),
+        ('location', 'location', None),
+        ('max_students', 'max_students', None),
+        ('enrolled_students', 'enrolled_count', None),
+        ('status', 'status', None),
+        ('exam_code', ('date', 'id'), Exam.code_for),
+        ('department', 'course__department', None),
+        ('created_at', 'row_created_at', datetime_string),
+        ('updated_at', 'row_updated_at', datetime_string),
+    ],
+    annotations={
+        'row_created_at': as_text('created_at'),
+        'row_updated_at': as_text('updated_at'),
+    },
+)
+
+
 class GradeSerializer(serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
     student_id_number = serializers.SerializerMethodField()
@@ -91,6 +126,27 @@ class GradeSerializer(serializers.ModelSerializer):
         return value
 
 
+class ExamGradeRowSerializer(serializers.Serializer):
+    """Ligne d'import de notes d'examen (JSON ou CSV), validée sans accès à la base"""
+    student = serializers.IntegerField(required=False)
+    student_id = serializers.CharField(required=False)
+    score = serializers.DecimalField(max_digits=5, decimal_places=2)
+    comments = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    
+    def validate_score(self, value):
+        """Validation du score"""
+        if value < 0 or value > 100:
+            raise serializers.ValidationError("Le score doit être entre 0 et 100")
+        return value
+    
+    def validate(self, data):
+        if data.get('student') is None and not data.get('student_id'):
+            raise serializers.ValidationError({
+                'student': "L'étudiant est requis (student ou student_id)"
+            })
+        return data
+
+
 class ExamDetailSerializer(ExamSerializer):
     """Serializer détaillé avec les notes"""
     grades = GradeSerializer(many=True, read_only=True)
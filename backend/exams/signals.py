@@ -0,0 +1,18 @@
+# backend/exams/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from university_management import stats_cache
+from .models import Exam, Grade
+
+
+@receiver([post_save, post_delete], sender=Exam)
+def exam_changed(sender, **kwargs):
+    """Invalider les statistiques en cache qui dépendent des examens"""
+    stats_cache.invalidate(sender)
+
+
+@receiver([post_save, post_delete], sender=Grade)
+def exam_grade_changed(sender, **kwargs):
+    """Invalider les statistiques en cache qui dépendent des notes d'examen"""
+    stats_cache.invalidate(sender)
@@ -0,0 +1,56 @@
+# backend/exams/statistics.py
+"""
+Statistiques des examens (endpoint ``exam_statistics`` et tableau de bord).
+
+Les effectifs par statut et par type sont lus par deux requêtes groupées au
+lieu d'un ``count()`` par valeur. Toutes les requêtes sont indépendantes :
+``run(statistics_plan())`` les enchaîne, ``arun`` les lance ensemble (voir
+``university_management/query_plan.py``).
+"""
+
+from datetime import date, timedelta
+
+from django.db.models import Avg, Count
+
+from courses.models import Enrollment
+from university_management.query_plan import aggregate, count, fetch
+from .models import Exam, Grade
+
+# Entrées de stats_cache (endpoint DRF et tableau de bord asynchrone)
+CACHE_ENDPOINT = 'exam-statistics'
+CACHE_MODELS = (Exam, Grade, Enrollment)
+
+STATUSES = ('upcoming', 'ongoing', 'completed', 'cancelled')
+
+
+def statistics_plan(today=None):
+    today = today or date.today()
+    results = yield {
+        'statuses': fetch(Exam.objects.values('status').annotate(count=Count('id')).order_by()),
+        'types': fetch(Exam.objects.values('exam_type').annotate(count=Count('id')).order_by()),
+        # Moyenne d'étudiants par examen
+        'enrolled': aggregate(Exam.objects.all(), avg_enrolled=Avg('course__enrollments__id')),
+        # Examens prochains (7 prochains jours)
+        'upcoming_week': count(Exam.objects.filter(
+            date__gte=today,
+            date__lte=today + timedelta(days=7),
+            status='upcoming'
+        )),
+        # Notes moyennes
+        'grades': aggregate(Grade.objects.all(), avg_score=Avg('score'), total=Count('id')),
+    }
+
+    by_status = {row['status']: row['count'] for row in results['statuses']}
+    by_type = {row['exam_type']: row['count'] for row in results['types']}
+    avg_students = results['enrolled']['avg_enrolled'] or 0
+    avg_grade = results['grades']['avg_score'] or 0
+
+    return {
+        'total_exams': sum(by_status.values()),
+        **{f'{status}_exams': by_status.get(status, 0) for status in STATUSES},
+        'avg_students_per_exam': round(avg_students, 2),
+        'exams_by_type': {exam_type: by_type.get(exam_type, 0) for exam_type, _ in Exam.EXAM_TYPE_CHOICES},
+        'upcoming_this_week': results['upcoming_week'],
+        'total_grades': results['grades']['total'],
+        'average_score': round(float(avg_grade), 2)
+    }
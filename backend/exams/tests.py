@@ -1,3 +1,150 @@
+from datetime import date, time
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Count, Q
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course, Enrollment
+from students.models import Student
+from .models import Exam, Grade
+from .serializers import ExamSerializer
+
+
+class ExamListQueryCountTest(TestCase):
+    """La liste des examens ne doit pas compter les inscrits examen par examen"""
+
+    EXAMS = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        course = Course.objects.create(
+            course_code='INF101', title='Algorithmique', description='',
+            credits=4, department='informatique', semester='fall', academic_year=2025
+        )
+        for i in range(3):
+            student_user = User.objects.create_user(username=f'etu{i}')
+            student = Student.objects.create(
+                user=student_user, student_id=f'S{i:03d}', enrollment_date=date(2024, 9, 1),
+                faculty='Sciences', department='informatique'
+            )
+            Enrollment.objects.create(
+                student=student, course=course, status='dropped' if i == 0 else 'enrolled'
+            )
+        Exam.objects.bulk_create([
+            Exam(
+                course=course, exam_type='quiz', title=f'Quiz {i}',
+                date=date(2030, 1, 1), time=time(9, 0), duration='1 heure', location='A1'
+            )
+            for i in range(cls.EXAMS)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_exam_list_query_count_is_constant(self):
+        # Une requête de comptage pour la pagination + une pour la page
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('exams:exam-list-create'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], self.EXAMS)
+        self.assertTrue(all(exam['enrolled_students'] == 2 for exam in response.data['results']))
+
+    def test_list_rows_match_serializer(self):
+        Exam.objects.filter(pk=Exam.objects.first().pk).update(description='Chapitres 1 à 3')
+        response = self.client.get(reverse('exams:exam-list-create'), {'page': 2})
+
+        exams = Exam.objects.select_related('course').annotate(
+            enrolled_count=Count('course__enrollments', filter=Q(course__enrollments__status='enrolled'))
+        ).order_by('-date', '-time')[10:20]
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(response.data['results']),
+            renderer.render(ExamSerializer(exams, many=True).data)
+        )
+
+    def test_exam_detail_falls_back_to_query(self):
+        exam = Exam.objects.first()
+        response = self.client.get(reverse('exams:exam-detail', args=[exam.pk]))
+
+        self.assertEqual(response.data['enrolled_students'], 2)
+
+
+class ExamGradeImportTest(TestCase):
+    """Saisie en masse des notes d'un examen : inscriptions, mise à jour, CSV"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        course = Course.objects.create(
+            course_code='INF101', title='Algorithmique', description='',
+            credits=4, department='informatique', semester='fall', academic_year=2025
+        )
+        cls.students = []
+        # S000 désinscrit, S001 et S002 inscrits, S003 jamais inscrit
+        for i, enrollment in enumerate(['dropped', 'enrolled', 'enrolled', None]):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f'etu{i}'), student_id=f'S{i:03d}',
+                enrollment_date=date(2024, 9, 1), faculty='Sciences', department='informatique'
+            )
+            if enrollment:
+                Enrollment.objects.create(student=student, course=course, status=enrollment)
+            cls.students.append(student)
+        cls.exam = Exam.objects.create(
+            course=course, exam_type='midterm', title='Partiel', date=date(2030, 1, 1),
+            time=time(9, 0), duration='2 heures', location='A1'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, data, **kwargs):
+        return self.client.post(reverse('exams:bulk-create-grades'), {'exam_id': self.exam.pk, **data}, **kwargs)
+
+    def test_only_enrolled_students_are_accepted(self):
+        response = self.post({'grades': [
+            {'student': self.students[1].pk, 'score': '85'},
+            {'student_id': 'S002', 'score': '40', 'comments': 'À revoir'},
+            {'student': self.students[0].pk, 'score': '70'},
+            {'student_id': 'S003', 'score': '70'},
+            {'student': self.students[1].pk, 'score': '90'},
+            {'student_id': 'S002', 'score': '120'},
+        ]}, format='json')
+        data = response.data['data']
+        self.assertEqual((data['created'], data['updated'], data['failed']), (2, 0, 4))
+        self.assertEqual([error['student'] for error in data['errors']],
+                         ['S002', self.students[0].pk, 'S003', self.students[1].pk])
+        self.assertEqual(
+            dict(Grade.objects.filter(exam=self.exam).values_list('student__student_id', 'grade')),
+            {'S001': 'B', 'S002': 'F'}
+        )
+
+    def test_existing_grade_is_updated(self):
+        Grade.objects.create(student=self.students[1], exam=self.exam, score=50)
+        with self.assertNumQueries(6):
+            # examen, inscriptions, SAVEPOINT, INSERT ... ON CONFLICT, RELEASE, relecture
+            response = self.post({'grades': [
+                {'student': self.students[1].pk, 'score': '91'},
+                {'student': self.students[2].pk, 'score': '65'},
+            ]}, format='json')
+        data = response.data['data']
+        self.assertEqual((data['created'], data['updated']), (1, 1))
+        grade = Grade.objects.get(student=self.students[1], exam=self.exam)
+        self.assertEqual((grade.score, grade.grade), (91, 'A'))
+        self.assertEqual(Grade.objects.filter(exam=self.exam).count(), 2)
 
-# Create your tests here.
+    def test_csv_file(self):
+        content = '﻿student_id;score;comments;ignorée\nS001;72.5;Bien;x\nS002;55;;\nS003;80;;\n'.encode('utf-8')
+        upload = SimpleUploadedFile('notes.csv', content, content_type='text/csv')
+        data = self.post({'file': upload}, format='multipart').data['data']
+        self.assertEqual((data['created'], data['failed']), (2, 1))
+        grade = Grade.objects.get(student=self.students[1], exam=self.exam)
+        self.assertEqual((grade.score, grade.grade, grade.comments), (Decimal('72.5'), 'C', 'Bien'))
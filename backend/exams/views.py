@@ -3,10 +3,25 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Count, Avg, Q
-from datetime import date, datetime
+from django.db.models import Count, Q
+from datetime import date
 from .models import Exam, Grade
-from .serializers import ExamSerializer, GradeSerializer, ExamDetailSerializer
+from .serializers import ExamSerializer, GradeSerializer, ExamDetailSerializer, EXAM_LIST_ROWS
+from .bulk import ExamGradeImporter, read_csv_rows
+from .statistics import CACHE_ENDPOINT, CACHE_MODELS, statistics_plan
+from university_management.query_plan import run
+from university_management.stats_cache import cached_statistics
+import csv
+
+def with_enrolled_count(queryset):
+    """Annoter les examens avec le nombre d'étudiants inscrits à leur cours"""
+    return queryset.annotate(
+        enrolled_count=Count(
+            'course__enrollments',
+            filter=Q(course__enrollments__status='enrolled')
+        )
+    )
+
 
 class ExamListCreate(generics.ListCreateAPIView):
     """Liste et création d'examens"""
@@ -37,7 +52,15 @@ class ExamListCreate(generics.ListCreateAPIView):
         if department:
             queryset = queryset.filter(course__department=department)
         
-        return queryset
+        return with_enrolled_count(queryset)
+    
+    def list(self, request, *args, **kwargs):
+        """Liste lue avec .values() : mêmes champs qu'ExamSerializer, sans ses champs DRF"""
+        queryset = EXAM_LIST_ROWS.queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(EXAM_LIST_ROWS.rows(page))
+        return Response(EXAM_LIST_ROWS.rows(queryset))
 
 
 class ExamDetail(generics.RetrieveUpdateDestroyAPIView):
@@ -93,53 +116,13 @@ class GradeDetail(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_statistics(CACHE_ENDPOINT, models=CACHE_MODELS)
 def exam_statistics(request):
     """Statistiques des examens"""
     try:
-        total_exams = Exam.objects.count()
-        upcoming_exams = Exam.objects.filter(status='upcoming').count()
-        ongoing_exams = Exam.objects.filter(status='ongoing').count()
-        completed_exams = Exam.objects.filter(status='completed').count()
-        cancelled_exams = Exam.objects.filter(status='cancelled').count()
-        
-        # Moyenne d'étudiants par examen
-        avg_students = Exam.objects.aggregate(
-            avg_enrolled=Avg('course__enrollments__id')
-        )['avg_enrolled'] or 0
-        
-        # Examens par type
-        exams_by_type = {}
-        for exam_type, label in Exam.EXAM_TYPE_CHOICES:
-            exams_by_type[exam_type] = Exam.objects.filter(exam_type=exam_type).count()
-        
-        # Examens prochains (7 prochains jours)
-        from datetime import timedelta
-        today = date.today()
-        next_week = today + timedelta(days=7)
-        upcoming_week = Exam.objects.filter(
-            date__gte=today,
-            date__lte=next_week,
-            status='upcoming'
-        ).count()
-        
-        # Notes moyennes
-        avg_grade = Grade.objects.aggregate(avg_score=Avg('score'))['avg_score'] or 0
-        total_grades = Grade.objects.count()
-        
         return Response({
             'success': True,
-            'data': {
-                'total_exams': total_exams,
-                'upcoming_exams': upcoming_exams,
-                'ongoing_exams': ongoing_exams,
-                'completed_exams': completed_exams,
-                'cancelled_exams': cancelled_exams,
-                'avg_students_per_exam': round(avg_students, 2),
-                'exams_by_type': exams_by_type,
-                'upcoming_this_week': upcoming_week,
-                'total_grades': total_grades,
-                'average_score': round(float(avg_grade), 2)
-            }
+            'data': run(statistics_plan())
         })
     except Exception as e:
         return Response({
@@ -154,10 +137,10 @@ def upcoming_exams(request):
     """Examens à venir"""
     try:
         limit = int(request.query_params.get('limit', 5))
-        exams = Exam.objects.filter(
+        exams = with_enrolled_count(Exam.objects.filter(
             status='upcoming',
             date__gte=date.today()
-        ).select_related('course').order_by('date', 'time')[:limit]
+        ).select_related('course')).order_by('date', 'time')[:limit]
         
         serializer = ExamSerializer(exams, many=True)
         return Response({
@@ -174,10 +157,15 @@ def upcoming_exams(request):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def bulk_create_grades(request):
-    """Création en masse de notes pour un examen"""
+    """
+    Création en masse de notes pour un examen
+
+    Accepte une liste JSON ``grades`` ou un fichier CSV ``file`` (colonnes
+    student ou student_id, score, comments). Les notes existantes sont mises
+    à jour ; seuls les étudiants inscrits au cours de l'examen sont acceptés.
+    """
     try:
         exam_id = request.data.get('exam_id')
-        grades_data = request.data.get('grades', [])
         
         if not exam_id:
             return Response({
@@ -186,37 +174,39 @@ def bulk_create_grades(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         exam = Exam.objects.get(id=exam_id)
-        created_grades = []
-        errors = []
         
-        for grade_data in grades_data:
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is not None:
             try:
-                grade_data['exam'] = exam_id
-                serializer = GradeSerializer(data=grade_data)
-                if serializer.is_valid():
-                    serializer.save()
-                    created_grades.append(serializer.data)
-                else:
-                    errors.append({
-                        'student': grade_data.get('student'),
-                        'errors': serializer.errors
-                    })
-            except Exception as e:
-                errors.append({
-                    'student': grade_data.get('student'),
-                    'error': str(e)
-                })
+                grades_data = read_csv_rows(uploaded_file)
+            except (UnicodeDecodeError, csv.Error) as e:
+                return Response({
+                    'success': False,
+                    'error': 'Fichier CSV invalide',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            grades_data = request.data.get('grades', [])
+        
+        if not isinstance(grades_data, list):
+            return Response({
+                'success': False,
+                'error': 'Le champ grades doit être une liste'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        importer = ExamGradeImporter(exam, grades_data).run()
         
         return Response({
             'success': True,
             'data': {
-                'created': len(created_grades),
-                'failed': len(errors),
-                'grades': created_grades,
-                'errors': errors
+                'created': importer.created,
+                'updated': importer.updated,
+                'failed': len(importer.errors),
+                'grades': GradeSerializer(importer.grades, many=True).data,
+                'errors': importer.errors
             }
         })
-    except Exam.DoesNotExist:
+    except (Exam.DoesNotExist, ValueError):
         return Response({
             'success': False,
             'error': 'Examen non trouvé'
@@ -225,4 +215,4 @@ def bulk_create_grades(request):
         return Response({
             'success': False,
             'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,97 @@
+# backend/finance/budget_ledger.py
+"""
+Engagements et dépenses des budgets, sûrs en concurrence.
+
+Chaque opération est un seul ``UPDATE`` conditionnel calculé par la base
+(``committed_amount = committed_amount + X WHERE <disponible >= X>``) :
+deux écritures simultanées ne peuvent ni dépasser le budget ni écraser la
+mise à jour de l'autre, sans lecture préalable de la ligne. La base
+réévalue la condition sur la ligne verrouillée (PostgreSQL) ou sérialise
+les écritures (SQLite). Le succès se lit au nombre de lignes modifiées.
+
+Invariant maintenu : ``spent_amount + committed_amount <= allocated_amount``
+(budgets actifs).
+
+Les opérations retournent ``True`` si elles ont été appliquées, ``False``
+si le budget est introuvable, inactif ou insuffisant.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from university_management import stats_cache
+from .models import Budget
+
+# Demi-unité de la dernière décimale : SQLite calcule ces sommes en flottants
+TOLERANCE = Decimal('0.0005')
+
+LEDGER_FIELDS = ['allocated_amount', 'spent_amount', 'committed_amount', 'updated_at']
+
+
+def _amount(amount):
+    amount = Decimal(str(amount))
+    if amount <= 0:
+        raise ValueError("Le montant doit être strictement positif")
+    return amount
+
+
+def _pk(budget):
+    return budget.pk if isinstance(budget, Budget) else budget
+
+
+def _update(budget, condition, **values):
+    updated = Budget.objects.filter(condition, pk=_pk(budget), is_active=True).update(
+        updated_at=timezone.now(), **values
+    )
+    if updated:
+        # update() n'envoie pas de signal post_save
+        stats_cache.invalidate(Budget)
+    return updated == 1
+
+
+def _fits(spent, committed):
+    """Condition : ``spent + committed`` (expressions) tient dans l'allocation"""
+    return Q(allocated_amount__gte=spent + committed - TOLERANCE)
+
+
+def commit(budget, amount):
+    """Engager ``amount`` si le disponible (alloué - dépensé - engagé) le permet"""
+    amount = _amount(amount)
+    return _update(
+        budget, _fits(F('spent_amount'), F('committed_amount') + amount),
+        committed_amount=F('committed_amount') + amount,
+    )
+
+
+def release(budget, amount):
+    """Libérer ``amount`` d'engagement s'il est engagé"""
+    amount = _amount(amount)
+    return _update(
+        budget, Q(committed_amount__gte=amount - TOLERANCE),
+        committed_amount=F('committed_amount') - amount,
+    )
+
+
+def spend(budget, amount, from_commitment=True):
+    """
+    Dépenser ``amount``. Avec ``from_commitment``, la dépense consomme
+    jusqu'à ``amount`` d'engagement (comme ``Budget.spend_amount``) ;
+    sinon elle doit tenir dans le disponible non engagé.
+    """
+    amount = _amount(amount)
+    spent = F('spent_amount') + amount
+    if not from_commitment:
+        return _update(budget, _fits(spent, F('committed_amount')), spent_amount=spent)
+
+    covered = Q(committed_amount__gte=amount - TOLERANCE)
+    return _update(
+        budget,
+        (covered & _fits(spent, F('committed_amount') - amount)) | (~covered & _fits(spent, Value(Decimal(0)))),
+        spent_amount=spent,
+        committed_amount=Case(
+            When(covered, then=F('committed_amount') - amount), default=Value(Decimal(0))
+        ),
+    )
+
@@ -0,0 +1,362 @@
+# backend/finance/bulk.py
+"""
+Import en masse de relevés bancaires (paiements et nouvelles transactions).
+
+- les lignes viennent d'une liste JSON ou d'un fichier CSV (colonnes de
+  ``CSV_COLUMNS``, montants au format ``1500.50`` ou ``1 500,50``) ;
+- les transactions existantes sont lues en une requête par paquet de
+  références et rangées dans des dictionnaires par ``invoice_number`` et
+  ``receipt_number`` (les transactions créées par le lot y sont ajoutées) ;
+- une ligne dont le ``receipt_number`` est déjà connu (``PaymentReceipt``
+  des imports précédents, ou reçu d'une transaction) est un doublon : un
+  relevé réimporté ne paie pas deux fois. Les lignes sans reçu ne peuvent
+  pas être reconnues ; une ligne dont l'``invoice_number`` est connu est un
+  paiement de ``paid_amount`` sur cette transaction ; les autres créent
+  une transaction ;
+- catégorie, statut, date de paiement et passage en retard sont calculés
+  en une passe avec les règles de ``Transaction.save()``
+  (``transaction_category`` / ``transaction_status``) ;
+- l'écriture se fait dans une seule transaction : ``bulk_update`` des
+  paiements, ``bulk_create`` des nouvelles transactions (numérotées par
+  numbering.py) et des reçus, deltas du rollup mensuel et invalidation du cache des
+  statistiques. Avec ``dry_run`` rien n'est écrit.
+
+Le rapport de rapprochement donne le résultat de chaque ligne.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from students.models import Student
+from university_management import csv_import, stats_cache
+from . import rollup
+from .models import PaymentReceipt, Transaction, transaction_category, transaction_status
+from .serializers import TransactionImportRowSerializer
+
+CSV_COLUMNS = (
+    'invoice_number', 'receipt_number', 'amount', 'paid_amount', 'transaction_type', 'category',
+    'method', 'date', 'due_date', 'payment_date', 'student_id', 'description',
+)
+AMOUNT_COLUMNS = ('amount', 'paid_amount')
+
+# Références par requête de rapprochement (limite de paramètres SQLite)
+LOOKUP_CHUNK_SIZE = 900
+BATCH_SIZE = 500
+
+UPDATE_FIELDS = ['paid_amount', 'status', 'payment_date', 'overdue_since', 'method', 'receipt_number', 'updated_at']
+MATCH_FIELDS = ('pk', 'transaction_number', 'invoice_number', 'receipt_number', 'status', 'overdue_since',
+                'amount', 'paid_amount', 'date', 'due_date', 'payment_date', 'method', 'category',
+                'transaction_type')
+
+
+def read_csv_rows(uploaded_file):
+    """Lire un relevé CSV (séparateur ',' ou ';') en liste de dicts"""
+    return csv_import.read_csv_rows(uploaded_file, CSV_COLUMNS)
+
+
+def normalize_amount(value):
+    """``'1 500,50'`` -> ``'1500.50'`` (les autres valeurs sont laissées au serializer)"""
+    if isinstance(value, str):
+        value = value.replace('\xa0', '').replace(' ', '')
+        if ',' in value and '.' not in value:
+            value = value.replace(',', '.')
+    return value
+
+
+class TransactionImporter:
+    """Rapproche un relevé des transactions existantes et l'enregistre en un lot"""
+
+    def __init__(self, rows, dry_run=False):
+        self.rows = rows
+        self.dry_run = dry_run
+        self.today = date.today()
+        self.now = timezone.now()
+        self.report = []
+        self.errors = []
+        self.updates = {}
+        self.creates = []
+        self.receipts = []
+        self.deltas = rollup.new_deltas()
+        self.total_paid = Decimal(0)
+        self.overpaid = Decimal(0)
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def _error(self, line, data, errors):
+        self.errors.append({
+            'line': line,
+            'reference': data.get('invoice_number') or data.get('receipt_number'),
+            'errors': errors,
+        })
+
+    def _validate(self):
+        # Un seul serializer pour toutes les lignes : ses champs ne sont
+        # construits qu'une fois
+        serializer = TransactionImportRowSerializer()
+        valid = []
+        for line, data in enumerate(self.rows, start=1):
+            if not isinstance(data, dict):
+                self._error(line, {}, {'non_field_errors': ['Ligne invalide']})
+                continue
+            data = {key: normalize_amount(value) if key in AMOUNT_COLUMNS else value
+                    for key, value in data.items()}
+            try:
+                valid.append((line, serializer.run_validation(data)))
+            except ValidationError as e:
+                self._error(line, data, e.detail)
+        return valid
+
+    def _load_index(self, valid):
+        """Transactions existantes par numéro de facture et de reçu (listes : doublons possibles)"""
+        invoices = {row['invoice_number'] for _, row in valid if row.get('invoice_number')}
+        receipts = sorted({row['receipt_number'] for _, row in valid if row.get('receipt_number')})
+
+        imported = {}
+        for start in range(0, len(receipts), LOOKUP_CHUNK_SIZE):
+            imported.update(PaymentReceipt.objects.filter(
+                receipt_number__in=receipts[start:start + LOOKUP_CHUNK_SIZE]
+            ).values_list('receipt_number', 'transaction_id'))
+
+        references = (
+            [('invoice_number', value) for value in invoices]
+            + [('receipt_number', value) for value in receipts]
+            + [('pk', value) for value in set(imported.values())]
+        )
+        self.by_invoice, self.by_receipt = {}, {}
+        by_pk = {}
+        for start in range(0, len(references), LOOKUP_CHUNK_SIZE):
+            chunk = references[start:start + LOOKUP_CHUNK_SIZE]
+            condition = Q()
+            for field in ('invoice_number', 'receipt_number', 'pk'):
+                values = [value for name, value in chunk if name == field]
+                if values:
+                    condition |= Q(**{f'{field}__in': values})
+            # Verrouillées (PostgreSQL) jusqu'à l'écriture du lot
+            for row in Transaction.objects.select_for_update().filter(condition).values(*MATCH_FIELDS).order_by():
+                if row['pk'] not in by_pk:
+                    by_pk[row['pk']] = row
+                    self._index(row)
+
+        # Reçus déjà importés : rattachés à leur transaction
+        for receipt_number, transaction_id in imported.items():
+            self.by_receipt[receipt_number] = [by_pk[transaction_id]]
+
+    def _index(self, row):
+        for field, index in (('invoice_number', self.by_invoice), ('receipt_number', self.by_receipt)):
+            if row[field]:
+                entries = index.setdefault(row[field], [])
+                if not any(entry is row for entry in entries):
+                    entries.append(row)
+
+    def _students(self, valid):
+        codes = {row['student_id'] for _, row in valid if row.get('student_id')}
+        return dict(Student.objects.filter(student_id__in=codes).values_list('student_id', 'pk'))
+
+    # ------------------------------------------------------------------
+    # Rapprochement
+    # ------------------------------------------------------------------
+
+    def _match(self, index, value):
+        """(transaction, erreur) pour une référence"""
+        entries = index.get(value) if value else None
+        if not entries:
+            return None, None
+        if len(entries) > 1:
+            return None, 'Référence ambiguë : plusieurs transactions'
+        return entries[0], None
+
+    def _pay(self, line, data, row, target):
+        paid_amount = data.get('paid_amount')
+        if not paid_amount:
+            return self._error(line, data, {'paid_amount': ['Montant du paiement requis']})
+        if target['status'] == 'cancelled':
+            return self._error(line, data, {'invoice_number': ['Transaction annulée']})
+
+        if target['pk'] is not None and target['pk'] not in self.updates:
+            # État en base, pour les deltas du rollup
+            self.updates[target['pk']] = ({field: target[field] for field in rollup.ROLLUP_FIELDS}, target)
+        paid_before = target['paid_amount']
+        paid = paid_before + paid_amount
+        overpayment = max(paid - target['amount'], Decimal(0))
+        target['paid_amount'] = paid - overpayment
+        if data.get('payment_date'):
+            target['payment_date'] = data['payment_date']
+        if data.get('method'):
+            target['method'] = data['method']
+        if data.get('receipt_number'):
+            target['receipt_number'] = data['receipt_number']
+            self._index(target)
+            self.receipts.append((data['receipt_number'], target, paid_amount, data.get('payment_date')))
+        target['status'], target['payment_date'], target['overdue_since'] = transaction_status(
+            target['amount'], target['paid_amount'], target['status'], target['due_date'],
+            target['payment_date'], target['overdue_since'], self.today, self.now
+        )
+        self.total_paid += target['paid_amount'] - paid_before
+        self.overpaid += overpayment
+        self.report.append({
+            'line': line, 'action': 'payment', 'target': target, 'status': target['status'],
+            'reference': row['invoice_number'] or row['receipt_number'],
+            'paid_before': paid_before, 'paid_after': target['paid_amount'],
+            'overpayment': overpayment,
+        })
+
+    def _create(self, line, data, row, students):
+        if data.get('amount') is None or not data.get('transaction_type'):
+            return self._error(line, data, {'invoice_number': ['Aucune transaction pour cette référence']})
+        student_id = None
+        if data.get('student_id'):
+            student_id = students.get(data['student_id'])
+            if student_id is None:
+                return self._error(line, data, {'student_id': ['Étudiant inconnu']})
+
+        amount = data['amount']
+        paid = data.get('paid_amount') or Decimal(0)
+        overpayment = max(paid - amount, Decimal(0))
+        target = {
+            'pk': None, 'transaction_number': None,
+            'invoice_number': data.get('invoice_number', ''), 'receipt_number': data.get('receipt_number', ''),
+            'amount': amount, 'paid_amount': paid - overpayment, 'status': 'pending', 'overdue_since': None,
+            'date': data.get('date') or self.today, 'due_date': data.get('due_date'),
+            'payment_date': data.get('payment_date'), 'method': data.get('method', ''),
+            'transaction_type': data['transaction_type'],
+            'category': transaction_category(data['transaction_type'], data.get('category')),
+            'student_id': student_id, 'description': data.get('description', ''),
+        }
+        target['status'], target['payment_date'], target['overdue_since'] = transaction_status(
+            amount, target['paid_amount'], 'pending', target['due_date'],
+            target['payment_date'], None, self.today, self.now
+        )
+        self.creates.append(target)
+        self._index(target)
+        if target['receipt_number']:
+            self.receipts.append((target['receipt_number'], target, paid, target['payment_date']))
+        self.total_paid += target['paid_amount']
+        self.overpaid += overpayment
+        self.report.append({
+            'line': line, 'action': 'created', 'target': target, 'status': target['status'],
+            'reference': row['invoice_number'] or row['receipt_number'],
+            'paid_before': Decimal(0), 'paid_after': target['paid_amount'],
+            'overpayment': overpayment,
+        })
+
+    def _reconcile(self, valid, students):
+        for line, data in valid:
+            row = {'invoice_number': data.get('invoice_number', ''), 'receipt_number': data.get('receipt_number', '')}
+            target, error = self._match(self.by_receipt, row['receipt_number'])
+            if target is not None:
+                self.report.append({
+                    'line': line, 'action': 'duplicate', 'target': target, 'status': target['status'],
+                    'reference': row['receipt_number'], 'paid_before': target['paid_amount'],
+                    'paid_after': target['paid_amount'], 'overpayment': Decimal(0),
+                })
+                continue
+            if error is None:
+                target, error = self._match(self.by_invoice, row['invoice_number'])
+            if error is not None:
+                self._error(line, data, {'invoice_number': [error]})
+            elif target is not None:
+                self._pay(line, data, row, target)
+            else:
+                self._create(line, data, row, students)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def _write(self):
+        updated = []
+        for pk, (before, target) in self.updates.items():
+            rollup.add_row(self.deltas, before, -1)
+            rollup.add_row(self.deltas, target, 1)
+            updated.append(Transaction(
+                pk=pk, updated_at=self.now,
+                **{field: target[field] for field in UPDATE_FIELDS if field != 'updated_at'}
+            ))
+        self._update(updated)
+        created = [
+            Transaction(**{field: value for field, value in target.items() if field not in ('pk', 'transaction_number')})
+            for target in self.creates
+        ]
+        for target in self.creates:
+            rollup.add_row(self.deltas, target, 1)
+
+        Transaction.objects.bulk_create(created, batch_size=BATCH_SIZE)
+        for target, instance in zip(self.creates, created):
+            target['pk'], target['transaction_number'] = instance.pk, instance.transaction_number
+        PaymentReceipt.objects.bulk_create([
+            PaymentReceipt(receipt_number=receipt_number, transaction_id=target['pk'],
+                           amount=amount, payment_date=payment_date)
+            for receipt_number, target, amount, payment_date in self.receipts
+        ], batch_size=BATCH_SIZE)
+        rollup.apply_deltas(self.deltas)
+        # bulk_update / bulk_create n'envoient pas de signaux
+        stats_cache.invalidate(Transaction)
+
+    def _update(self, transactions):
+        """
+        ``bulk_update`` des champs qui diffèrent d'une transaction à l'autre ;
+        ceux qui ont la même valeur partout (``updated_at``, souvent
+        ``status`` ou ``method``) en un UPDATE simple par paquet, sans le
+        ``CASE WHEN`` par ligne de ``bulk_update``
+        """
+        if not transactions:
+            return
+        varying = [field for field in UPDATE_FIELDS
+                   if len({getattr(transaction, field) for transaction in transactions}) > 1]
+        constant = {field: getattr(transactions[0], field) for field in UPDATE_FIELDS if field not in varying}
+        if varying:
+            Transaction.objects.bulk_update(transactions, varying, batch_size=BATCH_SIZE)
+        for start in range(0, len(transactions) if constant else 0, LOOKUP_CHUNK_SIZE):
+            Transaction.objects.filter(
+                pk__in=[transaction.pk for transaction in transactions[start:start + LOOKUP_CHUNK_SIZE]]
+            ).update(**constant)
+
+    def run(self):
+        valid = self._validate()
+        with transaction.atomic():
+            self._load_index(valid)
+            self._reconcile(valid, self._students(valid))
+            if not self.dry_run and (self.updates or self.creates):
+                self._write()
+        return self
+
+    # ------------------------------------------------------------------
+    # Rapport
+    # ------------------------------------------------------------------
+
+    def summary(self):
+        """Rapport de rapprochement : totaux, résultat de chaque ligne et erreurs"""
+        actions = [entry['action'] for entry in self.report]
+        rows = sorted((
+            {
+                'line': entry['line'],
+                'action': entry['action'],
+                'reference': entry['reference'],
+                'transaction_id': entry['target']['pk'],
+                'transaction_number': entry['target']['transaction_number'],
+                'status': entry['status'],
+                'paid_before': str(entry['paid_before']),
+                'paid_after': str(entry['paid_after']),
+                'overpayment': str(entry['overpayment']),
+            }
+            for entry in self.report
+        ), key=lambda entry: entry['line'])
+        return {
+            'dry_run': self.dry_run,
+            'created': actions.count('created'),
+            'updated': len(self.updates),
+            'payments': actions.count('payment'),
+            'duplicates': actions.count('duplicate'),
+            'failed': len(self.errors),
+            'total_paid': str(self.total_paid),
+            'overpaid': str(self.overpaid),
+            'rows': rows,
+            'errors': self.errors,
+        }
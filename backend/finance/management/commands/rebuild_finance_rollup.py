@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import rollup
+
+
+class Command(BaseCommand):
+    help = "Reconstruit le rollup mensuel des transactions et le vérifie par rapport à finance_transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help="Vérifier le rollup existant sans le reconstruire",
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            count = rollup.rebuild()
+            self.stdout.write(f"Rollup reconstruit : {count} lignes")
+
+        mismatches = rollup.verify()
+        if mismatches:
+            for mismatch in mismatches[:20]:
+                self.stderr.write(
+                    f"Écart {mismatch['key']} : attendu {mismatch['expected']}, trouvé {mismatch['actual']}"
+                )
+            raise CommandError(f"{len(mismatches)} écart(s) entre le rollup et les transactions")
+
+        self.stdout.write(self.style.SUCCESS("Rollup conforme aux transactions"))
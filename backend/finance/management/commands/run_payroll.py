@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.payroll import PayrollRun
+
+
+class Command(BaseCommand):
+    help = "Crée les salaires du mois des enseignants actifs et leurs transactions (relançable)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', type=int, help="Mois (1-12), mois en cours par défaut")
+        parser.add_argument('--year', type=int, help="Année, année en cours par défaut")
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Calculer la paie sans rien écrire",
+        )
+
+    def handle(self, *args, **options):
+        today = date.today()
+        try:
+            payroll = PayrollRun(
+                options['year'] or today.year, options['month'] or today.month, dry_run=options['dry_run']
+            )
+            summary = payroll.run().summary()
+        except (ImproperlyConfigured, ValueError) as e:
+            raise CommandError(str(e))
+
+        prefix = "[simulation] " if summary['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Paie {summary['month']:02d}/{summary['year']} : {summary['teachers']} enseignant(s), "
+            f"{summary['created']} salaire(s) créé(s), {summary['linked']} transaction(s) ajoutée(s), "
+            f"{summary['skipped']} déjà payé(s) ; net total {summary['total_net_salary']}"
+        ))
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import reminders
+
+
+class Command(BaseCommand):
+    help = "Génère les rappels de paiement dus des transactions en retard et les envoie (à lancer chaque jour)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help="Date du jour à utiliser (AAAA-MM-JJ), aujourd'hui par défaut",
+        )
+        parser.add_argument(
+            '--no-dispatch',
+            action='store_true',
+            help="Créer les rappels sans les envoyer",
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("La date doit être au format AAAA-MM-JJ")
+
+        if options['no_dispatch']:
+            created = reminders.generate(today)
+            result = {'created': sum(created.values()), 'by_type': created, 'sent': 0, 'failed': 0}
+        else:
+            result = reminders.run(today)
+
+        details = ', '.join(f"{reminder_type} : {count}" for reminder_type, count in result['by_type'].items())
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} rappel(s) créé(s) ({details}), "
+            f"{result['sent']} envoyé(s), {result['failed']} échec(s)"
+        ))
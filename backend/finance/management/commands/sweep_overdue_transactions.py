@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import overdue
+
+
+class Command(BaseCommand):
+    help = "Passe en retard les transactions ouvertes dont l'échéance est dépassée (à lancer chaque jour)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help="Date du jour à utiliser (AAAA-MM-JJ), aujourd'hui par défaut",
+        )
+        parser.add_argument(
+            '--no-reminders',
+            action='store_true',
+            help="Ne pas créer de rappels de paiement",
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("La date doit être au format AAAA-MM-JJ")
+
+        result = overdue.sweep(today, create_reminders=False if options['no_reminders'] else None)
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['transitioned']} transaction(s) passée(s) en retard, "
+            f"{result['reminders']} rappel(s) créé(s)"
+        ))
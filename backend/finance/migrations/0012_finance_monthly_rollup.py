@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def build_rollup(apps, schema_editor):
+    """Initialiser le rollup depuis les transactions existantes"""
+    Transaction = apps.get_model('finance', 'Transaction')
+    FinanceMonthlyRollup = apps.get_model('finance', 'FinanceMonthlyRollup')
+
+    rows = Transaction.objects.exclude(date__isnull=True).annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date'),
+    ).values('year', 'month', 'category', 'transaction_type', 'status').annotate(
+        total_amount=Sum('amount'),
+        total_paid_amount=Sum('paid_amount'),
+        transaction_count=Count('id'),
+    ).order_by()
+
+    FinanceMonthlyRollup.objects.bulk_create([
+        FinanceMonthlyRollup(
+            year=row['year'],
+            month=row['month'],
+            category=row['category'],
+            transaction_type=row['transaction_type'],
+            status=row['status'],
+            total_amount=row['total_amount'] or 0,
+            total_paid_amount=row['total_paid_amount'] or 0,
+            transaction_count=row['transaction_count'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0011_safe_index_removal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinanceMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('category', models.CharField(choices=[('income', 'Revenu'), ('expense', 'Dépense'), ('scholarship', 'Bourse'), ('salary', 'Salaire')], max_length=20)),
+                ('transaction_type', models.CharField(choices=[('tuition', 'Frais de scolarité'), ('exam_fee', "Frais d'examen"), ('library_fee', 'Frais de bibliothèque'), ('lab_fee', 'Frais de laboratoire'), ('scholarship', "Bourse d'études"), ('refund', 'Remboursement'), ('salary', 'Salaire enseignant'), ('maintenance', 'Maintenance'), ('equipment', 'Équipement'), ('other', 'Autre')], max_length=20)),
+                ('status', models.CharField(choices=[('paid', 'Payé'), ('pending', 'En attente'), ('overdue', 'En retard'), ('cancelled', 'Annulé'), ('partial', 'Partiel')], max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=3, default=0, max_digits=15)),
+                ('total_paid_amount', models.DecimalField(decimal_places=3, default=0, max_digits=15)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['year', 'month'],
+                'unique_together': {('year', 'month', 'category', 'transaction_type', 'status')},
+            },
+        ),
+        migrations.RunPython(build_rollup, reverse_code=migrations.RunPython.noop),
+    ]
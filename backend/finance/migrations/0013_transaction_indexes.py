@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+from university_management.indexes import AddIndexIfMissing
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_finance_monthly_rollup'),
+    ]
+
+    operations = [
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(fields=['-date'], name='fin_tx_date_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(fields=['student', '-date'], name='fin_tx_student_date_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(fields=['teacher', '-date'], name='fin_tx_teacher_date_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(fields=['category', 'status', 'date'], name='fin_tx_cat_status_date_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'partial'])), fields=['due_date'], name='fin_tx_open_due_idx'),
+        ),
+    ]
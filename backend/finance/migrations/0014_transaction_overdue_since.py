@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:44
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from university_management.indexes import AddIndexIfMissing
+
+
+def backfill_overdue_since(apps, schema_editor):
+    """Transactions déjà en retard : passage supposé le lendemain de l'échéance"""
+    Transaction = apps.get_model('finance', 'Transaction')
+    overdue = Transaction.objects.filter(status='overdue', overdue_since__isnull=True)
+    for due_date in overdue.exclude(due_date__isnull=True).values_list('due_date', flat=True).distinct():
+        since = datetime.combine(due_date + timedelta(days=1), time.min)
+        if settings.USE_TZ:
+            since = timezone.make_aware(since)
+        overdue.filter(due_date=due_date).update(overdue_since=since)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0013_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='overdue_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('status__in', ['overdue'])), fields=['due_date'], name='fin_tx_overdue_due_idx'),
+        ),
+        migrations.RunPython(backfill_overdue_since, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+from university_management.indexes import AddIndexIfMissing
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0014_transaction_overdue_since'),
+    ]
+
+    operations = [
+        AddIndexIfMissing(
+            model_name='paymentreminder',
+            index=models.Index(fields=['transaction', 'reminder_type', 'reminder_date'], name='fin_reminder_tx_type_date_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='paymentreminder',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['reminder_date'], name='fin_reminder_unsent_idx'),
+        ),
+    ]
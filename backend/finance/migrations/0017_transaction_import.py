@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from university_management.indexes import AddIndexIfMissing
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0016_transaction_sequence'),
+    ]
+
+    operations = [
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(fields=['invoice_number'], name='fin_tx_invoice_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='transaction',
+            index=models.Index(fields=['receipt_number'], name='fin_tx_receipt_idx'),
+        ),
+        migrations.CreateModel(
+            name='PaymentReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('receipt_number', models.CharField(max_length=50, unique=True)),
+                ('amount', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('payment_date', models.DateField(blank=True, null=True)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='finance.transaction')),
+            ],
+            options={
+                'ordering': ['-imported_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:24
+
+from django.db import migrations, models
+
+
+def remove_duplicate_reminders(apps, schema_editor):
+    """Garder un rappel par (transaction, type, date), de préférence déjà envoyé"""
+    PaymentReminder = apps.get_model('finance', 'PaymentReminder')
+    duplicates = PaymentReminder.objects.filter(transaction__isnull=False).values(
+        'transaction_id', 'reminder_type', 'reminder_date'
+    ).annotate(count=models.Count('id')).filter(count__gt=1).order_by()
+    for key in duplicates:
+        ids = list(
+            PaymentReminder.objects.filter(
+                transaction_id=key['transaction_id'], reminder_type=key['reminder_type'],
+                reminder_date=key['reminder_date'],
+            ).order_by(models.F('sent_at').asc(nulls_last=True), 'id').values_list('id', flat=True)
+        )
+        PaymentReminder.objects.filter(id__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0017_transaction_import'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reminders, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='paymentreminder',
+            name='fin_reminder_tx_type_date_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='paymentreminder',
+            constraint=models.UniqueConstraint(fields=('transaction', 'reminder_type', 'reminder_date'), name='fin_reminder_tx_type_date_uniq'),
+        ),
+    ]
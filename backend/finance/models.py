@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
+from django.db.models import F, Q
+from django.db.models.lookups import In
 from django.core.validators import MinValueValidator
 from students.models import Student
 from teachers.models import Teacher
@@ -7,6 +9,92 @@ from datetime import datetime, date
 from django.utils import timezone
 
 
+# Statuts d'une transaction encore à encaisser / payer
+OPEN_STATUSES = ['pending', 'partial']
+
+# Statut d'une transaction ouverte échue : posé par save() ou par le
+# balayage quotidien (overdue.sweep) ; les lectures se fient à ce statut
+OVERDUE_STATUS = 'overdue'
+
+# Statuts qui ne passent jamais en retard
+CLOSED_STATUSES = ['paid', 'cancelled']
+
+
+class LiteralIn(In):
+    """
+    ``IN`` dont les valeurs sont écrites en littéraux SQL plutôt qu'en
+    paramètres : le planificateur peut alors prouver que la requête est
+    couverte par la condition d'un index partiel (SQLite ne le fait pas avec
+    des paramètres liés). Réservé aux constantes du code.
+    """
+
+    prepare_rhs = False
+
+    def process_rhs(self, compiler, connection):
+        values = ', '.join("'%s'" % str(value).replace("'", "''") for value in self.rhs)
+        return '(%s)' % values, ()
+
+
+def open_status():
+    """Condition ``status IN ('pending', 'partial')`` utilisable par ``fin_tx_open_due_idx``"""
+    return LiteralIn(F('status'), OPEN_STATUSES)
+
+
+def overdue_status():
+    """Condition ``status IN ('overdue')`` utilisable par ``fin_tx_overdue_due_idx``"""
+    return LiteralIn(F('status'), [OVERDUE_STATUS])
+
+
+def transaction_category(transaction_type, category):
+    """Catégorie d'une transaction : déduite du type si absente ou 'income'"""
+    if not category or category == 'income':
+        if transaction_type in ['scholarship', 'refund']:
+            return 'scholarship'
+        elif transaction_type == 'salary':
+            return 'salary'
+        elif transaction_type in ['tuition', 'exam_fee', 'library_fee', 'lab_fee']:
+            return 'income'
+        else:
+            return 'expense'
+    return category
+
+
+def transaction_status(amount, paid_amount, status, due_date, payment_date, overdue_since, today, now):
+    """
+    ``(statut, date de paiement, passage en retard)`` d'une transaction selon
+    ses montants et son échéance. Sans accès à la base : ``save()`` et
+    l'import en masse (bulk.py) appliquent les mêmes règles.
+    """
+    if paid_amount >= amount:
+        status = 'paid'
+        if not payment_date:
+            payment_date = today
+    elif paid_amount > 0:
+        status = 'partial'
+    
+    if due_date and due_date < today and status not in CLOSED_STATUSES:
+        if status != OVERDUE_STATUS or not overdue_since:
+            overdue_since = now
+        status = OVERDUE_STATUS
+    elif status == OVERDUE_STATUS:
+        # Échéance repoussée ou supprimée : la transaction redevient ouverte
+        status = 'pending'
+    
+    if status != OVERDUE_STATUS:
+        overdue_since = None
+    return status, payment_date, overdue_since
+
+
+class TransactionQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Numéroter les transactions sans numéro avant l'insertion (voir numbering.py)"""
+        from . import numbering
+
+        objs = list(objs)
+        numbering.assign_numbers(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 # backend/finance/models.py - Section Transaction
 
 class Transaction(models.Model):
@@ -83,6 +171,8 @@ class Transaction(models.Model):
     
     # Statut et méthode
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Passage au statut 'overdue' (None pour une transaction qui n'est pas en retard)
+    overdue_since = models.DateTimeField(null=True, blank=True)
     method = models.CharField(max_length=20, choices=METHOD_CHOICES, blank=True)
     
     # Informations supplémentaires
@@ -102,9 +192,34 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TransactionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-date']
-        # ✅ PAS D'INDEXES - Tout commenté ou supprimé
+        # Chemins d'accès de TransactionViewSet et des statistiques. Les index
+        # sont créés par les migrations ; `python manage.py sync_indexes`
+        # vérifie que la base correspond à cette liste.
+        indexes = [
+            models.Index(fields=['-date'], name='fin_tx_date_idx'),
+            models.Index(fields=['student', '-date'], name='fin_tx_student_date_idx'),
+            models.Index(fields=['teacher', '-date'], name='fin_tx_teacher_date_idx'),
+            models.Index(fields=['category', 'status', 'date'], name='fin_tx_cat_status_date_idx'),
+            # Index partiel : seules les transactions ouvertes, pour les retards
+            models.Index(
+                fields=['due_date'],
+                condition=Q(status__in=OPEN_STATUSES),
+                name='fin_tx_open_due_idx',
+            ),
+            # Rapprochement des relevés bancaires (bulk.py)
+            models.Index(fields=['invoice_number'], name='fin_tx_invoice_idx'),
+            models.Index(fields=['receipt_number'], name='fin_tx_receipt_idx'),
+            # Transactions en retard (filtre is_overdue, rappels)
+            models.Index(
+                fields=['due_date'],
+                condition=Q(status__in=[OVERDUE_STATUS]),
+                name='fin_tx_overdue_due_idx',
+            ),
+        ]
     
     def __str__(self):
         try:
@@ -120,7 +235,7 @@ class Transaction(models.Model):
             return f"Transaction {str(self.id)[:8]}"
     
     def save(self, *args, **kwargs):
-        from datetime import datetime as dt
+        from . import rollup
         
         if not self.transaction_number and self._state.adding:
             self._generate_transaction_number()
@@ -129,44 +244,28 @@ class Transaction(models.Model):
         self._calculate_status()
         self._validate_amounts()
         
-        super().save(*args, **kwargs)
+        with db_transaction.atomic():
+            # État précédent en base, pour la mise à jour incrémentale du rollup
+            old_row = None
+            if not self._state.adding and self.pk is not None:
+                old_row = Transaction.objects.filter(pk=self.pk).values(*rollup.ROLLUP_FIELDS).first()
+            
+            super().save(*args, **kwargs)
+            rollup.record_save(old_row, self)
     
     def _generate_transaction_number(self):
-        from datetime import datetime as dt
+        from . import numbering
         
-        try:
-            prefix = 'TRN'
-            year = str(self.date.year)[2:] if self.date else str(dt.now().year)[2:]
-            timestamp = int(dt.now().timestamp())
-            random_part = str(timestamp)[-6:]
-            self.transaction_number = f"{prefix}{year}{random_part}"
-        except Exception:
-            self.transaction_number = f"TRN{str(dt.now().timestamp()).replace('.', '')[:10]}"
+        self.transaction_number = numbering.next_number(self.date)
     
     def _determine_category(self):
-        if not self.category or self.category == 'income':
-            if self.transaction_type in ['scholarship', 'refund']:
-                self.category = 'scholarship'
-            elif self.transaction_type == 'salary':
-                self.category = 'salary'
-            elif self.transaction_type in ['tuition', 'exam_fee', 'library_fee', 'lab_fee']:
-                self.category = 'income'
-            else:
-                self.category = 'expense'
+        self.category = transaction_category(self.transaction_type, self.category)
     
     def _calculate_status(self):
-        from datetime import date
-        
-        if self.paid_amount >= self.amount:
-            self.status = 'paid'
-            if not self.payment_date:
-                self.payment_date = date.today()
-        elif self.paid_amount > 0:
-            self.status = 'partial'
-        
-        if (self.due_date and self.due_date < date.today() and 
-            self.status not in ['paid', 'cancelled']):
-            self.status = 'overdue'
+        self.status, self.payment_date, self.overdue_since = transaction_status(
+            self.amount, self.paid_amount, self.status, self.due_date,
+            self.payment_date, self.overdue_since, date.today(), timezone.now()
+        )
     
     def _validate_amounts(self):
         if self.paid_amount > self.amount:
@@ -186,24 +285,14 @@ class Transaction(models.Model):
     
     @property
     def is_overdue(self):
-        from datetime import date
-        try:
-            if (self.due_date and self.due_date < date.today() and 
-                self.status not in ['paid', 'cancelled']):
-                return True
-            return False
-        except Exception:
-            return False
+        return self.status == OVERDUE_STATUS
     
     @property
     def days_overdue(self):
         from datetime import date
-        try:
-            if self.is_overdue:
-                return (date.today() - self.due_date).days
-            return 0
-        except Exception:
-            return 0
+        if self.is_overdue and self.due_date:
+            return max((date.today() - self.due_date).days, 0)
+        return 0
     
     @property
     def payment_percentage(self):
@@ -287,36 +376,25 @@ class Budget(models.Model):
         available = self.available_amount - self.committed_amount
         return available >= amount
     
+    def _apply_ledger(self, operation, amount):
+        """Opération de budget_ledger.py, puis relecture des montants"""
+        from . import budget_ledger
+
+        applied = getattr(budget_ledger, operation)(self, amount)
+        self.refresh_from_db(fields=budget_ledger.LEDGER_FIELDS)
+        return applied
+    
     def commit_amount(self, amount):
-        """Engager un montant"""
-        if self.can_spend(amount):
-            self.committed_amount += amount
-            self.save()
-            return True
-        return False
+        """Engager un montant (UPDATE conditionnel, sûr en concurrence)"""
+        return self._apply_ledger('commit', amount)
     
     def release_commitment(self, amount):
         """Libérer un engagement"""
-        if self.committed_amount >= amount:
-            self.committed_amount -= amount
-            self.save()
-            return True
-        return False
+        return self._apply_ledger('release', amount)
     
     def spend_amount(self, amount):
-        """Dépenser un montant (réel)"""
-        if self.spent_amount + amount <= self.allocated_amount:
-            self.spent_amount += amount
-            # Libérer l'engagement correspondant si nécessaire
-            if self.committed_amount >= amount:
-                self.committed_amount -= amount
-            elif self.committed_amount > 0:
-                # Si l'engagement est partiel
-                amount -= self.committed_amount
-                self.committed_amount = 0
-            self.save()
-            return True
-        return False
+        """Dépenser un montant (réel), en consommant l'engagement correspondant"""
+        return self._apply_ledger('spend', amount)
 
 class Salary(models.Model):
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='salaries')
@@ -403,6 +481,27 @@ class FinancialReport(models.Model):
     def __str__(self):
         return f"Rapport {self.report_type} - {self.period_start} au {self.period_end}"
     
+    def save(self, *args, **kwargs):
+        # Calculer les totaux à la création s'ils n'ont pas été fournis
+        if self._state.adding and not any([
+            self.total_income, self.total_expenses,
+            self.total_salaries, self.total_scholarships,
+        ]):
+            self.compute_totals()
+        super().save(*args, **kwargs)
+    
+    def compute_totals(self):
+        """Calculer les totaux de la période depuis le rollup mensuel"""
+        from .rollup import period_totals
+        
+        totals = period_totals(self.period_start, self.period_end)
+        self.total_income = totals['income']
+        self.total_expenses = totals['expense']
+        self.total_salaries = totals['salary']
+        self.total_scholarships = totals['scholarship']
+        self.net_balance = (self.total_income - self.total_expenses
+                            - self.total_salaries - self.total_scholarships)
+    
     @property
     def period_duration(self):
         return (self.period_end - self.period_start).days + 1
@@ -466,10 +565,68 @@ class PaymentReminder(models.Model):
     
     class Meta:
         ordering = ['-reminder_date']
+        constraints = [
+            # Un rappel de chaque type par transaction et par jour : deux
+            # générations concurrentes ne créent pas de doublon. Son index
+            # sert aussi au niveau d'escalade par transaction (reminders.py)
+            models.UniqueConstraint(
+                fields=['transaction', 'reminder_type', 'reminder_date'],
+                name='fin_reminder_tx_type_date_uniq',
+            ),
+        ]
+        indexes = [
+            # File d'envoi : rappels non envoyés
+            models.Index(
+                fields=['reminder_date'],
+                condition=Q(sent_at__isnull=True),
+                name='fin_reminder_unsent_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"Rappel {self.reminder_type} - {self.transaction.transaction_number or 'N/A'} - {self.reminder_date}"
 
+class FinanceMonthlyRollup(models.Model):
+    """Agrégat mensuel des transactions, maintenu incrémentalement (voir rollup.py)"""
+    year = models.IntegerField()
+    month = models.IntegerField()
+    category = models.CharField(max_length=20, choices=Transaction.CATEGORY_CHOICES)
+    transaction_type = models.CharField(max_length=20, choices=Transaction.TRANSACTION_TYPES)
+    status = models.CharField(max_length=20, choices=Transaction.STATUS_CHOICES)
+    total_amount = models.DecimalField(max_digits=15, decimal_places=3, default=0)
+    total_paid_amount = models.DecimalField(max_digits=15, decimal_places=3, default=0)
+    transaction_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['year', 'month', 'category', 'transaction_type', 'status']
+        ordering = ['year', 'month']
+    
+    def __str__(self):
+        return f"Rollup {self.month:02d}/{self.year} - {self.category} - {self.transaction_type} - {self.status}"
+
+class PaymentReceipt(models.Model):
+    """Paiement importé d'un relevé bancaire, identifié par son reçu (voir bulk.py)"""
+    receipt_number = models.CharField(max_length=50, unique=True)
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='receipts')
+    amount = models.DecimalField(max_digits=12, decimal_places=3)
+    payment_date = models.DateField(null=True, blank=True)
+    imported_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-imported_at']
+    
+    def __str__(self):
+        return f"Reçu {self.receipt_number} - {self.amount}"
+
+class TransactionSequence(models.Model):
+    """Compteur annuel des numéros de transaction, réservé par blocs (voir numbering.py)"""
+    year = models.IntegerField(unique=True)
+    next_value = models.BigIntegerField(default=1)
+    
+    def __str__(self):
+        return f"Séquence {self.year} - prochain {self.next_value}"
+
 class FinancialSetting(models.Model):
     setting_key = models.CharField(max_length=100, unique=True)
     setting_value = models.TextField()
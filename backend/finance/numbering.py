@@ -0,0 +1,136 @@
+# backend/finance/numbering.py
+"""
+Numéros de transaction ``TRN{aa}-{n:06d}`` (``TRN26-000042``), sans
+collision entre threads, requêtes et processus.
+
+Chaque année a son compteur (``TransactionSequence``). Un processus
+réserve un bloc de ``BLOCK_SIZE`` numéros en un seul UPDATE atomique
+(``next_value = next_value + n``, puis relecture : la ligne reste
+verrouillée jusqu'à la fin de la transaction sur PostgreSQL, la base
+entière sur SQLite), puis les distribue en mémoire sous verrou. Les
+numéros réservés et non utilisés (arrêt du processus) laissent des trous :
+la numérotation est unique et croissante par processus, pas continue.
+
+Une réservation faite dans une transaction englobante n'est gardée en
+mémoire qu'à sa validation (``on_commit``) : annulée, elle annule aussi le
+compteur, et ces numéros ne doivent plus être distribués. Après un
+``fork`` le processus enfant repart d'un cache vide.
+
+``Transaction.save()`` et ``Transaction.objects.bulk_create()`` numérotent
+les transactions qui n'ont pas de numéro.
+"""
+
+import os
+import threading
+from collections import defaultdict, deque
+from datetime import date
+
+from django.conf import settings
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import F
+
+DEFAULT_SETTINGS = {
+    'PREFIX': 'TRN',
+    # Numéros réservés par processus en une écriture
+    'BLOCK_SIZE': 100,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'TRANSACTION_NUMBERS', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def format_number(year, value):
+    return f"{get_setting('PREFIX')}{year % 100:02d}-{value:06d}"
+
+
+def reserve(year, count):
+    """Réserver ``count`` numéros de ``year`` ; retourne le premier"""
+    from .models import TransactionSequence
+
+    with db_transaction.atomic():
+        sequence = TransactionSequence.objects.filter(year=year)
+        if not sequence.update(next_value=F('next_value') + count):
+            try:
+                with db_transaction.atomic():
+                    TransactionSequence.objects.create(year=year, next_value=1 + count)
+                return 1
+            except IntegrityError:
+                # Créé en même temps par un autre processus
+                sequence.update(next_value=F('next_value') + count)
+        return sequence.values_list('next_value', flat=True).get() - count
+
+
+class NumberAllocator:
+    """Blocs de numéros réservés par le processus, par année"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # {année: file de plages [début, fin)}
+        self.blocks = defaultdict(deque)
+
+    def _take(self, year, count):
+        """Numéros pris dans les blocs en mémoire (au plus ``count``)"""
+        values = []
+        blocks = self.blocks[year]
+        while blocks and len(values) < count:
+            start, end = blocks.popleft()
+            taken = min(end - start, count - len(values))
+            values.extend(range(start, start + taken))
+            if start + taken < end:
+                blocks.appendleft((start + taken, end))
+        return values
+
+    def _keep(self, year, start, end):
+        if start < end:
+            with self.lock:
+                self.blocks[year].append((start, end))
+
+    def allocate(self, year, count=1):
+        """``count`` numéros de ``year`` (entiers), réservant un bloc si nécessaire"""
+        with self.lock:
+            values = self._take(year, count)
+        missing = count - len(values)
+        if missing:
+            reserved = max(missing, get_setting('BLOCK_SIZE'))
+            start = reserve(year, reserved)
+            values.extend(range(start, start + missing))
+            remainder = (year, start + missing, start + reserved)
+            if db_transaction.get_connection().in_atomic_block:
+                db_transaction.on_commit(lambda: self._keep(*remainder))
+            else:
+                self._keep(*remainder)
+        return values
+
+
+allocator = NumberAllocator()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=allocator.reset)
+
+
+def _year(value):
+    if value is None:
+        return date.today().year
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10]).year
+    return value.year
+
+
+def next_number(transaction_date=None):
+    """Numéro d'une nouvelle transaction datée de ``transaction_date``"""
+    year = _year(transaction_date)
+    return format_number(year, allocator.allocate(year)[0])
+
+
+def assign_numbers(transactions):
+    """Numéroter les transactions sans numéro (une allocation par année)"""
+    by_year = defaultdict(list)
+    for transaction in transactions:
+        if not transaction.transaction_number:
+            by_year[_year(transaction.date)].append(transaction)
+    for year, pending in by_year.items():
+        for transaction, value in zip(pending, allocator.allocate(year, len(pending))):
+            transaction.transaction_number = format_number(year, value)
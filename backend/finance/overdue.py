@@ -0,0 +1,130 @@
+# backend/finance/overdue.py
+"""
+Passage en retard des transactions échues.
+
+Une transaction ouverte (``pending`` / ``partial``) dont l'échéance est
+passée prend le statut ``overdue`` : à son enregistrement
+(``Transaction.save``) ou, si elle n'est pas réenregistrée, par le balayage
+quotidien ``sweep()``. Les lectures (filtre ``is_overdue``, serializers,
+statistiques) se fient ensuite au statut enregistré au lieu de comparer
+``due_date`` à la date du jour.
+
+``sweep()`` passe toutes les transactions échues en retard par un seul
+UPDATE, enregistre l'heure du passage (``overdue_since``), déplace leurs
+montants dans le rollup mensuel (le statut fait partie de sa clé) et
+invalide les statistiques en cache, puis génère et envoie les rappels de
+paiement du jour (finance/reminders.py).
+
+Exécution : ``python manage.py sweep_overdue_transactions`` (cron
+quotidien), ou le thread de ``start_runner()`` lorsque
+``OVERDUE_SWEEPER['RUN_IN_PROCESS']`` est activé. Ce thread n'est démarré
+que par les points d'entrée du serveur (wsgi.py, asgi.py ; runserver charge
+wsgi.py), jamais par migrate, shell ou les autres commandes. Un balayage
+qui ne trouve rien n'écrit rien : plusieurs processus peuvent le lancer le
+même jour.
+"""
+
+import logging
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from university_management import stats_cache
+from . import reminders, rollup
+from .models import OVERDUE_STATUS, Transaction, open_status
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    # Thread de balayage démarré avec l'application (processus web)
+    'RUN_IN_PROCESS': False,
+    # Secondes entre deux vérifications du thread (un balayage par jour)
+    'INTERVAL': 3600,
+    # Générer et envoyer les rappels de paiement après le balayage
+    'CREATE_REMINDERS': True,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'OVERDUE_SWEEPER', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def candidates(today=None):
+    """Transactions ouvertes échues (index partiel fin_tx_open_due_idx)"""
+    return Transaction.objects.filter(open_status(), due_date__lt=today or date.today()).order_by()
+
+
+def sweep(today=None, create_reminders=None):
+    """
+    Passer en retard les transactions ouvertes échues avant ``today``.
+
+    Retourne ``{'transitioned': nombre de transactions, 'reminders': nombre
+    de rappels créés}`` (rappels de toutes les transactions en retard, pas
+    seulement de celles qui viennent d'y passer).
+    """
+    today = today or date.today()
+    if create_reminders is None:
+        create_reminders = get_setting('CREATE_REMINDERS')
+    now = timezone.now()
+
+    with transaction.atomic():
+        queryset = candidates(today)
+        # Lignes verrouillées (PostgreSQL) : rollup et UPDATE portent sur
+        # le même ensemble
+        locked = list(queryset.select_for_update().values_list('pk', flat=True))
+        transitioned = 0
+        if locked:
+            deltas = rollup.status_change_deltas(rollup.compute_from_transactions(queryset), OVERDUE_STATUS)
+            transitioned = queryset.update(status=OVERDUE_STATUS, overdue_since=now, updated_at=now)
+            rollup.apply_deltas(deltas)
+            # UPDATE en masse : pas de signal post_save
+            stats_cache.invalidate(Transaction)
+
+    created = reminders.run(today)['created'] if create_reminders else 0
+
+    logger.info("%d transaction(s) passée(s) en retard, %d rappel(s) créé(s)", transitioned, created)
+    return {'transitioned': transitioned, 'reminders': created}
+
+
+# ----------------------------------------------------------------------
+# Exécution périodique dans le processus
+# ----------------------------------------------------------------------
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def _run_forever():
+    last_day = None
+    while True:
+        today = date.today()
+        if today != last_day:
+            try:
+                sweep(today)
+                last_day = today
+            except Exception:
+                logger.exception("Échec du balayage des transactions en retard")
+            finally:
+                close_old_connections()
+        time.sleep(get_setting('INTERVAL'))
+
+
+def start_runner():
+    """Démarrer le thread de balayage quotidien (une fois par processus)"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = threading.Thread(target=_run_forever, name='overdue-sweeper', daemon=True)
+            _runner.start()
+    return _runner
+
+
+def start_runner_if_enabled():
+    """Démarrer le thread si ``RUN_IN_PROCESS`` (appelé par wsgi.py / asgi.py)"""
+    if get_setting('RUN_IN_PROCESS'):
+        return start_runner()
+    return None
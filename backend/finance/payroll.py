@@ -0,0 +1,229 @@
+# backend/finance/payroll.py
+"""
+Paie mensuelle des enseignants.
+
+``PayrollRun(year, month).run()`` :
+
+- lit en une requête les enseignants actifs (compte actif, embauchés
+  avant la fin du mois) avec leur dernier salaire de base (sous-requête),
+  et en une autre les salaires déjà créés pour le mois ;
+- calcule en une passe salaire de base (dernier salaire payé, sinon barème
+  ``PAYROLL['BASE_SALARY']`` du grade), retenues (``DEDUCTION_RATE`` du
+  brut, aucune par défaut) et net ;
+- dans une seule transaction : ``bulk_create`` des transactions
+  ``salary`` (numérotées par numbering.py) puis des ``Salary`` qui leur
+  sont liés, ``bulk_update`` des salaires existants sans transaction,
+  deltas du rollup mensuel et invalidation des statistiques en cache.
+
+Reprise : relancée pour le même mois, la paie ne recrée rien ; elle ajoute
+les enseignants manquants (embauches, paie interrompue) et crée les
+transactions des salaires saisis à la main (réglées si le salaire est
+déjà payé). ``dry_run`` calcule le rapport sans rien écrire.
+
+Le barème n'a pas de valeur par défaut : sans ``PAYROLL['BASE_SALARY']``,
+ou pour un grade absent du barème (et sans ``DEFAULT_BASE_SALARY``), la paie
+échoue avec ``ImproperlyConfigured`` plutôt que d'inventer un salaire.
+"""
+
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction as db_transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from teachers.models import Teacher
+from university_management import stats_cache
+from . import rollup
+from .models import Salary, Transaction, transaction_status
+
+DEFAULT_SETTINGS = {
+    # Salaire de base mensuel par grade, sans salaire précédent ; obligatoire,
+    # ex. {'professor': '4500', 'lecturer': '3200'}
+    'BASE_SALARY': None,
+    # Salaire de base d'un grade absent du barème (None : erreur)
+    'DEFAULT_BASE_SALARY': None,
+    # Retenues (cotisations, impôt) en part du brut
+    'DEDUCTION_RATE': '0',
+    'PAYMENT_METHOD': 'bank_transfer',
+}
+
+BATCH_SIZE = 500
+AMOUNT_PRECISION = Decimal('0.001')
+
+
+def get_setting(name):
+    return getattr(settings, 'PAYROLL', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+class PayrollRun:
+    """Salaires et transactions d'un mois pour tous les enseignants actifs"""
+
+    def __init__(self, year, month, dry_run=False):
+        if not 1 <= month <= 12:
+            raise ValueError("Le mois doit être compris entre 1 et 12")
+        if not get_setting('BASE_SALARY'):
+            raise ImproperlyConfigured(
+                "Barème des salaires non configuré : définir PAYROLL['BASE_SALARY'] "
+                "(salaire de base mensuel par grade)"
+            )
+        self.year = year
+        self.month = month
+        self.dry_run = dry_run
+        self.period_start = date(year, month, 1)
+        self.period_end = date(year, month, calendar.monthrange(year, month)[1])
+        self.rows = []
+        self.created = []
+        self.linked = []
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def _teachers(self):
+        # Dernier mois payé : un salaire annulé ou en attente ne fait pas référence
+        previous = Salary.objects.filter(teacher=OuterRef('pk'), status='paid').filter(
+            Q(year__lt=self.year) | Q(year=self.year, month__lt=self.month)
+        ).order_by('-year', '-month').values('base_salary')[:1]
+        return list(
+            Teacher.objects.filter(user__is_active=True, hire_date__lte=self.period_end)
+            .annotate(last_base_salary=Subquery(previous))
+            .order_by('teacher_id')
+            .values('pk', 'teacher_id', 'rank', 'user__first_name', 'user__last_name', 'last_base_salary')
+        )
+
+    def _existing(self):
+        return {
+            row['teacher_id']: row
+            for row in Salary.objects.filter(year=self.year, month=self.month).values(
+                'pk', 'teacher_id', 'base_salary', 'bonus', 'deductions', 'net_salary',
+                'status', 'payment_date', 'transaction_id', 'payment_method'
+            )
+        }
+
+    # ------------------------------------------------------------------
+    # Calcul
+    # ------------------------------------------------------------------
+
+    def _transaction(self, teacher_pk, teacher_code, net_salary, method, today, now,
+                     paid=False, payment_date=None):
+        """Transaction ``salary`` ; réglée si le salaire est déjà payé"""
+        paid_amount = net_salary if paid else Decimal(0)
+        status, payment_date, overdue_since = transaction_status(
+            net_salary, paid_amount, 'pending', self.period_end, payment_date, None, today, now
+        )
+        return Transaction(
+            transaction_type='salary', category='salary', teacher_id=teacher_pk,
+            amount=net_salary, paid_amount=paid_amount, date=self.period_start,
+            due_date=self.period_end, status=status, payment_date=payment_date,
+            overdue_since=overdue_since, method=method,
+            description=f"Salaire {self.month:02d}/{self.year} - {teacher_code}",
+        )
+
+    def _plan(self):
+        scale = {rank: Decimal(value) for rank, value in get_setting('BASE_SALARY').items()}
+        default_base = get_setting('DEFAULT_BASE_SALARY')
+        default_base = Decimal(default_base) if default_base is not None else None
+        rate = Decimal(get_setting('DEDUCTION_RATE'))
+        method = get_setting('PAYMENT_METHOD')
+        today, now = date.today(), timezone.now()
+        existing = self._existing()
+
+        for teacher in self._teachers():
+            name = f"{teacher['user__first_name']} {teacher['user__last_name']}".strip()
+            salary = existing.get(teacher['pk'])
+            if salary is not None:
+                action = 'skipped'
+                if salary['transaction_id'] is None and salary['status'] != 'cancelled':
+                    action = 'linked'
+                    self.linked.append((salary['pk'], self._transaction(
+                        teacher['pk'], teacher['teacher_id'], salary['net_salary'],
+                        salary['payment_method'] or method, today, now,
+                        paid=salary['status'] == 'paid', payment_date=salary['payment_date'],
+                    )))
+                base, bonus = salary['base_salary'], salary['bonus']
+                deductions, net = salary['deductions'], salary['net_salary']
+            else:
+                action = 'created'
+                base = teacher['last_base_salary'] or scale.get(teacher['rank'], default_base)
+                if base is None:
+                    raise ImproperlyConfigured(
+                        f"Grade '{teacher['rank']}' ({teacher['teacher_id']}) absent de "
+                        "PAYROLL['BASE_SALARY'] et pas de DEFAULT_BASE_SALARY"
+                    )
+                bonus = Decimal(0)
+                deductions = ((base + bonus) * rate).quantize(AMOUNT_PRECISION)
+                net = base + bonus - deductions
+                self.created.append((
+                    Salary(teacher_id=teacher['pk'], year=self.year, month=self.month,
+                           base_salary=base, bonus=bonus, deductions=deductions, net_salary=net,
+                           status='pending', payment_method=method),
+                    self._transaction(teacher['pk'], teacher['teacher_id'], net, method, today, now),
+                ))
+            self.rows.append({
+                'teacher': teacher['pk'], 'teacher_id': teacher['teacher_id'], 'teacher_name': name,
+                'action': action, 'base_salary': base, 'bonus': bonus,
+                'deductions': deductions, 'net_salary': net,
+            })
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def _write(self):
+        transactions = [transaction for _, transaction in self.created] + [t for _, t in self.linked]
+        Transaction.objects.bulk_create(transactions, batch_size=BATCH_SIZE)
+
+        salaries = []
+        for salary, transaction in self.created:
+            salary.transaction_id = transaction.pk
+            salaries.append(salary)
+        Salary.objects.bulk_create(salaries, batch_size=BATCH_SIZE)
+        Salary.objects.bulk_update([
+            Salary(pk=pk, transaction_id=transaction.pk) for pk, transaction in self.linked
+        ], ['transaction'], batch_size=BATCH_SIZE)
+
+        deltas = rollup.new_deltas()
+        for transaction in transactions:
+            rollup.add_row(deltas, transaction, 1)
+        rollup.apply_deltas(deltas)
+        # bulk_create / bulk_update n'envoient pas de signaux
+        stats_cache.invalidate(Transaction)
+
+    def run(self):
+        with db_transaction.atomic():
+            self._plan()
+            if not self.dry_run and (self.created or self.linked):
+                self._write()
+        return self
+
+    # ------------------------------------------------------------------
+    # Rapport
+    # ------------------------------------------------------------------
+
+    def summary(self):
+        totals = {
+            field: sum((row[field] for row in self.rows), Decimal(0))
+            for field in ('base_salary', 'bonus', 'deductions', 'net_salary')
+        }
+        actions = [row['action'] for row in self.rows]
+        return {
+            'year': self.year,
+            'month': self.month,
+            'dry_run': self.dry_run,
+            'teachers': len(self.rows),
+            'created': actions.count('created'),
+            'linked': actions.count('linked'),
+            'skipped': actions.count('skipped'),
+            'total_base_salary': str(totals['base_salary']),
+            'total_bonus': str(totals['bonus']),
+            'total_deductions': str(totals['deductions']),
+            'total_net_salary': str(totals['net_salary']),
+            'salaries': [
+                {**row, **{field: str(row[field]) for field in ('base_salary', 'bonus', 'deductions', 'net_salary')}}
+                for row in self.rows
+            ],
+        }
@@ -0,0 +1,349 @@
+# backend/finance/reminders.py
+"""
+Rappels de paiement des transactions en retard.
+
+1. ``generate(today)`` : les transactions en retard (statut ``overdue``,
+   identifiants lus sur l'index partiel ``fin_tx_overdue_due_idx``) sont
+   traitées par paquets de ``CHUNK_SIZE``. Pour chaque paquet, une requête
+   groupée sur leurs rappels existants donne le niveau atteint et la date
+   du dernier rappel ; le rappel suivant de l'escalade
+   (``first`` → ``second`` → ``final`` → ``overdue``, ce dernier répété)
+   est créé en masse si le précédent date d'au moins ``INTERVAL_DAYS``
+   jours. La contrainte unique (transaction, type, date) écarte les
+   doublons d'une génération concurrente (``ignore_conflicts``).
+2. ``dispatch(today)`` : les rappels non envoyés (``sent_at`` nul, index
+   partiel ``fin_reminder_unsent_idx``) passent par une file locale vidée
+   par ``WORKERS`` threads, qui les remettent aux canaux ``SINKS``
+   (console ou fichier JSON Lines en attendant l'email / SMS). Un rappel
+   accepté par tous les canaux est marqué envoyé ; les autres seront
+   retentés au prochain passage.
+
+``run(today)`` enchaîne les deux. Relancé le même jour, il ne crée ni
+n'envoie rien de plus. Exécution : ``python manage.py
+send_payment_reminders``, ``POST /api/finance/reminders/run/``, ou à la
+suite du balayage quotidien (finance/overdue.py).
+"""
+
+import logging
+import queue
+import sys
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Case, IntegerField, Max, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from university_management.renderers import dumps
+from .models import PaymentReminder, Transaction, overdue_status
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    # Jours minimum entre deux rappels d'une même transaction
+    'INTERVAL_DAYS': 7,
+    # Transactions (génération) ou rappels (envoi) lus par paquet
+    'CHUNK_SIZE': 2000,
+    # Threads d'envoi et rappels remis à un canal en un appel
+    'WORKERS': 4,
+    'BATCH_SIZE': 100,
+    # Canaux d'envoi (chemins de classes Sink)
+    'SINKS': ['finance.reminders.ConsoleSink'],
+    # Fichier de FileSink (une ligne JSON par rappel)
+    'FILE_PATH': 'payment_reminders.jsonl',
+}
+
+# Escalade : niveau atteint -> rappel suivant
+ESCALATION = ['first', 'second', 'final', 'overdue']
+LEVELS = {reminder_type: level for level, reminder_type in enumerate(ESCALATION, start=1)}
+
+
+def get_setting(name):
+    return getattr(settings, 'PAYMENT_REMINDERS', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ----------------------------------------------------------------------
+# Génération
+# ----------------------------------------------------------------------
+
+def overdue_ids():
+    """Identifiants des transactions en retard (lecture de l'index partiel seule)"""
+    return list(
+        Transaction.objects.filter(overdue_status()).order_by('due_date').values_list('pk', flat=True)
+    )
+
+
+def reminder_levels(transaction_ids):
+    """``{transaction_id: (niveau atteint, date du dernier rappel)}`` en une requête groupée"""
+    level = Case(
+        *(When(reminder_type=reminder_type, then=Value(value)) for reminder_type, value in LEVELS.items()),
+        default=Value(0), output_field=IntegerField()
+    )
+    rows = PaymentReminder.objects.filter(transaction_id__in=transaction_ids).values('transaction_id').annotate(
+        level=Max(level), last_date=Max('reminder_date')
+    ).order_by()
+    return {row['transaction_id']: (row['level'], row['last_date']) for row in rows}
+
+
+def next_reminder_type(level, last_date, today, interval_days):
+    """Type du rappel à créer aujourd'hui, ou None si le dernier est trop récent"""
+    if last_date is not None and last_date > today - timedelta(days=interval_days):
+        return None
+    return ESCALATION[min(level, len(ESCALATION) - 1)]
+
+
+def generate(today=None):
+    """
+    Créer les rappels dus à ``today`` ; retourne ``{type de rappel: nombre
+    dû}`` (un rappel déjà créé par une exécution concurrente est compté mais
+    pas dupliqué)
+    """
+    today = today or date.today()
+    interval_days = get_setting('INTERVAL_DAYS')
+    created = {reminder_type: 0 for reminder_type in ESCALATION}
+
+    for chunk in _chunks(overdue_ids(), get_setting('CHUNK_SIZE')):
+        with db_transaction.atomic():
+            levels = reminder_levels(chunk)
+            reminders = []
+            for transaction_id in chunk:
+                reminder_type = next_reminder_type(*levels.get(transaction_id, (0, None)), today, interval_days)
+                if reminder_type is not None:
+                    reminders.append(PaymentReminder(
+                        transaction_id=transaction_id, reminder_date=today, reminder_type=reminder_type
+                    ))
+                    created[reminder_type] += 1
+            PaymentReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+
+    return created
+
+
+# ----------------------------------------------------------------------
+# Canaux d'envoi
+# ----------------------------------------------------------------------
+
+class Sink(ABC):
+    """
+    Canal d'envoi. Une sous-classe implémente ``send(message)``, qui lève une
+    exception en cas d'échec ; ``send_many(messages)`` retourne les
+    identifiants des rappels acceptés (par défaut : ``send`` pour chacun) et
+    peut être redéfinie pour un envoi groupé. Appelé depuis plusieurs
+    threads : sans accès à la base.
+    """
+
+    @abstractmethod
+    def send(self, message):
+        """Remettre un rappel au canal ; lever une exception en cas d'échec"""
+
+    def send_many(self, messages):
+        sent = []
+        for message in messages:
+            try:
+                self.send(message)
+            except Exception:
+                logger.exception("Échec d'envoi du rappel %s (%s)", message['reminder_id'], type(self).__name__)
+            else:
+                sent.append(message['reminder_id'])
+        return sent
+
+
+class ConsoleSink(Sink):
+    """Une ligne par rappel sur la sortie standard"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def format(self, message):
+        return (
+            f"[{message['type']}] {message['transaction_number']} -> {message['recipient']} "
+            f"<{message['email'] or '-'}> : {message['remaining']} restant, "
+            f"échéance {message['due_date']} ({message['days_overdue']} j de retard)\n"
+        )
+
+    def write(self, text):
+        with self._lock:
+            self.stream.write(text)
+            self.stream.flush()
+
+    def send(self, message):
+        self.write(self.format(message))
+
+    def send_many(self, messages):
+        self.write(''.join(self.format(message) for message in messages))
+        return [message['reminder_id'] for message in messages]
+
+
+class FileSink(Sink):
+    """Rappels ajoutés à ``FILE_PATH``, une ligne JSON chacun"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = Path(path or get_setting('FILE_PATH'))
+
+    def write(self, content):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as output:
+                output.write(content)
+
+    def send(self, message):
+        self.write(dumps(message) + b'\n')
+
+    def send_many(self, messages):
+        self.write(b''.join(dumps(message) + b'\n' for message in messages))
+        return [message['reminder_id'] for message in messages]
+
+
+def get_sinks():
+    return [import_string(path)() for path in get_setting('SINKS')]
+
+
+# ----------------------------------------------------------------------
+# File d'envoi
+# ----------------------------------------------------------------------
+
+class DispatchQueue:
+    """
+    File locale vidée par ``workers`` threads. ``put(messages)`` ajoute un
+    lot ; ``drain()`` attend qu'ils soient tous traités et retourne les
+    identifiants acceptés par tous les canaux depuis le précédent appel.
+    """
+
+    def __init__(self, sinks, workers):
+        self.sinks = sinks
+        self.queue = queue.Queue(maxsize=workers * 4)
+        self.sent = []
+        self.failed = 0
+        self.lock = threading.Lock()
+        self.threads = [
+            threading.Thread(target=self._work, name=f'payment-reminders-{index}', daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _deliver(self, messages):
+        accepted = {message['reminder_id'] for message in messages}
+        for sink in self.sinks:
+            try:
+                accepted &= set(sink.send_many([m for m in messages if m['reminder_id'] in accepted]))
+            except Exception:
+                logger.exception("Échec du canal %s", type(sink).__name__)
+                accepted = set()
+            if not accepted:
+                break
+        return accepted
+
+    def _work(self):
+        while True:
+            messages = self.queue.get()
+            try:
+                if messages is None:
+                    return
+                accepted = self._deliver(messages)
+                with self.lock:
+                    self.sent.extend(accepted)
+                    self.failed += len(messages) - len(accepted)
+            finally:
+                self.queue.task_done()
+
+    def put(self, messages):
+        self.queue.put(messages)
+
+    def drain(self):
+        self.queue.join()
+        with self.lock:
+            sent, self.sent = self.sent, []
+        return sent
+
+    def close(self):
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+MESSAGE_FIELDS = (
+    'pk', 'reminder_type', 'reminder_date', 'transaction_id',
+    'transaction__transaction_number', 'transaction__amount', 'transaction__paid_amount',
+    'transaction__due_date', 'transaction__description',
+    'transaction__student__user__first_name', 'transaction__student__user__last_name',
+    'transaction__student__user__email',
+    'transaction__teacher__user__first_name', 'transaction__teacher__user__last_name',
+    'transaction__teacher__user__email',
+)
+
+
+def build_message(row, today):
+    """Rappel à envoyer (dictionnaire sérialisable, lu avec .values())"""
+    person = 'student' if row['transaction__student__user__last_name'] is not None else 'teacher'
+    first_name = row[f'transaction__{person}__user__first_name'] or ''
+    last_name = row[f'transaction__{person}__user__last_name'] or ''
+    due_date = row['transaction__due_date']
+    return {
+        'reminder_id': row['pk'],
+        'type': row['reminder_type'],
+        'reminder_date': row['reminder_date'].isoformat(),
+        'transaction_id': row['transaction_id'],
+        'transaction_number': row['transaction__transaction_number'],
+        'description': row['transaction__description'],
+        'recipient': f'{first_name} {last_name}'.strip() or 'Administration',
+        'email': row[f'transaction__{person}__user__email'] or None,
+        'amount': str(row['transaction__amount']),
+        'remaining': str(row['transaction__amount'] - row['transaction__paid_amount']),
+        'due_date': due_date.isoformat() if due_date else None,
+        'days_overdue': max((today - due_date).days, 0) if due_date else 0,
+    }
+
+
+def pending_ids(today):
+    """Rappels non envoyés dus au plus tard à ``today`` (index partiel fin_reminder_unsent_idx)"""
+    return list(
+        PaymentReminder.objects.filter(sent_at__isnull=True, reminder_date__lte=today, transaction__isnull=False)
+        .order_by('reminder_date').values_list('pk', flat=True)
+    )
+
+
+def dispatch(today=None, sinks=None):
+    """Envoyer les rappels en attente ; retourne ``{'sent': n, 'failed': n}``"""
+    today = today or date.today()
+    batch_size = get_setting('BATCH_SIZE')
+    dispatch_queue = DispatchQueue(get_sinks() if sinks is None else sinks, get_setting('WORKERS'))
+    sent = 0
+    try:
+        for chunk in _chunks(pending_ids(today), get_setting('CHUNK_SIZE')):
+            rows = PaymentReminder.objects.filter(pk__in=chunk).values(*MESSAGE_FIELDS).order_by()
+            messages = [build_message(row, today) for row in rows]
+            for batch in _chunks(messages, batch_size):
+                dispatch_queue.put(batch)
+            # Marqués envoyés paquet par paquet : un arrêt en cours de route
+            # ne renverra que le paquet interrompu
+            accepted = dispatch_queue.drain()
+            if accepted:
+                sent += PaymentReminder.objects.filter(pk__in=accepted).update(sent_at=timezone.now())
+    finally:
+        dispatch_queue.close()
+
+    return {'sent': sent, 'failed': dispatch_queue.failed}
+
+
+def run(today=None, sinks=None):
+    """Générer puis envoyer les rappels du jour"""
+    today = today or date.today()
+    created = generate(today)
+    result = {'created': sum(created.values()), 'by_type': created, **dispatch(today, sinks)}
+    logger.info("Rappels de paiement : %d créé(s), %d envoyé(s), %d échec(s)",
+                result['created'], result['sent'], result['failed'])
+    return result
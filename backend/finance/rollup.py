@@ -0,0 +1,249 @@
+# backend/finance/rollup.py
+"""
+Agrégats mensuels pré-calculés des transactions (FinanceMonthlyRollup).
+
+Chaque ligne du rollup contient, pour une clé (année, mois, catégorie, type,
+statut), la somme des montants, la somme des montants payés et le nombre de
+transactions. Le rollup est maintenu de façon incrémentale :
+
+- ``Transaction.save()`` appelle ``record_save`` (ancienne ligne -> nouvelle) ;
+- le signal ``post_delete`` (y compris les suppressions en masse de
+  ``TransactionViewSet.destroy``) appelle ``record_delete`` ;
+- les changements de statut en masse (``overdue.sweep``) appliquent
+  ``status_change_deltas``.
+
+Les statistiques lisent alors O(mois) lignes au lieu de parcourir
+``finance_transaction``. ``rebuild()`` / ``verify()`` servent à la commande
+``rebuild_finance_rollup``.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+# Champs de Transaction nécessaires pour calculer la contribution d'une ligne
+ROLLUP_FIELDS = ('date', 'category', 'transaction_type', 'status', 'amount', 'paid_amount')
+
+KEY_FIELDS = ('year', 'month', 'category', 'transaction_type', 'status')
+
+
+def _get(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def rollup_key(row):
+    """Clé du rollup pour une transaction (instance ou dict de ROLLUP_FIELDS)"""
+    day = _get(row, 'date')
+    return (day.year, day.month, _get(row, 'category'),
+            _get(row, 'transaction_type'), _get(row, 'status'))
+
+
+def snapshot(instance):
+    """Copie des champs utiles d'une instance, pour un calcul de delta ultérieur"""
+    return {field: getattr(instance, field) for field in ROLLUP_FIELDS}
+
+
+def add_row(deltas, row, sign=1):
+    """Ajouter (sign=1) ou retirer (sign=-1) la contribution d'une ligne"""
+    if row is None or _get(row, 'date') is None:
+        return
+    entry = deltas[rollup_key(row)]
+    entry[0] += sign * Decimal(_get(row, 'amount') or 0)
+    entry[1] += sign * Decimal(_get(row, 'paid_amount') or 0)
+    entry[2] += sign
+
+
+def new_deltas():
+    return defaultdict(lambda: [Decimal(0), Decimal(0), 0])
+
+
+def apply_deltas(deltas):
+    """Appliquer des deltas {clé: [montant, payé, nombre]} avec des UPDATE F()"""
+    from .models import FinanceMonthlyRollup
+
+    for key, (amount, paid, count) in deltas.items():
+        if not amount and not paid and not count:
+            continue
+        lookup = dict(zip(KEY_FIELDS, key))
+        changes = {
+            'total_amount': F('total_amount') + amount,
+            'total_paid_amount': F('total_paid_amount') + paid,
+            'transaction_count': F('transaction_count') + count,
+        }
+        if FinanceMonthlyRollup.objects.filter(**lookup).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                FinanceMonthlyRollup.objects.create(
+                    total_amount=amount, total_paid_amount=paid,
+                    transaction_count=count, **lookup
+                )
+        except IntegrityError:
+            # Créée entre-temps par une autre requête
+            FinanceMonthlyRollup.objects.filter(**lookup).update(**changes)
+
+
+def status_change_deltas(grouped, status):
+    """
+    Deltas du passage au statut ``status`` de toutes les transactions
+    agrégées dans ``grouped`` (résultat de ``compute_from_transactions``)
+    """
+    deltas = new_deltas()
+    for key, totals in grouped.items():
+        for target, sign in ((key, -1), (key[:-1] + (status,), 1)):
+            entry = deltas[target]
+            for index, value in enumerate(totals):
+                entry[index] += sign * value
+    return deltas
+
+
+def record_save(old_row, instance):
+    """Mettre à jour le rollup après l'enregistrement d'une transaction"""
+    deltas = new_deltas()
+    add_row(deltas, old_row, -1)
+    add_row(deltas, instance, 1)
+    apply_deltas(deltas)
+
+
+def record_delete(row):
+    """Mettre à jour le rollup après la suppression d'une transaction"""
+    deltas = new_deltas()
+    add_row(deltas, row, -1)
+    apply_deltas(deltas)
+
+
+# ----------------------------------------------------------------------
+# Reconstruction et vérification
+# ----------------------------------------------------------------------
+
+def compute_from_transactions(queryset=None):
+    """Agrégats exacts calculés depuis la table de base (une requête groupée)"""
+    from .models import Transaction
+
+    queryset = queryset if queryset is not None else Transaction.objects.all()
+    rows = queryset.exclude(date__isnull=True).annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date'),
+    ).values(*KEY_FIELDS).annotate(
+        total_amount=Sum('amount'),
+        total_paid_amount=Sum('paid_amount'),
+        transaction_count=Count('id'),
+    ).order_by()
+    return {
+        tuple(row[field] for field in KEY_FIELDS): (
+            row['total_amount'] or Decimal(0),
+            row['total_paid_amount'] or Decimal(0),
+            row['transaction_count'],
+        )
+        for row in rows
+    }
+
+
+def rebuild():
+    """Reconstruire entièrement le rollup ; retourne le nombre de lignes créées"""
+    from .models import FinanceMonthlyRollup
+
+    expected = compute_from_transactions()
+    with transaction.atomic():
+        FinanceMonthlyRollup.objects.all().delete()
+        FinanceMonthlyRollup.objects.bulk_create([
+            FinanceMonthlyRollup(
+                total_amount=amount, total_paid_amount=paid,
+                transaction_count=count, **dict(zip(KEY_FIELDS, key))
+            )
+            for key, (amount, paid, count) in expected.items()
+        ], batch_size=500)
+    return len(expected)
+
+
+def verify():
+    """Comparer le rollup à la table de base ; retourne la liste des écarts"""
+    from .models import FinanceMonthlyRollup
+
+    expected = compute_from_transactions()
+    actual = {
+        tuple(row[field] for field in KEY_FIELDS): (
+            row['total_amount'], row['total_paid_amount'], row['transaction_count']
+        )
+        for row in FinanceMonthlyRollup.objects.values(
+            *KEY_FIELDS, 'total_amount', 'total_paid_amount', 'transaction_count'
+        )
+    }
+
+    mismatches = []
+    empty = (Decimal(0), Decimal(0), 0)
+    for key in sorted(set(expected) | set(actual), key=str):
+        wanted = expected.get(key, empty)
+        found = actual.get(key, empty)
+        if tuple(wanted) != tuple(found):
+            mismatches.append({
+                'key': dict(zip(KEY_FIELDS, key)),
+                'expected': wanted,
+                'actual': found,
+            })
+    return mismatches
+
+
+# ----------------------------------------------------------------------
+# Lecture
+# ----------------------------------------------------------------------
+
+def month_filter(queryset, start, end):
+    """Restreindre un queryset de rollup aux mois de start à end inclus"""
+    first = start.year * 12 + start.month
+    last = end.year * 12 + end.month
+    return queryset.annotate(
+        month_index=F('year') * 12 + F('month')
+    ).filter(month_index__gte=first, month_index__lte=last)
+
+
+def _month_end(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def period_totals(start, end):
+    """
+    Totaux payés par catégorie sur [start, end].
+
+    Les mois complets sont lus dans le rollup ; seuls les mois partiels aux
+    bornes de la période sont calculés sur la table de base.
+    """
+    from .models import FinanceMonthlyRollup, Transaction
+
+    totals = defaultdict(Decimal)
+
+    full_start = start if start.day == 1 else _month_end(start) + timedelta(days=1)
+    full_end = end if end == _month_end(end) else end.replace(day=1) - timedelta(days=1)
+
+    edges = []
+    if full_start > full_end:
+        edges.append((start, end))
+    else:
+        if start < full_start:
+            edges.append((start, full_start - timedelta(days=1)))
+        if full_end < end:
+            edges.append((full_end + timedelta(days=1), end))
+        rows = month_filter(
+            FinanceMonthlyRollup.objects.filter(status='paid'), full_start, full_end
+        ).values('category').annotate(total=Sum('total_amount')).order_by()
+        for row in rows:
+            totals[row['category']] += row['total'] or 0
+
+    for edge_start, edge_end in edges:
+        rows = Transaction.objects.filter(
+            status='paid', date__range=[edge_start, edge_end]
+        ).values('category').annotate(total=Sum('amount')).order_by()
+        for row in rows:
+            totals[row['category']] += row['total'] or 0
+
+    return totals
+
+
+def is_month_aligned(start, end):
+    """Vrai si [start, end] couvre exactement des mois complets"""
+    return start.day == 1 and end == _month_end(end)
+
@@ -1,15 +1,34 @@
 # finance/serializers.py - CORRIGÉ
 
+from django.db.models import BooleanField, Case, F, Value, When
+from django.db.models.functions import Concat
 from rest_framework import serializers
-from .models import Transaction, Budget, Salary, FinancialReport
+from .models import Transaction, Budget, Salary, FinancialReport, OVERDUE_STATUS
 from students.models import Student
 from teachers.models import Teacher
 from django.contrib.auth import get_user_model
 from datetime import datetime, date
 import decimal
+from university_management.list_rows import ListRows, as_text, datetime_string, decimal_string, per_list
 
 User = get_user_model()
 
+def remaining_amount(amount, paid_amount):
+    """Reste à payer, en flottant comme l'API l'a toujours renvoyé"""
+    try:
+        amount = float(amount) if amount else 0
+        paid = float(paid_amount) if paid_amount else 0
+        return amount - paid
+    except:
+        return 0
+
+
+def days_overdue(due_date, status):
+    """Jours de retard d'une transaction au statut 'overdue' (0 sinon)"""
+    if status == OVERDUE_STATUS and due_date:
+        return max((date.today() - due_date).days, 0)
+    return 0
+
 class StudentSimpleSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     email = serializers.SerializerMethodField()
@@ -61,10 +80,10 @@ class TransactionSerializer(serializers.ModelSerializer):
             'student', 'student_name', 'teacher', 'teacher_name',
             'amount', 'paid_amount', 'remaining_amount', 'date', 'due_date', 'payment_date',
             'status', 'method', 'description', 'receipt_number', 'invoice_number',
-            'is_recurring', 'recurrence_period', 'is_overdue', 'days_overdue',
+            'is_recurring', 'recurrence_period', 'is_overdue', 'days_overdue', 'overdue_since',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['transaction_number', 'created_at', 'updated_at', 'remaining_amount']
+        read_only_fields = ['transaction_number', 'overdue_since', 'created_at', 'updated_at', 'remaining_amount']
     
     def get_student_name(self, obj):
         if obj.student and hasattr(obj.student, 'user'):
@@ -83,30 +102,13 @@ class TransactionSerializer(serializers.ModelSerializer):
         return str(obj.teacher_id) if obj.teacher_id else ""
     
     def get_remaining_amount(self, obj):
-        try:
-            amount = float(obj.amount) if obj.amount else 0
-            paid = float(obj.paid_amount) if obj.paid_amount else 0
-            return amount - paid
-        except:
-            return 0
+        return remaining_amount(obj.amount, obj.paid_amount)
     
     def get_is_overdue(self, obj):
-        try:
-            from datetime import date
-            if obj.due_date and obj.due_date < date.today() and obj.status not in ['paid', 'cancelled']:
-                return True
-            return False
-        except:
-            return False
+        return obj.status == OVERDUE_STATUS
     
     def get_days_overdue(self, obj):
-        try:
-            from datetime import date
-            if obj.due_date and obj.due_date < date.today() and obj.status not in ['paid', 'cancelled']:
-                return (date.today() - obj.due_date).days
-            return 0
-        except:
-            return 0
+        return days_overdue(obj.due_date, obj.status)
     
     def validate(self, data):
         """Validation globale de la transaction"""
@@ -152,6 +154,81 @@ class TransactionSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
 
+def _person_name(relation):
+    """Nom « prénom nom » de l'étudiant / enseignant lié, '' sans relation"""
+    return Case(
+        When(**{f'{relation}__isnull': True}, then=Value('')),
+        default=Concat(F(f'{relation}__user__first_name'), Value(' '), F(f'{relation}__user__last_name')),
+    )
+
+
+def _is_overdue():
+    return Case(
+        When(status=OVERDUE_STATUS, then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField()
+    )
+
+
+@per_list
+def _days_overdue():
+    today = date.today()
+
+    def convert(due_date, is_overdue):
+        if is_overdue and due_date:
+            return max((today - date.fromisoformat(due_date)).days, 0)
+        return 0
+    return convert
+
+
+_amount = decimal_string(Transaction._meta.get_field('amount'))
+_paid_amount = decimal_string(Transaction._meta.get_field('paid_amount'))
+
+# Lecture rapide de la liste des transactions : mêmes clés et mêmes formats
+# que TransactionSerializer, lus avec .values()
+TRANSACTION_LIST_ROWS = ListRows(
+    columns=[
+        ('id', 'id', None),
+        ('transaction_number', 'transaction_number', None),
+        ('transaction_type', 'transaction_type', None),
+        ('category', 'category', None),
+        ('student', 'student', None),
+        ('student_name', 'row_student_name', None),
+        ('teacher', 'teacher', None),
+        ('teacher_name', 'row_teacher_name', None),
+        ('amount', 'amount', _amount),
+        ('paid_amount', 'paid_amount', _paid_amount),
+        ('remaining_amount', ('amount', 'paid_amount'), remaining_amount),
+        ('date', 'row_date', None),
+        ('due_date', 'row_due_date', None),
+        ('payment_date', 'row_payment_date', None),
+        ('status', 'status', None),
+        ('method', 'method', None),
+        ('description', 'description', None),
+        ('receipt_number', 'receipt_number', None),
+        ('invoice_number', 'invoice_number', None),
+        ('is_recurring', 'is_recurring', None),
+        ('recurrence_period', 'recurrence_period', None),
+        ('is_overdue', 'row_is_overdue', None),
+        ('days_overdue', ('row_due_date', 'row_is_overdue'), _days_overdue),
+        ('overdue_since', 'row_overdue_since', datetime_string),
+        ('created_at', 'row_created_at', datetime_string),
+        ('updated_at', 'row_updated_at', datetime_string),
+    ],
+    annotations={
+        'row_student_name': _person_name('student'),
+        'row_teacher_name': _person_name('teacher'),
+        'row_is_overdue': _is_overdue(),
+        'row_date': as_text('date'),
+        'row_due_date': as_text('due_date'),
+        'row_payment_date': as_text('payment_date'),
+        'row_overdue_since': as_text('overdue_since'),
+        'row_created_at': as_text('created_at'),
+        'row_updated_at': as_text('updated_at'),
+    },
+)
+
+
 class TransactionCreateSerializer(serializers.ModelSerializer):
     """Serializer pour la création de transactions"""
     class Meta:
@@ -176,6 +253,38 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
 
+class TransactionImportRowSerializer(serializers.Serializer):
+    """
+    Ligne d'import de relevé bancaire (JSON ou CSV), validée sans accès à la
+    base. Avec ``invoice_number`` / ``receipt_number`` connus : paiement de
+    ``paid_amount`` sur la transaction existante ; sinon nouvelle transaction
+    (``amount`` et ``transaction_type`` requis).
+    """
+    DATE_FORMATS = ['iso-8601', '%d/%m/%Y']
+
+    invoice_number = serializers.CharField(required=False, allow_blank=True, max_length=50)
+    receipt_number = serializers.CharField(required=False, allow_blank=True, max_length=50)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=3, required=False, min_value=decimal.Decimal('0.001'))
+    paid_amount = serializers.DecimalField(max_digits=12, decimal_places=3, required=False, min_value=0)
+    transaction_type = serializers.ChoiceField(choices=Transaction.TRANSACTION_TYPES, required=False)
+    category = serializers.ChoiceField(choices=Transaction.CATEGORY_CHOICES, required=False)
+    method = serializers.ChoiceField(choices=Transaction.METHOD_CHOICES, required=False, allow_blank=True)
+    date = serializers.DateField(required=False, input_formats=DATE_FORMATS)
+    due_date = serializers.DateField(required=False, input_formats=DATE_FORMATS)
+    payment_date = serializers.DateField(required=False, input_formats=DATE_FORMATS)
+    student_id = serializers.CharField(required=False, allow_blank=True)
+    description = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, data):
+        if not data.get('invoice_number') and not data.get('receipt_number') and (
+                data.get('amount') is None or not data.get('transaction_type')):
+            raise serializers.ValidationError({
+                'invoice_number': "Référence requise (invoice_number ou receipt_number), "
+                                  "ou amount et transaction_type pour une nouvelle transaction"
+            })
+        return data
+
+
 # Dans finance/serializers.py, modifiez BudgetSerializer:
 
 class BudgetSerializer(serializers.ModelSerializer):
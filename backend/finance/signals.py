@@ -0,0 +1,20 @@
+# backend/finance/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from university_management import stats_cache
+from .models import Transaction, Budget
+from . import rollup
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    """Retirer la transaction supprimée du rollup mensuel"""
+    rollup.record_delete(instance)
+
+
+@receiver([post_save, post_delete], sender=Transaction)
+@receiver([post_save, post_delete], sender=Budget)
+def finance_changed(sender, **kwargs):
+    """Invalider les statistiques financières en cache"""
+    stats_cache.invalidate(sender)
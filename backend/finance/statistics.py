@@ -0,0 +1,331 @@
+# backend/finance/statistics.py
+"""
+Moteur de statistiques financières.
+
+Toutes les valeurs du tableau de bord (totaux par catégorie, transactions en
+attente / en retard, répartition par type, séries mensuelles) sont calculées
+avec des agrégations conditionnelles : une requête groupée pour les totaux et
+une requête groupée pour les séries mensuelles, au lieu d'un ``aggregate()``
+par chiffre.
+
+Lorsque la fenêtre est alignée sur des mois complets, ces requêtes portent sur
+le rollup mensuel (``FinanceMonthlyRollup``) plutôt que sur
+``finance_transaction``. Les retards sont lus sur le statut enregistré
+(``overdue``, posé par le balayage quotidien de ``overdue.py``) : ils
+viennent eux aussi du rollup.
+
+Les requêtes sont indépendantes : ``compute()`` les exécute à la suite,
+``acompute()`` les lance ensemble avec l'ORM asynchrone (voir
+``university_management/query_plan.py``).
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from university_management.query_plan import arun, fetch, run
+from .models import Transaction, Budget, FinanceMonthlyRollup, OPEN_STATUSES, OVERDUE_STATUS, overdue_status
+from .rollup import is_month_aligned, month_filter
+
+
+# Entrées de stats_cache (endpoint DRF et tableau de bord asynchrone)
+CACHE_ENDPOINT = 'finance-statistics'
+CACHE_MODELS = (Transaction, Budget)
+
+DEFAULT_MONTHS = 6
+MAX_MONTHS = 120
+
+
+def add_months(day, months):
+    """Premier jour du mois décalé de ``months`` mois (négatif possible)"""
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_starts(start, end):
+    """Liste des premiers jours de mois couvrant l'intervalle [start, end]"""
+    current = start.replace(day=1)
+    months = []
+    while current <= end:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Le paramètre '{name}' doit être au format AAAA-MM-JJ")
+
+
+class FinanceStatistics:
+    """
+    Calcule les statistiques financières sur une fenêtre configurable.
+
+    - ``months`` : nombre de mois glissants (mois courant inclus) pour les
+      séries mensuelles ;
+    - ``start_date`` / ``end_date`` : intervalle explicite. Lorsqu'il est
+      fourni, il restreint aussi les totaux à cette période.
+    """
+
+    def __init__(self, months=DEFAULT_MONTHS, start_date=None, end_date=None,
+                 queryset=None, today=None):
+        self.today = today or date.today()
+        self.queryset = queryset if queryset is not None else Transaction.objects.all()
+        self.has_range = start_date is not None or end_date is not None
+
+        if self.has_range:
+            self.end_date = end_date or self.today
+            self.start_date = start_date or add_months(self.end_date, -(months - 1))
+        else:
+            self.end_date = self.today
+            self.start_date = add_months(self.today, -(months - 1))
+
+        if self.start_date > self.end_date:
+            raise ValueError("La date de début doit précéder la date de fin")
+        if len(month_starts(self.start_date, self.end_date)) > MAX_MONTHS:
+            raise ValueError(f"La fenêtre ne peut pas dépasser {MAX_MONTHS} mois")
+
+        # Le rollup n'a qu'une granularité mensuelle et ne connaît pas les
+        # filtres arbitraires : table de base pour les périodes partielles.
+        self.use_rollup = queryset is None and (
+            not self.has_range or is_month_aligned(self.start_date, self.end_date)
+        )
+
+    @classmethod
+    def from_params(cls, params, **kwargs):
+        """Construire le moteur depuis les paramètres GET (months, start_date, end_date)"""
+        months = params.get('months')
+        if months:
+            try:
+                months = int(months)
+            except ValueError:
+                raise ValueError("Le paramètre 'months' doit être un nombre")
+            if not 1 <= months <= MAX_MONTHS:
+                raise ValueError(f"Le paramètre 'months' doit être entre 1 et {MAX_MONTHS}")
+        else:
+            months = DEFAULT_MONTHS
+
+        start_date = params.get('start_date')
+        end_date = params.get('end_date')
+        return cls(
+            months=months,
+            start_date=_parse_date(start_date, 'start_date') if start_date else None,
+            end_date=_parse_date(end_date, 'end_date') if end_date else None,
+            **kwargs
+        )
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    def _scoped_queryset(self):
+        if self.has_range:
+            return self.queryset.filter(date__range=[self.start_date, self.end_date])
+        return self.queryset
+
+    def _scoped_rollup(self):
+        queryset = FinanceMonthlyRollup.objects.all()
+        if self.has_range:
+            return month_filter(queryset, self.start_date, self.end_date)
+        return queryset
+
+    def overdue_queryset(self):
+        """Transactions en retard (index partiel fin_tx_overdue_due_idx)"""
+        return self._scoped_queryset().filter(overdue_status()).order_by()
+
+    def _grouped_queries(self):
+        """Lignes groupées par (type, catégorie) avec les sommes conditionnelles"""
+        paid = Q(status='paid')
+        pending = Q(status__in=OPEN_STATUSES)
+        overdue = Q(status=OVERDUE_STATUS)
+
+        if self.use_rollup:
+            return {
+                'grouped': fetch(self._scoped_rollup().values('transaction_type', 'category').annotate(
+                    paid_total=Sum('total_amount', filter=paid),
+                    paid_count=Sum('transaction_count', filter=paid),
+                    pending_count=Sum('transaction_count', filter=pending),
+                    pending_amount=Sum('total_amount', filter=pending),
+                    overdue_count=Sum('transaction_count', filter=overdue),
+                    overdue_amount=Sum('total_amount', filter=overdue),
+                ).order_by()),
+            }
+
+        return {
+            'grouped': fetch(self._scoped_queryset().values('transaction_type', 'category').annotate(
+                paid_total=Sum('amount', filter=paid),
+                paid_count=Count('id', filter=paid),
+                pending_count=Count('id', filter=pending),
+                pending_amount=Sum('amount', filter=pending),
+                overdue_count=Count('id', filter=overdue),
+                overdue_amount=Sum('amount', filter=overdue),
+            ).order_by()),
+        }
+
+    def totals(self, results):
+        """Totaux par catégorie, en attente, en retard et répartition"""
+        rows = results['grouped']
+        categories = {'income': Decimal(0), 'expense': Decimal(0),
+                      'salary': Decimal(0), 'scholarship': Decimal(0)}
+        distribution = {}
+        result = {
+            'pending_count': 0, 'pending_amount': Decimal(0),
+            'overdue_count': 0, 'overdue_amount': Decimal(0),
+        }
+
+        for row in rows:
+            paid_total = row.get('paid_total') or Decimal(0)
+            if row['category'] in categories:
+                categories[row['category']] += paid_total
+
+            if row.get('paid_count'):
+                entry = distribution.setdefault(row['transaction_type'], {
+                    'transaction_type': row['transaction_type'],
+                    'total': Decimal(0),
+                    'count': 0,
+                })
+                entry['total'] += paid_total
+                entry['count'] += row['paid_count']
+
+            result['pending_count'] += row.get('pending_count') or 0
+            result['pending_amount'] += row.get('pending_amount') or 0
+            result['overdue_count'] += row.get('overdue_count') or 0
+            result['overdue_amount'] += row.get('overdue_amount') or 0
+
+        result['categories'] = categories
+        result['distribution'] = sorted(
+            distribution.values(), key=lambda item: item['total'], reverse=True
+        )
+        return result
+
+    def monthly_queryset(self, months):
+        """
+        Transactions payées de la fenêtre (index fin_tx_cat_status_date_idx).
+        Comme les totaux, un premier mois partiel commence à ``start_date``.
+        """
+        return self.queryset.filter(
+            status='paid',
+            category__in=['income', 'expense'],
+            date__gte=self.start_date,
+            date__lte=self.end_date,
+        )
+
+    def _monthly_query(self, months):
+        """Revenus et dépenses payés groupés par mois (une requête)"""
+        if self.use_rollup:
+            return fetch(month_filter(
+                FinanceMonthlyRollup.objects.filter(
+                    status='paid', category__in=['income', 'expense']
+                ),
+                months[0], self.end_date
+            ).values('year', 'month').annotate(
+                income=Sum('total_amount', filter=Q(category='income')),
+                expenses=Sum('total_amount', filter=Q(category='expense')),
+            ).order_by())
+
+        return fetch(self.monthly_queryset(months).annotate(
+            month=TruncMonth('date')
+        ).values('month').annotate(
+            income=Sum('amount', filter=Q(category='income')),
+            expenses=Sum('amount', filter=Q(category='expense')),
+        ).order_by())
+
+    @staticmethod
+    def _by_month(rows):
+        """{premier jour du mois: {'income': ..., 'expenses': ...}}"""
+        by_month = {}
+        for row in rows:
+            if 'year' in row:
+                month = date(row['year'], row['month'], 1)
+            else:
+                month = row['month']
+                if isinstance(month, datetime):
+                    month = month.date()
+            by_month[month] = row
+        return by_month
+
+    def monthly_series(self, months, rows):
+        """Revenus et dépenses payés de chaque mois de la fenêtre"""
+        by_month = self._by_month(rows)
+
+        monthly_income = []
+        monthly_expenses = []
+        for month in months:
+            row = by_month.get(month, {})
+            label = {
+                'month': month.strftime('%Y-%m'),
+                'month_name': month.strftime('%B %Y'),
+            }
+            monthly_income.append({**label, 'amount': float(row.get('income') or 0)})
+            monthly_expenses.append({**label, 'amount': float(row.get('expenses') or 0)})
+        return monthly_income, monthly_expenses
+
+    def budget_queryset(self):
+        return Budget.objects.filter(year=self.today.year, is_active=True)
+
+    @staticmethod
+    def budget_utilization(budgets):
+        return [{
+            'department': budget.department,
+            'department_display': budget.get_department_display(),
+            'type': budget.budget_type,
+            'type_display': budget.get_budget_type_display(),
+            'allocated': float(budget.allocated_amount),
+            'spent': float(budget.spent_amount),
+            'committed': float(budget.committed_amount),
+            'remaining': float(budget.remaining_amount),
+            'utilization': budget.utilization_percentage,
+        } for budget in budgets]
+
+    # ------------------------------------------------------------------
+    # Résultat
+    # ------------------------------------------------------------------
+
+    def plan(self):
+        """Plan de ``compute`` (voir query_plan) : une seule étape, requêtes indépendantes"""
+        months = month_starts(self.start_date, self.end_date)
+        results = yield {
+            **self._grouped_queries(),
+            'monthly': self._monthly_query(months),
+            'budgets': fetch(self.budget_queryset()),
+        }
+
+        totals = self.totals(results)
+        categories = totals['categories']
+        monthly_income, monthly_expenses = self.monthly_series(months, results['monthly'])
+
+        return {
+            'total_income': float(categories['income']),
+            'total_expenses': float(categories['expense']),
+            'total_salaries': float(categories['salary']),
+            'total_scholarships': float(categories['scholarship']),
+            'net_balance': float(
+                categories['income'] - categories['expense']
+                - categories['salary'] - categories['scholarship']
+            ),
+            'pending_transactions': totals['pending_count'],
+            'overdue_transactions': totals['overdue_count'],
+            'pending_amount': float(totals['pending_amount']),
+            'overdue_amount': float(totals['overdue_amount']),
+            'monthly_income': monthly_income,
+            'monthly_expenses': monthly_expenses,
+            'transaction_distribution': totals['distribution'],
+            'budget_utilization': self.budget_utilization(results['budgets']),
+            'period': {
+                'start_date': self.start_date.isoformat(),
+                'end_date': self.end_date.isoformat(),
+                'months': len(monthly_income),
+            },
+        }
+
+    def compute(self):
+        """Toutes les statistiques, au format de l'endpoint finance_statistics"""
+        return run(self.plan())
+
+    async def acompute(self):
+        """``compute`` avec l'ORM asynchrone, les requêtes lancées ensemble"""
+        return await arun(self.plan())
@@ -1,3 +1,1136 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction as db_transaction
+from django.db.models import F, Sum
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from courses.models import Course, Enrollment
+from exams.models import Exam, Grade as ExamGrade
+from grades.models import Grade
+from students.models import Student
+from teachers.models import Teacher
+from . import budget_ledger, numbering, overdue, reminders, rollup
+from .models import Budget, FinancialReport, PaymentReceipt, PaymentReminder, Salary, Transaction, TransactionSequence
+from .payroll import PayrollRun
+from .reminders import Sink
+from university_management import metrics, stats_cache
+from university_management.dashboard import SECTIONS
+from university_management.query_plan import arun
+from university_management.renderers import FastJSONRenderer
+from .serializers import TRANSACTION_LIST_ROWS, TransactionSerializer
+from .statistics import FinanceStatistics, add_months, month_starts
+
+
+class TransactionIndexUsageTest(TestCase):
+    """Les requêtes de retard et de revenus mensuels doivent passer par un index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        statuses = ['paid', 'pending', 'partial', 'cancelled']
+        categories = ['income', 'expense', 'salary', 'scholarship']
+        Transaction.objects.bulk_create([
+            Transaction(
+                transaction_type='tuition',
+                category=categories[i % 4],
+                status=statuses[i % 4],
+                amount=Decimal('100.00'),
+                date=today - timedelta(days=i),
+                due_date=today - timedelta(days=i - 30),
+            )
+            for i in range(400)
+        ])
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Sur une petite table, PostgreSQL préfère un parcours séquentiel
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        return queryset.explain()
+
+    def test_overdue_query_uses_partial_index(self):
+        engine = FinanceStatistics()
+        self.assertIn('fin_tx_overdue_due_idx', self.explain(engine.overdue_queryset()))
+        self.assertIn('fin_tx_open_due_idx', self.explain(overdue.candidates()))
+
+    def test_monthly_income_query_uses_index(self):
+        engine = FinanceStatistics(queryset=Transaction.objects.all())
+        months = month_starts(engine.start_date, engine.end_date)
+        plan = self.explain(engine.monthly_queryset(months))
+        self.assertIn('fin_tx_cat_status_date_idx', plan)
+
+    def test_overdue_filter_matches_status_in(self):
+        today = date.today()
+        expected = Transaction.objects.filter(
+            status__in=['pending', 'partial'], due_date__lt=today
+        ).count()
+        self.assertEqual(overdue.candidates(today).count(), expected)
+        self.assertEqual(FinanceStatistics().overdue_queryset().count(), 0)
+
+        overdue.sweep(today, create_reminders=False)
+        self.assertEqual(FinanceStatistics().overdue_queryset().count(), expected)
+
+
+class TransactionListRowsTest(TestCase):
+    """Les lignes lues avec .values() doivent donner le même JSON que TransactionSerializer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        student = Student.objects.create(
+            user=User.objects.create_user(username='etu', first_name='Inès', last_name='Durand'),
+            student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='informatique'
+        )
+        teacher = Teacher.objects.create(
+            user=User.objects.create_user(username='prof', first_name='Marie', last_name='Curie'),
+            teacher_id='T001', hire_date=date(2020, 1, 1),
+            department='sciences', specialization='Physique', rank='professor'
+        )
+        today = date.today()
+        rows = [
+            # (type, étudiant, enseignant, montant, payé, statut, échéance, paiement)
+            ('tuition', student, None, '1500.5', '0', 'pending', today - timedelta(days=12), None),
+            ('tuition', student, None, '1000', '250.125', 'partial', today, None),
+            ('exam_fee', student, None, '80.001', '80.001', 'paid', today - timedelta(days=40), today),
+            ('salary', None, teacher, '3200', '0', 'cancelled', today - timedelta(days=3), None),
+            ('maintenance', None, None, '0.001', '0', 'overdue', today - timedelta(days=1), None),
+            ('equipment', None, None, '99.999', '0', 'pending', None, None),
+        ]
+        Transaction.objects.bulk_create([
+            Transaction(
+                transaction_number=f'TRN-{index}', transaction_type=transaction_type,
+                student=student, teacher=teacher, amount=Decimal(amount), paid_amount=Decimal(paid),
+                status=status, due_date=due_date, payment_date=payment_date,
+                date=today - timedelta(days=index), is_recurring=bool(index % 2)
+            )
+            for index, (transaction_type, student, teacher, amount, paid, status, due_date, payment_date)
+            in enumerate(rows)
+        ])
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_rows_match_serializer(self):
+        transactions = Transaction.objects.select_related('student__user', 'teacher__user').order_by('id')
+        self.assertEqual(
+            self.render(TRANSACTION_LIST_ROWS(transactions)),
+            self.render(TransactionSerializer(transactions, many=True).data)
+        )
+
+    def test_transaction_list_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        expected = TransactionSerializer(Transaction.objects.order_by('-date'), many=True).data
+
+        response = client.get(reverse('transaction-list'))
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(self.render(response.data['results']), self.render(expected))
+
+        # Statut enregistré : la transaction échue n'est en retard qu'après le balayage
+        response = client.get(reverse('transaction-list'), {'is_overdue': 'true'})
+        self.assertEqual([row['days_overdue'] for row in response.data['results']], [1])
+
+        overdue.sweep(create_reminders=False)
+        response = client.get(reverse('transaction-list'), {'is_overdue': 'true'})
+        self.assertEqual([row['days_overdue'] for row in response.data['results']], [12, 1])
+
+
+class FastJSONRendererTest(TestCase):
+    """FastJSONRenderer doit produire les mêmes octets que le JSONRenderer de DRF"""
+
+    def assertSameJSON(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type)
+        )
+
+    def test_python_types(self):
+        paris = timezone.get_current_timezone()
+        self.assertSameJSON({
+            'montants': [Decimal('1500.5'), Decimal('0.001'), Decimal('12'), 2.75, 3],
+            'dates': [date(2025, 3, 30), time(8, 30), time(8, 30, 0, 250)],
+            'horodatages': [
+                datetime(2025, 3, 30, 1, 0, tzinfo=dt_timezone.utc),
+                datetime(2025, 3, 30, 3, 0, 0, 5, tzinfo=paris),
+                datetime(2025, 3, 30, 3, 0),
+            ],
+            'texte': ['Électricité', 'ligne\u2028suivante\u2029', gettext_lazy('Payé'), None, True],
+            'imbriqué': {'vide': [], 'nombres': (1, 2)},
+        })
+
+    def test_indented_output_falls_back_to_drf(self):
+        self.assertSameJSON({'a': [1, Decimal('2.5')]}, 'application/json; indent=4')
+
+    def test_transaction_payloads(self):
+        Transaction.objects.create(
+            transaction_type='tuition', amount=Decimal('1500.500'), paid_amount=Decimal('250'),
+            due_date=date.today() - timedelta(days=3), description='Frais « 2025 »'
+        )
+        transactions = Transaction.objects.all()
+        self.assertSameJSON(TransactionSerializer(transactions, many=True).data)
+        self.assertSameJSON(TRANSACTION_LIST_ROWS(transactions))
+        # Valeurs brutes : Decimal, date et datetime encodés par le renderer
+        self.assertSameJSON(list(transactions.values()))
+
+
+class DashboardTest(TestCase):
+    """Vues asynchrones du tableau de bord : mêmes corps que les endpoints DRF"""
+
+    STATISTICS_URLS = {
+        'finance': 'finance-statistics',
+        'grades': 'grades:grade-statistics',
+        'exams': 'exams:exam-statistics',
+        'students': 'student-statistics',
+        'teachers': 'teacher-statistics',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        teacher = Teacher.objects.create(
+            user=User.objects.create_user(username='prof', first_name='Marie', last_name='Curie'),
+            teacher_id='T001', hire_date=date(2020, 1, 1), office_number='B12',
+            department='sciences', specialization='Physique', rank='professor'
+        )
+        course = Course.objects.create(
+            course_code='PHY101', title='Mécanique', description='', credits=4, teacher=teacher,
+            department='sciences', semester='fall', academic_year=2025
+        )
+        exam = Exam.objects.create(
+            course=course, exam_type='midterm', title='Partiel', date=date.today() + timedelta(days=3),
+            time=time(9, 0), duration='2 heures', location='A1'
+        )
+        for i, score in enumerate((8, 12.5, 17)):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f'etu{i}', first_name='Léa', last_name=f'Martin{i}'),
+                student_id=f'S{i:03d}', enrollment_date=date(2024, 9, 1),
+                faculty='Sciences', department='sciences', status='graduated' if i == 2 else 'active'
+            )
+            Enrollment.objects.create(student=student, course=course)
+            Grade.objects.create(student=student, course=course, score=score, semester='fall', academic_year=2025)
+            ExamGrade.objects.create(student=student, exam=exam, score=score)
+            Transaction.objects.create(
+                transaction_number=f'TRN-DASH-{i}', transaction_type='tuition', category='income', student=student,
+                amount=Decimal('1500'), paid_amount=Decimal('500') * i,
+                status=['pending', 'partial', 'paid'][i], due_date=date.today() - timedelta(days=10)
+            )
+        Budget.objects.create(department='sciences', year=date.today().year, allocated_amount=Decimal('10000'),
+                              spent_amount=Decimal('2500'))
+
+    def setUp(self):
+        stats_cache.get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, *args, **params):
+        return self.client.get(reverse(url, args=args), params)
+
+    def test_sections_match_statistics_endpoints(self):
+        params = {'months': 3, 'top': 2}
+        with override_settings(STATS_CACHE={'ENABLED': False}):
+            expected = {
+                name: self.get(url, **params).json() for name, url in self.STATISTICS_URLS.items()
+            }
+            response = self.get('dashboard', **params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {'success': True, 'data': expected})
+            for name in SECTIONS:
+                self.assertEqual(self.get('dashboard-section', name, **params).json(), expected[name])
+
+        self.assertEqual(expected['exams']['data']['total_exams'], 1)
+        self.assertEqual(expected['exams']['data']['upcoming_this_week'], 1)
+        self.assertEqual(expected['students']['retention_rate'], 100.0)
+        self.assertEqual(expected['teachers']['with_office'], 1)
+        self.assertEqual(len(expected['grades']['data']['top_students']), 2)
+
+    def test_dashboard_shares_stats_cache(self):
+        self.assertEqual(self.get('finance-statistics')['X-Stats-Cache'], 'miss')
+
+        response = self.get('dashboard')
+        self.assertEqual(
+            response['X-Stats-Cache'],
+            'finance=hit, grades=miss, exams=miss, students=miss, teachers=miss'
+        )
+        self.assertEqual(self.get('grades:grade-statistics')['X-Stats-Cache'], 'hit')
+
+        response = self.client.get(reverse('dashboard'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['X-Stats-Cache'], ', '.join(f'{name}=hit' for name in SECTIONS))
+
+        # Une écriture invalide les sections qui en dépendent
+        Budget.objects.create(department='law', year=date.today().year, allocated_amount=Decimal('1'))
+        response = self.get('dashboard-section', 'finance')
+        self.assertEqual(response['X-Stats-Cache'], 'miss')
+        self.assertEqual(len(response.json()['data']['budget_utilization']), 2)
+
+    def test_errors(self):
+        self.assertEqual(APIClient().get(reverse('dashboard')).status_code, 401)
+        self.assertEqual(self.client.post(reverse('dashboard')).status_code, 405)
+        self.assertEqual(self.get('dashboard-section', 'inconnue').status_code, 404)
+
+        response = self.get('dashboard-section', 'finance', months='abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Paramètres invalides')
+
+        response = self.get('dashboard', months='abc')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['success'])
+        self.assertFalse(response.json()['data']['finance']['success'])
+        self.assertTrue(response.json()['data']['grades']['success'])
+
+    async def test_async_client_with_jwt(self):
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        metrics.store.reset()
+        response = await AsyncClient().get(reverse('dashboard'), headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        # Middleware en mode asynchrone : les requêtes SQL sont comptées
+        self.assertGreater(metrics.store.summary()['dashboard']['queries']['max'], 10)
+
+        response = await AsyncClient().get(reverse('dashboard'), headers={'Authorization': 'Bearer invalide'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_async_plan_matches_sync(self):
+        engine = FinanceStatistics(months=3)
+        self.assertEqual(await arun(engine.plan()), await sync_to_async(engine.compute)())
+
+
+class RecordingSink(Sink):
+    """Canal de test : garde les rappels reçus, refuse ceux de ``rejected``"""
+
+    messages = []
+    rejected = set()
+
+    def send(self, message):
+        if message['transaction_id'] in self.rejected:
+            raise ConnectionError('canal indisponible')
+        RecordingSink.messages.append(message)
+
+
+RECORDING_REMINDERS = {'SINKS': ['finance.tests.RecordingSink'], 'WORKERS': 3, 'BATCH_SIZE': 2, 'CHUNK_SIZE': 2}
+
+
+@override_settings(PAYMENT_REMINDERS=RECORDING_REMINDERS)
+class OverdueSweepTest(TestCase):
+    """Le balayage quotidien passe en retard les transactions ouvertes échues"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.today = date.today()
+        # Enregistrées via save() (rollup à jour), échues seulement à partir de demain
+        cls.open = [
+            Transaction.objects.create(
+                transaction_number=f'TRN-OD-{index}', transaction_type='tuition',
+                amount=Decimal('100'), paid_amount=Decimal(paid), due_date=cls.today
+            )
+            for index, paid in enumerate(['0', '40'])
+        ]
+        Transaction.objects.create(
+            transaction_number='TRN-OD-PAID', transaction_type='tuition',
+            amount=Decimal('100'), paid_amount=Decimal('100'), due_date=cls.today
+        )
+        Transaction.objects.create(
+            transaction_number='TRN-OD-LATER', transaction_type='tuition',
+            amount=Decimal('100'), due_date=cls.today + timedelta(days=30)
+        )
+
+    def test_sweep_transitions_open_past_due(self):
+        self.assertEqual([t.status for t in self.open], ['pending', 'partial'])
+        result = overdue.sweep(self.today + timedelta(days=3))
+        self.assertEqual(result, {'transitioned': 2, 'reminders': 2})
+
+        swept = Transaction.objects.filter(status='overdue')
+        self.assertEqual(sorted(swept.values_list('pk', flat=True)), sorted(t.pk for t in self.open))
+        self.assertFalse(swept.filter(overdue_since__isnull=True).exists())
+        self.assertEqual(
+            sorted(PaymentReminder.objects.filter(reminder_type='first').values_list('transaction_id', flat=True)),
+            sorted(t.pk for t in self.open)
+        )
+        self.assertEqual(rollup.verify(), [])
+
+        # Rien de plus à passer : aucune écriture
+        self.assertEqual(overdue.sweep(self.today + timedelta(days=3)), {'transitioned': 0, 'reminders': 0})
+
+    def test_sweep_feeds_statistics_and_filter(self):
+        overdue.sweep(self.today + timedelta(days=1), create_reminders=False)
+        self.assertFalse(PaymentReminder.objects.exists())
+
+        data = FinanceStatistics().compute()
+        self.assertEqual(data['overdue_transactions'], 2)
+        self.assertEqual(data['overdue_amount'], 200.0)
+        self.assertEqual(data['pending_transactions'], 1)
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(reverse('transaction-list'), {'is_overdue': 'true'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertTrue(all(row['is_overdue'] and row['overdue_since'] for row in response.data['results']))
+
+    def test_save_reverts_overdue_when_due_date_moves(self):
+        overdue.sweep(self.today + timedelta(days=1), create_reminders=False)
+        transaction = Transaction.objects.get(pk=self.open[0].pk)
+        transaction.due_date = self.today + timedelta(days=10)
+        transaction.save()
+        self.assertEqual(transaction.status, 'pending')
+        self.assertIsNone(transaction.overdue_since)
+        self.assertEqual(rollup.verify(), [])
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('sweep_overdue_transactions', '--date', str(self.today + timedelta(days=1)),
+                     '--no-reminders', stdout=out)
+        self.assertIn('2 transaction(s)', out.getvalue())
+        self.assertFalse(PaymentReminder.objects.exists())
+
+    @override_settings(OVERDUE_SWEEPER={'RUN_IN_PROCESS': True})
+    def test_runner_not_started_by_app_loading(self):
+        # ready() s'exécute aussi pour migrate, shell, tests... : pas de thread
+        apps.get_app_config('finance').ready()
+        self.assertIsNone(overdue._runner)
+
+    def test_runner_disabled_by_default(self):
+        self.assertIsNone(overdue.start_runner_if_enabled())
+        self.assertIsNone(overdue._runner)
+
+
+@override_settings(PAYMENT_REMINDERS=RECORDING_REMINDERS)
+class PaymentReminderTest(TestCase):
+    """Escalade des rappels, envoi par la file et reprise des échecs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        student = Student.objects.create(
+            user=User.objects.create_user(username='etu', first_name='Inès', last_name='Durand',
+                                          email='ines@example.org'),
+            student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='informatique'
+        )
+        cls.due = date.today()
+        cls.transactions = [
+            Transaction.objects.create(
+                transaction_number=f'TRN-RM-{index}', transaction_type='tuition', student=student,
+                amount=Decimal('100'), paid_amount=Decimal(index * 10), due_date=cls.due
+            )
+            for index in range(5)
+        ]
+        Transaction.objects.create(
+            transaction_number='TRN-RM-PAID', transaction_type='tuition', student=student,
+            amount=Decimal('100'), paid_amount=Decimal('100'), due_date=cls.due
+        )
+        overdue.sweep(cls.due + timedelta(days=1), create_reminders=False)
+        cls.day = cls.due + timedelta(days=1)
+
+    def setUp(self):
+        RecordingSink.messages = []
+        RecordingSink.rejected = set()
+
+    def test_escalation(self):
+        expected = ['first', 'second', 'final', 'overdue', 'overdue']
+        for week, reminder_type in enumerate(expected):
+            result = reminders.run(self.day + timedelta(weeks=week))
+            self.assertEqual(result['created'], 5)
+            self.assertEqual(result['by_type'][reminder_type], 5)
+            self.assertEqual(result['sent'], 5)
+        self.assertEqual(PaymentReminder.objects.count(), 25)
+        self.assertFalse(PaymentReminder.objects.filter(sent_at__isnull=True).exists())
+
+        # Moins de INTERVAL_DAYS après le dernier rappel : rien
+        result = reminders.run(self.day + timedelta(weeks=4, days=6))
+        self.assertEqual((result['created'], result['sent']), (0, 0))
+
+    def test_rerun_same_day_is_idempotent(self):
+        reminders.run(self.day)
+        self.assertEqual(len(RecordingSink.messages), 5)
+        self.assertEqual(reminders.run(self.day), {
+            'created': 0, 'by_type': dict.fromkeys(reminders.ESCALATION, 0), 'sent': 0, 'failed': 0
+        })
+        self.assertEqual(len(RecordingSink.messages), 5)
+
+    def test_concurrent_generation_creates_no_duplicate(self):
+        reminders.generate(self.day)
+        # Génération concurrente : niveaux lus avant l'insertion de l'autre
+        original = reminders.reminder_levels
+        reminders.reminder_levels = lambda transaction_ids: {}
+        self.addCleanup(setattr, reminders, 'reminder_levels', original)
+
+        self.assertEqual(reminders.generate(self.day)['first'], 5)
+        self.assertEqual(PaymentReminder.objects.count(), 5)
+        with self.assertRaises(IntegrityError), db_transaction.atomic():
+            PaymentReminder.objects.create(transaction=self.transactions[0], reminder_type='first',
+                                           reminder_date=self.day)
+
+    def test_message(self):
+        reminders.run(self.day)
+        message = next(m for m in RecordingSink.messages if m['transaction_number'] == 'TRN-RM-3')
+        self.assertEqual(message['type'], 'first')
+        self.assertEqual(message['recipient'], 'Inès Durand')
+        self.assertEqual(message['email'], 'ines@example.org')
+        self.assertEqual(Decimal(message['remaining']), Decimal('70'))
+        self.assertEqual(message['days_overdue'], 1)
+
+    def test_failed_reminders_are_retried(self):
+        RecordingSink.rejected = {self.transactions[1].pk, self.transactions[4].pk}
+        with self.assertLogs('finance.reminders', 'ERROR') as logs:
+            result = reminders.run(self.day)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual((result['created'], result['sent'], result['failed']), (5, 3, 2))
+        self.assertEqual(PaymentReminder.objects.filter(sent_at__isnull=True).count(), 2)
+
+        RecordingSink.rejected = set()
+        result = reminders.run(self.day)
+        self.assertEqual((result['created'], result['sent'], result['failed']), (0, 2, 0))
+        self.assertEqual(len(RecordingSink.messages), 5)
+
+    def test_generate_queries_per_chunk(self):
+        # identifiants + par paquet de 2 : savepoint, requête groupée, insertion, release
+        with self.assertNumQueries(1 + 3 * 4):
+            reminders.generate(self.day)
+
+    def test_sink_requires_send(self):
+        class IncompleteSink(Sink):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSink()
+
+    def test_file_sink(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'outbox' / 'reminders.jsonl'
+            with override_settings(PAYMENT_REMINDERS={**RECORDING_REMINDERS,
+                                                      'SINKS': ['finance.reminders.FileSink'],
+                                                      'FILE_PATH': path}):
+                self.assertEqual(reminders.run(self.day)['sent'], 5)
+            lines = path.read_text(encoding='utf-8').splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertIn('"recipient":"Inès Durand"', lines[0])
+
+    def test_run_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = reverse('payment-reminders-run')
+        response = client.post(url, {'date': self.day.isoformat()}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['data']['created'], response.data['data']['sent']), (5, 5))
+
+        response = client.post(url, {'date': '18/10/2026'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('send_payment_reminders', '--date', str(self.day), '--no-dispatch', stdout=out)
+        self.assertIn('5 rappel(s) créé(s)', out.getvalue())
+        self.assertEqual(PaymentReminder.objects.filter(sent_at__isnull=True).count(), 5)
+
+
+@override_settings(TRANSACTION_NUMBERS={'BLOCK_SIZE': 10})
+class TransactionNumberTest(TransactionTestCase):
+    """Numéros réservés par blocs, uniques pour save() comme pour bulk_create()"""
+
+    def setUp(self):
+        numbering.allocator.reset()
+
+    def create(self, day, **kwargs):
+        return Transaction.objects.create(transaction_type='tuition', amount=Decimal('10'), date=day, **kwargs)
+
+    def test_save_numbers_per_year(self):
+        numbers = [self.create(date(2026, 1, day)).transaction_number for day in range(1, 4)]
+        numbers.append(self.create(date(2025, 12, 31)).transaction_number)
+        self.assertEqual(numbers, ['TRN26-000001', 'TRN26-000002', 'TRN26-000003', 'TRN25-000001'])
+
+    def test_one_reservation_per_block(self):
+        numbering.next_number(date(2026, 1, 1))
+        with self.assertNumQueries(0):
+            for _ in range(9):
+                numbering.next_number(date(2026, 1, 1))
+        # Bloc suivant : BEGIN, UPDATE, relecture, COMMIT
+        with self.assertNumQueries(4):
+            self.assertEqual(numbering.next_number(date(2026, 1, 1)), 'TRN26-000011')
+        self.assertEqual(TransactionSequence.objects.get(year=2026).next_value, 21)
+
+    def test_bulk_create(self):
+        self.create(date(2026, 1, 1))
+        transactions = Transaction.objects.bulk_create([
+            Transaction(transaction_type='tuition', amount=Decimal('10'),
+                        date=date(2026, 2, 1) if index % 3 else '2025-06-01')
+            for index in range(30)
+        ] + [Transaction(transaction_type='tuition', amount=Decimal('10'), transaction_number='MANUEL-1')])
+
+        numbers = [transaction.transaction_number for transaction in transactions]
+        self.assertEqual(len(set(numbers)), 31)
+        self.assertEqual(numbers[-1], 'MANUEL-1')
+        self.assertEqual(numbers[:2], ['TRN25-000001', 'TRN26-000002'])
+        self.assertEqual(Transaction.objects.filter(transaction_number__startswith='TRN26-').count(), 21)
+
+    def test_rolled_back_reservation_is_not_reused(self):
+        with self.assertRaises(ValueError):
+            with db_transaction.atomic():
+                self.assertEqual(self.create(date(2026, 1, 1)).transaction_number, 'TRN26-000001')
+                raise ValueError
+        # Compteur annulé avec la transaction : le bloc n'est pas gardé en mémoire
+        self.assertFalse(TransactionSequence.objects.exists())
+        self.assertEqual(self.create(date(2026, 1, 1)).transaction_number, 'TRN26-000001')
+
+    def test_committed_reservation_is_kept(self):
+        with db_transaction.atomic():
+            first = self.create(date(2026, 1, 1)).transaction_number
+        self.assertEqual(first, 'TRN26-000001')
+        with self.assertNumQueries(0):
+            self.assertEqual(numbering.next_number(date(2026, 1, 1)), 'TRN26-000002')
+
+
+class TransactionImportTest(TestCase):
+    """Import d'un relevé bancaire : rapprochement, écriture en un lot et rapport"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        Student.objects.create(
+            user=User.objects.create_user(username='etu', first_name='Inès', last_name='Durand'),
+            student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='informatique'
+        )
+        today = date.today()
+        for invoice, amount, paid, due_date, extra in [
+            ('INV-1', '1000', '0', today + timedelta(days=30), {}),
+            ('INV-2', '500', '0', today - timedelta(days=10), {}),
+            ('INV-3', '100', '0', None, {'status': 'cancelled'}),
+            ('INV-DUP', '100', '0', None, {}),
+            ('INV-DUP', '200', '0', None, {}),
+            ('INV-4', '200', '200', None, {'receipt_number': 'RC-OLD'}),
+        ]:
+            Transaction.objects.create(
+                invoice_number=invoice, transaction_type='tuition', amount=Decimal(amount),
+                paid_amount=Decimal(paid), due_date=due_date, **extra
+            )
+
+    def post(self, data, **kwargs):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        return client.post(reverse('import-transactions'), data, **kwargs)
+
+    ROWS = [
+        {'invoice_number': 'INV-1', 'paid_amount': '400', 'receipt_number': 'RC-1', 'method': 'bank_transfer'},
+        {'invoice_number': 'INV-1', 'paid_amount': '700', 'receipt_number': 'RC-2'},
+        {'invoice_number': 'INV-2', 'paid_amount': '500', 'payment_date': '15/09/2026'},
+        {'receipt_number': 'RC-OLD', 'paid_amount': '200'},
+        {'invoice_number': 'INV-3', 'paid_amount': '10'},
+        {'invoice_number': 'INV-DUP', 'paid_amount': '10'},
+        {'invoice_number': 'INV-NEW', 'amount': '300', 'paid_amount': '100', 'transaction_type': 'tuition',
+         'student_id': 'S001'},
+        {'invoice_number': 'INV-404', 'paid_amount': '10'},
+        {'invoice_number': 'INV-NEW', 'paid_amount': '200'},
+        {'invoice_number': 'INV-5', 'amount': 'abc', 'transaction_type': 'tuition'},
+    ]
+
+    def test_reconciliation(self):
+        response = self.post({'transactions': self.ROWS}, format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual(
+            {key: data[key] for key in ('created', 'updated', 'payments', 'duplicates', 'failed')},
+            {'created': 1, 'updated': 2, 'payments': 4, 'duplicates': 1, 'failed': 4}
+        )
+        self.assertEqual(Decimal(data['total_paid']), Decimal('1800'))
+        self.assertEqual(Decimal(data['overpaid']), Decimal('100'))
+        self.assertEqual([error['line'] for error in data['errors']], [10, 5, 6, 8])
+        self.assertEqual([(row['line'], row['action'], row['status']) for row in data['rows']], [
+            (1, 'payment', 'partial'), (2, 'payment', 'paid'), (3, 'payment', 'paid'),
+            (4, 'duplicate', 'paid'), (7, 'created', 'partial'), (9, 'payment', 'paid'),
+        ])
+
+        first = Transaction.objects.get(invoice_number='INV-1')
+        self.assertEqual((first.paid_amount, first.status, first.receipt_number, first.method),
+                         (Decimal('1000'), 'paid', 'RC-2', 'bank_transfer'))
+        second = Transaction.objects.get(invoice_number='INV-2')
+        self.assertEqual((second.status, second.payment_date, second.overdue_since),
+                         ('paid', date(2026, 9, 15), None))
+        created = Transaction.objects.get(invoice_number='INV-NEW')
+        self.assertEqual((created.paid_amount, created.status, created.category, created.student.student_id),
+                         (Decimal('300'), 'paid', 'income', 'S001'))
+        self.assertEqual(data['rows'][4]['transaction_number'], created.transaction_number)
+        self.assertTrue(created.transaction_number.startswith('TRN'))
+        self.assertEqual(rollup.verify(), [])
+
+        # Relevé réimporté : les lignes avec reçu sont des doublons
+        data = self.post({'transactions': self.ROWS[:2]}, format='json').data['data']
+        self.assertEqual((data['duplicates'], data['payments']), (2, 0))
+
+    def test_dry_run_writes_nothing(self):
+        before = list(Transaction.objects.order_by('pk').values_list('paid_amount', 'status'))
+        data = self.post({'transactions': self.ROWS, 'dry_run': True}, format='json').data['data']
+        self.assertTrue(data['dry_run'])
+        self.assertEqual((data['created'], data['payments']), (1, 4))
+        self.assertEqual(list(Transaction.objects.order_by('pk').values_list('paid_amount', 'status')), before)
+
+    def test_csv_file(self):
+        content = (
+            'invoice_number;paid_amount;payment_date;receipt_number\n'
+            'INV-1;1 000,000;01/10/2026;RC-9\n'
+            'INV-2;250,5;;\n'
+        ).encode('utf-8-sig')
+        upload = SimpleUploadedFile('releve.csv', content, content_type='text/csv')
+        data = self.post({'file': upload}, format='multipart').data['data']
+        self.assertEqual((data['payments'], data['failed']), (2, 0))
+        self.assertEqual(Transaction.objects.get(invoice_number='INV-1').status, 'paid')
+        self.assertEqual(Transaction.objects.get(invoice_number='INV-2').paid_amount, Decimal('250.5'))
+
+    def test_query_count_does_not_grow_with_rows(self):
+        rows = [{'invoice_number': f'INV-N{index}', 'amount': '10', 'transaction_type': 'exam_fee'}
+                for index in range(300)]
+        # rapprochement, étudiants, création (numéros : un bloc), rollup, savepoints
+        with CaptureQueriesContext(connection) as queries:
+            self.post({'transactions': rows}, format='json')
+        self.assertLess(len(queries), 20)
+        self.assertEqual(Transaction.objects.filter(invoice_number__startswith='INV-N').count(), 300)
+
+    def test_invalid_payload(self):
+        self.assertEqual(self.post({'transactions': {'a': 1}}, format='json').status_code, 400)
+
+
+PAYROLL_SCALE = {'professor': '4500', 'associate': '3800', 'lecturer': '3200', 'assistant': '2500'}
+
+
+@override_settings(PAYROLL={'BASE_SALARY': PAYROLL_SCALE, 'DEDUCTION_RATE': '0.20'})
+class PayrollTest(TestCase):
+    """Paie mensuelle : salaires et transactions liées créés en un lot, relançable"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.teachers = {}
+        for code, rank, hire_date, active in [
+            ('T001', 'professor', date(2020, 1, 1), True),
+            ('T002', 'lecturer', date(2021, 9, 1), True),
+            ('T003', 'assistant', date(2026, 11, 1), True),
+            ('T004', 'associate', date(2019, 9, 1), False),
+        ]:
+            cls.teachers[code] = Teacher.objects.create(
+                user=User.objects.create_user(username=code, first_name='Prof', last_name=code, is_active=active),
+                teacher_id=code, hire_date=hire_date, department='sciences',
+                specialization='Physique', rank=rank
+            )
+        # Salaire de base repris du dernier mois payé, pas d'un salaire annulé plus récent
+        Salary.objects.create(teacher=cls.teachers['T002'], year=2026, month=8, status='paid',
+                              base_salary=Decimal('3500'), net_salary=Decimal('2800'))
+        Salary.objects.create(teacher=cls.teachers['T002'], year=2026, month=9, status='cancelled',
+                              base_salary=Decimal('9000'), net_salary=Decimal('7200'))
+
+    def test_creates_salaries_and_linked_transactions(self):
+        summary = PayrollRun(2026, 10).run().summary()
+        self.assertEqual((summary['teachers'], summary['created'], summary['linked']), (2, 2, 0))
+        self.assertEqual(Decimal(summary['total_net_salary']), Decimal('6400'))
+
+        salaries = {s.teacher.teacher_id: s for s in Salary.objects.filter(year=2026, month=10)}
+        self.assertEqual(set(salaries), {'T001', 'T002'})
+        professor = salaries['T001']
+        self.assertEqual((professor.base_salary, professor.deductions, professor.net_salary),
+                         (Decimal('4500'), Decimal('900'), Decimal('3600')))
+        self.assertEqual(salaries['T002'].base_salary, Decimal('3500'))
+
+        transaction = professor.transaction
+        self.assertEqual((transaction.transaction_type, transaction.category, transaction.amount,
+                          transaction.teacher_id, transaction.due_date),
+                         ('salary', 'salary', Decimal('3600'), professor.teacher_id, date(2026, 10, 31)))
+        self.assertTrue(transaction.transaction_number.startswith('TRN26-'))
+        self.assertEqual(rollup.verify(), [])
+
+    def test_rerun_completes_missing_transactions(self):
+        PayrollRun(2026, 10).run()
+        manual = Salary.objects.create(teacher=self.teachers['T002'], year=2026, month=11,
+                                       base_salary=Decimal('3500'), net_salary=Decimal('2900'))
+        summary = PayrollRun(2026, 11).run().summary()
+        # T003 embauché le 1er novembre
+        self.assertEqual((summary['teachers'], summary['created'], summary['linked']), (3, 2, 1))
+        manual.refresh_from_db()
+        self.assertEqual(manual.transaction.amount, Decimal('2900'))
+
+        count = Transaction.objects.count()
+        summary = PayrollRun(2026, 11).run().summary()
+        self.assertEqual((summary['created'], summary['linked'], summary['skipped']), (0, 0, 3))
+        self.assertEqual(Transaction.objects.count(), count)
+        self.assertEqual(rollup.verify(), [])
+
+    def test_paid_manual_salary_gets_settled_transaction(self):
+        manual = Salary.objects.create(teacher=self.teachers['T001'], year=2026, month=10, status='paid',
+                                       payment_date=date(2026, 10, 5), base_salary=Decimal('4500'),
+                                       net_salary=Decimal('3600'))
+        summary = PayrollRun(2026, 10).run().summary()
+        self.assertEqual((summary['created'], summary['linked']), (1, 1))
+        manual.refresh_from_db()
+        transaction = manual.transaction
+        self.assertEqual((transaction.paid_amount, transaction.status, transaction.payment_date,
+                          transaction.overdue_since),
+                         (Decimal('3600'), 'paid', date(2026, 10, 5), None))
+        self.assertEqual(rollup.verify(), [])
+
+    def test_dry_run_writes_nothing(self):
+        summary = PayrollRun(2026, 10, dry_run=True).run().summary()
+        self.assertEqual(summary['created'], 2)
+        self.assertFalse(Salary.objects.filter(year=2026, month=10).exists())
+        self.assertFalse(Transaction.objects.filter(transaction_type='salary').exists())
+
+    def test_query_count_does_not_grow_with_teachers(self):
+        for index in range(50):
+            Teacher.objects.create(
+                user=User.objects.create_user(username=f'extra{index}'), teacher_id=f'X{index:03d}',
+                hire_date=date(2022, 1, 1), department='sciences', specialization='Maths', rank='assistant'
+            )
+        # enseignants, salaires du mois, numéros, transactions, salaires, rollup, savepoints
+        with CaptureQueriesContext(connection) as queries:
+            PayrollRun(2026, 10).run()
+        self.assertLess(len(queries), 20)
+        self.assertEqual(Salary.objects.filter(year=2026, month=10, transaction__isnull=False).count(), 52)
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(reverse('payroll-run'), {'month': 10, 'year': 2026}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['created'], 2)
+        response = client.get(reverse('salary-list'), {'year': 2026, 'month': 10})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(client.post(reverse('payroll-run'), {'month': 13}, format='json').status_code, 400)
+
+    @override_settings(PAYROLL={'BASE_SALARY': PAYROLL_SCALE})
+    def test_no_deductions_by_default(self):
+        summary = PayrollRun(2026, 10).run().summary()
+        self.assertEqual((Decimal(summary['total_deductions']), Decimal(summary['total_net_salary'])),
+                         (0, Decimal('8000')))
+
+    @override_settings(PAYROLL={})
+    def test_scale_is_required(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "PAYROLL['BASE_SALARY']"):
+            PayrollRun(2026, 10)
+        with self.assertRaisesMessage(CommandError, "PAYROLL['BASE_SALARY']"):
+            call_command('run_payroll', month=10, year=2026, stdout=StringIO())
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(reverse('payroll-run'), {'month': 10, 'year': 2026}, format='json')
+        self.assertEqual((response.status_code, response.data['error']), (500, 'Paie non configurée'))
+        self.assertFalse(Salary.objects.filter(year=2026, month=10).exists())
+
+    @override_settings(PAYROLL={'BASE_SALARY': {'lecturer': '3200'}})
+    def test_rank_missing_from_scale(self):
+        # T001 (professeur) n'a ni salaire précédent ni barème : rien n'est écrit
+        with self.assertRaisesMessage(ImproperlyConfigured, "Grade 'professor' (T001)"):
+            PayrollRun(2026, 10).run()
+        self.assertFalse(Salary.objects.filter(year=2026, month=10).exists())
+
+        with override_settings(PAYROLL={'BASE_SALARY': {'lecturer': '3200'}, 'DEFAULT_BASE_SALARY': '2000'}):
+            self.assertEqual(PayrollRun(2026, 10).run().summary()['total_base_salary'], '5500')
+
+
+class BudgetLedgerTest(TestCase):
+    """Engagements et dépenses par UPDATE conditionnel"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.budget = Budget.objects.create(department='sciences', year=2026, allocated_amount=Decimal('1000'))
+
+    def amounts(self):
+        budget = Budget.objects.get(pk=self.budget.pk)
+        return budget.spent_amount, budget.committed_amount
+
+    def test_commit_release_spend(self):
+        self.assertTrue(budget_ledger.commit(self.budget, '600'))
+        self.assertFalse(budget_ledger.commit(self.budget, '400.001'))
+        self.assertTrue(budget_ledger.commit(self.budget.pk, '400'))
+        self.assertEqual(self.amounts(), (0, Decimal('1000')))
+
+        self.assertFalse(budget_ledger.release(self.budget, '1000.5'))
+        self.assertTrue(budget_ledger.release(self.budget, '300'))
+        # Dépense couverte par l'engagement, puis au-delà de l'engagement
+        self.assertTrue(budget_ledger.spend(self.budget, '500'))
+        self.assertEqual(self.amounts(), (Decimal('500'), Decimal('200')))
+        self.assertFalse(budget_ledger.spend(self.budget, '301', from_commitment=False))
+        self.assertTrue(budget_ledger.spend(self.budget, '300', from_commitment=False))
+        self.assertFalse(budget_ledger.spend(self.budget, '201'))
+        self.assertTrue(budget_ledger.spend(self.budget, '200'))
+        self.assertEqual(self.amounts(), (Decimal('1000'), 0))
+
+        with self.assertRaises(ValueError):
+            budget_ledger.commit(self.budget, '0')
+
+    def test_decimal_boundary(self):
+        for amount in ['0.1', '0.2', '999.7']:
+            self.assertTrue(budget_ledger.commit(self.budget, amount))
+        self.assertFalse(budget_ledger.commit(self.budget, '0.001'))
+
+    def test_inactive_budget_refuses_operations(self):
+        budget_ledger.commit(self.budget, '100')
+        Budget.objects.filter(pk=self.budget.pk).update(is_active=False)
+        self.assertFalse(budget_ledger.commit(self.budget, '1'))
+        self.assertFalse(budget_ledger.release(self.budget, '1'))
+        self.assertFalse(budget_ledger.spend(self.budget, '1'))
+        self.assertFalse(budget_ledger.spend(self.budget, '1', from_commitment=False))
+        self.assertEqual(self.amounts(), (0, Decimal('100')))
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(reverse('budget-commit', args=[self.budget.pk]), {'amount': '1'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('budget inactif', response.data['error'])
+
+    def test_model_methods_refresh_amounts(self):
+        budget = Budget.objects.get(pk=self.budget.pk)
+        self.assertTrue(budget.commit_amount(Decimal('250')))
+        self.assertEqual(budget.committed_amount, Decimal('250'))
+        self.assertTrue(budget.spend_amount(Decimal('100')))
+        self.assertEqual((budget.spent_amount, budget.committed_amount), (Decimal('100'), Decimal('150')))
+        self.assertFalse(budget.release_commitment(Decimal('200')))
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = reverse('budget-commit', args=[self.budget.pk])
+        response = client.post(url, {'amount': '800'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['data']['committed_amount']), Decimal('800'))
+        self.assertEqual(client.post(url, {'amount': '201'}, format='json').status_code, 409)
+        self.assertEqual(client.post(url, {'amount': 'abc'}, format='json').status_code, 400)
+        response = client.post(reverse('budget-spend', args=[self.budget.pk]), {'amount': '800'}, format='json')
+        self.assertEqual(Decimal(response.data['data']['spent_amount']), Decimal('800'))
+
+
+class BudgetLedgerConcurrencyTest(TransactionTestCase):
+    """32 écrivains simultanés : ni dépassement ni mise à jour perdue"""
+
+    WRITERS = 32
+    OPERATIONS = 25
+
+    def run_writers(self, work):
+        def run(writer):
+            try:
+                return work(writer)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(self.WRITERS) as pool:
+            return list(pool.map(run, range(self.WRITERS)))
+
+    def test_no_overspend(self):
+        # 800 demandes de 10 pour 5000 disponibles : exactement 500 acceptées
+        budget = Budget.objects.create(department='sciences', year=2026, allocated_amount=Decimal('5000'))
+
+        def work(writer):
+            accepted = 0
+            for index in range(self.OPERATIONS):
+                if index % 2:
+                    accepted += budget_ledger.spend(budget.pk, '10', from_commitment=False)
+                else:
+                    accepted += budget_ledger.commit(budget.pk, '10')
+            return accepted
+
+        accepted = sum(self.run_writers(work))
+        budget.refresh_from_db()
+        self.assertEqual(accepted, 500)
+        self.assertEqual(budget.spent_amount + budget.committed_amount, Decimal('5000'))
+
+    def test_no_lost_update(self):
+        # Chaque écrivain engage puis dépense son engagement : tout est compté
+        budget = Budget.objects.create(department='sciences', year=2026, allocated_amount=Decimal('1000000'))
+
+        def work(writer):
+            for _ in range(self.OPERATIONS):
+                self.assertTrue(budget_ledger.commit(budget.pk, '1.5'))
+                self.assertTrue(budget_ledger.spend(budget.pk, '1.5'))
+            return self.OPERATIONS
+
+        self.run_writers(work)
+        budget.refresh_from_db()
+        self.assertEqual(budget.spent_amount, Decimal('1.5') * self.WRITERS * self.OPERATIONS)
+        self.assertEqual(budget.committed_amount, 0)
+
+
+class TransactionApiRollupTest(TestCase):
+    """Création, modification et suppression par l'API : rollup mensuel exact"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.student = Student.objects.create(
+            user=User.objects.create_user(username='etu', first_name='Inès', last_name='Durand'),
+            student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='informatique'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_create_update_delete(self):
+        response = self.client.post(reverse('transaction-list'), {
+            'student': self.student.pk, 'transaction_type': 'tuition', 'amount': '1500',
+            'date': '2026-09-01', 'due_date': '2026-09-30',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        transaction = Transaction.objects.get()
+        self.assertEqual(rollup.verify(), [])
+
+        response = self.client.patch(reverse('transaction-detail', args=[transaction.pk]),
+                                     {'paid_amount': '600', 'date': '2026-10-02'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Transaction.objects.get().paid_amount, Decimal('600'))
+        self.assertEqual(rollup.verify(), [])
+
+        # Rappel supprimé, reçu en cascade
+        PaymentReminder.objects.create(transaction=transaction, reminder_date=date(2026, 10, 7),
+                                       reminder_type='first')
+        PaymentReceipt.objects.create(receipt_number='RC-1', transaction=transaction, amount=Decimal('600'))
+        response = self.client.delete(reverse('transaction-detail', args=[transaction.pk]))
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(PaymentReminder.objects.exists())
+        self.assertFalse(PaymentReceipt.objects.exists())
+        self.assertEqual(rollup.verify(), [])
+
+        response = self.client.delete(reverse('transaction-detail', args=[transaction.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+STATISTICS_TODAY = date(2026, 6, 15)
+
+
+def create_statistics_transactions():
+    """
+    Transactions payées ou en attente de décembre 2025 à juin 2026, à
+    différents jours du mois (jusqu'au 15, aucune après STATISTICS_TODAY)
+    """
+    categories = ['income', 'expense', 'salary', 'scholarship']
+    for index in range(56):
+        day = add_months(date(2025, 12, 1), index % 7) + timedelta(days=(index * 4) % 15)
+        amount = Decimal(100 + index * 7) + Decimal('0.125')
+        Transaction.objects.create(
+            transaction_type='tuition', category=categories[index % 4], amount=amount,
+            paid_amount=amount if index % 3 else Decimal(0), date=day,
+            due_date=STATISTICS_TODAY + timedelta(days=30),
+        )
+
+
+def paid_total(category, **filters):
+    total = Transaction.objects.filter(status='paid', category=category, **filters).aggregate(
+        total=Sum('amount')
+    )['total']
+    return total or Decimal(0)
+
+
+class FinanceStatisticsTest(TestCase):
+    """Chiffres de FinanceStatistics égaux à des Sum sur les transactions"""
+
+    TODAY = STATISTICS_TODAY
+
+    @classmethod
+    def setUpTestData(cls):
+        create_statistics_transactions()
+
+    def paid_total(self, category, **filters):
+        return float(paid_total(category, **filters))
+
+    def assertTotals(self, data, **filters):
+        self.assertEqual(data['total_income'], self.paid_total('income', **filters))
+        self.assertEqual(data['total_expenses'], self.paid_total('expense', **filters))
+        self.assertEqual(data['total_salaries'], self.paid_total('salary', **filters))
+        self.assertEqual(data['total_scholarships'], self.paid_total('scholarship', **filters))
+        self.assertEqual(data['pending_transactions'],
+                         Transaction.objects.filter(status__in=['pending', 'partial'], **filters).count())
+
+    def assertMonthly(self, data, start, end):
+        expected_income, expected_expenses = [], []
+        for month in month_starts(start, end):
+            window = {'date__gte': max(month, start), 'date__lte': min(add_months(month, 1) - timedelta(days=1), end)}
+            expected_income.append((month.strftime('%Y-%m'), self.paid_total('income', **window)))
+            expected_expenses.append((month.strftime('%Y-%m'), self.paid_total('expense', **window)))
+        self.assertEqual([(row['month'], row['amount']) for row in data['monthly_income']], expected_income)
+        self.assertEqual([(row['month'], row['amount']) for row in data['monthly_expenses']], expected_expenses)
+
+    def test_rolling_months(self):
+        data = FinanceStatistics(months=4, today=self.TODAY).compute()
+        # Sans intervalle : totaux sur toutes les transactions, séries sur 4 mois
+        self.assertTotals(data)
+        self.assertMonthly(data, date(2026, 3, 1), self.TODAY)
+        self.assertEqual(data['period'], {'start_date': '2026-03-01', 'end_date': '2026-06-15', 'months': 4})
+
+    def test_explicit_window(self):
+        start, end = date(2026, 1, 10), date(2026, 4, 20)
+        data = FinanceStatistics(start_date=start, end_date=end, today=self.TODAY).compute()
+        self.assertTotals(data, date__range=[start, end])
+        self.assertMonthly(data, start, end)
+        self.assertEqual(data['period'], {'start_date': '2026-01-10', 'end_date': '2026-04-20', 'months': 4})
+
+    def test_start_date_only(self):
+        start = date(2026, 2, 3)
+        data = FinanceStatistics(start_date=start, today=self.TODAY).compute()
+        self.assertTotals(data, date__range=[start, self.TODAY])
+        self.assertMonthly(data, start, self.TODAY)
+
+
+class FinanceRollupTest(TestCase):
+    """Rollup mensuel : mêmes chiffres que la table de base, reconstruction après un UPDATE brut"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_statistics_transactions()
+
+    def test_rollup_path_matches_base_table(self):
+        start, end = date(2026, 1, 1), date(2026, 4, 30)
+        from_rollup = FinanceStatistics(start_date=start, end_date=end, today=STATISTICS_TODAY)
+        from_table = FinanceStatistics(start_date=start, end_date=end, today=STATISTICS_TODAY,
+                                       queryset=Transaction.objects.all())
+        self.assertTrue(from_rollup.use_rollup)
+        self.assertFalse(from_table.use_rollup)
+        self.assertEqual(from_rollup.compute(), from_table.compute())
+
+    def test_period_totals_and_financial_report(self):
+        for start, end in ((date(2026, 1, 1), date(2026, 3, 31)),
+                           (date(2026, 1, 10), date(2026, 4, 20)),
+                           (date(2026, 2, 3), date(2026, 2, 9))):
+            totals = rollup.period_totals(start, end)
+            for category in ('income', 'expense', 'salary', 'scholarship'):
+                self.assertEqual(totals[category], paid_total(category, date__range=[start, end]))
+
+        report = FinancialReport.objects.create(report_type='quarterly', period_start=date(2026, 1, 10),
+                                                period_end=date(2026, 4, 20))
+        window = {'date__range': [report.period_start, report.period_end]}
+        self.assertEqual(report.total_income, paid_total('income', **window))
+        self.assertEqual(report.total_scholarships, paid_total('scholarship', **window))
+        self.assertEqual(report.net_balance, paid_total('income', **window) - paid_total('expense', **window)
+                         - paid_total('salary', **window) - paid_total('scholarship', **window))
+
+    def test_rebuild_after_raw_update(self):
+        self.assertEqual(rollup.verify(), [])
+        # update() ne passe pas par save() : le rollup n'est plus à jour
+        Transaction.objects.filter(category='income').update(amount=F('amount') + 1)
+        self.assertTrue(rollup.verify())
+        with self.assertRaisesMessage(CommandError, 'écart(s) entre le rollup'):
+            call_command('rebuild_finance_rollup', verify_only=True, stdout=StringIO(), stderr=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_finance_rollup', stdout=out)
+        self.assertIn('Rollup conforme aux transactions', out.getvalue())
+        self.assertEqual(rollup.verify(), [])
+        start, end = date(2026, 1, 1), date(2026, 4, 30)
+        self.assertEqual(rollup.period_totals(start, end)['income'],
+                         paid_total('income', date__range=[start, end]))
@@ -6,12 +6,16 @@ from . import views
 router = DefaultRouter()
 router.register(r'transactions', views.TransactionViewSet, basename='transaction')
 router.register(r'budgets', views.BudgetViewSet, basename='budget')
+router.register(r'salaries', views.SalaryViewSet, basename='salary')
 
 # Dans backend/finance/urls.py
 urlpatterns = [
     path('', include(router.urls)),
     path('statistics/', views.finance_statistics, name='finance-statistics'),
     path('export/transactions/', views.export_transactions, name='export-transactions'),
+    path('import/transactions/', views.import_transactions, name='import-transactions'),
+    path('reminders/run/', views.run_payment_reminders, name='payment-reminders-run'),
+    path('payroll/run/', views.run_payroll, name='payroll-run'),
     path('test/transactions/', views.test_transactions, name='test-transactions'),  # <-- AJOUTEZ CETTE LIGNE
 ]
 # Les URLs générées seront :
@@ -5,21 +5,27 @@ from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Count, Q
-from datetime import datetime, date, timedelta
-import calendar
-import traceback
-from django.http import HttpResponse
+from datetime import datetime, date
 import csv
+import logging
+import traceback
 from decimal import Decimal
-from django.db import connection
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction as db_transaction
 # Import correct des modèles et serializers
-from .models import Transaction, Budget, Salary, FinancialReport
+from .models import Transaction, Budget, Salary, PaymentReminder, overdue_status
 from .serializers import (
-    TransactionSerializer, TransactionCreateSerializer,
-    BudgetSerializer, SalarySerializer, FinancialReportSerializer,
-    FinanceStatisticsSerializer
+    TransactionSerializer, TransactionCreateSerializer, TRANSACTION_LIST_ROWS,
+    BudgetSerializer, SalarySerializer
 )
+from .statistics import CACHE_ENDPOINT, CACHE_MODELS, FinanceStatistics
+from . import budget_ledger, reminders
+from .bulk import TransactionImporter, read_csv_rows
+from .payroll import PayrollRun
+from university_management.csv_export import streaming_csv_response, QUERY_CHUNK_SIZE
+from university_management.stats_cache import cached_statistics
+
+logger = logging.getLogger(__name__)
 
 # backend/finance/views.py - TRANSACTION VIEWSET CORRIGÉ
 
@@ -50,14 +56,19 @@ class TransactionViewSet(viewsets.ModelViewSet):
         
         is_overdue = self.request.query_params.get('is_overdue')
         if is_overdue == 'true':
-            from datetime import date
-            queryset = queryset.filter(
-                due_date__lt=date.today(),
-                status__in=['pending', 'partial']
-            )
+            # Statut posé par save() et par le balayage quotidien (overdue.py)
+            queryset = queryset.filter(overdue_status())
         
         return queryset.order_by('-date')
     
+    def list(self, request, *args, **kwargs):
+        """Liste lue avec .values() : mêmes champs que TransactionSerializer, sans ses champs DRF"""
+        queryset = TRANSACTION_LIST_ROWS.queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(TRANSACTION_LIST_ROWS.rows(page))
+        return Response(TRANSACTION_LIST_ROWS.rows(queryset))
+    
     def retrieve(self, request, *args, **kwargs):
         """Récupérer une transaction spécifique - VERSION DEBUG"""
         try:
@@ -83,31 +94,17 @@ class TransactionViewSet(viewsets.ModelViewSet):
             transaction_id = kwargs.get('pk')
             print(f"🗑️ Suppression de la transaction {transaction_id}")
         
-        # SUPPRESSION DIRECTE SANS CONTRAINTES
-            with connection.cursor() as cursor:
-            # D'abord, essayer de supprimer les PaymentReminder liés (sans vérifier si la table existe)
-                try:
-                    cursor.execute(
-                        "DELETE FROM finance_paymentreminder WHERE transaction_id = %s",
-                        [transaction_id]
-                    )
-                    print(f"✅ Rappels liés supprimés: {cursor.rowcount}")
-                except Exception as e:
-                # Si la table n'existe pas, continuer
-                    if 'no such table' in str(e):
-                        print("ℹ️ Table paymentreminder n'existe pas - ignorée")
-                    else:
-                        print(f"⚠️ Erreur suppression rappels: {e}")
-            
-            # Supprimer la transaction
-                cursor.execute(
-                    "DELETE FROM finance_transaction WHERE id = %s",
-                    [transaction_id]
-                )
-            
-                deleted_count = cursor.rowcount
-            
-                if deleted_count == 0:
+            # Rappels liés supprimés avec la transaction ; les erreurs remontent
+            # (sur PostgreSQL, une requête en échec invalide toute la transaction)
+            with db_transaction.atomic():
+                reminders_count, _ = PaymentReminder.objects.filter(transaction_id=transaction_id).delete()
+                print(f"✅ Rappels liés supprimés: {reminders_count}")
+                
+                # Reçus en cascade, salaire délié ; le signal post_delete retire la
+                # transaction du rollup mensuel et invalide les statistiques
+                _, deleted = Transaction.objects.filter(pk=transaction_id).delete()
+                
+                if not deleted.get(Transaction._meta.label, 0):
                     return Response({
                         'success': False,
                         'error': 'Transaction non trouvée'
@@ -273,134 +270,72 @@ class BudgetViewSet(viewsets.ModelViewSet):
                     'original_error': str(e)
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _ledger(self, request, operation, *args):
+        """Opération de budget_ledger.py : 409 si le budget ne la permet pas"""
+        budget = self.get_object()
+        try:
+            applied = operation(budget, request.data.get('amount'), *args)
+        except (ArithmeticError, TypeError, ValueError) as e:
+            return Response({
+                'success': False,
+                'error': 'Montant invalide',
+                'detail': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        budget.refresh_from_db()
+        if not applied:
+            return Response({
+                'success': False,
+                'error': 'Opération refusée : budget inactif ou montant disponible insuffisant',
+                'data': self.get_serializer(budget).data
+            }, status=status.HTTP_409_CONFLICT)
+        return Response({'success': True, 'data': self.get_serializer(budget).data})
+
+    @action(detail=True, methods=['post'])
+    def commit(self, request, pk=None):
+        """Engager ``amount`` sur le disponible du budget"""
+        return self._ledger(request, budget_ledger.commit)
+
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        """Libérer ``amount`` d'engagement"""
+        return self._ledger(request, budget_ledger.release)
+
+    @action(detail=True, methods=['post'])
+    def spend(self, request, pk=None):
+        """Dépenser ``amount`` (``from_commitment`` : consomme l'engagement, par défaut)"""
+        from_commitment = str(request.data.get('from_commitment', 'true')).lower() not in ('0', 'false', 'no')
+        return self._ledger(request, budget_ledger.spend, from_commitment)
+
+class SalaryViewSet(viewsets.ReadOnlyModelViewSet):
+    """Salaires des enseignants (créés par la paie mensuelle, voir payroll.py)"""
+    queryset = Salary.objects.select_related('teacher__user').order_by('-year', '-month', 'teacher_id')
+    serializer_class = SalarySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['teacher', 'month', 'year', 'status']
+    ordering_fields = ['year', 'month', 'net_salary']
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_statistics(CACHE_ENDPOINT, models=CACHE_MODELS)
 def finance_statistics(request):
-    """Statistiques financières complètes"""
+    """
+    Statistiques financières complètes
+
+    Paramètres optionnels : ``months`` (fenêtre glissante, 6 par défaut) ou
+    ``start_date`` / ``end_date`` (AAAA-MM-JJ) pour une période explicite.
+    """
     try:
-        today = date.today()
-        current_year = today.year
-        
-        # Transactions
-        transactions = Transaction.objects.all()
-        
-        # Revenus (catégorie income)
-        total_income = transactions.filter(
-            category='income',
-            status='paid'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Dépenses (catégorie expense)
-        total_expenses = transactions.filter(
-            category='expense',
-            status='paid'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Salaires
-        total_salaries = transactions.filter(
-            category='salary',
-            status='paid'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Bourses
-        total_scholarships = transactions.filter(
-            category='scholarship',
-            status='paid'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # En attente
-        pending_transactions = transactions.filter(status__in=['pending', 'partial'])
-        pending_count = pending_transactions.count()
-        pending_amount = pending_transactions.aggregate(total=Sum('amount'))['total'] or 0
-        
-        # En retard
-        overdue_transactions = transactions.filter(
-            due_date__lt=today,
-            status__in=['pending', 'partial']
-        )
-        overdue_count = overdue_transactions.count()
-        overdue_amount = overdue_transactions.aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Répartition par type de transaction
-        transaction_distribution = []
-        try:
-            transaction_distribution = list(transactions.filter(
-                status='paid'
-            ).values('transaction_type').annotate(
-                total=Sum('amount'),
-                count=Count('id')
-            ).order_by('-total'))
-        except Exception as e:
-            print(f"⚠️ Erreur distribution: {e}")
-        
-        # Revenus mensuels (6 derniers mois)
-        monthly_income = []
-        monthly_expenses = []
-        for i in range(5, -1, -1):
-            month_date = today.replace(day=1) - timedelta(days=30*i)
-            month_start = month_date.replace(day=1)
-            month_end = (month_date.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            month_income = transactions.filter(
-                category='income',
-                status='paid',
-                date__range=[month_start, month_end]
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            month_expenses = transactions.filter(
-                category='expense',
-                status='paid',
-                date__range=[month_start, month_end]
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            monthly_income.append({
-                'month': month_date.strftime('%Y-%m'),
-                'month_name': month_date.strftime('%B %Y'),
-                'amount': float(month_income)
-            })
-            
-            monthly_expenses.append({
-                'month': month_date.strftime('%Y-%m'),
-                'month_name': month_date.strftime('%B %Y'),
-                'amount': float(month_expenses)
-            })
-        
-        # Utilisation des budgets
-        budget_utilization = []
-        try:
-            budgets = Budget.objects.filter(year=current_year, is_active=True)
-            for budget in budgets:
-                budget_utilization.append({
-                    'department': budget.department,
-                    'department_display': budget.get_department_display(),
-                    'type': budget.budget_type,
-                    'type_display': budget.get_budget_type_display(),
-                    'allocated': float(budget.allocated_amount),
-                    'spent': float(budget.spent_amount),
-                    'committed': float(budget.committed_amount),
-                    'remaining': float(budget.remaining_amount),
-                    'utilization': budget.utilization_percentage,
-                })
-        except Exception as e:
-            print(f"⚠️ Erreur budgets: {e}")
-        
-        data = {
-            'total_income': float(total_income),
-            'total_expenses': float(total_expenses),
-            'total_salaries': float(total_salaries),
-            'total_scholarships': float(total_scholarships),
-            'net_balance': float(total_income - total_expenses - total_salaries - total_scholarships),
-            'pending_transactions': pending_count,
-            'overdue_transactions': overdue_count,
-            'pending_amount': float(pending_amount),
-            'overdue_amount': float(overdue_amount),
-            'monthly_income': monthly_income,
-            'monthly_expenses': monthly_expenses,
-            'transaction_distribution': transaction_distribution,
-            'budget_utilization': budget_utilization,
-        }
-        
-        return Response({'success': True, 'data': data})
+        engine = FinanceStatistics.from_params(request.query_params)
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': 'Paramètres invalides',
+            'detail': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        return Response({'success': True, 'data': engine.compute()})
         
     except Exception as e:
         print(f"❌ Erreur calcul statistiques: {str(e)}")
@@ -411,57 +346,185 @@ def finance_statistics(request):
             'detail': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _transaction_person(transaction):
+    if transaction.student_id:
+        try:
+            return f"{transaction.student.user.first_name} {transaction.student.user.last_name}"
+        except Exception:
+            return f"Étudiant {transaction.student_id}"
+    if transaction.teacher_id:
+        try:
+            return f"{transaction.teacher.user.first_name} {transaction.teacher.user.last_name}"
+        except Exception:
+            return f"Enseignant {transaction.teacher_id}"
+    return ''
+
+
+def _transaction_csv_rows(transactions):
+    for transaction in transactions:
+        yield [
+            transaction.transaction_number or '',
+            transaction.date.strftime('%d/%m/%Y') if transaction.date else '',
+            transaction.get_transaction_type_display(),
+            transaction.get_category_display() if transaction.category else '',
+            _transaction_person(transaction),
+            str(transaction.amount) if transaction.amount else '0',
+            str(transaction.paid_amount) if transaction.paid_amount else '0',
+            str(transaction.remaining_amount),
+            transaction.due_date.strftime('%d/%m/%Y') if transaction.due_date else '',
+            transaction.get_status_display(),
+            transaction.get_method_display() if transaction.method else '',
+            transaction.description or ''
+        ]
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def export_transactions(request):
-    """Exporter les transactions en CSV"""
+    """
+    Exporter les transactions en CSV (streaming)
+
+    Accepte les mêmes filtres que la liste des transactions (student, teacher,
+    is_overdue, transaction_type, category, status, method, search, ordering).
+    """
     try:
-        # Créer la réponse HTTP
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="transactions.csv"'
+        # Réutiliser le filtrage du ViewSet pour garantir le même résultat que la liste
+        view = TransactionViewSet(request=request, format_kwarg=None, action='list')
+        transactions = view.filter_queryset(view.get_queryset())
         
-        writer = csv.writer(response)
-        writer.writerow([
+        return streaming_csv_response('transactions.csv', [
             'Numéro', 'Date', 'Type', 'Catégorie', 'Étudiant/Enseignant',
             'Montant total', 'Montant payé', 'Reste à payer',
             'Date échéance', 'Statut', 'Mode paiement', 'Description'
-        ])
-        
-        transactions = Transaction.objects.all()
-        
-        for transaction in transactions:
-            if transaction.student:
-                try:
-                    person = f"{transaction.student.user.first_name} {transaction.student.user.last_name}"
-                except:
-                    person = f"Étudiant {transaction.student_id}"
-            elif transaction.teacher:
-                try:
-                    person = f"{transaction.teacher.user.first_name} {transaction.teacher.user.last_name}"
-                except:
-                    person = f"Enseignant {transaction.teacher_id}"
-            else:
-                person = ''
-            
-            writer.writerow([
-                transaction.transaction_number or '',
-                transaction.date.strftime('%d/%m/%Y') if transaction.date else '',
-                transaction.get_transaction_type_display(),
-                transaction.get_category_display() if transaction.category else '',
-                person,
-                str(transaction.amount) if transaction.amount else '0',
-                str(transaction.paid_amount) if transaction.paid_amount else '0',
-                str(transaction.remaining_amount),
-                transaction.due_date.strftime('%d/%m/%Y') if transaction.due_date else '',
-                transaction.get_status_display(),
-                transaction.get_method_display() if transaction.method else '',
-                transaction.description or ''
-            ])
-        
-        return response
+        ], _transaction_csv_rows(transactions.iterator(chunk_size=QUERY_CHUNK_SIZE)))
         
     except Exception as e:
         return Response({
             'success': False,
             'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def run_payment_reminders(request):
+    """
+    Générer et envoyer les rappels de paiement dus (voir reminders.py)
+
+    Paramètre optionnel ``date`` (AAAA-MM-JJ, aujourd'hui par défaut).
+    Relancé le même jour, ne crée ni n'envoie rien de plus.
+    """
+    today = None
+    if request.data.get('date'):
+        try:
+            today = datetime.strptime(request.data['date'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return Response({
+                'success': False,
+                'error': 'Paramètres invalides',
+                'detail': 'date doit être au format AAAA-MM-JJ'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        return Response({'success': True, 'data': reminders.run(today)})
+    except Exception:
+        logger.exception("Erreur lors de l'envoi des rappels")
+        return Response({
+            'success': False,
+            'error': "Erreur lors de l'envoi des rappels"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def run_payroll(request):
+    """
+    Paie mensuelle des enseignants actifs (voir payroll.py)
+
+    Paramètres ``month`` et ``year`` (mois en cours par défaut) ;
+    ``dry_run`` : rapport sans écriture. Relancée pour un mois déjà payé,
+    ne complète que les salaires et transactions manquants.
+    """
+    today = date.today()
+    try:
+        month = int(request.data.get('month') or today.month)
+        year = int(request.data.get('year') or today.year)
+        payroll = PayrollRun(
+            year, month, dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        )
+    except (TypeError, ValueError) as e:
+        return Response({
+            'success': False,
+            'error': 'Paramètres invalides',
+            'detail': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except ImproperlyConfigured as e:
+        return Response({
+            'success': False,
+            'error': 'Paie non configurée',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    try:
+        return Response({'success': True, 'data': payroll.run().summary()})
+    except ImproperlyConfigured as e:
+        return Response({
+            'success': False,
+            'error': 'Paie non configurée',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except IntegrityError as e:
+        # Paie du même mois lancée en même temps
+        return Response({
+            'success': False,
+            'error': 'Paie déjà en cours pour ce mois',
+            'detail': str(e)
+        }, status=status.HTTP_409_CONFLICT)
+    except Exception:
+        logger.exception('Erreur lors du calcul de la paie')
+        return Response({
+            'success': False,
+            'error': 'Erreur lors du calcul de la paie'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def import_transactions(request):
+    """
+    Import en masse d'un relevé bancaire (voir bulk.py)
+
+    Accepte une liste JSON ``transactions`` ou un fichier CSV ``file``
+    (colonnes invoice_number, receipt_number, amount, paid_amount,
+    transaction_type, category, method, date, due_date, payment_date,
+    student_id, description). ``dry_run`` : rapport sans écriture.
+    """
+    uploaded_file = request.FILES.get('file')
+    if uploaded_file is not None:
+        try:
+            rows = read_csv_rows(uploaded_file)
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response({
+                'success': False,
+                'error': 'Fichier CSV invalide',
+                'detail': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        rows = request.data.get('transactions', [])
+
+    if not isinstance(rows, list):
+        return Response({
+            'success': False,
+            'error': 'Le champ transactions doit être une liste'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    try:
+        importer = TransactionImporter(rows, dry_run=dry_run).run()
+        return Response({'success': True, 'data': importer.summary()})
+    except Exception:
+        logger.exception("Erreur lors de l'import des transactions")
+        return Response({
+            'success': False,
+            'error': "Erreur lors de l'import des transactions"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,289 @@
+# backend/grades/analytics.py
+"""
+Statistiques des notes.
+
+La distribution par catégorie, le taux de réussite, la moyenne, les
+percentiles et l'histogramme sont tous dérivés d'une seule requête groupée
+``values('grade_category', 'score').annotate(Count)`` : la table de
+fréquences des scores (au plus quelques milliers de lignes, les scores ayant
+deux décimales sur 20) suffit à tout calculer en Python.
+
+Les classements (meilleurs cours / étudiants) ajoutent une requête chacun,
+avec ``select_related`` pour éviter une requête par ligne. Sans filtre de
+département, et pour un semestre précis ou l'ensemble des notes, le
+classement des étudiants lit les sommes de StudentGradeTotals (une ligne par
+étudiant) au lieu d'agréger grades_grade. Les deux classements sont
+indépendants : ``acompute()`` les lance ensemble avec l'ORM asynchrone.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Avg, Count, Q
+
+from students.models import Student
+from courses.models import Course
+from university_management.query_plan import arun, fetch, run
+from .gpa import CUMULATIVE_SEMESTER, CUMULATIVE_YEAR, average_expression
+from .models import Grade, StudentGradeTotals
+
+# Entrées de stats_cache (endpoint DRF et tableau de bord asynchrone)
+CACHE_ENDPOINT = 'grade-statistics'
+CACHE_MODELS = (Grade, Course, Student)
+
+PASSING_SCORE = Decimal('10')
+MAX_SCORE = 20
+BUCKET_WIDTH = Decimal('0.5')
+PERCENTILES = (10, 25, 50, 75, 90)
+DEFAULT_TOP = 5
+MAX_TOP = 50
+CATEGORIES = ('excellent', 'good', 'average', 'fail')
+
+
+class GradeAnalytics:
+    """
+    Statistiques des notes, filtrables par ``academic_year``, ``semester``
+    et ``department`` (département du cours).
+    """
+
+    def __init__(self, academic_year=None, semester=None, department=None, top=DEFAULT_TOP):
+        self.academic_year = academic_year
+        self.semester = semester
+        self.department = department
+        self.top = top
+
+    @classmethod
+    def from_params(cls, params):
+        """Construire depuis les paramètres GET (academic_year, semester, department, top)"""
+        academic_year = params.get('academic_year')
+        if academic_year:
+            try:
+                academic_year = int(academic_year)
+            except ValueError:
+                raise ValueError("L'année académique doit être un nombre")
+        else:
+            academic_year = None
+
+        top = params.get('top')
+        if top:
+            try:
+                top = int(top)
+            except ValueError:
+                raise ValueError("Le paramètre 'top' doit être un nombre")
+            if not 1 <= top <= MAX_TOP:
+                raise ValueError(f"Le paramètre 'top' doit être entre 1 et {MAX_TOP}")
+        else:
+            top = DEFAULT_TOP
+
+        semester = params.get('semester')
+        department = params.get('department')
+        return cls(
+            academic_year=academic_year,
+            semester=semester if semester and semester != 'all' else None,
+            department=department if department and department != 'all' else None,
+            top=top,
+        )
+
+    # ------------------------------------------------------------------
+    # Filtres
+    # ------------------------------------------------------------------
+
+    def grade_filter(self, prefix=''):
+        """Filtre des notes, éventuellement à travers une relation (``prefix``)"""
+        conditions = {}
+        if self.academic_year is not None:
+            conditions[f'{prefix}academic_year'] = self.academic_year
+        if self.semester:
+            conditions[f'{prefix}semester'] = self.semester
+        if self.department:
+            conditions[f'{prefix}course__department'] = self.department
+        return Q(**conditions)
+
+    def filters(self):
+        return {
+            'academic_year': self.academic_year,
+            'semester': self.semester,
+            'department': self.department,
+        }
+
+    # ------------------------------------------------------------------
+    # Table de fréquences
+    # ------------------------------------------------------------------
+
+    def frequencies_query(self):
+        return fetch(Grade.objects.filter(self.grade_filter()).values(
+            'grade_category', 'score'
+        ).annotate(count=Count('id')).order_by('score'))
+
+    @staticmethod
+    def frequency_table(rows):
+        """Liste triée de (score, catégorie, effectif)"""
+        return [(row['score'], row['grade_category'], row['count']) for row in rows]
+
+    def frequencies(self):
+        """Liste triée de (score, catégorie, effectif) — une requête"""
+        return self.frequency_table(self.frequencies_query().run())
+
+    @staticmethod
+    def percentile(frequencies, total, p):
+        """Percentile par interpolation linéaire sur la table de fréquences"""
+        rank = (total - 1) * p / 100
+        low_index = int(rank)
+        high_index = min(low_index + 1, total - 1)
+
+        low = high = None
+        seen = 0
+        for score, _, count in frequencies:
+            seen += count
+            if low is None and low_index < seen:
+                low = score
+            if high_index < seen:
+                high = score
+                break
+        value = float(low) + (float(high) - float(low)) * (rank - low_index)
+        return round(value, 2)
+
+    @staticmethod
+    def histogram(frequencies):
+        """Effectifs par tranche de 0,5 point, de 0 à 20 (20 inclus dans la dernière)"""
+        bucket_count = int(MAX_SCORE / BUCKET_WIDTH)
+        counts = [0] * bucket_count
+        for score, _, count in frequencies:
+            index = min(int(score / BUCKET_WIDTH), bucket_count - 1)
+            counts[index] += count
+        return [
+            {
+                'from': float(index * BUCKET_WIDTH),
+                'to': float((index + 1) * BUCKET_WIDTH),
+                'count': counts[index],
+            }
+            for index in range(bucket_count)
+        ]
+
+    # ------------------------------------------------------------------
+    # Classements
+    # ------------------------------------------------------------------
+
+    def top_courses_query(self):
+        grade_filter = self.grade_filter('course_grades__')
+        return fetch(Course.objects.annotate(
+            avg_score=Avg('course_grades__score', filter=grade_filter),
+            grade_count=Count('course_grades', filter=grade_filter)
+        ).filter(grade_count__gt=0).order_by('-avg_score', 'id')[:self.top])
+
+    @staticmethod
+    def course_ranking(courses):
+        return [
+            {
+                'id': course.id,
+                'course_code': course.course_code,
+                'title': course.title,
+                'average_score': round(float(course.avg_score), 2),
+                'total_grades': course.grade_count
+            }
+            for course in courses
+        ]
+
+    def totals_key(self):
+        """Ligne de StudentGradeTotals correspondant aux filtres, ou None"""
+        if self.department:
+            return None
+        if self.academic_year is None and not self.semester:
+            return CUMULATIVE_YEAR, CUMULATIVE_SEMESTER
+        if self.academic_year is not None and self.semester:
+            return self.academic_year, self.semester
+        return None
+
+    def top_courses(self):
+        return self.course_ranking(self.top_courses_query().run())
+
+    def top_students_query(self):
+        """Classement des étudiants : depuis StudentGradeTotals si possible"""
+        key = self.totals_key()
+        if key is not None:
+            academic_year, semester = key
+            return fetch(StudentGradeTotals.objects.select_related('student__user').filter(
+                academic_year=academic_year, semester=semester, grade_count__gt=0
+            ).annotate(avg_score=average_expression()).order_by('-avg_score', 'student_id')[:self.top])
+
+        grade_filter = self.grade_filter('student_grades__')
+        return fetch(Student.objects.select_related('user').annotate(
+            avg_score=Avg('student_grades__score', filter=grade_filter),
+            grade_count=Count('student_grades', filter=grade_filter)
+        ).filter(grade_count__gt=0).order_by('-avg_score', 'id')[:self.top])
+
+    @staticmethod
+    def student_ranking(rows):
+        """Lignes du classement (étudiants annotés ou lignes StudentGradeTotals)"""
+        ranking = []
+        for row in rows:
+            student = row.student if isinstance(row, StudentGradeTotals) else row
+            ranking.append({
+                'id': student.id,
+                'student_id': student.student_id,
+                'name': student.user.get_full_name(),
+                'average_score': round(float(row.avg_score), 2),
+                'total_grades': row.grade_count
+            })
+        return ranking
+
+    def top_students(self):
+        return self.student_ranking(self.top_students_query().run())
+
+    # ------------------------------------------------------------------
+    # Résultat
+    # ------------------------------------------------------------------
+
+    def plan(self):
+        """
+        Plan de ``compute`` (voir query_plan) : la table de fréquences, puis
+        les deux classements ensemble s'il y a des notes
+        """
+        frequencies = self.frequency_table((yield {'frequencies': self.frequencies_query()})['frequencies'])
+        total = sum(count for _, _, count in frequencies)
+
+        distribution = {category: 0 for category in CATEGORIES}
+        passing = 0
+        score_sum = Decimal('0')
+        for score, category, count in frequencies:
+            distribution[category] = distribution.get(category, 0) + count
+            score_sum += score * count
+            if score >= PASSING_SCORE:
+                passing += count
+
+        if total == 0:
+            return {
+                'total_grades': 0,
+                'average_score': 0,
+                'distribution': distribution,
+                'passing_rate': 0,
+                'top_courses': [],
+                'top_students': [],
+                'percentiles': {f'p{p}': None for p in PERCENTILES},
+                'histogram': self.histogram([]),
+                'filters': self.filters(),
+            }
+
+        rankings = yield {
+            'courses': self.top_courses_query(),
+            'students': self.top_students_query(),
+        }
+        return {
+            'total_grades': total,
+            'average_score': round(float(score_sum / total), 2),
+            'distribution': distribution,
+            'passing_rate': round((passing / total) * 100, 2),
+            'top_courses': self.course_ranking(rankings['courses']),
+            'top_students': self.student_ranking(rankings['students']),
+            'percentiles': {
+                f'p{p}': self.percentile(frequencies, total, p) for p in PERCENTILES
+            },
+            'histogram': self.histogram(frequencies),
+            'filters': self.filters(),
+        }
+
+    def compute(self):
+        return run(self.plan())
+
+    async def acompute(self):
+        """``compute`` avec l'ORM asynchrone (voir query_plan)"""
+        return await arun(self.plan())
@@ -0,0 +1,154 @@
+# backend/grades/bulk.py
+"""
+Import de notes en masse, traité par lots plutôt que ligne par ligne.
+
+Pipeline :
+1. validation des champs de chaque ligne en Python (GradeRowSerializer) ;
+2. existence des étudiants et des cours avec un ``in_bulk`` chacun ;
+3. unicité (student, course, semester, academic_year) avec une seule requête ;
+4. calcul de ``grade_category`` en Python ;
+5. écriture avec ``bulk_create`` / ``bulk_update`` dans une seule transaction.
+
+Les erreurs restent rapportées ligne par ligne (index, données, erreurs).
+"""
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from university_management import stats_cache
+from students.models import Student
+from courses.models import Course
+from .models import Grade
+from . import gpa
+from .serializers import GradeRowSerializer
+
+DUPLICATE_MESSAGE = 'Cet étudiant a déjà une note pour ce cours dans ce semestre et cette année académique.'
+
+
+def _does_not_exist(pk):
+    message = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+    return str(message).format(pk_value=pk)
+
+
+class BulkGradeImporter:
+    """
+    Crée (ou met à jour en mode ``upsert``) un lot de notes.
+
+    Sans ``upsert``, une note déjà existante est rejetée comme avant ; avec
+    ``upsert``, son score et son commentaire sont mis à jour.
+    """
+
+    def __init__(self, rows, upsert=False):
+        self.rows = rows
+        self.upsert = upsert
+        self.errors = []
+        self.created = []
+        self.updated = []
+
+    def _error(self, index, data, errors):
+        self.errors.append({'index': index, 'data': data, 'errors': errors})
+
+    def _validate_fields(self):
+        valid = []
+        for index, data in enumerate(self.rows):
+            row = GradeRowSerializer(data=data)
+            if row.is_valid():
+                valid.append((index, data, row.validated_data))
+            else:
+                self._error(index, data, row.errors)
+        return valid
+
+    def _existing_grades(self, valid):
+        """Notes existantes pour les clés du lot, indexées par clé (une requête)"""
+        if not valid:
+            return {}
+        candidates = Grade.objects.filter(
+            student_id__in={row['student'] for _, _, row in valid},
+            course_id__in={row['course'] for _, _, row in valid},
+            semester__in={row['semester'] for _, _, row in valid},
+            academic_year__in={row['academic_year'] for _, _, row in valid},
+        )
+        return {
+            (grade.student_id, grade.course_id, grade.semester, grade.academic_year): grade
+            for grade in candidates
+        }
+
+    def run(self):
+        valid = self._validate_fields()
+
+        students = Student.objects.select_related('user').in_bulk(
+            {row['student'] for _, _, row in valid}
+        )
+        courses = Course.objects.in_bulk({row['course'] for _, _, row in valid})
+
+        resolved = []
+        for index, data, row in valid:
+            errors = {}
+            if row['student'] not in students:
+                errors['student'] = [_does_not_exist(row['student'])]
+            if row['course'] not in courses:
+                errors['course'] = [_does_not_exist(row['course'])]
+            if errors:
+                self._error(index, data, errors)
+            else:
+                resolved.append((index, data, row))
+
+        existing = self._existing_grades(resolved)
+        now = timezone.now()
+        seen = set()
+        to_create = []
+        to_update = []
+
+        for index, data, row in resolved:
+            key = (row['student'], row['course'], row['semester'], row['academic_year'])
+            if key in seen:
+                self._error(index, data, {'non_field_errors': [DUPLICATE_MESSAGE]})
+                continue
+            seen.add(key)
+
+            category = Grade.category_for_score(row['score'])
+            grade = existing.get(key)
+            if grade is not None:
+                if not self.upsert:
+                    self._error(index, data, {'non_field_errors': [DUPLICATE_MESSAGE]})
+                    continue
+                grade.score = row['score']
+                grade.grade_category = category
+                if 'comment' in row:
+                    grade.comment = row['comment']
+                grade.updated_at = now
+                to_update.append(grade)
+            else:
+                to_create.append(Grade(
+                    student_id=row['student'],
+                    course_id=row['course'],
+                    course_code=courses[row['course']].course_code,
+                    score=row['score'],
+                    grade_category=category,
+                    semester=row['semester'],
+                    academic_year=row['academic_year'],
+                    comment=row.get('comment'),
+                ))
+
+        with transaction.atomic():
+            if to_create:
+                Grade.objects.bulk_create(to_create, batch_size=500)
+            if to_update:
+                Grade.objects.bulk_update(
+                    to_update, ['score', 'grade_category', 'comment', 'updated_at'], batch_size=500
+                )
+            if to_create or to_update:
+                # bulk_create / bulk_update n'envoient pas de signaux
+                gpa.rebuild({grade.student_id for grade in to_create + to_update})
+                stats_cache.invalidate(Grade)
+
+        # Rattacher les objets déjà chargés pour sérialiser sans requête supplémentaire
+        for grade in to_create + to_update:
+            grade.student = students[grade.student_id]
+            grade.course = courses[grade.course_id]
+
+        self.created = to_create
+        self.updated = to_update
+        self.errors.sort(key=lambda error: error['index'])
+        return self
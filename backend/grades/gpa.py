@@ -0,0 +1,287 @@
+# backend/grades/gpa.py
+"""
+Moyennes des étudiants maintenues de façon incrémentale (StudentGradeTotals).
+
+Pour chaque étudiant, une ligne par (année, semestre) et une ligne cumulée
+(``academic_year=0``, ``semester='all'``) contiennent les sommes courantes :
+nombre de notes, crédits, somme des scores, somme des scores pondérés par
+``Course.credits``, nombre de notes réussies / en échec.
+
+- ``Grade.save()`` appelle ``record_save`` (ancienne ligne -> nouvelle) ;
+- le signal ``post_delete`` de Grade appelle ``record_delete`` ;
+- les imports en masse appellent ``rebuild(student_ids)`` pour les étudiants
+  touchés ;
+- une modification des crédits d'un cours recalcule ses étudiants.
+
+``Student.gpa`` (échelle sur 4) est recopié depuis la ligne cumulée et les
+relevés en cache des étudiants touchés sont invalidés. Les moyennes se
+lisent alors en O(1). ``expected_totals()`` / ``verify()``
+servent à la commande ``reconcile_gpa``.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, Q, Sum, When
+from django.db.models.functions import Cast, Coalesce
+
+# Moyenne sur 20 convertie sur l'échelle GPA 4.0
+MAX_SCORE = Decimal('20')
+GPA_SCALE = Decimal('4')
+
+CUMULATIVE_YEAR = 0
+CUMULATIVE_SEMESTER = 'all'
+
+KEY_FIELDS = ('student_id', 'academic_year', 'semester')
+TOTAL_FIELDS = (
+    'grade_count', 'credit_total', 'score_total',
+    'weighted_score_total', 'passing_count', 'failing_count',
+)
+
+# Mêmes règles que StudentGradeSummarySerializer
+PASSING_CATEGORIES = ('excellent', 'good')
+FAILING_CATEGORIES = ('fail',)
+
+
+def gpa_from_totals(weighted_score_total, credit_total):
+    """GPA sur 4 à partir des sommes pondérées (0 sans crédits)"""
+    if not credit_total:
+        return Decimal('0.00')
+    average = Decimal(weighted_score_total) / Decimal(credit_total)
+    return (average * GPA_SCALE / MAX_SCORE).quantize(Decimal('0.01'))
+
+
+def snapshot(grade, credits=None):
+    """Champs utiles d'une note (instance), pour un calcul de delta"""
+    if credits is None:
+        credits = grade.course.credits
+    return {
+        'student_id': grade.student_id,
+        'academic_year': grade.academic_year,
+        'semester': grade.semester,
+        'score': grade.score,
+        'grade_category': grade.grade_category,
+        'credits': credits,
+    }
+
+
+def old_snapshot(pk):
+    """État en base d'une note avant modification (une requête), ou None"""
+    from .models import Grade
+
+    row = Grade.objects.filter(pk=pk).values(
+        'student_id', 'academic_year', 'semester', 'score', 'grade_category',
+        'course_id', 'course_code', 'course__credits'
+    ).first()
+    if row is not None:
+        row['credits'] = row.pop('course__credits')
+    return row
+
+
+def new_deltas():
+    return defaultdict(lambda: dict.fromkeys(TOTAL_FIELDS, 0))
+
+
+def add_row(deltas, row, sign=1):
+    """Ajouter (sign=1) ou retirer (sign=-1) la contribution d'une note"""
+    if row is None:
+        return
+    score = Decimal(row['score'])
+    credits = row['credits'] or 0
+    keys = (
+        (row['student_id'], row['academic_year'], row['semester']),
+        (row['student_id'], CUMULATIVE_YEAR, CUMULATIVE_SEMESTER),
+    )
+    for key in keys:
+        entry = deltas[key]
+        entry['grade_count'] += sign
+        entry['credit_total'] += sign * credits
+        entry['score_total'] += sign * score
+        entry['weighted_score_total'] += sign * score * credits
+        entry['passing_count'] += sign * (row['grade_category'] in PASSING_CATEGORIES)
+        entry['failing_count'] += sign * (row['grade_category'] in FAILING_CATEGORIES)
+
+
+def apply_deltas(deltas, create_missing=True):
+    """
+    Appliquer des deltas {clé: {champ: delta}} avec des UPDATE F(), puis
+    recopier le GPA cumulé des étudiants concernés.
+
+    ``create_missing=False`` pour les suppressions : une ligne absente
+    (étudiant en cours de suppression) n'est pas recréée.
+    """
+    from . import transcript
+    from .models import StudentGradeTotals
+
+    students = set()
+    for key, values in deltas.items():
+        if not any(values.values()):
+            continue
+        students.add(key[0])
+        lookup = dict(zip(KEY_FIELDS, key))
+        changes = {field: F(field) + value for field, value in values.items()}
+        if StudentGradeTotals.objects.filter(**lookup).update(**changes) or not create_missing:
+            continue
+        try:
+            with transaction.atomic():
+                StudentGradeTotals.objects.create(**lookup, **values)
+        except IntegrityError:
+            # Créée entre-temps par une autre requête
+            StudentGradeTotals.objects.filter(**lookup).update(**changes)
+
+    if students:
+        refresh_student_gpa(students)
+        transcript.invalidate(students)
+
+
+def refresh_student_gpa(student_ids=None):
+    """Recopier le GPA des lignes cumulées dans Student.gpa"""
+    from students.models import Student
+    from .models import StudentGradeTotals
+
+    rows = StudentGradeTotals.objects.filter(
+        academic_year=CUMULATIVE_YEAR, semester=CUMULATIVE_SEMESTER
+    )
+    if student_ids is None:
+        student_ids = Student.objects.values_list('id', flat=True)
+    else:
+        rows = rows.filter(student_id__in=list(student_ids))
+    cumulative = {
+        row['student_id']: gpa_from_totals(row['weighted_score_total'], row['credit_total'])
+        for row in rows.values('student_id', 'weighted_score_total', 'credit_total')
+    }
+
+    students = [
+        Student(pk=student_id, gpa=cumulative.get(student_id, Decimal('0.00')))
+        for student_id in student_ids
+    ]
+    if len(students) == 1:
+        Student.objects.filter(pk=students[0].pk).update(gpa=students[0].gpa)
+    elif students:
+        Student.objects.bulk_update(students, ['gpa'], batch_size=500)
+
+
+def record_save(old_row, grade, credits=None):
+    """Mettre à jour les sommes après l'enregistrement d'une note"""
+    deltas = new_deltas()
+    add_row(deltas, old_row, -1)
+    add_row(deltas, snapshot(grade, credits=credits), 1)
+    apply_deltas(deltas)
+
+
+def record_delete(row):
+    """Mettre à jour les sommes après la suppression d'une note"""
+    deltas = new_deltas()
+    add_row(deltas, row, -1)
+    apply_deltas(deltas, create_missing=False)
+
+
+# ----------------------------------------------------------------------
+# Reconstruction et vérification
+# ----------------------------------------------------------------------
+
+def expected_totals(student_ids=None):
+    """Sommes exactes calculées depuis grades_grade (une requête groupée)"""
+    from .models import Grade
+
+    grades = Grade.objects.all()
+    if student_ids is not None:
+        grades = grades.filter(student_id__in=list(student_ids))
+
+    rows = grades.values(*KEY_FIELDS).annotate(
+        grade_count=Count('id'),
+        credit_total=Coalesce(Sum('course__credits'), 0),
+        score_total=Sum('score'),
+        weighted_score_total=Sum(
+            F('score') * F('course__credits'),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+        passing_count=Count('id', filter=Q(grade_category__in=PASSING_CATEGORIES)),
+        failing_count=Count('id', filter=Q(grade_category__in=FAILING_CATEGORIES)),
+    ).order_by()
+
+    totals = new_deltas()
+    for row in rows:
+        keys = (
+            tuple(row[field] for field in KEY_FIELDS),
+            (row['student_id'], CUMULATIVE_YEAR, CUMULATIVE_SEMESTER),
+        )
+        for key in keys:
+            for field in TOTAL_FIELDS:
+                totals[key][field] += Decimal(row[field] or 0) if 'score' in field else row[field]
+    return dict(totals)
+
+
+def rebuild(student_ids=None):
+    """Recalculer les sommes (de tous les étudiants ou de ``student_ids``)"""
+    from . import transcript
+    from .models import StudentGradeTotals
+
+    expected = expected_totals(student_ids)
+    with transaction.atomic():
+        rows = StudentGradeTotals.objects.all()
+        if student_ids is not None:
+            rows = rows.filter(student_id__in=list(student_ids))
+        rows.delete()
+        StudentGradeTotals.objects.bulk_create([
+            StudentGradeTotals(**dict(zip(KEY_FIELDS, key)), **values)
+            for key, values in expected.items()
+        ], batch_size=500)
+        refresh_student_gpa(student_ids)
+        transcript.invalidate(student_ids)
+    return len(expected)
+
+
+def verify():
+    """Comparer les sommes stockées et Student.gpa à grades_grade ; retourne les écarts"""
+    from students.models import Student
+    from .models import StudentGradeTotals
+
+    expected = expected_totals()
+    actual = {
+        tuple(row[field] for field in KEY_FIELDS): {field: row[field] for field in TOTAL_FIELDS}
+        for row in StudentGradeTotals.objects.values(*KEY_FIELDS, *TOTAL_FIELDS)
+    }
+
+    mismatches = []
+    empty = dict.fromkeys(TOTAL_FIELDS, 0)
+    for key in sorted(set(expected) | set(actual), key=str):
+        wanted = expected.get(key, empty)
+        found = actual.get(key, empty)
+        if any(Decimal(wanted[field]) != Decimal(found[field]) for field in TOTAL_FIELDS):
+            mismatches.append({
+                'key': dict(zip(KEY_FIELDS, key)),
+                'expected': wanted,
+                'actual': found,
+            })
+
+    cumulative = {
+        key[0]: values for key, values in expected.items()
+        if key[1:] == (CUMULATIVE_YEAR, CUMULATIVE_SEMESTER)
+    }
+    for student_id, gpa in Student.objects.values_list('id', 'gpa'):
+        values = cumulative.get(student_id, empty)
+        wanted = gpa_from_totals(values['weighted_score_total'], values['credit_total'])
+        if Decimal(gpa) != wanted:
+            mismatches.append({
+                'key': {'student_id': student_id, 'field': 'gpa'},
+                'expected': wanted,
+                'actual': gpa,
+            })
+    return mismatches
+
+
+# ----------------------------------------------------------------------
+# Lecture
+# ----------------------------------------------------------------------
+
+def average_expression(prefix=''):
+    """Moyenne non pondérée (sur 20) d'une ligne de sommes, pour annotate/order_by"""
+    return Case(
+        # Division flottante : SQLite divise en entiers si la somme est entière
+        When(**{f'{prefix}grade_count__gt': 0}, then=(
+            Cast(f'{prefix}score_total', FloatField()) / F(f'{prefix}grade_count')
+        )),
+        default=None,
+    )
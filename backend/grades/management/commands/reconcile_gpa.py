@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from grades import gpa
+
+
+class Command(BaseCommand):
+    help = "Vérifie les moyennes maintenues (StudentGradeTotals, Student.gpa) par rapport aux notes et les recalcule"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help="Recalculer toutes les sommes et les GPA en cas d'écart",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = gpa.verify()
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Moyennes conformes aux notes"))
+            return
+
+        for mismatch in mismatches[:20]:
+            self.stderr.write(
+                f"Écart {mismatch['key']} : attendu {mismatch['expected']}, trouvé {mismatch['actual']}"
+            )
+
+        if not options['fix']:
+            raise CommandError(f"{len(mismatches)} écart(s) entre les moyennes et les notes")
+
+        count = gpa.rebuild()
+        self.stdout.write(f"Moyennes recalculées : {count} lignes")
+        remaining = gpa.verify()
+        if remaining:
+            raise CommandError(f"{len(remaining)} écart(s) après recalcul")
+        self.stdout.write(self.style.SUCCESS("Moyennes conformes aux notes"))
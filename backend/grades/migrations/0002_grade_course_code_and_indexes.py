@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:53
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from university_management.indexes import AddIndexIfMissing
+
+
+def copy_course_codes(apps, schema_editor):
+    Grade = apps.get_model('grades', 'Grade')
+    Course = apps.get_model('courses', 'Course')
+    Grade.objects.update(course_code=Subquery(
+        Course.objects.filter(pk=OuterRef('course_id')).values('course_code')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='grade',
+            options={'ordering': ['-academic_year', 'semester', 'course_code'], 'verbose_name': 'Note', 'verbose_name_plural': 'Notes'},
+        ),
+        migrations.AddField(
+            model_name='grade',
+            name='course_code',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(copy_course_codes, reverse_code=migrations.RunPython.noop),
+        AddIndexIfMissing(
+            model_name='grade',
+            index=models.Index(fields=['-academic_year', 'semester', 'course_code', 'id'], name='grade_order_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='grade',
+            index=models.Index(fields=['student', '-academic_year', 'semester', 'course_code'], name='grade_student_order_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='grade',
+            index=models.Index(fields=['course', '-academic_year', 'semester'], name='grade_course_order_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='grade',
+            index=models.Index(fields=['academic_year', 'semester', 'grade_category'], name='grade_year_sem_cat_idx'),
+        ),
+        AddIndexIfMissing(
+            model_name='grade',
+            index=models.Index(fields=['score', 'grade_category'], name='grade_score_cat_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:57
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+import django.db.models.deletion
+
+TOTAL_FIELDS = (
+    'grade_count', 'credit_total', 'score_total',
+    'weighted_score_total', 'passing_count', 'failing_count',
+)
+
+
+def build_totals(apps, schema_editor):
+    """Initialiser les sommes et Student.gpa depuis les notes existantes"""
+    Grade = apps.get_model('grades', 'Grade')
+    Student = apps.get_model('students', 'Student')
+    StudentGradeTotals = apps.get_model('grades', 'StudentGradeTotals')
+
+    rows = Grade.objects.values('student_id', 'academic_year', 'semester').annotate(
+        grade_count=Count('id'),
+        credit_total=Sum('course__credits'),
+        score_total=Sum('score'),
+        weighted_score_total=Sum(
+            F('score') * F('course__credits'),
+            output_field=models.DecimalField(max_digits=14, decimal_places=2),
+        ),
+        passing_count=Count('id', filter=Q(grade_category__in=['excellent', 'good'])),
+        failing_count=Count('id', filter=Q(grade_category='fail')),
+    ).order_by()
+
+    totals = defaultdict(lambda: dict.fromkeys(TOTAL_FIELDS, 0))
+    for row in rows:
+        for key in ((row['student_id'], row['academic_year'], row['semester']),
+                    (row['student_id'], 0, 'all')):
+            for field in TOTAL_FIELDS:
+                totals[key][field] += Decimal(row[field] or 0) if 'score' in field else (row[field] or 0)
+
+    StudentGradeTotals.objects.bulk_create([
+        StudentGradeTotals(student_id=student_id, academic_year=year, semester=semester, **values)
+        for (student_id, year, semester), values in totals.items()
+    ], batch_size=500)
+
+    # Comme gpa.refresh_student_gpa : 0 pour un étudiant sans note (ni crédit)
+    Student.objects.update(gpa=Decimal('0.00'))
+    students = []
+    for (student_id, year, semester), values in totals.items():
+        if semester == 'all' and values['credit_total']:
+            average = values['weighted_score_total'] / values['credit_total']
+            students.append(Student(pk=student_id, gpa=(average * 4 / 20).quantize(Decimal('0.01'))))
+    Student.objects.bulk_update(students, ['gpa'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_enrollment_enrollment_date_id_idx'),
+        ('students', '0002_student_student_enrolled_id_idx'),
+        ('grades', '0002_grade_course_code_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentGradeTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.IntegerField()),
+                ('semester', models.CharField(max_length=20)),
+                ('grade_count', models.IntegerField(default=0)),
+                ('credit_total', models.IntegerField(default=0)),
+                ('score_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('weighted_score_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('passing_count', models.IntegerField(default=0)),
+                ('failing_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_totals', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Totaux des notes',
+                'verbose_name_plural': 'Totaux des notes',
+                'unique_together': {('student', 'academic_year', 'semester')},
+            },
+        ),
+        migrations.RunPython(build_totals, reverse_code=migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from students.models import Student
 from courses.models import Course
@@ -13,6 +13,9 @@ class Grade(models.Model):
     
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='student_grades')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='course_grades')
+    # Copie de course.course_code (synchronisée par save() et le signal de
+    # Course) : l'ordre par défaut n'a pas besoin de joindre courses_course
+    course_code = models.CharField(max_length=20, blank=True, default='', editable=False)
     score = models.DecimalField(
         max_digits=4, 
         decimal_places=2,
@@ -31,52 +34,142 @@ class Grade(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-academic_year', 'semester', 'course__course_code']
+        ordering = ['-academic_year', 'semester', 'course_code']
         unique_together = ['student', 'course', 'semester', 'academic_year']
+        # Combinaisons de filtres de grade_list, chacune suivie de l'ordre par défaut
+        indexes = [
+            models.Index(fields=['-academic_year', 'semester', 'course_code', 'id'], name='grade_order_idx'),
+            models.Index(fields=['student', '-academic_year', 'semester', 'course_code'], name='grade_student_order_idx'),
+            models.Index(fields=['course', '-academic_year', 'semester'], name='grade_course_order_idx'),
+            models.Index(fields=['academic_year', 'semester', 'grade_category'], name='grade_year_sem_cat_idx'),
+            models.Index(fields=['score', 'grade_category'], name='grade_score_cat_idx'),
+        ]
         verbose_name = 'Note'
         verbose_name_plural = 'Notes'
     
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.course.course_code}: {self.score}/20"
     
-    def save(self, *args, **kwargs):
-        """Déterminer automatiquement la catégorie de note"""
-        score = float(self.score)
+    @staticmethod
+    def category_for_score(score):
+        """Catégorie de note correspondant à un score sur 20"""
+        score = float(score)
         
         if score >= 15:
-            self.grade_category = 'excellent'
+            return 'excellent'
         elif score >= 10:
-            self.grade_category = 'good'
+            return 'good'
         elif score >= 5:
-            self.grade_category = 'average'
+            return 'average'
         else:
-            self.grade_category = 'fail'
+            return 'fail'
+    
+    def save(self, *args, **kwargs):
+        """Déterminer automatiquement la catégorie de note et le code du cours"""
+        self.grade_category = self.category_for_score(self.score)
+        
+        from . import gpa
+        
+        with db_transaction.atomic():
+            # État précédent en base, pour la mise à jour incrémentale des moyennes
+            old_row = None
+            if not self._state.adding and self.pk is not None:
+                old_row = gpa.old_snapshot(self.pk)
+            
+            credits = None
+            if old_row is not None and old_row['course_id'] == self.course_id and old_row['course_code']:
+                # Même cours : code (tenu à jour par le signal de Course) et
+                # crédits lus avec l'état précédent, sans charger le cours
+                self.course_code = old_row['course_code']
+                credits = old_row['credits']
+            elif self.course_id:
+                self.course_code = self.course.course_code
+            
+            super().save(*args, **kwargs)
+            gpa.record_save(old_row, self, credits=credits)
+    
+    # Seuils des lettres (note minimale sur 20), du plus haut au plus bas ; 'F' en dessous
+    LETTER_THRESHOLDS = [
+        (18, 'A+'),
+        (16, 'A'),
+        (14, 'B'),
+        (12, 'C+'),
+        (10, 'C'),
+        (8, 'D+'),
+        (5, 'D'),
+    ]
+    
+    @classmethod
+    def letter_for_score(cls, score):
+        """Lettre correspondant à un score sur 20"""
+        score = float(score)
         
-        super().save(*args, **kwargs)
+        for minimum, letter in cls.LETTER_THRESHOLDS:
+            if score >= minimum:
+                return letter
+        return 'F'
+    
+    @classmethod
+    def letter_expression(cls, field='score'):
+        """Équivalent SQL de ``letter_for_score`` (annotation de liste)"""
+        return models.Case(
+            *[models.When(**{f'{field}__gte': minimum}, then=models.Value(letter))
+              for minimum, letter in cls.LETTER_THRESHOLDS],
+            default=models.Value('F'),
+            output_field=models.CharField()
+        )
     
     @property
     def letter_grade(self):
         """Convertir la note numérique en lettre"""
-        score = float(self.score)
-        
-        if score >= 18:
-            return 'A+'
-        elif score >= 16:
-            return 'A'
-        elif score >= 14:
-            return 'B'
-        elif score >= 12:
-            return 'C+'
-        elif score >= 10:
-            return 'C'
-        elif score >= 8:
-            return 'D+'
-        elif score >= 5:
-            return 'D'
-        else:
-            return 'F'
+        return self.letter_for_score(self.score)
     
     @property
     def is_passing(self):
         """Vérifier si la note est une réussite"""
-        return float(self.score) >= 10
\ No newline at end of file
+        return float(self.score) >= 10
+
+
+class StudentGradeTotals(models.Model):
+    """
+    Sommes courantes des notes d'un étudiant, par semestre et cumulées
+    (academic_year=0, semester='all'), maintenues par grades/gpa.py
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='grade_totals')
+    academic_year = models.IntegerField()
+    semester = models.CharField(max_length=20)
+    grade_count = models.IntegerField(default=0)
+    credit_total = models.IntegerField(default=0)
+    score_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    weighted_score_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    passing_count = models.IntegerField(default=0)
+    failing_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['student', 'academic_year', 'semester']
+        verbose_name = 'Totaux des notes'
+        verbose_name_plural = 'Totaux des notes'
+    
+    def __str__(self):
+        return f"{self.student_id} - {self.semester} {self.academic_year}: {self.grade_count} notes"
+    
+    @property
+    def average_score(self):
+        """Moyenne non pondérée sur 20"""
+        if not self.grade_count:
+            return 0
+        return round(float(self.score_total) / self.grade_count, 2)
+    
+    @property
+    def weighted_average(self):
+        """Moyenne pondérée par les crédits, sur 20"""
+        if not self.credit_total:
+            return 0
+        return round(float(self.weighted_score_total) / self.credit_total, 2)
+    
+    @property
+    def gpa(self):
+        """Moyenne pondérée sur l'échelle 4.0"""
+        from .gpa import gpa_from_totals
+        return float(gpa_from_totals(self.weighted_score_total, self.credit_total))
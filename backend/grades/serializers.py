@@ -1,7 +1,10 @@
+from django.db.models import BooleanField, Case, F, Value, When
+from django.db.models.functions import Concat
 from rest_framework import serializers
-from .models import Grade
+from .models import Grade, StudentGradeTotals
 from students.models import Student
 from courses.models import Course
+from university_management.list_rows import ListRows, as_text, datetime_string, decimal_string
 
 class GradeSerializer(serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
@@ -139,37 +142,79 @@ class GradeSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+# Lecture rapide de grade_list : mêmes clés et mêmes formats que GradeSerializer,
+# calculés par la base et lus avec .values()
+GRADE_LIST_ROWS = ListRows(
+    columns=[
+        ('id', 'id', None),
+        ('student_name', 'row_student_name', None),
+        ('student_id', 'student__student_id', None),
+        ('course_name', 'course__title', None),
+        ('course_code', 'course__course_code', None),
+        ('score', 'score', decimal_string(Grade._meta.get_field('score'))),
+        ('grade_category', 'grade_category', None),
+        ('letter_grade', 'row_letter_grade', None),
+        ('is_passing', 'row_is_passing', None),
+        ('semester', 'semester', None),
+        ('academic_year', 'academic_year', None),
+        ('comment', 'comment', None),
+        ('created_at', 'row_created_at', datetime_string),
+        ('updated_at', 'row_updated_at', datetime_string),
+    ],
+    annotations={
+        'row_student_name': Concat(
+            F('student__user__first_name'), Value(' '), F('student__user__last_name')
+        ),
+        'row_letter_grade': Grade.letter_expression(),
+        'row_is_passing': Case(
+            When(score__gte=10, then=Value(True)), default=Value(False), output_field=BooleanField()
+        ),
+        'row_created_at': as_text('created_at'),
+        'row_updated_at': as_text('updated_at'),
+    },
+    # Clé de l'ordre par défaut (pagination par curseur)
+    extra=['course_code'],
+)
+
+
 class StudentGradeSummarySerializer(serializers.ModelSerializer):
-    """Serializer pour le résumé des notes d'un étudiant"""
-    grades_count = serializers.SerializerMethodField()
-    average_score = serializers.SerializerMethodField()
-    passing_courses = serializers.SerializerMethodField()
-    failing_courses = serializers.SerializerMethodField()
+    """Serializer pour le résumé des notes d'un étudiant (ligne cumulée de StudentGradeTotals)"""
+    id = serializers.IntegerField(source='student.id', read_only=True)
+    student_id = serializers.CharField(source='student.student_id', read_only=True)
+    user_first_name = serializers.CharField(source='student.user.first_name', read_only=True)
+    user_last_name = serializers.CharField(source='student.user.last_name', read_only=True)
+    grades_count = serializers.IntegerField(source='grade_count', read_only=True)
+    average_score = serializers.FloatField(read_only=True)
+    weighted_average = serializers.FloatField(read_only=True)
+    gpa = serializers.FloatField(read_only=True)
+    passing_courses = serializers.IntegerField(source='passing_count', read_only=True)
+    failing_courses = serializers.IntegerField(source='failing_count', read_only=True)
     
     class Meta:
-        model = Student
+        model = StudentGradeTotals
         fields = [
             'id', 'student_id', 
             'user_first_name', 'user_last_name',
             'grades_count', 'average_score',
+            'weighted_average', 'gpa',
             'passing_courses', 'failing_courses'
         ]
+
+
+class GradeRowSerializer(serializers.Serializer):
+    """Validation d'une ligne d'import en masse, sans accès à la base"""
+    student = serializers.IntegerField()
+    course = serializers.IntegerField()
+    score = serializers.DecimalField(max_digits=4, decimal_places=2)
+    semester = serializers.ChoiceField(choices=Grade._meta.get_field('semester').choices)
+    academic_year = serializers.IntegerField()
+    comment = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     
-    def get_grades_count(self, obj):
-        return obj.student_grades.count()
-    
-    def get_average_score(self, obj):
-        grades = obj.student_grades.all()
-        if grades:
-            total = sum(float(grade.score) for grade in grades)
-            return round(total / len(grades), 2)
-        return 0
-    
-    def get_passing_courses(self, obj):
-        return obj.student_grades.filter(grade_category__in=['excellent', 'good']).count()
-    
-    def get_failing_courses(self, obj):
-        return obj.student_grades.filter(grade_category='fail').count()
+    def validate_score(self, value):
+        """Valider que la note est entre 0 et 20"""
+        if value < 0 or value > 20:
+            raise serializers.ValidationError("La note doit être entre 0 et 20")
+        return value
 
 
 class BulkGradeCreateSerializer(serializers.Serializer):
@@ -178,6 +223,7 @@ class BulkGradeCreateSerializer(serializers.Serializer):
         child=serializers.DictField(),
         min_length=1
     )
+    upsert = serializers.BooleanField(required=False, default=False)
     
     def validate_grades(self, value):
         for grade_data in value:
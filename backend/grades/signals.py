@@ -0,0 +1,86 @@
+# backend/grades/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from university_management import stats_cache
+from accounts.models import User
+from courses.models import Course
+from students.models import Student
+from .models import Grade
+from . import gpa, transcript
+
+
+@receiver(post_delete, sender=Grade)
+def grade_deleted(sender, instance, **kwargs):
+    """Retirer la note supprimée des moyennes de l'étudiant"""
+    credits = Course.objects.filter(pk=instance.course_id).values_list('credits', flat=True).first()
+    gpa.record_delete(gpa.snapshot(instance, credits=credits or 0))
+
+
+@receiver([post_save, post_delete], sender=Grade)
+def grade_changed(sender, instance, **kwargs):
+    """Invalider les statistiques et le relevé en cache qui dépendent de la note"""
+    stats_cache.invalidate(sender)
+    # Les moyennes peuvent être inchangées (changement de cours à crédits égaux)
+    transcript.invalidate([instance.student_id])
+
+
+@receiver(pre_save, sender=Course)
+def remember_course_credits(sender, instance, **kwargs):
+    """Conserver les crédits et l'intitulé en base avant modification d'un cours"""
+    instance._previous_credits = instance._previous_title = None
+    if instance.pk is not None:
+        previous = Course.objects.filter(pk=instance.pk).values_list('credits', 'title').first()
+        if previous is not None:
+            instance._previous_credits, instance._previous_title = previous
+
+
+@receiver(post_save, sender=Course)
+def course_changed_for_grades(sender, instance, created, **kwargs):
+    """
+    Recopier le code du cours sur ses notes (colonne dénormalisée),
+    recalculer les moyennes pondérées si les crédits ont changé et invalider
+    les relevés qui affichent le cours
+    """
+    if created:
+        return
+    updated = Grade.objects.filter(course=instance).exclude(
+        course_code=instance.course_code
+    ).update(course_code=instance.course_code)
+    if updated:
+        stats_cache.invalidate(Grade)
+
+    previous_credits = getattr(instance, '_previous_credits', None)
+    credits_changed = previous_credits is not None and previous_credits != instance.credits
+    title_changed = getattr(instance, '_previous_title', None) not in (None, instance.title)
+    if credits_changed or title_changed or updated:
+        student_ids = set(Grade.objects.filter(course=instance).values_list('student_id', flat=True))
+        if credits_changed and student_ids:
+            # Invalide aussi les relevés des étudiants recalculés
+            gpa.rebuild(student_ids)
+        else:
+            transcript.invalidate(student_ids)
+
+
+@receiver(post_save, sender=Student)
+def student_changed_for_transcript(sender, instance, created, **kwargs):
+    """Le relevé reprend le département et l'année de l'étudiant"""
+    if not created:
+        transcript.invalidate([instance.pk])
+
+
+@receiver(pre_save, sender=User)
+def remember_user_name(sender, instance, update_fields=None, **kwargs):
+    """Conserver le nom en base avant modification d'un utilisateur"""
+    instance._previous_name = None
+    # Connexion (update_fields=['last_login']) : nom inchangé, pas de requête
+    if instance.pk is not None and (update_fields is None or {'first_name', 'last_name'} & set(update_fields)):
+        instance._previous_name = User.objects.filter(pk=instance.pk).values_list('first_name', 'last_name').first()
+
+
+@receiver(post_save, sender=User)
+def user_changed_for_transcript(sender, instance, created, **kwargs):
+    """Le relevé reprend le nom de l'étudiant"""
+    previous_name = getattr(instance, '_previous_name', None)
+    if not created and previous_name not in (None, (instance.first_name, instance.last_name)):
+        transcript.invalidate(Student.objects.filter(user=instance).values_list('id', flat=True))
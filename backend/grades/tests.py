@@ -1,3 +1,579 @@
-from django.test import TestCase
+import io
+import zipfile
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from tempfile import TemporaryDirectory
 
-# Create your tests here.
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from students.models import Student
+from university_management.pagination import KeysetPaginator
+from . import bulk, gpa, transcript
+from .analytics import GradeAnalytics
+from .models import Grade, StudentGradeTotals
+from .serializers import GRADE_LIST_ROWS, GradeSerializer
+
+
+class IncrementalGpaTest(TestCase):
+    """Les sommes maintenues doivent rester égales au recalcul complet"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='etu', first_name='Paul', last_name='Durand')
+        cls.student = Student.objects.create(
+            user=user, student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='informatique'
+        )
+        cls.math, cls.info = Course.objects.bulk_create([
+            Course(course_code=code, title=code, description='', credits=credits,
+                   department='informatique', semester='fall', academic_year=2025)
+            for code, credits in (('MATH101', 4), ('INFO101', 2))
+        ])
+
+    def cumulative(self):
+        return StudentGradeTotals.objects.get(
+            student=self.student, academic_year=gpa.CUMULATIVE_YEAR, semester=gpa.CUMULATIVE_SEMESTER
+        )
+
+    def test_create_update_delete_keep_totals_in_sync(self):
+        math = Grade.objects.create(student=self.student, course=self.math, score=16,
+                                    semester='fall', academic_year=2025)
+        Grade.objects.create(student=self.student, course=self.info, score=10,
+                             semester='spring', academic_year=2025)
+        self.assertEqual(gpa.verify(), [])
+        # (16 * 4 + 10 * 2) / 6 = 14 sur 20, soit 2.80 sur 4
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.gpa, Decimal('2.80'))
+
+        math.score = 4
+        math.semester = 'spring'
+        math.save()
+        self.assertEqual(gpa.verify(), [])
+        self.assertEqual(self.cumulative().failing_count, 1)
+
+        math.delete()
+        self.assertEqual(gpa.verify(), [])
+        self.assertEqual(self.cumulative().grade_count, 1)
+
+    def test_course_credits_change_recomputes_students(self):
+        Grade.objects.create(student=self.student, course=self.math, score=16,
+                             semester='fall', academic_year=2025)
+        Grade.objects.create(student=self.student, course=self.info, score=10,
+                             semester='fall', academic_year=2025)
+
+        self.info.credits = 4
+        self.info.save()
+
+        self.assertEqual(gpa.verify(), [])
+        self.assertEqual(self.cumulative().weighted_average, 13.0)
+
+    def test_save_reads_course_only_when_it_changes(self):
+        grade = Grade.objects.create(student=self.student, course=self.math, score=12,
+                                     semester='fall', academic_year=2025)
+        grade = Grade.objects.get(pk=grade.pk)
+        grade.score = 14
+        with CaptureQueriesContext(connection) as queries:
+            grade.save()
+        self.assertFalse([query['sql'] for query in queries if 'FROM "courses_course"' in query['sql']])
+
+        grade.course_id = self.info.pk
+        grade.save()
+        grade.refresh_from_db()
+        self.assertEqual(grade.course_code, 'INFO101')
+        self.assertEqual(gpa.verify(), [])
+
+    def test_course_rename_rewrites_grade_codes(self):
+        math = Grade.objects.create(student=self.student, course=self.math, score=12,
+                                    semester='fall', academic_year=2025)
+        Grade.objects.create(student=self.student, course=self.info, score=15,
+                             semester='fall', academic_year=2025)
+        stale = Grade.objects.get(pk=math.pk)
+        self.assertEqual(list(Grade.objects.values_list('course_code', flat=True)), ['INFO101', 'MATH101'])
+
+        self.math.course_code = 'ALG101'
+        self.math.save()
+        self.assertEqual(list(Grade.objects.values_list('course_code', flat=True)), ['ALG101', 'INFO101'])
+
+        # Une instance chargée avant le renommage ne remet pas l'ancien code
+        stale.score = 13
+        stale.save()
+        self.assertEqual(Grade.objects.get(pk=math.pk).course_code, 'ALG101')
+        self.assertEqual(gpa.verify(), [])
+
+    def test_initial_migration_resets_gpa_without_grades(self):
+        build_totals = import_module('grades.migrations.0003_student_grade_totals').build_totals
+        Grade.objects.create(student=self.student, course=self.math, score=16,
+                             semester='fall', academic_year=2025)
+        other = Student.objects.create(
+            user=User.objects.create_user(username='etu2'), student_id='S002',
+            enrollment_date=date(2024, 9, 1), faculty='Sciences', department='informatique'
+        )
+        # État d'avant la migration : pas de sommes, GPA saisis à la main
+        StudentGradeTotals.objects.all().delete()
+        Student.objects.update(gpa=Decimal('3.50'))
+
+        build_totals(apps, None)
+        other.refresh_from_db()
+        self.assertEqual(other.gpa, Decimal('0.00'))
+        self.assertEqual(gpa.verify(), [])
+
+    def test_verify_reports_drift_and_rebuild_fixes_it(self):
+        Grade.objects.create(student=self.student, course=self.math, score=12,
+                             semester='fall', academic_year=2025)
+        StudentGradeTotals.objects.update(grade_count=5)
+
+        self.assertEqual(len(gpa.verify()), 2)
+        gpa.rebuild()
+        self.assertEqual(gpa.verify(), [])
+
+
+class TranscriptTest(TestCase):
+    """Relevé pondéré par les crédits, en cache jusqu'à la modification des notes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        user = User.objects.create_user(username='etu', first_name='Paul', last_name='Durand')
+        cls.student = Student.objects.create(
+            user=user, student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='informatique'
+        )
+        math, info, algo = Course.objects.bulk_create([
+            Course(course_code=code, title=code, description='', credits=credits,
+                   department='informatique', semester='fall', academic_year=2025)
+            for code, credits in (('MATH101', 4), ('INFO101', 2), ('ALGO201', 3))
+        ])
+        cls.math = Grade.objects.create(student=cls.student, course=math, score=16,
+                                        semester='fall', academic_year=2025)
+        Grade.objects.create(student=cls.student, course=info, score=7,
+                             semester='fall', academic_year=2025)
+        Grade.objects.create(student=cls.student, course=algo, score=12,
+                             semester='spring', academic_year=2025)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        transcript.invalidate()
+
+    def get_transcript(self):
+        return self.client.get(reverse('grades:student-transcript', args=[self.student.pk]))
+
+    def test_semesters_are_credit_weighted(self):
+        response = self.get_transcript()
+
+        fall, spring = response.data['data']['semesters']
+        # (16 * 4 + 7 * 2) / 6 = 13
+        self.assertEqual(fall['weighted_average'], 13.0)
+        self.assertEqual((fall['credits_attempted'], fall['credits_earned']), (6, 4))
+        self.assertEqual([course['letter_grade'] for course in fall['courses']], ['D', 'A'])
+        self.assertEqual(spring['cumulative_credits_earned'], 7)
+        self.assertEqual(response.data['data']['summary']['weighted_average'], 12.67)
+
+    def test_cached_until_grades_change(self):
+        self.assertEqual(self.get_transcript()['X-Transcript-Cache'], 'miss')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_transcript()['X-Transcript-Cache'], 'hit')
+
+        self.math.score = 4
+        self.math.save()
+
+        response = self.get_transcript()
+        self.assertEqual(response['X-Transcript-Cache'], 'miss')
+        self.assertFalse(response.data['data']['semesters'][0]['passed'])
+
+    def test_invalidated_by_name_change_only(self):
+        self.get_transcript()
+        user = self.student.user
+        user.last_login = datetime.now(dt_timezone.utc)
+        user.save(update_fields=['last_login'])
+        user.email = 'paul@example.com'
+        user.save()
+        self.assertEqual(self.get_transcript()['X-Transcript-Cache'], 'hit')
+
+        user.last_name = 'Dupont'
+        user.save()
+        response = self.get_transcript()
+        self.assertEqual(response['X-Transcript-Cache'], 'miss')
+        self.assertEqual(response.data['data']['student']['name'], 'Paul Dupont')
+
+    def test_timeout_is_short_without_shared_cache(self):
+        # Alias 'stats' en locmem : les autres processus ne voient pas l'invalidation
+        self.assertEqual(transcript.cache_timeout(), 60)
+        with TemporaryDirectory() as directory, override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                'LOCATION': directory}},
+            TRANSCRIPT_CACHE={'ALIAS': 'default'},
+        ):
+            self.assertEqual(transcript.cache_timeout(), 24 * 3600)
+
+    def test_department_zip_contains_json_and_csv(self):
+        response = self.client.get(reverse('grades:department-transcripts', args=['informatique']))
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(sorted(archive.namelist()), ['S001.csv', 'S001.json'])
+        self.assertIn('Cumul', archive.read('S001.csv').decode('utf-8'))
+
+
+class GradeListRowsTest(TestCase):
+    """Les lignes lues avec .values() doivent donner le même JSON que GradeSerializer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        students = []
+        for index, (first_name, last_name) in enumerate([('Léa', 'Martin'), ('', 'Durand')]):
+            user = User.objects.create_user(username=f'etu{index}', first_name=first_name, last_name=last_name)
+            students.append(Student.objects.create(
+                user=user, student_id=f'S{index:03d}', enrollment_date=date(2024, 9, 1),
+                faculty='Sciences', department='informatique'
+            ))
+        courses = Course.objects.bulk_create([
+            Course(course_code=f'INF{index:03d}', title=f'Informatique {index}', description='', credits=3,
+                   department='informatique', semester='fall', academic_year=2025)
+            for index in range(6)
+        ])
+        # Chaque seuil de lettre et ses voisins immédiats
+        scores = ['0', '4.99', '5', '7.5', '8', '10', '11.99', '12', '14.25', '16', '17.99', '18', '20']
+        for index, score in enumerate(scores):
+            Grade.objects.create(
+                student=students[index % 2], course=courses[index % 6], score=Decimal(score),
+                semester=['fall', 'spring'][index // 6 % 2], academic_year=2024 + index // 12,
+                comment='Très bien' if index % 3 else None
+            )
+        # Horodatages autour des changements d'heure (Europe/Paris), avec et sans microsecondes
+        moments = [
+            datetime(2025, 3, 30, 0, 59, 59, 999999), datetime(2025, 3, 30, 1, 0),
+            datetime(2025, 10, 26, 0, 59, 30), datetime(2025, 10, 26, 1, 0, 0, 500),
+        ]
+        for grade, moment in zip(Grade.objects.order_by('id'), moments):
+            moment = moment.replace(tzinfo=dt_timezone.utc)
+            Grade.objects.filter(pk=grade.pk).update(created_at=moment, updated_at=moment)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_rows_match_serializer(self):
+        grades = Grade.objects.select_related('student__user', 'course').order_by('id')
+        self.assertEqual(
+            self.render(GRADE_LIST_ROWS(grades)),
+            self.render(GradeSerializer(grades, many=True).data)
+        )
+
+    def test_grade_list_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        expected = GradeSerializer(
+            Grade.objects.order_by('-academic_year', 'semester', 'course_code', 'id'), many=True
+        ).data
+
+        response = client.get(reverse('grades:grade-list'))
+        self.assertEqual(self.render(response.data['results']), self.render(expected))
+
+        with override_settings(JSON_RENDERER={'STREAM_THRESHOLD': 5}):
+            response = client.get(reverse('grades:grade-list'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            self.render({'success': True, 'count': len(expected), 'results': expected})
+        )
+
+        response = client.get(reverse('grades:grade-list'), {'page_size': 5})
+        pages = response.data['results']
+        response = client.get(response.data['next'])
+        self.assertEqual(self.render(pages + response.data['results']), self.render(expected[:10]))
+
+
+class KeysetPaginationTest(TestCase):
+    """Pagination par curseur de grade_list : ni ligne sautée ni doublon, dans les deux sens"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        students = [
+            Student.objects.create(
+                user=User.objects.create_user(username=f'etu{index}'), student_id=f'S{index:03d}',
+                enrollment_date=date(2024, 9, 1), faculty='Sciences', department='informatique'
+            )
+            for index in range(5)
+        ]
+        courses = Course.objects.bulk_create([
+            Course(course_code=code, title=code, description='', credits=3,
+                   department='informatique', semester='fall', academic_year=2025)
+            for code in ('ALGO', 'BDD', 'RES')
+        ])
+        # Ordre (-academic_year, semester, course_code, id) : 5 notes à égalité
+        # sur les trois premières colonnes pour chaque (année, semestre, cours)
+        Grade.objects.bulk_create([
+            Grade(student=student, course=course, course_code=course.course_code, score=Decimal('12'),
+                  semester=semester, academic_year=academic_year)
+            for academic_year, semester in ((2024, 'fall'), (2025, 'spring'), (2025, 'fall'))
+            for course in courses
+            for student in students
+        ])
+        cls.expected = list(
+            Grade.objects.order_by('-academic_year', 'semester', 'course_code', 'id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, url=None, **params):
+        return self.client.get(url or reverse('grades:grade-list'), params)
+
+    def test_walk_forward_and_backward(self):
+        pages, response = [], self.get(page_size=7)
+        self.assertEqual(response.data['count'], 45)
+        self.assertIsNone(response.data['previous'])
+        while True:
+            pages.append([row['id'] for row in response.data['results']])
+            if not response.data['next']:
+                break
+            response = self.get(response.data['next'])
+        self.assertEqual([len(page) for page in pages], [7] * 6 + [3])
+        self.assertEqual([grade_id for page in pages for grade_id in page], self.expected)
+
+        # Retour en arrière depuis la dernière page par les curseurs « previous »
+        backward = []
+        while response.data['previous']:
+            response = self.get(response.data['previous'])
+            backward.insert(0, [row['id'] for row in response.data['results']])
+        self.assertEqual(backward, pages[:-1])
+
+    def test_keyset_filter_mixed_directions(self):
+        paginator = KeysetPaginator(('-academic_year', 'semester', 'course_code', 'id'))
+        pivot = Grade.objects.get(pk=self.expected[20])
+        position = paginator.position(pivot)
+        after = Grade.objects.filter(paginator.keyset_filter(position)).order_by(*paginator.ordering)
+        before = Grade.objects.filter(paginator.keyset_filter(position, reverse=True))
+        self.assertEqual(list(after.values_list('id', flat=True)), self.expected[21:])
+        self.assertEqual(sorted(before.values_list('id', flat=True)), sorted(self.expected[:20]))
+
+    def test_count_false_and_page_size_cap(self):
+        response = self.get(page_size=5, count='false')
+        self.assertIsNone(response.data['count'])
+        self.assertEqual(len(response.data['results']), 5)
+        with override_settings(KEYSET_PAGINATION_MAX_PAGE_SIZE=4):
+            self.assertEqual(len(self.get(page_size=50).data['results']), 4)
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(('-academic_year', 'semester', 'course_code', 'id'))
+        for params in (
+            {'cursor': 'pas-un-curseur!'},
+            # {} sans position, puis position tronquée
+            {'cursor': 'e30'},
+            {'cursor': paginator.encode_cursor([2025, 'fall'])},
+            {'page_size': 'abc'},
+            {'page_size': '0'},
+        ):
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(response.data['error'], 'Pagination invalide')
+
+
+class BulkGradeImportTest(TestCase):
+    """Import en masse : erreurs ligne par ligne, écriture par lots, totaux GPA à jour"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.students = [
+            Student.objects.create(
+                user=User.objects.create_user(username=f'etu{index}'), student_id=f'S{index:03d}',
+                enrollment_date=date(2024, 9, 1), faculty='Sciences', department='informatique'
+            )
+            for index in range(2)
+        ]
+        cls.courses = Course.objects.bulk_create([
+            Course(course_code=f'INF{index}', title=f'INF{index}', description='', credits=index + 1,
+                   department='informatique', semester='fall', academic_year=2025)
+            for index in range(5)
+        ])
+        cls.existing = Grade.objects.create(student=cls.students[0], course=cls.courses[0], score=8,
+                                            semester='fall', academic_year=2025)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def post(self, rows, **extra):
+        return self.client.post(reverse('grades:bulk-create-grades'), {'grades': rows, **extra}, format='json')
+
+    def row(self, student=0, course=1, score='12', semester='fall', academic_year=2025, **extra):
+        return {'student': self.students[student].pk, 'course': self.courses[course].pk, 'score': score,
+                'semester': semester, 'academic_year': academic_year, **extra}
+
+    def test_valid_batch(self):
+        response = self.post([self.row(0, 1, '17'), self.row(1, 1, '9.5'), self.row(1, 2, '14', comment='Bien')])
+        self.assertEqual((response.data['created'], response.data['failed']), (3, 0))
+        grade = Grade.objects.get(student=self.students[1], course=self.courses[2])
+        self.assertEqual((grade.course_code, grade.comment, grade.grade_category),
+                         ('INF2', 'Bien', Grade.category_for_score(14)))
+        self.assertEqual(gpa.verify(), [])
+        # (8 * 1 + 17 * 2) / 3 = 14 sur 20
+        self.assertEqual(StudentGradeTotals.objects.get(
+            student=self.students[0], academic_year=gpa.CUMULATIVE_YEAR, semester=gpa.CUMULATIVE_SEMESTER
+        ).weighted_average, 14.0)
+
+    def test_existing_grade_with_and_without_upsert(self):
+        response = self.post([self.row(0, 0, '15')])
+        self.assertEqual((response.data['created'], response.data['failed']), (0, 1))
+        self.assertEqual(response.data['errors'][0]['errors'], {'non_field_errors': [bulk.DUPLICATE_MESSAGE]})
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.score, 8)
+
+        response = self.post([self.row(0, 0, '15', comment='Rattrapage')], upsert=True)
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 1))
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.score, self.existing.comment), (15, 'Rattrapage'))
+        self.assertEqual(gpa.verify(), [])
+
+        # Même clé deux fois dans un lot : la seconde ligne est rejetée
+        response = self.post([self.row(1, 3), self.row(1, 3, '18')], upsert=True)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+
+    def test_unknown_student_or_course(self):
+        field = serializers.PrimaryKeyRelatedField(queryset=Student.objects.all())
+        with self.assertRaises(serializers.ValidationError) as context:
+            field.run_validation(999999)
+        expected = context.exception.detail
+
+        response = self.post([{**self.row(), 'student': 999999}, {**self.row(), 'course': 999999},
+                              self.row(score='25')])
+        errors = {error['index']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(errors[0], {'student': expected})
+        self.assertEqual(errors[1], {'course': expected})
+        self.assertIn('score', errors[2])
+        self.assertEqual(response.data['created'], 0)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def queries(rows):
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.post(rows).data['created'], len(rows))
+            return len(captured)
+
+        small = queries([self.row(student, course, academic_year=2023) for student in (0, 1) for course in (1, 2)])
+        large = queries([
+            self.row(student, course, semester=semester, academic_year=2024)
+            for student in (0, 1) for course in range(5) for semester in ('fall', 'spring')
+        ])
+        self.assertEqual(small, large)
+        self.assertEqual(gpa.verify(), [])
+
+
+class GradeAnalyticsTest(TestCase):
+    """Percentiles, histogramme et classements tirés de la table de fréquences"""
+
+    # Scores par (étudiant, cours) ; cours 0 à 2 en informatique, 3 et 4 en mathématiques
+    SCORES = [
+        ['4', '8', '10', '12.5', '16.75'],
+        ['10', '12', '14', '15', '19.75'],
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [
+            Student.objects.create(
+                user=User.objects.create_user(username=f'etu{index}'), student_id=f'S{index:03d}',
+                enrollment_date=date(2024, 9, 1), faculty='Sciences', department='informatique'
+            )
+            for index in range(2)
+        ]
+        cls.courses = Course.objects.bulk_create([
+            Course(course_code=f'C{index}', title=f'C{index}', description='', credits=3,
+                   department='informatique' if index < 3 else 'mathematiques',
+                   semester='fall', academic_year=2025)
+            for index in range(5)
+        ])
+        for student, scores in zip(cls.students, cls.SCORES):
+            for course, score in zip(cls.courses, scores):
+                Grade.objects.create(student=student, course=course, score=Decimal(score),
+                                     semester='fall', academic_year=2025)
+
+    @staticmethod
+    def naive_percentile(scores, p):
+        scores = sorted(float(score) for score in scores)
+        rank = (len(scores) - 1) * p / 100
+        low = int(rank)
+        high = min(low + 1, len(scores) - 1)
+        return round(scores[low] + (scores[high] - scores[low]) * (rank - low), 2)
+
+    def test_known_statistics(self):
+        data = GradeAnalytics(top=3).compute()
+        self.assertEqual(data['total_grades'], 10)
+        self.assertEqual(data['average_score'], 12.2)
+        self.assertEqual(data['passing_rate'], 80.0)
+        self.assertEqual(data['distribution'], {'excellent': 3, 'good': 5, 'average': 1, 'fail': 1})
+        self.assertEqual(data['percentiles'], {'p10': 7.6, 'p25': 10.0, 'p50': 12.25, 'p75': 14.75, 'p90': 17.05})
+
+        histogram = {bucket['from']: bucket['count'] for bucket in data['histogram'] if bucket['count']}
+        self.assertEqual(len(data['histogram']), 40)
+        self.assertEqual(histogram, {4.0: 1, 8.0: 1, 10.0: 2, 12.0: 1, 12.5: 1, 14.0: 1, 15.0: 1, 16.5: 1, 19.5: 1})
+
+        self.assertEqual(
+            [(course['course_code'], course['average_score']) for course in data['top_courses']],
+            [('C4', 18.25), ('C3', 13.75), ('C2', 12.0)]
+        )
+        # Sans filtre : classement lu dans StudentGradeTotals
+        self.assertEqual(
+            [(student['student_id'], student['average_score']) for student in data['top_students']],
+            [('S001', 14.15), ('S000', 10.25)]
+        )
+
+    def test_department_filter(self):
+        data = GradeAnalytics(department='informatique').compute()
+        self.assertEqual(data['total_grades'], 6)
+        self.assertEqual(data['percentiles']['p50'], 10.0)
+        self.assertEqual(
+            [(student['student_id'], student['average_score']) for student in data['top_students']],
+            [('S001', 12.0), ('S000', 7.33)]
+        )
+
+    def test_matches_naive_computation(self):
+        courses = Course.objects.bulk_create([
+            Course(course_code=f'N{index:02d}', title=f'N{index:02d}', description='', credits=2,
+                   department='physique', semester='spring', academic_year=2026)
+            for index in range(12)
+        ])
+        # Scores de 0 à 20 par quarts de point, avec des égalités
+        grades = []
+        for index, course in enumerate(courses):
+            for offset, student in enumerate(self.students):
+                score = Decimal((index * 37 + offset * 11) % 81) / 4
+                grades.append(Grade(student=student, course=course, course_code=course.course_code,
+                                    score=score, grade_category=Grade.category_for_score(score),
+                                    semester='spring', academic_year=2026))
+        Grade.objects.bulk_create(grades)
+
+        analytics = GradeAnalytics(academic_year=2026, semester='spring', department='physique', top=4)
+        data = analytics.compute()
+        scores = [grade.score for grade in grades]
+
+        self.assertEqual(data['total_grades'], len(scores))
+        for p in (10, 25, 50, 75, 90):
+            self.assertEqual(data['percentiles'][f'p{p}'], self.naive_percentile(scores, p))
+        self.assertEqual(
+            [bucket['count'] for bucket in data['histogram']],
+            [sum(1 for score in scores if min(int(score * 2), 39) == index) for index in range(40)]
+        )
+
+        averages = {
+            course.course_code: sum(grade.score for grade in grades if grade.course_id == course.pk) / 2
+            for course in courses
+        }
+        expected = sorted(courses, key=lambda course: (-averages[course.course_code], course.pk))[:4]
+        self.assertEqual(
+            [course['course_code'] for course in data['top_courses']],
+            [course.course_code for course in expected]
+        )
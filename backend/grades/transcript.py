@@ -0,0 +1,328 @@
+# backend/grades/transcript.py
+"""
+Relevés de notes (transcripts).
+
+Un relevé regroupe les notes d'un étudiant semestre par semestre, dans
+l'ordre chronologique (automne, printemps puis été de chaque année), avec
+pour chaque semestre et en cumulé :
+- les crédits tentés et obtenus (note >= 10) ;
+- la moyenne pondérée par ``Course.credits`` et le GPA sur 4 ;
+- le résultat (semestre validé si la moyenne pondérée est >= 10).
+
+Les notes de plusieurs étudiants sont lues en une requête (``Grade`` joint à
+``Course``), puis regroupées en Python. Chaque relevé est mis en cache par
+étudiant ; ``invalidate()`` est appelé par grades/gpa.py à chaque
+modification des notes et par les signaux de Course et Student.
+
+L'invalidation ne vaut que pour le cache où elle est faite : avec un cache
+propre au processus (LocMemCache, défaut de l'alias ``stats``), les autres
+workers ne la voient pas. Un relevé y est donc gardé au plus
+``LOCAL_TIMEOUT`` secondes (la fraîcheur des statistiques) ; ``TIMEOUT``
+(24 h) ne s'applique qu'à un cache partagé (``STATS_CACHE_BACKEND`` file
+ou db).
+"""
+
+import functools
+import json
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from university_management.csv_export import iter_csv
+from .gpa import gpa_from_totals
+from .models import Grade
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    # Cache partagé entre processus
+    'TIMEOUT': 24 * 3600,
+    # Cache propre au processus : invalidations des autres workers non vues
+    'LOCAL_TIMEOUT': 60,
+}
+
+KEY_PREFIX = 'transcript'
+
+PASSING_SCORE = Decimal('10')
+
+# Ordre des semestres dans une année académique
+SEMESTER_ORDER = {'fall': 0, 'spring': 1, 'summer': 2}
+SEMESTER_LABELS = dict(Grade._meta.get_field('semester').choices)
+
+# Nombre d'étudiants traités par requête lors d'une génération par lot
+BATCH_SIZE = 200
+
+EXPORT_FORMATS = ('json', 'csv', 'both')
+
+CSV_HEADER = ['Année', 'Semestre', 'Code', 'Cours', 'Crédits', 'Note /20', 'Lettre', 'Résultat']
+
+
+def get_setting(name):
+    return getattr(settings, 'TRANSCRIPT_CACHE', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def get_cache():
+    return caches[get_setting('ALIAS')]
+
+
+def cache_timeout():
+    """Durée de vie d'un relevé en cache, courte si le cache n'est pas partagé"""
+    if isinstance(get_cache(), LocMemCache):
+        return min(get_setting('TIMEOUT'), get_setting('LOCAL_TIMEOUT'))
+    return get_setting('TIMEOUT')
+
+
+# ----------------------------------------------------------------------
+# Cache par étudiant
+# ----------------------------------------------------------------------
+
+def _generation():
+    """Génération courante des clés (incrémentée pour tout invalider)"""
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:generation'
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _keys(student_ids):
+    generation = _generation()
+    return {student_id: f'{KEY_PREFIX}:{generation}:{student_id}' for student_id in student_ids}
+
+
+def _forget(student_ids):
+    cache = get_cache()
+    if student_ids is None:
+        key = f'{KEY_PREFIX}:generation'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+    else:
+        cache.delete_many(list(_keys(student_ids).values()))
+
+
+def invalidate(student_ids=None):
+    """
+    Invalider les relevés de ``student_ids`` (tous si None).
+
+    Comme pour stats_cache, l'invalidation est refaite au commit : un relevé
+    calculé pendant la transaction ne survit pas à sa validation.
+    """
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        if not student_ids:
+            return
+    _forget(student_ids)
+    transaction.on_commit(functools.partial(_forget, student_ids))
+
+
+# ----------------------------------------------------------------------
+# Calcul
+# ----------------------------------------------------------------------
+
+def grade_rows(student_ids):
+    """Notes des étudiants avec les crédits de leur cours — une requête"""
+    return Grade.objects.filter(student_id__in=list(student_ids)).values(
+        'student_id', 'academic_year', 'semester', 'course_id', 'course_code',
+        'course__title', 'course__credits', 'score', 'grade_category'
+    ).order_by()
+
+
+class _Totals:
+    """Sommes de crédits et de scores pondérés d'un semestre ou du cumul"""
+
+    def __init__(self):
+        self.credits_attempted = 0
+        self.credits_earned = 0
+        self.weighted_score_total = Decimal('0')
+        self.passed_courses = 0
+        self.failed_courses = 0
+
+    def add(self, score, credits):
+        self.credits_attempted += credits
+        self.weighted_score_total += score * credits
+        if score >= PASSING_SCORE:
+            self.credits_earned += credits
+            self.passed_courses += 1
+        else:
+            self.failed_courses += 1
+
+    @property
+    def weighted_average(self):
+        if not self.credits_attempted:
+            return None
+        return self.weighted_score_total / self.credits_attempted
+
+    def as_dict(self):
+        average = self.weighted_average
+        return {
+            'credits_attempted': self.credits_attempted,
+            'credits_earned': self.credits_earned,
+            'passed_courses': self.passed_courses,
+            'failed_courses': self.failed_courses,
+            'weighted_average': round(float(average), 2) if average is not None else None,
+            'gpa': float(gpa_from_totals(self.weighted_score_total, self.credits_attempted)),
+            'passed': average is not None and average >= PASSING_SCORE,
+        }
+
+
+def build_transcript(student, rows):
+    """Relevé d'un étudiant à partir de ses lignes de ``grade_rows``"""
+    terms = defaultdict(list)
+    for row in rows:
+        terms[(row['academic_year'], row['semester'])].append(row)
+
+    cumulative = _Totals()
+    semesters = []
+    for academic_year, semester in sorted(terms, key=lambda key: (key[0], SEMESTER_ORDER.get(key[1], 9), key[1])):
+        totals = _Totals()
+        courses = []
+        for row in sorted(terms[(academic_year, semester)], key=lambda row: (row['course_code'], row['course_id'])):
+            score = Decimal(row['score'])
+            credits = row['course__credits'] or 0
+            totals.add(score, credits)
+            cumulative.add(score, credits)
+            courses.append({
+                'course_id': row['course_id'],
+                'course_code': row['course_code'],
+                'title': row['course__title'],
+                'credits': credits,
+                'score': float(score),
+                'letter_grade': Grade.letter_for_score(score),
+                'grade_category': row['grade_category'],
+                'passed': score >= PASSING_SCORE,
+            })
+        running = cumulative.as_dict()
+        semesters.append({
+            'academic_year': academic_year,
+            'semester': semester,
+            'semester_display': SEMESTER_LABELS.get(semester, semester),
+            'courses': courses,
+            **totals.as_dict(),
+            'cumulative_credits_earned': cumulative.credits_earned,
+            'cumulative_weighted_average': running['weighted_average'],
+            'cumulative_gpa': running['gpa'],
+        })
+
+    return {
+        'student': {
+            'id': student.id,
+            'student_id': student.student_id,
+            'name': student.user.get_full_name(),
+            'faculty': student.faculty,
+            'department': student.department,
+            'current_year': student.current_year,
+        },
+        'semesters': semesters,
+        'summary': cumulative.as_dict(),
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_transcripts(students):
+    """
+    Relevés de ``students`` (instances avec ``user`` chargé), depuis le cache
+    ou calculés en une requête pour les absents. Retourne (relevés par id,
+    ids servis depuis le cache).
+    """
+    students = list(students)
+    enabled = get_setting('ENABLED')
+    keys = _keys([student.id for student in students]) if enabled else {}
+    found = get_cache().get_many(list(keys.values())) if enabled else {}
+
+    transcripts = {}
+    for student in students:
+        key = keys.get(student.id)
+        if key in found:
+            transcripts[student.id] = found[key]
+    cached = set(transcripts)
+
+    missing = [student for student in students if student.id not in transcripts]
+    if missing:
+        rows = defaultdict(list)
+        for row in grade_rows(student.id for student in missing):
+            rows[row['student_id']].append(row)
+        computed = {student.id: build_transcript(student, rows[student.id]) for student in missing}
+        transcripts.update(computed)
+        if enabled:
+            get_cache().set_many(
+                {keys[student_id]: data for student_id, data in computed.items()},
+                cache_timeout()
+            )
+    return transcripts, cached
+
+
+def get_transcript(student):
+    """Relevé d'un étudiant et indicateur de lecture en cache"""
+    transcripts, cached = get_transcripts([student])
+    return transcripts[student.id], student.id in cached
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+def _result(passed):
+    return 'Validé' if passed else 'Non validé'
+
+
+def transcript_csv_rows(transcript):
+    for semester in transcript['semesters']:
+        for course in semester['courses']:
+            yield [
+                semester['academic_year'], semester['semester_display'],
+                course['course_code'], course['title'], course['credits'],
+                course['score'], course['letter_grade'], _result(course['passed']),
+            ]
+        yield [
+            semester['academic_year'], semester['semester_display'], '', 'Moyenne du semestre',
+            f"{semester['credits_earned']}/{semester['credits_attempted']}",
+            semester['weighted_average'], semester['gpa'], _result(semester['passed']),
+        ]
+    summary = transcript['summary']
+    yield [
+        '', '', '', 'Cumul',
+        f"{summary['credits_earned']}/{summary['credits_attempted']}",
+        summary['weighted_average'], summary['gpa'], _result(summary['passed']),
+    ]
+
+
+def transcript_csv(transcript):
+    return ''.join(iter_csv(CSV_HEADER, transcript_csv_rows(transcript)))
+
+
+def transcript_json(transcript):
+    return json.dumps(transcript, cls=JSONEncoder, ensure_ascii=False, indent=2)
+
+
+def iter_transcript_files(students, export='both', batch_size=BATCH_SIZE):
+    """
+    Fichiers (nom, contenu) des relevés de ``students``, par lots de
+    ``batch_size`` étudiants (une requête de notes par lot)
+    """
+    iterator = iter(students)
+    while True:
+        batch = []
+        for student in iterator:
+            batch.append(student)
+            if len(batch) == batch_size:
+                break
+        if not batch:
+            return
+        transcripts, _ = get_transcripts(batch)
+        for student in batch:
+            transcript = transcripts[student.id]
+            if export in ('json', 'both'):
+                yield f'{student.student_id}.json', transcript_json(transcript)
+            if export in ('csv', 'both'):
+                yield f'{student.student_id}.csv', transcript_csv(transcript)
@@ -12,6 +12,10 @@ urlpatterns = [
     
     # Notes par étudiant
     path('student/<int:student_id>/', views.student_grades, name='student-grades'),
+    path('student/<int:student_id>/transcript/', views.student_transcript, name='student-transcript'),
+    
+    # Relevés par département (archive ZIP)
+    path('transcripts/department/<str:department>/', views.department_transcripts, name='department-transcripts'),
     
     # Notes par cours
     path('course/<int:course_id>/', views.course_grades, name='course-grades'),
@@ -4,9 +4,20 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Avg, Count, Max, Min, Q
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Grade
-from .serializers import GradeSerializer, StudentGradeSummarySerializer, BulkGradeCreateSerializer
+from django.utils.text import slugify
+from .models import Grade, StudentGradeTotals
+from .gpa import CUMULATIVE_SEMESTER, CUMULATIVE_YEAR
+from .serializers import GradeSerializer, StudentGradeSummarySerializer, BulkGradeCreateSerializer, GRADE_LIST_ROWS
+from .bulk import BulkGradeImporter
+from .analytics import CACHE_ENDPOINT, CACHE_MODELS, GradeAnalytics
+from . import transcript
+from university_management.pagination import KeysetPaginator, InvalidCursor
+from university_management.stats_cache import cached_statistics
+from university_management.csv_export import QUERY_CHUNK_SIZE
+from university_management.zip_export import streaming_zip_response
+from university_management import renderers
 from students.models import Student
 from courses.models import Course
 import logging
@@ -14,6 +25,8 @@ import logging
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
+# Ordre stable de la liste des notes (clé de pagination par curseur)
+GRADE_ORDERING = ('-academic_year', 'semester', 'course_code', 'id')
 
 
 
@@ -95,17 +108,42 @@ def grade_list(request):
                 grades = grades.filter(grade_category=grade_category)
             
             # Trier par défaut
-            grades = grades.order_by('-academic_year', 'semester', 'course__course_code')
+            grades = grades.order_by(*GRADE_ORDERING)
             
-            # Compter avant sérialisation
-            total_count = grades.count()
+            # Lignes lues avec .values(), sans instancier les notes
+            rows = GRADE_LIST_ROWS.queryset(grades)
             
-            serializer = GradeSerializer(grades, many=True)
+            # Pagination par curseur si demandée (?cursor=... ou ?page_size=...)
+            try:
+                page = KeysetPaginator(GRADE_ORDERING).paginate(request, rows)
+            except InvalidCursor as e:
+                return Response({
+                    'success': False,
+                    'error': 'Pagination invalide',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            if page is not None:
+                return Response({
+                    'success': True,
+                    'count': page.count,
+                    'results': GRADE_LIST_ROWS.rows(page.results),
+                    'next': page.next,
+                    'previous': page.previous
+                })
+            
+            # Liste complète : envoyée par lots au-delà du seuil de streaming
+            total_count = rows.count()
+            if renderers.should_stream(total_count):
+                return renderers.streaming_json_response(
+                    {'success': True, 'count': total_count}, 'results',
+                    GRADE_LIST_ROWS.batches(rows, QUERY_CHUNK_SIZE)
+                )
             
             return Response({
                 'success': True,
                 'count': total_count,
-                'results': serializer.data
+                'results': GRADE_LIST_ROWS.rows(rows)
             })
             
         except Exception as e:
@@ -475,6 +513,86 @@ def student_grades(request, student_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def student_transcript(request, student_id):
+    """
+    Relevé de notes d'un étudiant : semestres, moyennes pondérées par les
+    crédits, crédits obtenus et résultats. ``?export=csv`` pour un fichier CSV.
+    """
+    try:
+        student = get_object_or_404(Student.objects.select_related('user'), id=student_id)
+        data, cached = transcript.get_transcript(student)
+        
+        if request.query_params.get('export') == 'csv':
+            response = HttpResponse(transcript.transcript_csv(data), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="releve_{student.student_id}.csv"'
+        else:
+            response = Response({
+                'success': True,
+                'data': data
+            })
+        response['X-Transcript-Cache'] = 'hit' if cached else 'miss'
+        return response
+        
+    except Http404:
+        return Response({
+            'success': False,
+            'error': 'Étudiant non trouvé',
+            'detail': f'Aucun étudiant avec l\'ID {student_id}'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error in student_transcript: {str(e)}")
+        return Response({
+            'success': False,
+            'error': 'Erreur lors de la génération du relevé',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def department_transcripts(request, department):
+    """
+    Relevés de tous les étudiants d'un département, en archive ZIP produite
+    en streaming (``?export=json|csv|both``, ``?status=active``...)
+    """
+    try:
+        export = request.query_params.get('export', 'both')
+        if export not in transcript.EXPORT_FORMATS:
+            return Response({
+                'success': False,
+                'error': 'Format invalide',
+                'detail': f"Formats acceptés : {', '.join(transcript.EXPORT_FORMATS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        students = Student.objects.select_related('user').filter(department=department)
+        student_status = request.query_params.get('status')
+        if student_status:
+            students = students.filter(status=student_status)
+        students = students.order_by('student_id')
+        
+        if not students.exists():
+            return Response({
+                'success': False,
+                'error': 'Aucun étudiant',
+                'detail': f'Aucun étudiant dans le département {department}'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return streaming_zip_response(
+            f'releves_{slugify(department)}.zip',
+            transcript.iter_transcript_files(students.iterator(chunk_size=QUERY_CHUNK_SIZE), export)
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in department_transcripts: {str(e)}")
+        return Response({
+            'success': False,
+            'error': 'Erreur lors de la génération des relevés',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def course_grades(request, course_id):
@@ -541,88 +659,27 @@ def course_grades(request, course_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_statistics(CACHE_ENDPOINT, models=CACHE_MODELS)
 def grade_statistics(request):
-    """Statistiques générales des notes"""
+    """
+    Statistiques générales des notes
+
+    Paramètres optionnels : ``academic_year``, ``semester``, ``department``
+    (département du cours) et ``top`` (taille des classements, 5 par défaut).
+    """
+    try:
+        analytics = GradeAnalytics.from_params(request.query_params)
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': 'Paramètres invalides',
+            'detail': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
     try:
-        total_grades = Grade.objects.count()
-        
-        if total_grades == 0:
-            return Response({
-                'success': True,
-                'data': {
-                    'total_grades': 0,
-                    'average_score': 0,
-                    'distribution': {
-                        'excellent': 0,
-                        'good': 0,
-                        'average': 0,
-                        'fail': 0
-                    },
-                    'passing_rate': 0,
-                    'top_courses': [],
-                    'top_students': []
-                }
-            })
-        
-        # Score moyen général
-        overall_stats = Grade.objects.aggregate(
-            average=Avg('score'),
-            passing=Count('id', filter=Q(score__gte=10))
-        )
-        
-        # Distribution par catégorie
-        distribution = {
-            'excellent': Grade.objects.filter(grade_category='excellent').count(),
-            'good': Grade.objects.filter(grade_category='good').count(),
-            'average': Grade.objects.filter(grade_category='average').count(),
-            'fail': Grade.objects.filter(grade_category='fail').count()
-        }
-        
-        # Taux de réussite
-        passing_rate = round((overall_stats['passing'] / total_grades) * 100, 2)
-        
-        # Top 5 cours avec les meilleures moyennes
-        top_courses = Course.objects.annotate(
-            avg_score=Avg('course_grades__score'),
-            grade_count=Count('course_grades')
-        ).filter(grade_count__gt=0).order_by('-avg_score')[:5]
-        
-        top_courses_data = []
-        for course in top_courses:
-            top_courses_data.append({
-                'id': course.id,
-                'course_code': course.course_code,
-                'title': course.title,
-                'average_score': round(float(course.avg_score), 2),
-                'total_grades': course.grade_count
-            })
-        
-        # Top 5 étudiants avec les meilleures moyennes
-        top_students = Student.objects.annotate(
-            avg_score=Avg('student_grades__score'),
-            grade_count=Count('student_grades')
-        ).filter(grade_count__gt=0).order_by('-avg_score')[:5]
-        
-        top_students_data = []
-        for student in top_students:
-            top_students_data.append({
-                'id': student.id,
-                'student_id': student.student_id,
-                'name': student.user.get_full_name(),
-                'average_score': round(float(student.avg_score), 2),
-                'total_grades': student.grade_count
-            })
-        
         return Response({
             'success': True,
-            'data': {
-                'total_grades': total_grades,
-                'average_score': round(float(overall_stats['average'] or 0), 2),
-                'distribution': distribution,
-                'passing_rate': passing_rate,
-                'top_courses': top_courses_data,
-                'top_students': top_students_data
-            }
+            'data': analytics.compute()
         })
         
     except Exception as e:
@@ -633,11 +690,15 @@ def grade_statistics(request):
             'detail': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def bulk_create_grades(request):
-    """Création en masse de notes"""
+    """
+    Création en masse de notes
+
+    Le lot est validé et écrit en une seule transaction. Avec ``upsert: true``,
+    les notes déjà existantes sont mises à jour au lieu d'être rejetées.
+    """
     try:
         serializer = BulkGradeCreateSerializer(data=request.data)
         
@@ -648,35 +709,28 @@ def bulk_create_grades(request):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        grades_data = serializer.validated_data['grades']
-        created_grades = []
-        errors = []
+        importer = BulkGradeImporter(
+            serializer.validated_data['grades'],
+            upsert=serializer.validated_data['upsert']
+        ).run()
         
-        for index, grade_data in enumerate(grades_data):
-            try:
-                grade_serializer = GradeSerializer(data=grade_data)
-                if grade_serializer.is_valid():
-                    grade = grade_serializer.save()
-                    created_grades.append(grade_serializer.data)
-                else:
-                    errors.append({
-                        'index': index,
-                        'data': grade_data,
-                        'errors': grade_serializer.errors
-                    })
-            except Exception as e:
-                errors.append({
-                    'index': index,
-                    'data': grade_data,
-                    'error': str(e)
-                })
+        written = importer.created + importer.updated
+        created_count = len(importer.created)
+        updated_count = len(importer.updated)
+        errors = importer.errors
+        
+        if importer.upsert:
+            message = f'{created_count} notes créées, {updated_count} mises à jour, {len(errors)} erreurs'
+        else:
+            message = f'{created_count} notes créées avec succès, {len(errors)} erreurs'
         
         return Response({
             'success': True,
-            'message': f'{len(created_grades)} notes créées avec succès, {len(errors)} erreurs',
-            'created': len(created_grades),
+            'message': message,
+            'created': created_count,
+            'updated': updated_count,
             'failed': len(errors),
-            'grades': created_grades,
+            'grades': GradeSerializer(written, many=True).data,
             'errors': errors
         })
         
@@ -694,17 +748,20 @@ def bulk_create_grades(request):
 def student_grade_summary(request):
     """Résumé des notes pour tous les étudiants"""
     try:
-        students = Student.objects.annotate(
-            grades_count=Count('student_grades'),
-            avg_score=Avg('student_grades__score')
-        ).filter(grades_count__gt=0)
+        # Lignes cumulées maintenues par grades/gpa.py : une ligne par étudiant
+        totals = StudentGradeTotals.objects.select_related('student__user').filter(
+            academic_year=CUMULATIVE_YEAR,
+            semester=CUMULATIVE_SEMESTER,
+            grade_count__gt=0
+        ).order_by('student_id')
         
-        serializer = StudentGradeSummarySerializer(students, many=True)
+        serializer = StudentGradeSummarySerializer(totals, many=True)
+        data = serializer.data
         
         return Response({
             'success': True,
-            'count': students.count(),
-            'results': serializer.data
+            'count': len(data),
+            'results': data
         })
         
     except Exception as e:
@@ -730,6 +787,8 @@ def test_api(request):
             'PUT /<id>/': 'Update grade',
             'DELETE /<id>/': 'Delete grade',
             'GET /student/<student_id>/': 'Get student grades',
+            'GET /student/<student_id>/transcript/': 'Get student transcript',
+            'GET /transcripts/department/<department>/': 'Department transcripts (ZIP)',
             'GET /course/<course_id>/': 'Get course grades',
             'GET /statistics/': 'Get statistics',
             'GET /summary/': 'Get student summary',
@@ -0,0 +1,210 @@
+# backend/search/autocomplete.py
+"""
+Autocomplétion des sélecteurs (étudiant, enseignant, cours) en mémoire.
+
+Chaque type a un index trié de couples (clé normalisée, id) parcouru par
+``bisect`` : une recherche par préfixe coûte O(log n + limit), sans accès à
+la base. Clés indexées :
+- étudiants / enseignants : identifiant, « prénom nom », « nom prénom » ;
+- cours : code, intitulé et intitulé à partir de chacun de ses mots.
+
+L'index est construit à la première utilisation (une requête), puis mis à
+jour par les signaux (search/signals.py) après le commit. Chaque processus a
+son propre index : au-delà de ``MAX_AGE`` secondes, il est reconstruit en
+arrière-plan pour intégrer les écritures des autres workers, l'ancien
+restant servi pendant ce temps.
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from courses.models import Course
+from students.models import Student
+from teachers.models import Teacher
+from .documents import normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 50,
+    'MAX_AGE': 300,
+    'BACKGROUND_REFRESH': True,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'AUTOCOMPLETE', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def _unique(keys):
+    result = []
+    for key in keys:
+        if key and key not in result:
+            result.append(key)
+    return result
+
+
+def person_entries(model, code_field, filters):
+    rows = model.objects.filter(**filters).values_list(
+        'id', code_field, 'user__first_name', 'user__last_name'
+    ).order_by()
+    for object_id, code, first_name, last_name in rows:
+        full_name = f"{first_name} {last_name}".strip()
+        first, last = normalize(first_name), normalize(last_name)
+        keys = _unique([
+            normalize(code),
+            f"{first} {last}".strip(),
+            f"{last} {first}".strip(),
+        ])
+        yield object_id, code, f"{code} - {full_name}" if full_name else code, keys
+
+
+def course_entries(filters):
+    rows = Course.objects.filter(**filters).values_list('id', 'course_code', 'title').order_by()
+    for object_id, code, title in rows:
+        words = normalize(title).split()
+        keys = _unique([normalize(code)] + [' '.join(words[index:]) for index in range(len(words))])
+        yield object_id, code, f"{code} - {title}", keys
+
+
+SOURCES = {
+    'student': lambda **filters: person_entries(Student, 'student_id', filters),
+    'teacher': lambda **filters: person_entries(Teacher, 'teacher_id', filters),
+    'course': lambda **filters: course_entries(filters),
+}
+
+
+class PrefixIndex:
+    """Index trié (clé, id) d'un type d'objet"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.keys = []
+        # id -> (code, libellé, clés)
+        self.entries = {}
+        self.built_at = None
+        self.refreshing = False
+        self.lock = threading.RLock()
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def build(self):
+        """(Re)construire l'index depuis la base — une requête"""
+        entries = {}
+        keys = []
+        for object_id, code, label, object_keys in SOURCES[self.kind]():
+            entries[object_id] = (code, label, object_keys)
+            keys.extend((key, object_id) for key in object_keys)
+        keys.sort()
+        with self.lock:
+            self.keys = keys
+            self.entries = entries
+            self.built_at = time.monotonic()
+
+    def _remove(self, object_id):
+        entry = self.entries.pop(object_id, None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            index = bisect.bisect_left(self.keys, (key, object_id))
+            if index < len(self.keys) and self.keys[index] == (key, object_id):
+                del self.keys[index]
+
+    def remove(self, object_id):
+        with self.lock:
+            self._remove(object_id)
+
+    def refresh_objects(self, object_ids):
+        """Relire les objets ``object_ids`` en base et mettre l'index à jour"""
+        if not self.is_built:
+            return
+        object_ids = set(object_ids)
+        rows = list(SOURCES[self.kind](id__in=object_ids))
+        with self.lock:
+            for object_id in object_ids:
+                self._remove(object_id)
+            for object_id, code, label, object_keys in rows:
+                self.entries[object_id] = (code, label, object_keys)
+                for key in object_keys:
+                    bisect.insort(self.keys, (key, object_id))
+
+    def lookup(self, query, limit):
+        """Au plus ``limit`` objets dont une clé commence par ``query``"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self.lock:
+            keys = self.keys
+            index = bisect.bisect_left(keys, (prefix,))
+            while index < len(keys) and len(results) < limit:
+                key, object_id = keys[index]
+                if not key.startswith(prefix):
+                    break
+                if object_id not in seen:
+                    seen.add(object_id)
+                    code, label, _ = self.entries[object_id]
+                    results.append({'id': object_id, 'code': code, 'label': label})
+                index += 1
+        return results
+
+    # ------------------------------------------------------------------
+    # Fraîcheur
+    # ------------------------------------------------------------------
+
+    def _refresh_in_background(self):
+        try:
+            self.build()
+        except Exception as e:
+            logger.error(f"Error rebuilding autocomplete index {self.kind}: {str(e)}")
+        finally:
+            self.refreshing = False
+            close_old_connections()
+
+    def ensure_fresh(self):
+        if not self.is_built:
+            with self.lock:
+                if not self.is_built:
+                    self.build()
+            return
+        if time.monotonic() - self.built_at < get_setting('MAX_AGE'):
+            return
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+        if get_setting('BACKGROUND_REFRESH'):
+            threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        else:
+            try:
+                self.build()
+            finally:
+                self.refreshing = False
+
+
+INDEXES = {kind: PrefixIndex(kind) for kind in SOURCES}
+
+
+def get_index(kind):
+    index = INDEXES[kind]
+    index.ensure_fresh()
+    return index
+
+
+def autocomplete(kind, query, limit=None):
+    return get_index(kind).lookup(query, limit or get_setting('DEFAULT_LIMIT'))
+
+
+def reset():
+    """Oublier tous les index (reconstruits à la prochaine utilisation)"""
+    for kind in SOURCES:
+        INDEXES[kind] = PrefixIndex(kind)
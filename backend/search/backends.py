@@ -0,0 +1,185 @@
+# backend/search/backends.py
+"""
+Index de recherche selon la base de données.
+
+- SQLite : table virtuelle FTS5 ``search_document_fts`` (tokenizer
+  ``trigram``, contenu externe lu dans ``search_searchdocument``), tenue à
+  jour par des triggers SQL ;
+- PostgreSQL : extension pg_trgm et index GIN ``gin_trgm_ops`` sur
+  ``content`` (``LIKE '%terme%'`` et opérateur ``<%`` indexés) ;
+- autres bases : ``LIKE`` sur ``content``, sans recherche approchée.
+
+Chaque backend fournit deux requêtes de candidats (au plus ``limit``
+documents, sans tri : le classement est fait par search/engine.py, et un
+``LIMIT`` sans ``ORDER BY`` s'arrête aux premières correspondances).
+"""
+
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import SearchDocument
+
+FTS_TABLE = 'search_document_fts'
+DOCUMENT_TABLE = 'search_searchdocument'
+
+CANDIDATE_FIELDS = ('object_id', 'identifier', 'first_name', 'last_name', 'content', 'title', 'subtitle')
+
+
+class SearchBackend:
+    """Recherche par sous-chaîne sans index dédié"""
+
+    def install(self, schema_editor):
+        pass
+
+    def uninstall(self, schema_editor):
+        pass
+
+    def optimize(self, connection):
+        pass
+
+    def substring_candidates(self, kind, terms, limit):
+        """Documents contenant tous les ``terms`` (normalisés)"""
+        documents = SearchDocument.objects.filter(kind=kind)
+        for term in terms:
+            documents = documents.filter(content__contains=term)
+        return list(documents.values(*CANDIDATE_FIELDS)[:limit])
+
+    def fuzzy_candidates(self, kind, terms, limit):
+        """Documents proches des ``terms`` (fautes de frappe)"""
+        return []
+
+
+class SQLiteFTSBackend(SearchBackend):
+    def install(self, schema_editor):
+        statements = [
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                content, content='{DOCUMENT_TABLE}', content_rowid='id', tokenize='trigram'
+            )
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF content ON {DOCUMENT_TABLE} BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+            END
+            """,
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    def uninstall(self, schema_editor):
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def optimize(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+    @staticmethod
+    def phrase(text):
+        """Chaîne FTS5 entre guillemets (sous-chaîne avec le tokenizer trigram)"""
+        return '"%s"' % text.replace('"', '""')
+
+    def _match(self, kind, expression, limit):
+        matching = RawSQL(
+            f"""
+            SELECT f.rowid FROM {FTS_TABLE} f
+            JOIN {DOCUMENT_TABLE} d ON d.id = f.rowid
+            WHERE f.{FTS_TABLE} MATCH %s AND d.kind = %s
+            LIMIT %s
+            """,
+            [expression, kind, limit]
+        )
+        return list(SearchDocument.objects.filter(id__in=matching).values(*CANDIDATE_FIELDS))
+
+    def substring_candidates(self, kind, terms, limit):
+        # Le tokenizer trigram n'indexe pas les termes de moins de 3 caractères :
+        # ils sont vérifiés par le classement
+        indexed = [term for term in terms if len(term) >= 3]
+        if not indexed:
+            return []
+        return self._match(kind, ' AND '.join(self.phrase(term) for term in indexed), limit)
+
+    @staticmethod
+    def edit_groups(term):
+        """
+        Pour chaque position d'une faute possible, trigrammes du terme situés
+        entièrement avant ou après elle : un mot à une faute près les contient
+        tous
+        """
+        grams = [term[index:index + 3] for index in range(len(term) - 2)]
+        groups = []
+        for position in range(len(term)):
+            group = tuple(sorted({
+                gram for index, gram in enumerate(grams)
+                if index + 2 < position or index > position
+            }))
+            if group and group not in groups:
+                groups.append(group)
+        return groups
+
+    def fuzzy_candidates(self, kind, terms, limit):
+        groups = [group for term in terms if len(term) >= 4 for group in self.edit_groups(term)]
+        if not groups:
+            return []
+        expression = ' OR '.join(
+            '(%s)' % ' AND '.join(self.phrase(gram) for gram in group) for group in groups
+        )
+        return self._match(kind, expression, limit)
+
+
+class PostgresTrigramBackend(SearchBackend):
+    def install(self, schema_editor):
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS search_doc_content_trgm_idx "
+            f"ON {DOCUMENT_TABLE} USING gin (content gin_trgm_ops)"
+        )
+
+    def uninstall(self, schema_editor):
+        schema_editor.execute("DROP INDEX IF EXISTS search_doc_content_trgm_idx")
+
+    def optimize(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {DOCUMENT_TABLE}")
+
+    def substring_candidates(self, kind, terms, limit):
+        # content__contains : LIKE '%terme%' sur la colonne, indexé par gin_trgm_ops
+        documents = SearchDocument.objects.filter(kind=kind)
+        for term in terms:
+            documents = documents.filter(content__contains=term)
+        return list(documents.values(*CANDIDATE_FIELDS)[:limit])
+
+    def fuzzy_candidates(self, kind, terms, limit):
+        query = ' '.join(terms)
+        close = Q()
+        for term in terms:
+            close |= Q(id__in=RawSQL(
+                f"SELECT id FROM {DOCUMENT_TABLE} WHERE kind = %s AND %s <%% content",
+                [kind, term]
+            ))
+        return list(SearchDocument.objects.filter(close, kind=kind).annotate(
+            similarity=RawSQL('word_similarity(%s, content)', [query])
+        ).order_by('-similarity').values(*CANDIDATE_FIELDS)[:limit])
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresTrigramBackend,
+}
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor, SearchBackend)()
@@ -0,0 +1,127 @@
+# backend/search/documents.py
+"""
+Construction et synchronisation des documents de recherche.
+
+Un document par étudiant et par enseignant. Les champs recherchés par les
+anciens filtres ``icontains`` (identifiant, prénom, nom, email, et spécialité
+pour les enseignants) sont normalisés puis concaténés dans ``content``.
+"""
+
+import functools
+import unicodedata
+
+from django.db import connection, transaction
+
+from students.models import Student
+from teachers.models import Teacher
+from .backends import get_backend
+from .models import SearchDocument
+
+BATCH_SIZE = 2000
+
+
+@functools.lru_cache(maxsize=65536)
+def _normalize(value):
+    if value.isascii():
+        return ' '.join(value.lower().split())
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return ' '.join(value.lower().split())
+
+
+def normalize(value):
+    """Minuscules, sans accents, espaces réduits (mémorisé : les noms se répètent)"""
+    return _normalize(str(value or ''))
+
+
+def _document(kind, obj, identifier, extra, subtitle):
+    user = obj.user
+    fields = {
+        'identifier': normalize(identifier),
+        'first_name': normalize(user.first_name),
+        'last_name': normalize(user.last_name),
+    }
+    content = ' '.join(
+        value for value in (
+            fields['identifier'], fields['first_name'], fields['last_name'],
+            normalize(user.email), normalize(extra),
+        ) if value
+    )
+    return SearchDocument(
+        kind=kind,
+        object_id=obj.pk,
+        content=content,
+        title=user.get_full_name() or user.username,
+        subtitle=subtitle,
+        **fields
+    )
+
+
+def student_document(student):
+    return _document('student', student, student.student_id, '',
+                     f"{student.student_id} · {student.department}")
+
+
+def teacher_document(teacher):
+    return _document('teacher', teacher, teacher.teacher_id, teacher.specialization,
+                     f"{teacher.teacher_id} · {teacher.specialization}")
+
+
+BUILDERS = {
+    'student': (Student, student_document),
+    'teacher': (Teacher, teacher_document),
+}
+
+
+def save_document(document):
+    """Créer ou remplacer le document (kind, object_id)"""
+    values = {
+        field: getattr(document, field)
+        for field in ('identifier', 'first_name', 'last_name', 'content', 'title', 'subtitle')
+    }
+    SearchDocument.objects.update_or_create(
+        kind=document.kind, object_id=document.object_id, defaults=values
+    )
+
+
+def index_student(student):
+    save_document(student_document(student))
+
+
+def index_teacher(teacher):
+    save_document(teacher_document(teacher))
+
+
+def remove(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def index_user(user):
+    """Réindexer les profils étudiant / enseignant d'un utilisateur modifié"""
+    for student in Student.objects.filter(user=user):
+        student.user = user
+        index_student(student)
+    for teacher in Teacher.objects.filter(user=user):
+        teacher.user = user
+        index_teacher(teacher)
+
+
+def rebuild(kinds=None):
+    """Reconstruire les documents (de tous les types ou de ``kinds``)"""
+    kinds = kinds or list(BUILDERS)
+    count = 0
+    with transaction.atomic():
+        for kind in kinds:
+            model, build = BUILDERS[kind]
+            SearchDocument.objects.filter(kind=kind).delete()
+            batch = []
+            for obj in model.objects.select_related('user').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+                batch.append(build(obj))
+                if len(batch) == BATCH_SIZE:
+                    SearchDocument.objects.bulk_create(batch)
+                    count += len(batch)
+                    batch = []
+            SearchDocument.objects.bulk_create(batch)
+            count += len(batch)
+    get_backend(connection).optimize(connection)
+    return count
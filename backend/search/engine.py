@@ -0,0 +1,197 @@
+# backend/search/engine.py
+"""
+Recherche classée des étudiants et enseignants.
+
+1. Candidats exacts puis par préfixe (index B-tree sur l'identifiant, le
+   nom et le prénom normalisés), puis par sous-chaîne (index trigrammes du
+   backend), jusqu'à obtenir assez de résultats.
+2. Sans aucune correspondance, candidats approchés (à une faute près
+   d'après les trigrammes, puis préfixe des termes sans leur dernier
+   caractère) pour tolérer les fautes de frappe.
+3. Classement en Python sur au plus quelques centaines de candidats : pour
+   chaque terme, mot identique > début de mot > sous-chaîne > similarité
+   de trigrammes (même définition que pg_trgm). Tous les termes doivent
+   correspondre.
+"""
+
+import functools
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .backends import CANDIDATE_FIELDS, get_backend
+from .documents import normalize
+from .models import SearchDocument
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 100,
+    # Résultats au plus pour les filtres ?search= des listes
+    'LIST_LIMIT': 500,
+    'CANDIDATES': 100,
+    'FUZZY_THRESHOLD': 0.3,
+}
+
+MAX_TERMS = 8
+
+EXACT_SCORE = 4
+PREFIX_SCORE = 3
+SUBSTRING_SCORE = 2
+
+WORD_RE = re.compile(r'[0-9a-z]+')
+
+
+def get_setting(name):
+    return getattr(settings, 'SEARCH_INDEX', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def enabled():
+    return get_setting('ENABLED')
+
+
+def terms_for(query):
+    """Termes normalisés et dédoublonnés de la requête"""
+    terms = []
+    for term in normalize(query).split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+@functools.lru_cache(maxsize=65536)
+def trigrams(word):
+    """Trigrammes d'un mot (mémorisés : les prénoms et noms se répètent)"""
+    padded = f'  {word} '
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+def similarity(left, right):
+    """Similarité de trigrammes (comme pg_trgm.similarity)"""
+    left, right = trigrams(left), trigrams(right)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def term_score(term, document, words, threshold):
+    if term == document['identifier'] or term in words:
+        return EXACT_SCORE
+    if any(word.startswith(term) for word in words) or document['identifier'].startswith(term):
+        return PREFIX_SCORE
+    if term in document['content']:
+        return SUBSTRING_SCORE
+    best = max((similarity(term, word) for word in words), default=0.0)
+    return best if best >= threshold else 0
+
+
+def score_document(terms, document, threshold):
+    words = set(WORD_RE.findall(document['content']))
+    total = 0
+    for term in terms:
+        score = term_score(term, document, words, threshold)
+        if not score:
+            return 0
+        total += score
+    return total
+
+
+NAME_FIELDS = ('identifier', 'last_name', 'first_name')
+
+
+def exact_candidates(kind, terms, limit):
+    """Documents dont chaque terme est l'identifiant, le nom ou le prénom"""
+    condition = Q()
+    for term in terms:
+        condition &= Q(*[Q(**{field: term}) for field in NAME_FIELDS], _connector=Q.OR)
+    return list(SearchDocument.objects.filter(condition, kind=kind).values(*CANDIDATE_FIELDS)[:limit])
+
+
+def prefix_candidates(kind, terms, limit):
+    """Documents dont chaque terme commence l'identifiant, le nom ou le prénom"""
+    condition = Q()
+    for term in terms:
+        upper = term + '\U0010ffff'
+        condition &= Q(*[
+            Q(**{f'{field}__gte': term, f'{field}__lt': upper}) for field in NAME_FIELDS
+        ], _connector=Q.OR)
+    return list(SearchDocument.objects.filter(condition, kind=kind).values(*CANDIDATE_FIELDS)[:limit])
+
+
+def search(kind, query, limit=None):
+    """
+    Documents ``kind`` correspondant à ``query``, classés : liste de dicts
+    (object_id, title, subtitle, identifier, score)
+    """
+    limit = limit or get_setting('DEFAULT_LIMIT')
+    terms = terms_for(query)
+    if not terms:
+        return []
+
+    backend = get_backend(connection)
+    candidate_limit = max(get_setting('CANDIDATES'), limit)
+    threshold = get_setting('FUZZY_THRESHOLD')
+
+    # Du plus pertinent au moins pertinent ; on s'arrête dès que ``limit``
+    # documents correspondent (les étapes suivantes ne feraient pas mieux)
+    stages = (
+        lambda: exact_candidates(kind, terms, candidate_limit),
+        lambda: prefix_candidates(kind, terms, candidate_limit),
+        lambda: backend.substring_candidates(kind, terms, candidate_limit),
+    )
+    # Sans aucune correspondance, tolérer une faute de frappe : trigrammes à
+    # une faute près, puis préfixe sans le dernier caractère (mots courts)
+    fuzzy_stages = (
+        lambda: backend.fuzzy_candidates(kind, terms, candidate_limit),
+        lambda: prefix_candidates(kind, [term[:max(2, len(term) - 1)] for term in terms], candidate_limit),
+    )
+    scored = {}
+    for stage in stages + fuzzy_stages:
+        if stage is fuzzy_stages[0] and scored:
+            break
+        for document in stage():
+            if document['object_id'] in scored:
+                continue
+            score = score_document(terms, document, threshold)
+            if score:
+                scored[document['object_id']] = (score, document)
+        if len(scored) >= limit:
+            break
+
+    ranked = sorted(
+        scored.values(),
+        key=lambda item: (-item[0], item[1]['title'].lower(), item[1]['object_id'])
+    )[:limit]
+    return [
+        {
+            'object_id': document['object_id'],
+            'identifier': document['identifier'],
+            'title': document['title'],
+            'subtitle': document['subtitle'],
+            'score': round(score, 3),
+        }
+        for score, document in ranked
+    ]
+
+
+def search_ids(kind, query, limit=None):
+    """Identifiants (pk) classés des objets ``kind`` correspondant à ``query``"""
+    return [result['object_id'] for result in search(kind, query, limit)]
+
+
+def filter_ranked(queryset, kind, query, limit=None):
+    """
+    Restreindre ``queryset`` aux résultats de la recherche, dans l'ordre du
+    classement (remplacé par l'ordre de la pagination par curseur si elle
+    est demandée)
+    """
+    ids = search_ids(kind, query, limit or get_setting('LIST_LIMIT'))
+    if not ids:
+        return queryset.none()
+    rank = Case(
+        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+        output_field=IntegerField()
+    )
+    return queryset.filter(pk__in=ids).order_by(rank)
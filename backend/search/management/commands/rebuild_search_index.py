@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from search import documents
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les documents de recherche des étudiants et des enseignants"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(documents.BUILDERS),
+            help="Type de document à reconstruire (répétable ; tous par défaut)",
+        )
+
+    def handle(self, *args, **options):
+        count = documents.rebuild(options['kind'])
+        self.stdout.write(self.style.SUCCESS(f"Index de recherche reconstruit : {count} documents"))
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:04
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize(value):
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return ' '.join(value.lower().split())
+
+
+def install_index(apps, schema_editor):
+    """Index trigrammes propre à la base (voir search/backends.py)"""
+    from search.backends import get_backend
+    get_backend(schema_editor.connection).install(schema_editor)
+
+
+def uninstall_index(apps, schema_editor):
+    from search.backends import get_backend
+    get_backend(schema_editor.connection).uninstall(schema_editor)
+
+
+def build_documents(apps, schema_editor):
+    """Indexer les étudiants et enseignants existants"""
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    sources = [
+        ('student', apps.get_model('students', 'Student'), 'student_id', None, 'department'),
+        ('teacher', apps.get_model('teachers', 'Teacher'), 'teacher_id', 'specialization', 'specialization'),
+    ]
+    documents = []
+    for kind, model, identifier_field, extra_field, subtitle_field in sources:
+        for obj in model.objects.select_related('user').iterator():
+            user = obj.user
+            identifier = getattr(obj, identifier_field)
+            extra = getattr(obj, extra_field) if extra_field else ''
+            fields = [normalize(identifier), normalize(user.first_name), normalize(user.last_name),
+                      normalize(user.email), normalize(extra)]
+            full_name = f"{user.first_name} {user.last_name}".strip()
+            documents.append(SearchDocument(
+                kind=kind,
+                object_id=obj.pk,
+                identifier=fields[0],
+                first_name=fields[1],
+                last_name=fields[2],
+                content=' '.join(value for value in fields if value),
+                title=full_name or user.username,
+                subtitle=f"{identifier} · {getattr(obj, subtitle_field)}",
+            ))
+    SearchDocument.objects.bulk_create(documents, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('students', '0002_student_student_enrolled_id_idx'),
+        ('teachers', '0002_teacher_teacher_hired_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Étudiant'), ('teacher', 'Enseignant')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('identifier', models.CharField(max_length=50)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('content', models.TextField()),
+                ('title', models.CharField(max_length=300)),
+                ('subtitle', models.CharField(blank=True, max_length=300)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Document de recherche',
+                'verbose_name_plural': 'Documents de recherche',
+                'indexes': [models.Index(fields=['kind', 'identifier'], name='search_doc_identifier_idx'), models.Index(fields=['kind', 'last_name'], name='search_doc_last_name_idx'), models.Index(fields=['kind', 'first_name'], name='search_doc_first_name_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(install_index, uninstall_index),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Document de recherche d'un étudiant ou d'un enseignant : champs
+    normalisés (minuscules, sans accents) et texte concaténé ``content``,
+    indexé en trigrammes (FTS5 sur SQLite, pg_trgm sur PostgreSQL).
+    Maintenu par search/signals.py.
+    """
+    KIND_CHOICES = [
+        ('student', 'Étudiant'),
+        ('teacher', 'Enseignant'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    identifier = models.CharField(max_length=50)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    content = models.TextField()
+    # Affichage dans les résultats de /api/search/
+    title = models.CharField(max_length=300)
+    subtitle = models.CharField(max_length=300, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        # Recherche par préfixe des requêtes de moins de trois caractères
+        indexes = [
+            models.Index(fields=['kind', 'identifier'], name='search_doc_identifier_idx'),
+            models.Index(fields=['kind', 'last_name'], name='search_doc_last_name_idx'),
+            models.Index(fields=['kind', 'first_name'], name='search_doc_first_name_idx'),
+        ]
+        verbose_name = 'Document de recherche'
+        verbose_name_plural = 'Documents de recherche'
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
@@ -0,0 +1,73 @@
+# backend/search/signals.py
+import functools
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from courses.models import Course
+from students.models import Student
+from teachers.models import Teacher
+from . import autocomplete, documents
+
+
+def refresh_autocomplete(kind, object_ids):
+    """Mettre à jour l'index d'autocomplétion après le commit"""
+    object_ids = list(object_ids)
+    if not object_ids:
+        return
+    transaction.on_commit(functools.partial(_refresh_autocomplete, kind, object_ids))
+
+
+def _refresh_autocomplete(kind, object_ids):
+    autocomplete.INDEXES[kind].refresh_objects(object_ids)
+
+
+def remove_autocomplete(kind, object_id):
+    transaction.on_commit(lambda: autocomplete.INDEXES[kind].remove(object_id))
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, **kwargs):
+    """Indexer l'étudiant créé ou modifié"""
+    documents.index_student(instance)
+    refresh_autocomplete('student', [instance.pk])
+
+
+@receiver(post_save, sender=Teacher)
+def teacher_saved(sender, instance, **kwargs):
+    """Indexer l'enseignant créé ou modifié"""
+    documents.index_teacher(instance)
+    refresh_autocomplete('teacher', [instance.pk])
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, **kwargs):
+    refresh_autocomplete('course', [instance.pk])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """Le nom et l'email sont portés par l'utilisateur"""
+    if not created:
+        documents.index_user(instance)
+        refresh_autocomplete('student', Student.objects.filter(user=instance).values_list('id', flat=True))
+        refresh_autocomplete('teacher', Teacher.objects.filter(user=instance).values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    documents.remove('student', instance.pk)
+    remove_autocomplete('student', instance.pk)
+
+
+@receiver(post_delete, sender=Teacher)
+def teacher_deleted(sender, instance, **kwargs):
+    documents.remove('teacher', instance.pk)
+    remove_autocomplete('teacher', instance.pk)
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    remove_autocomplete('course', instance.pk)
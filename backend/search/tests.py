@@ -0,0 +1,151 @@
+from datetime import date
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from students.models import Student
+from teachers.models import Teacher
+from . import autocomplete, documents, engine
+from .models import SearchDocument
+
+
+class SearchIndexTest(TestCase):
+    """Index de recherche tenu à jour par les signaux, résultats classés"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.students = {}
+        for index, (first_name, last_name) in enumerate([
+            ('Léa', 'Martin'), ('Hugo', 'Martinez'), ('Inès', 'Lamartine'), ('Paul', 'Durand'),
+        ]):
+            user = User.objects.create_user(
+                username=f'etu{index}', first_name=first_name, last_name=last_name,
+                email=f'etu{index}@universite.fr'
+            )
+            cls.students[last_name] = Student.objects.create(
+                user=user, student_id=f'S{index:03d}', enrollment_date=date(2024, 9, 1),
+                faculty='Sciences', department='informatique'
+            )
+        teacher_user = User.objects.create_user(username='prof', first_name='Marie', last_name='Curie')
+        cls.teacher = Teacher.objects.create(
+            user=teacher_user, teacher_id='T001', hire_date=date(2020, 1, 1),
+            department='sciences', specialization='Physique nucléaire', rank='professor'
+        )
+
+    def titles(self, kind, query):
+        return [result['title'] for result in engine.search(kind, query)]
+
+    def test_exact_then_prefix_then_substring(self):
+        self.assertEqual(self.titles('student', 'martin'), ['Léa Martin', 'Hugo Martinez', 'Inès Lamartine'])
+
+    def test_short_prefix_accents_and_identifier(self):
+        self.assertEqual(self.titles('student', 'du'), ['Paul Durand'])
+        self.assertEqual(self.titles('student', 'lea'), ['Léa Martin'])
+        self.assertEqual(self.titles('student', 's003'), ['Paul Durand'])
+        self.assertEqual(self.titles('teacher', 'nucleaire'), ['Marie Curie'])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.titles('student', 'Durant'), ['Paul Durand'])
+        self.assertEqual(self.titles('student', 'zzzz'), [])
+
+    def test_signals_keep_documents_in_sync(self):
+        student = self.students['Durand']
+        student.user.last_name = 'Dupont'
+        student.user.save()
+        self.assertEqual(self.titles('student', 'dupont'), ['Paul Dupont'])
+
+        student.delete()
+        self.assertEqual(self.titles('student', 'dupont'), [])
+        self.assertFalse(SearchDocument.objects.filter(kind='student', object_id=student.pk).exists())
+
+    def test_rebuild(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(documents.rebuild(), 5)
+        self.assertEqual(self.titles('student', 'martinez'), ['Hugo Martinez'])
+
+    def test_student_list_uses_ranked_search(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.get(reverse('student-list'), {'search': 'martin'})
+        self.assertEqual([student['student_id'] for student in response.data], ['S000', 'S001', 'S002'])
+
+        response = client.get(reverse('search:search'), {'q': 'curie', 'type': 'all'})
+        self.assertEqual(response.data['results'][0]['type'], 'teacher')
+
+
+class AutocompleteTest(TestCase):
+    """Index de préfixes en mémoire pour les sélecteurs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.students = []
+        for index, (first_name, last_name) in enumerate([('Léa', 'Martin'), ('Hugo', 'Martinez'), ('Paul', 'Durand')]):
+            user = User.objects.create_user(username=f'etu{index}', first_name=first_name, last_name=last_name)
+            cls.students.append(Student.objects.create(
+                user=user, student_id=f'S{index:03d}', enrollment_date=date(2024, 9, 1),
+                faculty='Sciences', department='informatique'
+            ))
+        cls.course = Course.objects.create(
+            course_code='INF101', title='Bases de données', description='', credits=6,
+            department='informatique', semester='fall', academic_year=2024
+        )
+
+    def setUp(self):
+        autocomplete.reset()
+
+    def codes(self, kind, query, limit=10):
+        return [result['code'] for result in autocomplete.autocomplete(kind, query, limit)]
+
+    def test_prefix_on_identifier_names_and_title(self):
+        self.assertEqual(self.codes('student', 's00'), ['S000', 'S001', 'S002'])
+        self.assertEqual(self.codes('student', 'mart'), ['S000', 'S001'])
+        self.assertEqual(self.codes('student', 'lea m'), ['S000'])
+        self.assertEqual(self.codes('student', 'durand p'), ['S002'])
+        self.assertEqual(self.codes('student', 'mart', limit=1), ['S000'])
+        self.assertEqual(self.codes('course', 'inf'), ['INF101'])
+        self.assertEqual(self.codes('course', 'donnees'), ['INF101'])
+        self.assertEqual(self.codes('course', 'artin'), [])
+
+    def test_lookup_after_build_hits_no_database(self):
+        self.codes('student', 'p')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.codes('student', 'paul'), ['S002'])
+
+    def test_signals_update_index_after_commit(self):
+        self.codes('student', 'p')
+        student = self.students[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            student.user.last_name = 'Dupont'
+            student.user.save()
+        self.assertEqual(self.codes('student', 'dupont'), ['S002'])
+        self.assertEqual(self.codes('student', 'durand'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertEqual(self.codes('student', 's002'), [])
+
+        self.codes('course', 'inf')
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.create(
+                course_code='INF102', title='Réseaux', description='', credits=4,
+                department='informatique', semester='spring', academic_year=2024
+            )
+        self.assertEqual(self.codes('course', 'inf'), ['INF101', 'INF102'])
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.get(reverse('search:autocomplete', args=['student']), {'q': 'hugo'})
+        self.assertEqual(response.data['results'], [{'id': self.students[1].pk, 'code': 'S001', 'label': 'S001 - Hugo Martinez'}])
+
+        response = client.get(reverse('search:autocomplete', args=['room']), {'q': 'a'})
+        self.assertEqual(response.status_code, 404)
+        response = client.get(reverse('search:autocomplete', args=['student']), {'q': 'a', 'limit': 'x'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,118 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+import logging
+
+from . import autocomplete as autocomplete_index, engine
+
+logger = logging.getLogger(__name__)
+
+TYPES = {
+    'student': ['student'],
+    'teacher': ['teacher'],
+    'all': ['student', 'teacher'],
+}
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """
+    Recherche classée des étudiants et enseignants (champ de recherche du
+    front-end) : ?q=...&type=student|teacher|all&limit=10
+    """
+    try:
+        query = request.GET.get('q', '').strip()
+        kinds = TYPES.get(request.GET.get('type', 'all'))
+        if kinds is None:
+            return Response({
+                'success': False,
+                'error': 'Type invalide',
+                'detail': f"Types acceptés : {', '.join(TYPES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        limit = request.GET.get('limit')
+        try:
+            limit = int(limit) if limit else engine.get_setting('DEFAULT_LIMIT')
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= engine.get_setting('MAX_LIMIT'):
+            return Response({
+                'success': False,
+                'error': 'Limite invalide',
+                'detail': f"La limite doit être entre 1 et {engine.get_setting('MAX_LIMIT')}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = []
+        for kind in kinds:
+            results.extend({'type': kind, **result} for result in engine.search(kind, query, limit))
+        results.sort(key=lambda result: -result['score'])
+        results = results[:limit]
+        
+        return Response({
+            'success': True,
+            'query': query,
+            'count': len(results),
+            'results': [
+                {
+                    'type': result['type'],
+                    'id': result['object_id'],
+                    'name': result['title'],
+                    'detail': result['subtitle'],
+                    'score': result['score'],
+                }
+                for result in results
+            ]
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in search: {str(e)}")
+        return Response({
+            'success': False,
+            'error': 'Erreur lors de la recherche',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def autocomplete(request, kind):
+    """
+    Suggestions des sélecteurs (création de notes, d'inscriptions, de
+    transactions) : ?q=<préfixe>&limit=10, servies par l'index en mémoire
+    """
+    if kind not in autocomplete_index.SOURCES:
+        return Response({
+            'success': False,
+            'error': 'Type invalide',
+            'detail': f"Types acceptés : {', '.join(autocomplete_index.SOURCES)}"
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        limit = request.GET.get('limit')
+        try:
+            limit = int(limit) if limit else autocomplete_index.get_setting('DEFAULT_LIMIT')
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= autocomplete_index.get_setting('MAX_LIMIT'):
+            return Response({
+                'success': False,
+                'error': 'Limite invalide',
+                'detail': f"La limite doit être entre 1 et {autocomplete_index.get_setting('MAX_LIMIT')}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = autocomplete_index.autocomplete(kind, request.GET.get('q', ''), limit)
+        return Response({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in autocomplete: {str(e)}")
+        return Response({
+            'success': False,
+            'error': "Erreur lors de l'autocomplétion",
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
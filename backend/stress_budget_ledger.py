@@ -0,0 +1,128 @@
+# backend/stress_budget_ledger.py
+"""
+Test de charge des engagements / dépenses de budget (finance/budget_ledger.py)
+sur une base SQLite temporaire (la base de développement n'est pas touchée).
+
+    python stress_budget_ledger.py [--writers 32] [--operations 100]
+
+``--writers`` threads engagent puis dépensent chacun ``--operations`` fois
+10 sur un budget de ``--allocated``, d'abord avec l'ancienne logique
+(lecture, calcul en Python, ``save()``), puis avec budget_ledger.py.
+Attendu : engagements + dépenses acceptés = montants en base (pas de mise à
+jour perdue), et dépensé + engagé <= alloué (pas de dépassement).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+
+AMOUNT = Decimal('10')
+
+
+def configure(path):
+    django.setup()
+    from django.conf import settings
+
+    settings.DATABASES['default'].update({'NAME': path, 'OPTIONS': {'timeout': 60}})
+    settings.STATS_CACHE = {**settings.STATS_CACHE, 'ENABLED': False}
+
+
+def legacy_commit(budget_id, amount):
+    """Ancien Budget.commit_amount : lecture, calcul, save()"""
+    from finance.models import Budget
+
+    budget = Budget.objects.get(pk=budget_id)
+    if budget.allocated_amount - budget.spent_amount - budget.committed_amount >= amount:
+        budget.committed_amount += amount
+        budget.save()
+        return True
+    return False
+
+
+def legacy_spend(budget_id, amount):
+    """Ancien Budget.spend_amount"""
+    from finance.models import Budget
+
+    budget = Budget.objects.get(pk=budget_id)
+    if budget.spent_amount + amount <= budget.allocated_amount:
+        budget.spent_amount += amount
+        budget.committed_amount = max(budget.committed_amount - amount, Decimal(0))
+        budget.save()
+        return True
+    return False
+
+
+def run(label, commit, spend, writers, operations, allocated):
+    from django.db import connection
+
+    from finance.models import Budget
+
+    budget = Budget.objects.create(department='sciences', year=2026, allocated_amount=allocated)
+
+    def work(writer):
+        counts = [0, 0]
+        try:
+            for _ in range(operations):
+                if commit(budget.pk, AMOUNT):
+                    counts[0] += 1
+                    counts[1] += spend(budget.pk, AMOUNT)
+            return counts
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(writers) as pool:
+        results = list(pool.map(work, range(writers)))
+    elapsed = time.perf_counter() - started
+
+    budget.refresh_from_db()
+    committed = sum(result[0] for result in results)
+    spent = sum(result[1] for result in results)
+    lost = (spent * AMOUNT - budget.spent_amount) + ((committed - spent) * AMOUNT - budget.committed_amount)
+    # Dépenses acceptées (et non seulement celles restées en base) au-delà de l'alloué
+    overspent = max(spent * AMOUNT, budget.spent_amount + budget.committed_amount) - budget.allocated_amount
+    print(f"{label:14} {elapsed:6.1f} s  engagés {committed:6d}  dépensés {spent:6d}  "
+          f"en base : dépensé {budget.spent_amount}, engagé {budget.committed_amount}  "
+          f"perdu {lost}  dépassement {max(overspent, 0)}")
+    return lost == 0 and overspent <= 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--operations', type=int, default=100)
+    parser.add_argument('--allocated', type=Decimal, default=Decimal('25000'))
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'stress.sqlite3')
+    configure(path)
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    from finance import budget_ledger
+
+    call_command('migrate', verbosity=0)
+    try:
+        print(f"🚀 {args.writers} écrivains x {args.operations} engagements + dépenses de {AMOUNT}, "
+              f"alloué {args.allocated}")
+        run('ancien save()', legacy_commit, legacy_spend, args.writers, args.operations, args.allocated)
+        safe = run('budget_ledger', budget_ledger.commit, budget_ledger.spend,
+                   args.writers, args.operations, args.allocated)
+        return 0 if safe else 1
+    finally:
+        connection.close()
+        os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# backend/stress_transaction_numbers.py
+"""
+Test de charge des numéros de transaction (finance/numbering.py) sur une
+base SQLite temporaire partagée par plusieurs processus (la base de
+développement n'est pas touchée).
+
+    python stress_transaction_numbers.py [--rows 100000] [--processes 8] [--threads 2]
+
+Chaque tâche crée ``--task-size`` transactions : quelques-unes une par une
+(``save()``), le reste par ``bulk_create`` en lots de ``--batch``. Le
+script échoue si un numéro est dupliqué (la contrainte d'unicité fait
+aussi échouer la tâche fautive) ou si une transaction n'est pas numérotée.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from decimal import Decimal
+from multiprocessing import get_context
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
+
+
+def configure(path):
+    """Django initialisé sur la base de test ``path``"""
+    django.setup()
+    from django.conf import settings
+
+    settings.DATABASES['default'].update({'NAME': path, 'OPTIONS': {'timeout': 60}})
+    settings.STATS_CACHE = {**settings.STATS_CACHE, 'ENABLED': False}
+
+
+def worker_init(path):
+    configure(path)
+
+
+def create_transactions(task, size, singles, batch, threads):
+    from django.db import connection
+
+    from finance.models import Transaction
+
+    def run(part, count):
+        try:
+            today = date.today()
+            # Quelques transactions à cheval sur deux années
+            transactions = [
+                Transaction(transaction_type='tuition', amount=Decimal('10.000'),
+                            date=today - timedelta(days=(task * 7 + part + index) % 400))
+                for index in range(count)
+            ]
+            for transaction in transactions[:singles]:
+                transaction.save()
+            rest = transactions[singles:]
+            for start in range(0, len(rest), batch):
+                Transaction.objects.bulk_create(rest[start:start + batch])
+            return count
+        finally:
+            connection.close()
+
+    per_thread = size // threads
+    with ThreadPoolExecutor(threads) as pool:
+        counts = list(pool.map(run, range(threads), [per_thread] * (threads - 1) + [size - per_thread * (threads - 1)]))
+    return sum(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=2)
+    parser.add_argument('--task-size', type=int, default=2000)
+    parser.add_argument('--singles', type=int, default=10)
+    parser.add_argument('--batch', type=int, default=250)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'stress.sqlite3')
+    configure(path)
+
+    from django.core.management import call_command
+    from django.db import connection
+    from django.db.models import Count
+
+    from finance.models import Transaction, TransactionSequence
+
+    call_command('migrate', verbosity=0)
+    connection.close()
+    try:
+        tasks = [args.task_size] * (args.rows // args.task_size)
+        if args.rows % args.task_size:
+            tasks.append(args.rows % args.task_size)
+
+        print(f"🚀 {args.rows} transactions, {args.processes} processus x {args.threads} threads...")
+        started = time.perf_counter()
+        created = 0
+        with ProcessPoolExecutor(args.processes, mp_context=get_context('spawn'),
+                                 initializer=worker_init, initargs=(path,)) as pool:
+            futures = [
+                pool.submit(create_transactions, task, size, args.singles, args.batch, args.threads)
+                for task, size in enumerate(tasks)
+            ]
+            for future in as_completed(futures):
+                created += future.result()
+        elapsed = time.perf_counter() - started
+
+        total = Transaction.objects.count()
+        missing = Transaction.objects.filter(transaction_number__isnull=True).count()
+        duplicates = (Transaction.objects.values('transaction_number').annotate(n=Count('id'))
+                      .filter(n__gt=1).count())
+        distinct = Transaction.objects.values('transaction_number').distinct().count()
+        print(f"créées : {created} en {elapsed:.1f} s ({created / elapsed:.0f}/s)")
+        print(f"en base : {total}, numéros distincts : {distinct}, doublons : {duplicates}, sans numéro : {missing}")
+        for sequence in TransactionSequence.objects.order_by('year'):
+            print(f"séquence {sequence.year} : prochain {sequence.next_value}")
+        return 0 if total == created == distinct == args.rows and not duplicates and not missing else 1
+    finally:
+        connection.close()
+        os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,9 @@ class Student(models.Model):
     
     class Meta:
         ordering = ['-enrollment_date']
+        indexes = [
+            models.Index(fields=['-enrollment_date', 'id'], name='student_enrolled_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student_id} - {self.user.get_full_name()}"
\ No newline at end of file
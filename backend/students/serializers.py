@@ -26,6 +26,8 @@ class StudentWriteSerializer(serializers.ModelSerializer):
             'faculty', 'department', 'current_year', 'gpa', 'status',
             'first_name', 'last_name', 'email', 'phone', 'date_of_birth'
         ]
+        # Calculé depuis les notes (grades/gpa.py)
+        read_only_fields = ['gpa']
     
     def create(self, validated_data):
         """Créer un étudiant avec un utilisateur associé"""
@@ -121,4 +123,5 @@ class StudentReadSerializer(serializers.ModelSerializer):
             'id', 'user', 'student_id', 'first_name', 'last_name', 'email', 
             'phone', 'date_of_birth', 'enrollment_date', 'graduation_date',
             'faculty', 'department', 'current_year', 'gpa', 'status'
-        ]
\ No newline at end of file
+        ]
+        read_only_fields = ['gpa']
\ No newline at end of file
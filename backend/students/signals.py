@@ -0,0 +1,12 @@
+# backend/students/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from university_management import stats_cache
+from .models import Student
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_changed(sender, **kwargs):
+    """Invalider les statistiques en cache qui dépendent des étudiants"""
+    stats_cache.invalidate(sender)
@@ -0,0 +1,44 @@
+# backend/students/statistics.py
+"""
+Statistiques des étudiants (endpoint ``student_statistics`` et tableau de
+bord) : une agrégation conditionnelle au lieu d'un ``count()`` par chiffre.
+"""
+
+from datetime import datetime
+
+from django.db.models import Count, Q
+
+from university_management.query_plan import aggregate
+from .models import Student
+
+# Entrées de stats_cache (endpoint DRF et tableau de bord asynchrone)
+CACHE_ENDPOINT = 'student-statistics'
+CACHE_MODELS = (Student,)
+
+
+def statistics_plan():
+    # Nouveaux étudiants ce mois-ci
+    this_month_start = datetime.now().replace(day=1)
+    counts = (yield {
+        'counts': aggregate(
+            Student.objects.all(),
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            graduated=Count('id', filter=Q(status='graduated')),
+            new_this_month=Count('id', filter=Q(enrollment_date__gte=this_month_start)),
+        ),
+    })['counts']
+
+    # Calcul du taux de rétention
+    total_students = counts['total']
+    if total_students > 0:
+        retention_rate = round(((counts['active'] + counts['graduated']) / total_students) * 100, 1)
+    else:
+        retention_rate = 0
+
+    return {
+        'total_students': total_students,
+        'active_students': counts['active'],
+        'new_this_month': counts['new_this_month'],
+        'retention_rate': retention_rate,
+    }
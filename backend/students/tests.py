@@ -1,3 +1,52 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from grades import gpa
+from grades.models import Grade
+from .models import Student
+
+
+class StudentGpaTest(TestCase):
+    """Le GPA est calculé depuis les notes : l'API étudiant ne le modifie pas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='pass', user_type='admin')
+        cls.student = Student.objects.create(
+            user=User.objects.create_user(username='etu', first_name='Paul', last_name='Durand',
+                                          email='paul@example.org'),
+            student_id='S001', enrollment_date=date(2024, 9, 1),
+            faculty='Sciences', department='informatique'
+        )
+        course = Course.objects.create(course_code='MATH101', title='Maths', description='', credits=3,
+                                       department='informatique', semester='fall', academic_year=2025)
+        Grade.objects.create(student=cls.student, course=course, score=16, semester='fall', academic_year=2025)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_update_ignores_gpa(self):
+        response = self.client.put(reverse('student-detail', args=[self.student.pk]),
+                                   {'gpa': '1.00', 'current_year': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['gpa'], response.data['current_year']), ('3.20', 2))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.gpa, Decimal('3.20'))
+        self.assertEqual(gpa.verify(), [])
 
-# Create your tests here.
+    def test_create_ignores_gpa(self):
+        response = self.client.post(reverse('student-list'), {
+            'student_id': 'S002', 'enrollment_date': '2025-09-01', 'faculty': 'Sciences',
+            'department': 'informatique', 'current_year': 1, 'gpa': '3.90', 'status': 'active',
+            'first_name': 'Léa', 'last_name': 'Martin', 'email': 'lea@example.org',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Student.objects.get(student_id='S002').gpa, Decimal('0.00'))
+        self.assertEqual(gpa.verify(), [])
@@ -3,42 +3,58 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
-from datetime import datetime
 from .models import Student
 from .serializers import StudentWriteSerializer, StudentReadSerializer
+from .statistics import CACHE_ENDPOINT, CACHE_MODELS, statistics_plan
 from django.contrib.auth import get_user_model
-import csv
-from django.http import HttpResponse
+from university_management.csv_export import streaming_csv_response, QUERY_CHUNK_SIZE
+from university_management.pagination import paginated_list_response
+from university_management.query_plan import run
+from university_management.stats_cache import cached_statistics
+from search import engine as search_engine
 
 User = get_user_model()
 
+# Ordre stable de la liste des étudiants (clé de pagination par curseur)
+STUDENT_ORDERING = ('-enrollment_date', 'id')
+
+def filter_students(request, students):
+    """Appliquer les filtres de la liste (search, department, status)"""
+    search = request.GET.get('search', '')
+    department = request.GET.get('department', '')
+    status_filter = request.GET.get('status', '')
+    
+    if search and search_engine.enabled():
+        # Index de recherche (search/) : résultats classés, fautes de frappe tolérées
+        students = search_engine.filter_ranked(students, 'student', search)
+    elif search:
+        students = students.filter(
+            Q(student_id__icontains=search) |
+            Q(user__first_name__icontains=search) |
+            Q(user__last_name__icontains=search) |
+            Q(user__email__icontains=search)
+        )
+    
+    if department and department != 'all':
+        students = students.filter(department=department)
+    
+    if status_filter and status_filter != 'all':
+        students = students.filter(status=status_filter)
+    
+    return students
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def student_list(request):
     """Récupère la liste des étudiants (GET) ou crée un nouvel étudiant (POST)"""
     
     if request.method == 'GET':
-        # Filtres
-        search = request.GET.get('search', '')
-        department = request.GET.get('department', '')
-        status_filter = request.GET.get('status', '')
-        
-        students = Student.objects.select_related('user').all()
-        
-        # Application des filtres
-        if search:
-            students = students.filter(
-                Q(student_id__icontains=search) |
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search)
-            )
+        students = filter_students(request, Student.objects.select_related('user').all())
         
-        if department and department != 'all':
-            students = students.filter(department=department)
-        
-        if status_filter and status_filter != 'all':
-            students = students.filter(status=status_filter)
+        # Pagination par curseur si demandée (?cursor=... ou ?page_size=...)
+        response = paginated_list_response(request, students, STUDENT_ORDERING, StudentReadSerializer)
+        if response is not None:
+            return response
         
         serializer = StudentReadSerializer(students, many=True)
         return Response(serializer.data)
@@ -101,33 +117,11 @@ def student_detail(request, pk):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_statistics(CACHE_ENDPOINT, models=CACHE_MODELS)
 def student_statistics(request):
     """Récupère les statistiques des étudiants"""
     try:
-        total_students = Student.objects.count()
-        active_students = Student.objects.filter(status='active').count()
-        
-        # Nouveaux étudiants ce mois-ci
-        this_month_start = datetime.now().replace(day=1)
-        new_this_month = Student.objects.filter(
-            enrollment_date__gte=this_month_start
-        ).count()
-        
-        # Calcul du taux de rétention
-        total_active = Student.objects.filter(status='active').count()
-        total_graduated = Student.objects.filter(status='graduated').count()
-        
-        if total_students > 0:
-            retention_rate = round(((total_active + total_graduated) / total_students) * 100, 1)
-        else:
-            retention_rate = 0
-        
-        data = {
-            'total_students': total_students,
-            'active_students': active_students,
-            'new_this_month': new_this_month,
-            'retention_rate': retention_rate,
-        }
+        data = run(statistics_plan())
         
         print("📈 Statistiques étudiants:", data)
         return Response(data)
@@ -141,43 +135,36 @@ def student_statistics(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+def _student_csv_rows(students):
+    for student in students:
+        yield [
+            student.student_id,
+            student.user.last_name if student.user else '',
+            student.user.first_name if student.user else '',
+            student.user.email if student.user else '',
+            student.user.phone if hasattr(student.user, 'phone') else '',
+            student.department,
+            student.current_year,
+            str(student.gpa),
+            student.get_status_display(),
+            student.enrollment_date.strftime('%d/%m/%Y') if student.enrollment_date else ''
+        ]
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def export_students(request):
-    """Exporte les étudiants en CSV"""
+    """Exporte les étudiants en CSV (streaming, mêmes filtres que la liste)"""
     try:
-        # Créer la réponse HTTP
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="etudiants.csv"'
+        students = filter_students(request, Student.objects.select_related('user').all())
         
-        writer = csv.writer(response)
-        writer.writerow([
+        return streaming_csv_response('etudiants.csv', [
             'ID Étudiant', 'Nom', 'Prénom', 'Email', 'Téléphone',
             'Département', 'Année en cours', 'GPA', 'Statut', 'Date d\'inscription'
-        ])
-        
-        students = Student.objects.select_related('user').all()
-        
-        for student in students:
-            writer.writerow([
-                student.student_id,
-                student.user.last_name if student.user else '',
-                student.user.first_name if student.user else '',
-                student.user.email if student.user else '',
-                student.user.phone if hasattr(student.user, 'phone') else '',
-                student.department,
-                student.current_year,
-                str(student.gpa),
-                student.get_status_display(),
-                student.enrollment_date.strftime('%d/%m/%Y') if student.enrollment_date else ''
-            ])
-        
-        print("✅ Export CSV réalisé")
-        return response
+        ], _student_csv_rows(students.iterator(chunk_size=QUERY_CHUNK_SIZE)))
         
     except Exception as e:
         print("❌ Erreur export:", str(e))
         return Response({
             'error': 'Erreur lors de l\'export',
             'detail': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -18,6 +18,9 @@ class Teacher(models.Model):
     
     class Meta:
         ordering = ['-hire_date']
+        indexes = [
+            models.Index(fields=['-hire_date', 'id'], name='teacher_hired_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.teacher_id} - {self.user.get_full_name()}"
\ No newline at end of file
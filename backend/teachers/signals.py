@@ -0,0 +1,12 @@
+# backend/teachers/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from university_management import stats_cache
+from .models import Teacher
+
+
+@receiver([post_save, post_delete], sender=Teacher)
+def teacher_changed(sender, **kwargs):
+    """Invalider les statistiques en cache qui dépendent des enseignants"""
+    stats_cache.invalidate(sender)
@@ -0,0 +1,61 @@
+# backend/teachers/statistics.py
+"""
+Statistiques des enseignants (endpoint ``teacher_statistics`` et tableau de
+bord). Les requêtes sont indépendantes (voir
+``university_management/query_plan.py``).
+"""
+
+from datetime import datetime
+
+from django.db.models import Count, Q
+
+from university_management.query_plan import aggregate, fetch
+from .models import Teacher
+
+# Entrées de stats_cache (endpoint DRF et tableau de bord asynchrone)
+CACHE_ENDPOINT = 'teacher-statistics'
+CACHE_MODELS = (Teacher,)
+
+
+def statistics_plan():
+    # Nouveaux enseignants ce mois-ci
+    this_month_start = datetime.now().replace(day=1)
+    results = yield {
+        'counts': aggregate(
+            Teacher.objects.all(),
+            total=Count('id'),
+            new_this_month=Count('id', filter=Q(hire_date__gte=this_month_start)),
+            # Enseignants avec bureau attribué
+            with_office=Count('id', filter=Q(office_number__isnull=False) & ~Q(office_number='')),
+        ),
+        # Répartition par département
+        'departments': fetch(Teacher.objects.values('department').annotate(
+            count=Count('id')
+        ).order_by('-count')),
+        # Répartition par grade
+        'ranks': fetch(Teacher.objects.values('rank').annotate(
+            count=Count('id')
+        ).order_by('rank')),
+        # Derniers enseignants ajoutés
+        'recent': fetch(Teacher.objects.select_related('user').order_by('-hire_date')[:5]),
+    }
+
+    counts = results['counts']
+    departments = results['departments']
+    ranks = results['ranks']
+    return {
+        'total_teachers': counts['total'],
+        'new_this_month': counts['new_this_month'],
+        'with_office': counts['with_office'],
+        'departments': departments,
+        'ranks': ranks,
+        'departments_count': len(departments),
+        'ranks_count': len(ranks),
+        'recent_teachers': [{
+            'id': teacher.id,
+            'teacher_id': teacher.teacher_id,
+            'name': teacher.user.get_full_name(),
+            'department': teacher.department,
+            'hire_date': teacher.hire_date
+        } for teacher in results['recent']]
+    }
@@ -2,15 +2,22 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count
-from datetime import datetime
+from django.db.models import Q
 from .models import Teacher
 from .serializers import TeacherSerializer
+from .statistics import CACHE_ENDPOINT, CACHE_MODELS, statistics_plan
 from django.contrib.auth import get_user_model
+from university_management.pagination import KeysetPaginator, InvalidCursor
+from university_management.query_plan import run
+from university_management.stats_cache import cached_statistics
+from search import engine as search_engine
 import traceback
 
 User = get_user_model()
 
+# Ordre stable de la liste des enseignants (clé de pagination par curseur)
+TEACHER_ORDERING = ('-hire_date', 'id')
+
 def create_teacher_manually(data):
     """
     Fonction de secours pour créer un enseignant manuellement
@@ -72,7 +79,10 @@ def teacher_list(request):
             teachers = Teacher.objects.select_related('user').all()
             
             # Application des filtres
-            if search:
+            if search and search_engine.enabled():
+                # Index de recherche (search/) : résultats classés, fautes de frappe tolérées
+                teachers = search_engine.filter_ranked(teachers, 'teacher', search)
+            elif search:
                 teachers = teachers.filter(
                     Q(teacher_id__icontains=search) |
                     Q(user__first_name__icontains=search) |
@@ -87,8 +97,29 @@ def teacher_list(request):
             if rank_filter and rank_filter != 'all':
                 teachers = teachers.filter(rank=rank_filter)
             
-            # Tri par défaut
-            teachers = teachers.order_by('-hire_date')
+            # Tri par défaut (les résultats d'une recherche restent classés par pertinence)
+            if not (search and search_engine.enabled()):
+                teachers = teachers.order_by(*TEACHER_ORDERING)
+            
+            # Pagination par curseur si demandée (?cursor=... ou ?page_size=...)
+            try:
+                page = KeysetPaginator(TEACHER_ORDERING).paginate(request, teachers)
+            except InvalidCursor as e:
+                return Response({
+                    'success': False,
+                    'error': 'Pagination invalide',
+                    'detail': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            if page is not None:
+                serializer = TeacherSerializer(page.results, many=True)
+                return Response({
+                    'success': True,
+                    'data': serializer.data,
+                    'count': page.count,
+                    'next': page.next,
+                    'previous': page.previous
+                })
             
             serializer = TeacherSerializer(teachers, many=True)
             return Response({
@@ -323,57 +354,11 @@ def teacher_detail(request, pk):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_statistics(CACHE_ENDPOINT, models=CACHE_MODELS)
 def teacher_statistics(request):
     """Récupère les statistiques des enseignants"""
     try:
-        total_teachers = Teacher.objects.count()
-        
-        # Répartition par département
-        departments = Teacher.objects.values('department').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        # Répartition par grade
-        ranks = Teacher.objects.values('rank').annotate(
-            count=Count('id')
-        ).order_by('rank')
-        
-        # Nouveaux enseignants ce mois-ci
-        this_month_start = datetime.now().replace(day=1)
-        new_this_month = Teacher.objects.filter(
-            hire_date__gte=this_month_start
-        ).count()
-        
-        # Enseignants avec bureau attribué
-        with_office = Teacher.objects.filter(
-            office_number__isnull=False
-        ).exclude(office_number='').count()
-        
-        # Derniers enseignants ajoutés
-        recent_teachers = Teacher.objects.select_related('user').order_by('-hire_date')[:5]
-        recent_data = []
-        for teacher in recent_teachers:
-            recent_data.append({
-                'id': teacher.id,
-                'teacher_id': teacher.teacher_id,
-                'name': teacher.user.get_full_name(),
-                'department': teacher.department,
-                'hire_date': teacher.hire_date
-            })
-        
-        data = {
-            'success': True,
-            'total_teachers': total_teachers,
-            'new_this_month': new_this_month,
-            'with_office': with_office,
-            'departments': list(departments),
-            'ranks': list(ranks),
-            'departments_count': len(departments),
-            'ranks_count': len(ranks),
-            'recent_teachers': recent_data
-        }
-        
-        return Response(data)
+        return Response({'success': True, **run(statistics_plan())})
         
     except Exception as e:
         print(f"❌ Erreur statistiques enseignants: {str(e)}")
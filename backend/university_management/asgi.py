@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+Les statistiques du tableau de bord (/api/dashboard/) sont des vues
+asynchrones : servies par un serveur ASGI (uvicorn, daphne), elles
+n'occupent pas de worker pendant leurs requêtes SQL. Les vues DRF restent
+synchrones et sont exécutées dans des threads.
 """
 
 import os
@@ -14,3 +19,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
 
 application = get_asgi_application()
+
+# Balayage quotidien des transactions en retard dans le processus serveur
+# seulement (OVERDUE_SWEEPER['RUN_IN_PROCESS'], voir finance/overdue.py)
+from finance import overdue  # noqa: E402
+
+overdue.start_runner_if_enabled()
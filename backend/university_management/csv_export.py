@@ -0,0 +1,53 @@
+# backend/university_management/csv_export.py
+"""
+Export CSV en streaming.
+
+Les lignes sont écrites par paquets dans un ``StreamingHttpResponse`` : la
+mémoire reste constante quel que soit le nombre de lignes et les premiers
+octets partent immédiatement vers le client.
+"""
+
+import csv
+import io
+
+from django.http import StreamingHttpResponse
+
+# Nombre de lignes CSV regroupées dans un même fragment envoyé au client
+ROWS_PER_CHUNK = 500
+
+# Taille des lots lus en base par QuerySet.iterator()
+QUERY_CHUNK_SIZE = 2000
+
+
+def iter_csv(header, rows, rows_per_chunk=ROWS_PER_CHUNK):
+    """
+    Générer le contenu CSV : l'en-tête seul d'abord, envoyé avant la
+    première lecture de ``rows``, puis des fragments de ``rows_per_chunk``
+    lignes
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining
+
+
+def streaming_csv_response(filename, header, rows):
+    """Réponse HTTP CSV en streaming, téléchargée sous ``filename``"""
+    response = StreamingHttpResponse(iter_csv(header, rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,32 @@
+# backend/university_management/csv_import.py
+"""
+Lecture des fichiers CSV envoyés aux endpoints d'import en masse.
+
+Séparateur ',' ou ';' détecté sur la ligne d'en-tête, BOM UTF-8 accepté ;
+seules les colonnes attendues sont gardées, sans les cellules vides.
+"""
+
+import csv
+import io
+
+
+def read_csv_rows(uploaded_file, columns):
+    """Lire un fichier CSV en liste de dicts limités à ``columns``"""
+    content = uploaded_file.read()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+
+    try:
+        dialect = csv.Sniffer().sniff(content.split('\n', 1)[0], delimiters=',;')
+    except csv.Error:
+        dialect = csv.excel
+
+    rows = []
+    for row in csv.DictReader(io.StringIO(content), dialect=dialect):
+        cleaned = {}
+        for key, value in row.items():
+            key = (key or '').strip()
+            if key in columns and value not in (None, ''):
+                cleaned[key] = value.strip()
+        rows.append(cleaned)
+    return rows
@@ -0,0 +1,247 @@
+# backend/university_management/dashboard.py
+"""
+Statistiques du tableau de bord en vues asynchrones (ASGI).
+
+- ``/api/dashboard/<section>/`` : une statistique (``finance``, ``grades``,
+  ``exams``, ``students``, ``teachers``), mêmes paramètres et même corps
+  que l'endpoint DRF correspondant ;
+- ``/api/dashboard/`` : les cinq en un aller-retour,
+  ``{'success': ..., 'data': {section: corps}}``. Chaque section ne lit que
+  ses propres paramètres (``months``, ``academic_year``...).
+
+Les vues partagent les entrées de ``stats_cache`` des endpoints DRF (même
+endpoint, mêmes modèles, mêmes paramètres) : ETag, 304 et recalcul en
+arrière-plan fonctionnent de la même façon. Les sections absentes du cache
+sont calculées ensemble par l'ORM asynchrone (``query_plan.arun``).
+
+Servies par un serveur ASGI, elles n'occupent pas de worker synchrone
+pendant les requêtes SQL. Sous WSGI, Django les exécute avec
+``async_to_sync`` : même résultat, sans gain.
+"""
+
+import asyncio
+import hashlib
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, QueryDict
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from exams import statistics as exam_statistics
+from finance import statistics as finance_statistics
+from grades import analytics as grade_analytics
+from students import statistics as student_statistics
+from teachers import statistics as teacher_statistics
+from . import stats_cache
+from .query_plan import arun, run
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class Section:
+    """
+    Une statistique du tableau de bord.
+
+    ``plan(params)`` retourne le plan de calcul (``ValueError`` si les
+    paramètres sont invalides) et ``body(data)`` le corps de la réponse,
+    au format de l'endpoint DRF.
+    """
+
+    def __init__(self, name, module, plan, body, params=()):
+        self.name = name
+        self.endpoint = module.CACHE_ENDPOINT
+        self.models = module.CACHE_MODELS
+        self.plan = plan
+        self.body = body
+        self.params = params
+
+    def query_params(self, query):
+        """Paramètres de la section seuls (clé de cache identique à l'endpoint DRF)"""
+        params = QueryDict(mutable=True)
+        for name in self.params:
+            if name in query:
+                params.setlist(name, query.getlist(name))
+        return params
+
+    def compute(self, params):
+        """Corps calculé en synchrone (recalcul en arrière-plan du cache)"""
+        return self.body(run(self.plan(params)))
+
+    async def acompute(self, params):
+        """(statut HTTP, corps) calculé avec l'ORM asynchrone"""
+        try:
+            plan = self.plan(params)
+        except ValueError as e:
+            return status.HTTP_400_BAD_REQUEST, {
+                'success': False,
+                'error': 'Paramètres invalides',
+                'detail': str(e)
+            }
+        try:
+            return status.HTTP_200_OK, self.body(await arun(plan))
+        except Exception as e:
+            logger.exception("Erreur du tableau de bord (%s)", self.name)
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, {
+                'success': False,
+                'error': 'Erreur lors du calcul des statistiques',
+                'detail': str(e)
+            }
+
+
+def _success(data):
+    return {'success': True, 'data': data}
+
+
+SECTIONS = {section.name: section for section in (
+    Section('finance', finance_statistics,
+            lambda params: finance_statistics.FinanceStatistics.from_params(params).plan(),
+            _success, params=('months', 'start_date', 'end_date')),
+    Section('grades', grade_analytics,
+            lambda params: grade_analytics.GradeAnalytics.from_params(params).plan(),
+            _success, params=('academic_year', 'semester', 'department', 'top')),
+    Section('exams', exam_statistics,
+            lambda params: exam_statistics.statistics_plan(), _success),
+    Section('students', student_statistics,
+            lambda params: student_statistics.statistics_plan(), lambda data: data),
+    Section('teachers', teacher_statistics,
+            lambda params: teacher_statistics.statistics_plan(), lambda data: {'success': True, **data}),
+)}
+
+
+# ----------------------------------------------------------------------
+# Calcul
+# ----------------------------------------------------------------------
+
+def _lookup_all(sections, params):
+    """Entrées de cache des sections (un seul passage dans le thread synchrone)"""
+    lookups = {}
+    for section in sections:
+        section_params = params[section.name]
+        lookups[section.name] = stats_cache.lookup(
+            section.endpoint, section_params, section.models,
+            lambda section=section, section_params=section_params: section.compute(section_params)
+        )
+    return lookups
+
+
+def _store_all(pending):
+    return {name: stats_cache.store(key, versions, data) for name, (key, versions, data) in pending.items()}
+
+
+async def resolve(sections, query):
+    """
+    ``{section: (statut, corps, etag, état du cache)}`` : entrées du cache,
+    et calcul concurrent des sections manquantes
+    """
+    params = {section.name: section.query_params(query) for section in sections}
+    results = {}
+    lookups = {}
+    if stats_cache.get_setting('ENABLED'):
+        lookups = await sync_to_async(_lookup_all)(sections, params)
+        for name, (_, _, entry, state) in lookups.items():
+            if entry is not None:
+                results[name] = (status.HTTP_200_OK, entry['data'], entry['etag'], state)
+
+    missing = [section for section in sections if section.name not in results]
+    computed = await asyncio.gather(*(section.acompute(params[section.name]) for section in missing))
+
+    pending = {}
+    for section, (status_code, body) in zip(missing, computed):
+        results[section.name] = (status_code, body, None, None)
+        if status_code == status.HTTP_200_OK and section.name in lookups:
+            key, versions, _, _ = lookups[section.name]
+            pending[section.name] = (key, versions, body)
+    if pending:
+        for name, entry in (await sync_to_async(_store_all)(pending)).items():
+            results[name] = (status.HTTP_200_OK, entry['data'], entry['etag'], 'miss')
+    return {section.name: results[section.name] for section in sections}
+
+
+# ----------------------------------------------------------------------
+# Vues
+# ----------------------------------------------------------------------
+
+def _authenticate(request):
+    """Utilisateur authentifié par les classes de DRF (JWT), ou None"""
+    drf_request = Request(request, authenticators=[
+        authentication() for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ])
+    user = drf_request.user
+    return user if user and user.is_authenticated else None
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(dumps(data), status=status_code, content_type='application/json')
+
+
+def _respond(request, status_code, data, etag, state):
+    if etag is not None and etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = _json(data, status_code)
+    if etag is not None:
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+    if state is not None:
+        response['X-Stats-Cache'] = state
+    return response
+
+
+def dashboard_view(view):
+    """Vue asynchrone en GET, authentifiée comme les vues DRF (IsAuthenticated)"""
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            response = _json({'detail': exceptions.MethodNotAllowed(request.method).detail},
+                             status.HTTP_405_METHOD_NOT_ALLOWED)
+            response['Allow'] = 'GET'
+            return response
+        try:
+            user = await sync_to_async(_authenticate)(request)
+        except exceptions.AuthenticationFailed as e:
+            user, detail = None, e.detail
+        else:
+            detail = exceptions.NotAuthenticated().detail
+        if user is None:
+            response = _json({'detail': detail}, status.HTTP_401_UNAUTHORIZED)
+            response['WWW-Authenticate'] = 'Bearer realm="api"'
+            return response
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+@dashboard_view
+async def section_statistics(request, section):
+    """Une statistique du tableau de bord (corps de l'endpoint DRF)"""
+    if section not in SECTIONS:
+        return _json({
+            'success': False,
+            'error': 'Section inconnue',
+            'detail': f"Sections disponibles : {', '.join(SECTIONS)}"
+        }, status.HTTP_404_NOT_FOUND)
+
+    results = await resolve([SECTIONS[section]], request.GET)
+    return _respond(request, *results[section])
+
+
+@dashboard_view
+async def dashboard(request):
+    """Les cinq statistiques du tableau de bord en une réponse"""
+    results = await resolve(list(SECTIONS.values()), request.GET)
+
+    etags = [etag for _, _, etag, _ in results.values()]
+    etag = None
+    if all(etags):
+        etag = '"%s"' % hashlib.md5(','.join(etags).encode('utf-8')).hexdigest()
+    states = [f'{name}={state}' for name, (_, _, _, state) in results.items() if state]
+
+    return _respond(request, status.HTTP_200_OK, {
+        'success': all(status_code == status.HTTP_200_OK for status_code, _, _, _ in results.values()),
+        'data': {name: body for name, (_, body, _, _) in results.items()},
+    }, etag, ', '.join(states) or None)
@@ -0,0 +1,83 @@
+# backend/university_management/indexes.py
+"""
+Gestion des index déclarés dans ``Meta.indexes``.
+
+- ``AddIndexIfMissing`` : opération de migration idempotente. Une base où
+  l'index existe déjà (créé à la main ou par ``sync_indexes``) ne fait pas
+  échouer la migration.
+- ``index_report()`` : compare les index déclarés par les modèles à ceux
+  présents en base (manquants / obsolètes), utilisé par la commande
+  ``sync_indexes``.
+"""
+
+from django.apps import apps
+from django.db import connection as default_connection, migrations, models
+
+
+def existing_indexes(connection, table):
+    """Index présents en base : nom -> colonnes"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {name: info['columns'] for name, info in constraints.items() if info['index']}
+
+
+def existing_index_names(connection, table):
+    return set(existing_indexes(connection, table))
+
+
+class AddIndexIfMissing(migrations.AddIndex):
+    """``AddIndex`` qui ne recrée pas un index déjà présent (et inversement)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        existing = existing_index_names(schema_editor.connection, model._meta.db_table)
+        if self.index.name not in existing:
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        existing = existing_index_names(schema_editor.connection, model._meta.db_table)
+        if self.index.name in existing:
+            schema_editor.remove_index(model, self.index)
+
+    def describe(self):
+        return f'Create index {self.index.name} on {self.model_name} if missing'
+
+
+def _managed_models():
+    for model in apps.get_models():
+        if model._meta.managed and not model._meta.proxy:
+            yield model
+
+
+def index_report(connection=default_connection):
+    """
+    Liste de dicts ``{model, table, missing, stale}`` pour chaque modèle dont
+    les index ne correspondent pas à ``Meta.indexes``.
+
+    Sont considérés obsolètes les index nommés explicitement (suffixe
+    ``_idx``) présents en base mais plus déclarés ; ils sont décrits par un
+    ``Index`` reconstruit depuis la base, à passer à
+    ``schema_editor.remove_index``.
+    """
+    tables = set(connection.introspection.table_names())
+    report = []
+    for model in _managed_models():
+        table = model._meta.db_table
+        if table not in tables:
+            continue
+        declared = {index.name: index for index in model._meta.indexes}
+        existing = existing_indexes(connection, table)
+        missing = [index for name, index in declared.items() if name not in existing]
+        stale = [
+            models.Index(fields=existing[name], name=name)
+            for name in sorted(existing)
+            if name.endswith('_idx') and name not in declared
+        ]
+        if missing or stale:
+            report.append({'model': model, 'table': table, 'missing': missing, 'stale': stale})
+    return report
@@ -0,0 +1,186 @@
+# backend/university_management/list_rows.py
+"""
+Lignes de liste construites depuis ``.values()``, sans les champs DRF.
+
+Sur une grande liste, un ``ModelSerializer`` coûte surtout par champ et par
+objet : instanciation du modèle, ``get_attribute``, un appel de méthode par
+``SerializerMethodField``, ``to_representation`` de chaque champ. Un
+``ListRows`` décrit les mêmes colonnes une fois pour toutes :
+
+- les valeurs calculées par la base (``Concat`` pour les noms, ``Case`` pour
+  les lettres ou les retards...) sont déclarées dans ``annotations`` ;
+- chaque colonne lit une clé de ``.values()`` et la passe éventuellement à
+  une conversion reproduisant le format DRF (décimaux en chaîne, dates ISO) ;
+  dates et horodatages sont lus en texte (``as_text``), plus rapides à
+  convertir ;
+- une colonne dérivée de plusieurs champs reçoit leurs valeurs brutes.
+
+Le JSON produit doit être identique à celui du serializer correspondant :
+chaque ``ListRows`` est couvert par un test de parité dans son application.
+"""
+
+import datetime
+import decimal
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def decimal_string(model_field):
+    """Format de ``serializers.DecimalField`` (chaîne quantifiée) pour ``model_field``"""
+    quantum = decimal.Decimal('.1') ** model_field.decimal_places
+    context = decimal.getcontext().copy()
+    context.prec = model_field.max_digits
+
+    def convert(value):
+        if value is None:
+            return ''
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return '{:f}'.format(value.quantize(quantum, context=context))
+    return convert
+
+
+def per_list(factory):
+    """
+    Marque une conversion préparée une fois par liste : ``factory()`` lit le
+    contexte de la requête (fuseau courant...) et retourne la conversion
+    """
+    factory.per_list = True
+    return factory
+
+
+def as_text(field):
+    """
+    Date ou horodatage lu tel que la base l'écrit en texte, sans la
+    conversion de Django (analyse, puis ``make_aware`` par valeur). Une date
+    en texte est déjà au format ISO de DRF ; un horodatage passe par
+    ``datetime_string``, qui accepte aussi ces chaînes.
+    """
+    return Cast(field, output_field=TextField())
+
+
+def _offset_suffix(offset):
+    """Suffixe ISO d'un décalage, tel que l'écrit DRF ('Z' pour UTC)"""
+    if not offset:
+        return 'Z'
+    minutes = int(offset.total_seconds()) // 60
+    sign = '-' if minutes < 0 else '+'
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+@per_list
+def datetime_string():
+    """Format de ``serializers.DateTimeField`` (ISO 8601, fuseau courant)"""
+    current = timezone.get_current_timezone() if settings.USE_TZ else None
+    # Décalage du fuseau courant par minute UTC ('AAAA-MM-JJ HH:MM') : les
+    # changements d'heure tombent sur une minute entière
+    offsets = {}
+
+    def from_utc_text(value):
+        key = value[:16]
+        entry = offsets.get(key)
+        if entry is None:
+            utc = datetime.datetime.fromisoformat(key).replace(tzinfo=datetime.timezone.utc)
+            offset = utc.astimezone(current).utcoffset()
+            entry = offsets[key] = (offset, _offset_suffix(offset))
+        offset, suffix = entry
+        return (datetime.datetime.fromisoformat(value) + offset).isoformat() + suffix
+
+    def convert(value):
+        if not value:
+            return None
+        if isinstance(value, str):
+            # Texte sans décalage : heure UTC (SQLite, MySQL)
+            if current is not None and '+' not in value[19:] and '-' not in value[19:]:
+                return from_utc_text(value)
+            value = parse_datetime(value)
+        if current is not None:
+            value = value.astimezone(current) if value.tzinfo is not None else timezone.make_aware(value, current)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def date_string(value):
+    """Format de ``serializers.DateField`` / ``TimeField`` (ISO 8601)"""
+    if value in (None, ''):
+        return None
+    return value.isoformat()
+
+
+class ListRows:
+    """
+    Colonnes d'une liste : ``(clé, source, conversion)``.
+
+    ``source`` est un chemin accepté par ``.values()`` ou le nom d'une
+    annotation ; ``conversion`` (facultative) reçoit la valeur. Une colonne
+    dérivée de plusieurs champs a pour source un tuple de chemins, dont les
+    valeurs sont passées dans l'ordre à ``conversion``. Les annotations
+    peuvent être des fonctions sans argument, évaluées à chaque requête
+    (expressions dépendant de la date du jour). ``extra`` liste les champs
+    lus sans colonne de sortie (clés de pagination).
+
+    Les lignes sont construites colonne par colonne (``map`` sur chaque
+    colonne, puis ``zip``) : pas d'appel Python par cellule non convertie.
+    """
+
+    def __init__(self, columns, annotations=None, extra=()):
+        self.columns = list(columns)
+        self.annotations = dict(annotations or {})
+        self.keys = [key for key, _, _ in self.columns]
+        fields = set(extra)
+        for _, source, _ in self.columns:
+            fields.update(source if isinstance(source, tuple) else (source,))
+        self.fields = sorted(fields)
+
+    def queryset(self, queryset):
+        """Queryset de dictionnaires bruts (toujours paginable et filtrable)"""
+        annotations = {
+            name: expression() if callable(expression) else expression
+            for name, expression in self.annotations.items()
+        }
+        return queryset.annotate(**annotations).values(*self.fields)
+
+    def rows(self, values):
+        """Lignes de sortie, dans l'ordre des colonnes du serializer"""
+        values = list(values)
+        fields = {field: list(map(itemgetter(field), values)) for field in self.fields}
+        prepared = {}
+        columns = []
+        for _, source, convert in self.columns:
+            if getattr(convert, 'per_list', False):
+                if convert not in prepared:
+                    prepared[convert] = convert()
+                convert = prepared[convert]
+            if isinstance(source, tuple):
+                columns.append(map(convert, *[fields[field] for field in source]))
+            elif convert is None:
+                columns.append(fields[source])
+            else:
+                columns.append(map(convert, fields[source]))
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    def batches(self, values, chunk_size):
+        """Lignes de sortie par lots de ``chunk_size``, ``values`` étant lu avec ``iterator()``"""
+        batch = []
+        for row in values.iterator(chunk_size=chunk_size):
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield self.rows(batch)
+                batch = []
+        if batch:
+            yield self.rows(batch)
+
+    def __call__(self, queryset):
+        return self.rows(self.queryset(queryset))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from university_management.indexes import index_report
+
+
+class Command(BaseCommand):
+    help = "Compare les index déclarés (Meta.indexes) à ceux de la base et crée les index manquants"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--create-missing',
+            action='store_true',
+            help="Créer les index déclarés absents de la base",
+        )
+        parser.add_argument(
+            '--drop-stale',
+            action='store_true',
+            help="Supprimer les index nommés (*_idx) qui ne sont plus déclarés",
+        )
+
+    def handle(self, *args, **options):
+        report = index_report(connection)
+        if not report:
+            self.stdout.write(self.style.SUCCESS("Index conformes aux modèles"))
+            return
+
+        problems = 0
+        with connection.schema_editor() as schema_editor:
+            for entry in report:
+                model, table = entry['model'], entry['table']
+                for index in entry['missing']:
+                    if options['create_missing']:
+                        schema_editor.add_index(model, index)
+                        self.stdout.write(f"Index créé : {table}.{index.name}")
+                    else:
+                        problems += 1
+                        self.stderr.write(f"Index manquant : {table}.{index.name} {index.fields}")
+                for index in entry['stale']:
+                    if options['drop_stale']:
+                        schema_editor.remove_index(model, index)
+                        self.stdout.write(f"Index supprimé : {table}.{index.name}")
+                    else:
+                        problems += 1
+                        self.stderr.write(f"Index obsolète : {table}.{index.name}")
+
+        if problems:
+            raise CommandError(f"{problems} écart(s) entre les index déclarés et la base")
+        self.stdout.write(self.style.SUCCESS("Index synchronisés"))
@@ -0,0 +1,153 @@
+# backend/university_management/metrics.py
+"""
+Métriques de coût par vue : nombre de requêtes SQL, temps base de données,
+temps de sérialisation, durée totale et taille de la réponse.
+
+Les mesures sont conservées en mémoire (par processus) dans une fenêtre
+glissante par nom d'URL résolu, et exposées sous forme de percentiles.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework import serializers
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    # Nombre de mesures conservées par vue
+    'WINDOW': 500,
+    # Nombre de requêtes SQL au-delà duquel un avertissement est émis
+    'QUERY_BUDGET': 50,
+    # Budgets spécifiques par nom d'URL, ex. {'grade-list': 5}
+    'QUERY_BUDGETS': {},
+}
+
+METRIC_FIELDS = ('duration_ms', 'queries', 'db_ms', 'serializer_ms', 'response_bytes')
+PERCENTILES = (50, 90, 95, 99)
+
+
+def get_setting(name):
+    return getattr(settings, 'REQUEST_METRICS', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def query_budget(url_name):
+    return get_setting('QUERY_BUDGETS').get(url_name, get_setting('QUERY_BUDGET'))
+
+
+def percentile(sorted_values, p):
+    """Percentile par interpolation linéaire sur une liste triée"""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class MetricsStore:
+    """Fenêtres glissantes de mesures par nom d'URL (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(self._new_window)
+        self._totals = defaultdict(int)
+
+    def _new_window(self):
+        return deque(maxlen=get_setting('WINDOW'))
+
+    def record(self, url_name, sample):
+        with self._lock:
+            self._samples[url_name].append(sample)
+            self._totals[url_name] += 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: list(window) for name, window in self._samples.items()}
+            totals = dict(self._totals)
+
+        result = {}
+        for name, samples in sorted(snapshot.items()):
+            entry = {'requests': totals[name], 'window': len(samples)}
+            for field in METRIC_FIELDS:
+                values = sorted(s[field] for s in samples if s.get(field) is not None)
+                entry[field] = {
+                    f'p{p}': round(percentile(values, p), 2) if values else None
+                    for p in PERCENTILES
+                }
+                entry[field]['max'] = round(values[-1], 2) if values else None
+            entry['query_budget'] = query_budget(name)
+            result[name] = entry
+        return result
+
+
+store = MetricsStore()
+
+
+# ----------------------------------------------------------------------
+# Mesure du temps de sérialisation
+# ----------------------------------------------------------------------
+
+class SerializerTimer:
+    """Cumule le temps passé dans ``to_representation`` (premier niveau seulement)"""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = 0.0
+        self.total = 0.0
+
+
+_current_timer = ContextVar('serializer_timer', default=None)
+
+
+def _timed(method):
+    def to_representation(self, *args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return method(self, *args, **kwargs)
+        # Les sérialiseurs imbriqués sont déjà inclus dans la mesure du parent
+        if timer.depth == 0:
+            timer.started = time.perf_counter()
+        timer.depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timer.depth -= 1
+            if timer.depth == 0:
+                timer.total += time.perf_counter() - timer.started
+
+    to_representation.metrics_timed = True
+    to_representation.__wrapped__ = method
+    return to_representation
+
+
+def install_serializer_timer():
+    """Instrumenter les sérialiseurs DRF (idempotent)"""
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        method = cls.to_representation
+        if not getattr(method, 'metrics_timed', False):
+            cls.to_representation = _timed(method)
+
+
+def uninstall_serializer_timer():
+    """Rétablir les ``to_representation`` d'origine de DRF"""
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        method = cls.to_representation
+        if getattr(method, 'metrics_timed', False):
+            cls.to_representation = method.__wrapped__
+
+
+def start_serializer_timer():
+    timer = SerializerTimer()
+    return timer, _current_timer.set(timer)
+
+
+def stop_serializer_timer(token):
+    _current_timer.reset(token)
@@ -0,0 +1,118 @@
+# backend/university_management/middleware.py
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connection
+
+from . import metrics
+
+logger = logging.getLogger('university_management.metrics')
+
+
+class QueryCounter:
+    """Wrapper ``connection.execute_wrapper`` comptant les requêtes et leur durée"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def _install_counter(counter):
+    connection.execute_wrappers.append(counter)
+
+
+def _remove_counter(counter):
+    connection.execute_wrappers.remove(counter)
+
+
+class RequestMetricsMiddleware:
+    """
+    Mesure le coût de chaque requête et l'enregistre sous le nom d'URL résolu
+    (``grade-list``, ``finance-statistics``...). Émet un avertissement quand
+    une vue dépasse son budget de requêtes SQL (``REQUEST_METRICS``).
+
+    Compatible ASGI : pour une vue asynchrone, le compteur de requêtes est
+    installé sur la connexion du thread où l'ORM asynchrone exécute le SQL.
+
+    Les sérialiseurs DRF ne sont instrumentés qu'à la première requête
+    mesurée : métriques désactivées, ils restent intacts.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not metrics.get_setting('ENABLED'):
+            return self.get_response(request)
+
+        metrics.install_serializer_timer()
+        counter = QueryCounter()
+        timer, token = metrics.start_serializer_timer()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                response = self.get_response(request)
+        finally:
+            metrics.stop_serializer_timer(token)
+        self.record(request, response, counter, timer, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not metrics.get_setting('ENABLED'):
+            return await self.get_response(request)
+
+        metrics.install_serializer_timer()
+        counter = QueryCounter()
+        timer, token = metrics.start_serializer_timer()
+        started = time.perf_counter()
+        await sync_to_async(_install_counter)(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_counter)(counter)
+            metrics.stop_serializer_timer(token)
+        self.record(request, response, counter, timer, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, counter, timer, duration):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return
+        url_name = match.url_name or match.view_name or request.path
+
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+
+        metrics.store.record(url_name, {
+            'duration_ms': duration * 1000,
+            'queries': counter.count,
+            'db_ms': counter.duration * 1000,
+            'serializer_ms': timer.total * 1000,
+            'response_bytes': size,
+        })
+
+        budget = metrics.query_budget(url_name)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                "%s %s (%s) : %d requêtes SQL pour un budget de %d (%.1f ms en base)",
+                request.method, request.path, url_name, counter.count, budget,
+                counter.duration * 1000,
+            )
@@ -0,0 +1,217 @@
+# backend/university_management/pagination.py
+"""
+Pagination par curseur (keyset) pour les vues de liste.
+
+Contrairement à ``PageNumberPagination`` (OFFSET), la page suivante est
+obtenue en filtrant sur la position du dernier élément retourné :
+
+    WHERE (a, b, id) > (:a, :b, :id) ORDER BY a, b, id LIMIT n
+
+Le coût d'une page ne dépend donc pas de sa profondeur, à condition que
+l'ordre soit stable (se terminer par une clé unique, ``id``) et couvert par
+un index.
+
+La pagination est activée à la demande, dès que la requête contient
+``cursor`` ou ``page_size`` : les clients existants qui attendent la liste
+complète ne sont pas affectés. ``count=false`` évite le COUNT(*) global.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+DEFAULT_MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible ou paramètre de pagination invalide"""
+
+
+def _encode_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _resolve(obj, path):
+    for attr in path.split('__'):
+        obj = obj[attr] if isinstance(obj, dict) else getattr(obj, attr)
+    return obj
+
+
+class KeysetPage:
+    def __init__(self, results, count, next_url, previous_url):
+        self.results = results
+        self.count = count
+        self.next = next_url
+        self.previous = previous_url
+
+
+class KeysetPaginator:
+    """
+    Pagine un queryset selon un ordre stable, par exemple
+    ``('-academic_year', 'semester', 'course_code', 'id')``.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    def __init__(self, ordering, page_size=None, max_page_size=None):
+        self.ordering = tuple(ordering)
+        self.fields = [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+        self.page_size = page_size or settings.REST_FRAMEWORK.get('PAGE_SIZE') or 10
+        self.max_page_size = max_page_size or getattr(
+            settings, 'KEYSET_PAGINATION_MAX_PAGE_SIZE', DEFAULT_MAX_PAGE_SIZE
+        )
+
+    # ------------------------------------------------------------------
+    # Curseurs
+    # ------------------------------------------------------------------
+
+    def encode_cursor(self, position, reverse=False):
+        payload = {'p': [_encode_value(value) for value in position]}
+        if reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise InvalidCursor('Curseur invalide')
+        if not isinstance(position, list) or len(position) != len(self.fields):
+            raise InvalidCursor('Curseur invalide')
+        return position, reverse
+
+    def position(self, obj):
+        return [_resolve(obj, field) for field, _ in self.fields]
+
+    # ------------------------------------------------------------------
+    # Requête
+    # ------------------------------------------------------------------
+
+    def keyset_filter(self, position, reverse=False):
+        """Condition « après la position » (ou « avant » si reverse)"""
+        condition = Q()
+        for index, (field, descending) in enumerate(self.fields):
+            # On avance vers les valeurs plus petites pour un tri décroissant
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {name: position[i] for i, (name, _) in enumerate(self.fields[:index])}
+            condition |= Q(**equal, **{f'{field}__{lookup}': position[index]})
+        return condition
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if not value:
+            return self.page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise InvalidCursor('page_size doit être un nombre')
+        if page_size < 1:
+            raise InvalidCursor('page_size doit être positif')
+        return min(page_size, self.max_page_size)
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate(self, request, queryset):
+        """
+        Retourne un ``KeysetPage``, ou ``None`` si la requête ne demande pas
+        de pagination. Lève ``InvalidCursor`` pour un curseur invalide.
+        """
+        if not self.is_requested(request):
+            return None
+
+        page_size = self.get_page_size(request)
+        token = request.query_params.get(self.cursor_query_param)
+        position, reverse = self.decode_cursor(token) if token else (None, False)
+
+        count = None
+        if request.query_params.get(self.count_query_param, 'true').lower() not in ('false', '0', 'no'):
+            count = queryset.count()
+
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+        else:
+            ordering = list(self.ordering)
+
+        page = queryset.order_by(*ordering)
+        if position is not None:
+            page = page.filter(self.keyset_filter(position, reverse))
+        results = list(page[:page_size + 1])
+
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+        if has_next and results:
+            next_url = replace_query_param(
+                url, self.cursor_query_param, self.encode_cursor(self.position(results[-1]))
+            )
+        if has_previous:
+            if results:
+                previous_url = replace_query_param(
+                    url, self.cursor_query_param,
+                    self.encode_cursor(self.position(results[0]), reverse=True)
+                )
+            else:
+                previous_url = remove_query_param(url, self.cursor_query_param)
+
+        return KeysetPage(results, count, next_url, previous_url)
+
+
+def paginated_list_response(request, queryset, ordering, serializer_class=None, list_rows=None):
+    """
+    Réponse ``{success, count, results, next, previous}`` pour les listes
+    qui retournent sinon un tableau brut, ou ``None`` sans pagination demandée.
+    Les lignes sont produites par ``serializer_class`` ou, à défaut, par un
+    ``ListRows`` (university_management/list_rows.py).
+    """
+    if list_rows is not None:
+        queryset = list_rows.queryset(queryset)
+    try:
+        page = KeysetPaginator(ordering).paginate(request, queryset)
+    except InvalidCursor as e:
+        return Response({
+            'success': False,
+            'error': 'Pagination invalide',
+            'detail': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if page is None:
+        return None
+
+    if list_rows is not None:
+        results = list_rows.rows(page.results)
+    else:
+        results = serializer_class(page.results, many=True).data
+    return Response({
+        'success': True,
+        'count': page.count,
+        'results': results,
+        'next': page.next,
+        'previous': page.previous
+    })
@@ -0,0 +1,84 @@
+# backend/university_management/query_plan.py
+"""
+Statistiques écrites une fois, exécutées en synchrone ou en asynchrone.
+
+Un « plan » est un générateur qui produit des étapes : chaque étape est un
+dictionnaire ``{nom: requête}`` de requêtes indépendantes, et le générateur
+reçoit en retour ``{nom: résultat}``. Sa valeur de retour est le résultat
+final ::
+
+    def plan():
+        results = yield {
+            'total': count(Exam.objects.all()),
+            'average': aggregate(Grade.objects.all(), avg=Avg('score')),
+        }
+        return {'total_exams': results['total'], ...}
+
+``run(plan())`` exécute les requêtes l'une après l'autre (vues DRF) ;
+``await arun(plan())`` les lance ensemble avec l'ORM asynchrone
+(``acount``, ``aaggregate``, ``async for``) et ``asyncio.gather``.
+
+Avec Django 4.2, l'ORM asynchrone exécute encore chaque requête dans le
+thread synchrone de la requête HTTP : les requêtes d'une étape se suivent
+côté base, mais la boucle d'événements n'est pas bloquée pendant ce temps.
+"""
+
+import asyncio
+
+
+class Query:
+    """Requête différée : ``method`` vaut 'count', 'aggregate' ou 'list'"""
+
+    def __init__(self, queryset, method, **kwargs):
+        self.queryset = queryset
+        self.method = method
+        self.kwargs = kwargs
+
+    def run(self):
+        if self.method == 'count':
+            return self.queryset.count()
+        if self.method == 'aggregate':
+            return self.queryset.aggregate(**self.kwargs)
+        return list(self.queryset)
+
+    async def arun(self):
+        if self.method == 'count':
+            return await self.queryset.acount()
+        if self.method == 'aggregate':
+            return await self.queryset.aaggregate(**self.kwargs)
+        return [row async for row in self.queryset]
+
+
+def count(queryset):
+    return Query(queryset, 'count')
+
+
+def aggregate(queryset, **aggregates):
+    return Query(queryset, 'aggregate', **aggregates)
+
+
+def fetch(queryset):
+    """Lignes du queryset (objets, ou dictionnaires après ``.values()``)"""
+    return Query(queryset, 'list')
+
+
+def run(plan):
+    """Exécuter ``plan`` en synchrone, une requête après l'autre"""
+    try:
+        queries = next(plan)
+        while True:
+            queries = plan.send({name: query.run() for name, query in queries.items()})
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun(plan):
+    """Exécuter ``plan`` avec l'ORM asynchrone, les requêtes d'une étape ensemble"""
+    try:
+        queries = next(plan)
+        while True:
+            names = list(queries)
+            results = await asyncio.gather(*(queries[name].arun() for name in names))
+            queries = plan.send(dict(zip(names, results)))
+    except StopIteration as stop:
+        return stop.value
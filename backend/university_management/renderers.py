@@ -0,0 +1,102 @@
+# backend/university_management/renderers.py
+"""
+Rendu JSON rapide des réponses de l'API.
+
+``FastJSONRenderer`` remplace le ``JSONRenderer`` de DRF (même type de
+média, même sortie) en s'appuyant sur orjson (requirements.txt) : les
+``Decimal`` deviennent des nombres, les dates et heures sont écrites en ISO
+8601 ('Z' pour UTC), comme avec l'encodeur de DRF. Si orjson manque, ou pour
+une sortie indentée (API navigable, ``Accept: application/json; indent=4``),
+le rendu de DRF est utilisé.
+
+Sélection globale par ``REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']``, ou
+par vue avec ``renderer_classes = [FastJSONRenderer]`` /
+``@renderer_classes([FastJSONRenderer])``.
+
+Les listes volumineuses non paginées peuvent être envoyées en streaming
+(``streaming_json_response``) : l'objet ``{..., "results": [...]}`` est
+écrit lot par lot, la mémoire reste bornée par la taille d'un lot.
+"""
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # dépendance facultative : rendu de DRF
+    orjson = None
+
+DEFAULT_SETTINGS = {
+    # Listes non paginées envoyées en streaming au-delà de ce nombre de lignes
+    # (None : jamais)
+    'STREAM_THRESHOLD': 5000,
+}
+
+# Séparateurs de ligne JavaScript, toujours échappés par DRF
+_LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+
+def get_setting(name):
+    return getattr(settings, 'JSON_RENDERER', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+_encoder = encoders.JSONEncoder()
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def _default(obj):
+        # Types inconnus d'orjson (Decimal, chaînes traduites, QuerySet...) :
+        # même conversion que l'encodeur de DRF
+        return _encoder.default(obj)
+
+    def dumps(data):
+        """Encoder ``data`` en JSON compact (octets UTF-8)"""
+        content = orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+        if b'\xe2\x80' in content:
+            for raw, escaped in _LINE_SEPARATORS:
+                content = content.replace(raw, escaped)
+        return content
+else:
+    def dumps(data):
+        """Encoder ``data`` en JSON compact (octets UTF-8)"""
+        return JSONRenderer().render(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` encodé par orjson (repli sur DRF si indisponible)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+def should_stream(count):
+    threshold = get_setting('STREAM_THRESHOLD')
+    return threshold is not None and count > threshold
+
+
+def iter_json_list(head, key, batches):
+    """
+    Générer l'objet ``head`` complété de ``key`` : la liste formée par la
+    concaténation des lots ``batches``, encodés un par un
+    """
+    opening = dumps({**head, key: []})
+    # '{..., "results":[]}' -> '{..., "results":['
+    yield opening[:-2]
+    separator = b''
+    for batch in batches:
+        if batch:
+            yield separator + dumps(batch)[1:-1]
+            separator = b','
+    yield b']}'
+
+
+def streaming_json_response(head, key, batches):
+    """Réponse JSON en streaming (voir ``iter_json_list``)"""
+    return StreamingHttpResponse(iter_json_list(head, key, batches), content_type='application/json')
@@ -36,9 +36,13 @@ INSTALLED_APPS = [
     'exams',
     'finance',
     'grades',
+    'search',
+    # Commandes transverses (sync_indexes)
+    'university_management',
 ]
 
 MIDDLEWARE = [
+    'university_management.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -115,10 +119,133 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # JSON encodé par orjson s'il est installé (voir university_management/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'university_management.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
+# Listes non paginées envoyées en streaming au-delà de STREAM_THRESHOLD lignes
+JSON_RENDERER = {
+    'STREAM_THRESHOLD': 5000,
+}
+
+# Taille maximale d'une page pour la pagination par curseur (?page_size=)
+KEYSET_PAGINATION_MAX_PAGE_SIZE = 100
+
+# Cache des statistiques du tableau de bord (voir university_management/stats_cache.py)
+# STATS_CACHE_BACKEND : 'locmem' (défaut, par processus), 'file' ou 'db'
+# (partagés entre workers ; 'db' nécessite `python manage.py createcachetable`)
+STATS_CACHE_BACKEND = os.environ.get('STATS_CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'university-management',
+    },
+    'stats': {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'university-management-stats',
+        },
+        'file': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache' / 'stats',
+        },
+        'db': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'stats_cache',
+        },
+    }[STATS_CACHE_BACKEND],
+}
+
+STATS_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'stats',
+    # Durée (s) pendant laquelle une entrée à jour est servie telle quelle
+    'FRESH_TIMEOUT': 60,
+    # Au-delà, servie encore jusqu'à STALE_TIMEOUT pendant son recalcul
+    'STALE_TIMEOUT': 600,
+    'BACKGROUND_REFRESH': True,
+}
+
+# Relevés de notes en cache par étudiant (voir grades/transcript.py),
+# invalidés à chaque modification de leurs notes. L'invalidation n'atteint
+# que le cache du processus qui écrit : TIMEOUT vaut pour un cache partagé
+# (STATS_CACHE_BACKEND file ou db), LOCAL_TIMEOUT pour locmem
+TRANSCRIPT_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'stats',
+    'TIMEOUT': 24 * 3600,
+    'LOCAL_TIMEOUT': 60,
+}
+
+# Instrumentation des requêtes (voir university_management/metrics.py)
+REQUEST_METRICS = {
+    'ENABLED': True,
+    'WINDOW': 500,
+    'QUERY_BUDGET': 50,
+    'QUERY_BUDGETS': {},
+}
+
+# Recherche des étudiants et enseignants (voir search/engine.py) : FTS5
+# trigram sur SQLite, pg_trgm sur PostgreSQL. Reconstruction de l'index :
+# `python manage.py rebuild_search_index`
+SEARCH_INDEX = {
+    'ENABLED': True,
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 100,
+    'LIST_LIMIT': 500,
+    'CANDIDATES': 100,
+    'FUZZY_THRESHOLD': 0.3,
+}
+
+# Autocomplétion des sélecteurs en mémoire (voir search/autocomplete.py) ;
+# chaque processus reconstruit son index au-delà de MAX_AGE secondes
+AUTOCOMPLETE = {
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 50,
+    'MAX_AGE': 300,
+    'BACKGROUND_REFRESH': True,
+}
+
+# Passage en retard des transactions échues (voir finance/overdue.py) :
+# `python manage.py sweep_overdue_transactions` chaque jour, ou thread du
+# processus web avec RUN_IN_PROCESS (démarré par wsgi.py / asgi.py)
+OVERDUE_SWEEPER = {
+    'RUN_IN_PROCESS': os.environ.get('OVERDUE_SWEEPER_IN_PROCESS') == '1',
+    'INTERVAL': 3600,
+    'CREATE_REMINDERS': True,
+}
+
+# Rappels de paiement (voir finance/reminders.py) : escalade
+# first -> second -> final -> overdue, un rappel au plus tous les
+# INTERVAL_DAYS jours, envoyés par WORKERS threads vers les canaux SINKS
+# (ConsoleSink, FileSink ; `python manage.py send_payment_reminders`)
+PAYMENT_REMINDERS = {
+    'INTERVAL_DAYS': 7,
+    'CHUNK_SIZE': 2000,
+    'WORKERS': 4,
+    'BATCH_SIZE': 100,
+    'SINKS': ['finance.reminders.ConsoleSink'],
+    'FILE_PATH': BASE_DIR / 'outbox' / 'payment_reminders.jsonl',
+}
+
+# Paie mensuelle des enseignants (voir finance/payroll.py) : salaire de
+# base repris du mois précédent, sinon barème BASE_SALARY du grade ;
+# `python manage.py run_payroll` ou POST /api/finance/payroll/run/.
+# BASE_SALARY (salaire mensuel par grade, ex. {'professor': '4500'}) doit
+# être fourni par l'établissement : sans barème, la paie refuse de tourner.
+PAYROLL = {
+    'BASE_SALARY': None,
+    'DEFAULT_BASE_SALARY': None,
+    'DEDUCTION_RATE': '0',
+    'PAYMENT_METHOD': 'bank_transfer',
+}
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -0,0 +1,217 @@
+# backend/university_management/stats_cache.py
+"""
+Cache des statistiques du tableau de bord.
+
+Chaque entrée est stockée par endpoint et par jeu de paramètres, avec les
+numéros de version des modèles dont elle dépend. Les signaux
+``post_save`` / ``post_delete`` incrémentent la version du modèle modifié :
+une entrée dont les versions ne correspondent plus est recalculée.
+
+Une entrée à jour reste « fraîche » pendant ``FRESH_TIMEOUT`` secondes
+(statistiques dépendant de la date du jour, écritures sans signal). Au-delà
+et jusqu'à ``STALE_TIMEOUT``, elle est servie immédiatement pendant qu'un
+thread la recalcule (stale-while-revalidate).
+
+Les réponses portent un ETag calculé sur leur contenu : un client qui
+renvoie ``If-None-Match`` reçoit un 304 sans corps.
+
+Les vues asynchrones du tableau de bord (``dashboard.py``) lisent et
+écrivent les mêmes entrées avec ``lookup()`` et ``store()``.
+
+Les écritures en masse qui contournent les signaux (``bulk_create``,
+``QuerySet.update``, DELETE brut) doivent appeler ``invalidate()``.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'FRESH_TIMEOUT': 60,
+    'STALE_TIMEOUT': 600,
+    'BACKGROUND_REFRESH': True,
+}
+
+KEY_PREFIX = 'stats'
+
+
+def get_setting(name):
+    return getattr(settings, 'STATS_CACHE', {}).get(name, DEFAULT_SETTINGS[name])
+
+
+def get_cache():
+    return caches[get_setting('ALIAS')]
+
+
+# ----------------------------------------------------------------------
+# Versions par modèle
+# ----------------------------------------------------------------------
+
+def _version_key(model):
+    return f'{KEY_PREFIX}:version:{model._meta.label_lower}'
+
+
+def _bump(model):
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Version absente (cache vidé) : repartir d'une valeur jamais utilisée
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate(*models):
+    """
+    Invalider les statistiques qui dépendent de ``models``.
+
+    La version est incrémentée tout de suite puis à nouveau au commit, pour
+    qu'une lecture concurrente ne mette pas en cache l'état non validé.
+    """
+    for model in models:
+        _bump(model)
+        transaction.on_commit(functools.partial(_bump, model))
+
+
+def current_versions(models):
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            found[key] = time.time_ns()
+            cache.add(key, found[key], None)
+            found[key] = cache.get(key, found[key])
+        versions.append(found[key])
+    return versions
+
+
+# ----------------------------------------------------------------------
+# Entrées
+# ----------------------------------------------------------------------
+
+def entry_key(endpoint, params):
+    items = sorted((key, params.getlist(key)) for key in params.keys())
+    digest = hashlib.md5(json.dumps(items).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:entry:{endpoint}:{digest}'
+
+
+def make_etag(data):
+    payload = json.dumps(data, cls=JSONEncoder, sort_keys=True).encode('utf-8')
+    return '"%s"' % hashlib.md5(payload).hexdigest()
+
+
+def store(key, versions, data):
+    """Mettre en cache le corps ``data`` d'une réponse 200, calculé aux ``versions``"""
+    entry = {
+        'versions': versions,
+        'computed_at': time.time(),
+        'data': data,
+        'etag': make_etag(data),
+    }
+    get_cache().set(key, entry, get_setting('STALE_TIMEOUT'))
+    return entry
+
+
+def _refresh_in_background(key, models, compute):
+    lock_key = f'{key}:refreshing'
+    cache = get_cache()
+    if not cache.add(lock_key, 1, get_setting('FRESH_TIMEOUT')):
+        return
+
+    def refresh():
+        try:
+            versions = current_versions(models)
+            data = compute()
+            if data is not None:
+                store(key, versions, data)
+        except Exception:
+            logger.exception("Échec du recalcul en arrière-plan de %s", key)
+        finally:
+            cache.delete(lock_key)
+            close_old_connections()
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def lookup(endpoint, params, models, compute):
+    """
+    Chercher l'entrée de ``endpoint`` pour ``params``.
+
+    Retourne ``(clé, versions, entrée, état)`` : l'entrée est servable telle
+    quelle ('hit'), ou périmée et recalculée en arrière-plan par
+    ``compute()`` — fonction synchrone retournant le corps ou None —
+    ('stale') ; sinon elle vaut None ('miss') et l'appelant calcule puis
+    enregistre le corps avec ``store(clé, versions, corps)``.
+    """
+    key = entry_key(endpoint, params)
+    versions = current_versions(models)
+    entry = get_cache().get(key)
+
+    if entry is not None and entry['versions'] == versions:
+        age = time.time() - entry['computed_at']
+        if age < get_setting('FRESH_TIMEOUT'):
+            return key, versions, entry, 'hit'
+        if get_setting('BACKGROUND_REFRESH'):
+            _refresh_in_background(key, models, compute)
+            return key, versions, entry, 'stale'
+    return key, versions, None, 'miss'
+
+
+def _respond(request, entry, state):
+    if entry['etag'] in request.headers.get('If-None-Match', ''):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(entry['data'])
+    response['ETag'] = entry['etag']
+    response['Cache-Control'] = 'private, no-cache'
+    response['X-Stats-Cache'] = state
+    return response
+
+
+def cached_statistics(endpoint, models):
+    """
+    Décorateur des vues de statistiques (à placer sous ``@api_view``).
+
+    ``models`` liste les modèles lus par la vue : toute écriture sur l'un
+    d'eux invalide les entrées de l'endpoint.
+    """
+    models = tuple(models)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not get_setting('ENABLED'):
+                return view(request, *args, **kwargs)
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                return response.data if response.status_code == status.HTTP_200_OK else None
+
+            key, versions, entry, state = lookup(endpoint, request.query_params, models, compute)
+            if entry is not None:
+                return _respond(request, entry, state)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            return _respond(request, store(key, versions, response.data), 'miss')
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,237 @@
+import csv
+import io
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.db import connection, models
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User
+from finance.models import Budget, Transaction
+from . import csv_export, metrics, stats_cache
+from .indexes import existing_index_names, index_report
+
+computed = []
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@stats_cache.cached_statistics('test-statistics', models=[Budget])
+def statistics_view(request):
+    computed.append(request.query_params.get('year'))
+    return Response({'computed': len(computed)})
+
+
+class StatsCacheTest(TestCase):
+    """Entrées versionnées par modèle, ETag, servies périmées pendant leur recalcul"""
+
+    def setUp(self):
+        stats_cache.get_cache().clear()
+        computed.clear()
+        self.factory = APIRequestFactory()
+
+    def get(self, **headers):
+        return statistics_view(self.factory.get('/statistiques/', {'year': '2026'}, **headers))
+
+    def test_model_version_bumped_on_save_and_delete(self):
+        initial = stats_cache.current_versions([Budget])
+        budget = Budget.objects.create(department='law', year=2026, allocated_amount=Decimal('10'))
+        created = stats_cache.current_versions([Budget])
+        self.assertNotEqual(created, initial)
+        budget.delete()
+        self.assertNotEqual(stats_cache.current_versions([Budget]), created)
+
+    def test_hit_until_model_changes(self):
+        self.assertEqual(self.get()['X-Stats-Cache'], 'miss')
+        response = self.get()
+        self.assertEqual((response['X-Stats-Cache'], response.data), ('hit', {'computed': 1}))
+
+        Budget.objects.create(department='law', year=2026, allocated_amount=Decimal('10'))
+        response = self.get()
+        self.assertEqual((response['X-Stats-Cache'], response.data), ('miss', {'computed': 2}))
+
+    def test_if_none_match_returns_304(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(computed), 1)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"autre"').status_code, 200)
+
+    def test_stale_entry_served_while_refreshing(self):
+        self.get()
+        lock_key = stats_cache.entry_key('test-statistics', QueryDict('year=2026')) + ':refreshing'
+        with override_settings(STATS_CACHE={'ALIAS': 'stats', 'FRESH_TIMEOUT': 0}):
+            response = self.get()
+            # Ancien corps servi tout de suite, recalcul dans un thread
+            self.assertEqual((response['X-Stats-Cache'], response.data), ('stale', {'computed': 1}))
+            deadline = time.monotonic() + 5
+            while stats_cache.get_cache().get(lock_key) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(computed), 2)
+        response = self.get()
+        self.assertEqual((response['X-Stats-Cache'], response.data), ('hit', {'computed': 2}))
+
+    @override_settings(STATS_CACHE={'ENABLED': False})
+    def test_disabled(self):
+        first, second = self.get(), self.get()
+        self.assertEqual((first.data, second.data), ({'computed': 1}, {'computed': 2}))
+        self.assertFalse(second.has_header('X-Stats-Cache'))
+
+
+class CsvExportTest(TestCase):
+    """Export CSV en streaming : en-tête envoyé d'abord, puis les lignes par fragments"""
+
+    def test_header_yielded_before_rows_are_read(self):
+        read = []
+
+        def rows():
+            for index in range(3):
+                read.append(index)
+                yield [index, f'ligne {index}']
+
+        chunks = csv_export.iter_csv(['Numéro', 'Libellé'], rows(), rows_per_chunk=2)
+        self.assertEqual(next(chunks), 'Numéro,Libellé\r\n')
+        self.assertEqual(read, [])
+        self.assertEqual(list(chunks), ['0,ligne 0\r\n1,ligne 1\r\n', '2,ligne 2\r\n'])
+
+    def test_streamed_transaction_export(self):
+        Transaction.objects.bulk_create([
+            Transaction(transaction_type='tuition', category='income', amount=Decimal('100'),
+                        due_date=date(2026, 1, 31), description=f'Frais {index}')
+            for index in range(csv_export.ROWS_PER_CHUNK * 2 + 3)
+        ])
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='admin', user_type='admin'))
+
+        response = client.get(reverse('export-transactions'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="transactions.csv"')
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 4)
+
+        header, *rows = csv.reader(io.StringIO(chunks[0]))
+        self.assertEqual((header[0], rows), ('Numéro', []))
+        rows = list(csv.reader(io.StringIO(''.join(chunks[1:]))))
+        self.assertEqual(len(rows), Transaction.objects.count())
+        self.assertEqual(len(rows[0]), len(header))
+
+
+class RequestMetricsTest(TestCase):
+    """Mesures du middleware par nom d'URL, exposées aux administrateurs seulement"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', user_type='admin', is_staff=True)
+        cls.user = User.objects.create_user(username='etu')
+        Transaction.objects.create(transaction_type='tuition', amount=Decimal('100'), due_date=date(2026, 1, 31))
+
+    def setUp(self):
+        metrics.store.reset()
+        self.client = APIClient()
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.assertIn(self.client.get(reverse('request-metrics')).status_code, (401, 403))
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('request-metrics')).status_code, 403)
+        self.assertEqual(self.client.delete(reverse('request-metrics')).status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('request-metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+
+    def test_queries_and_time_recorded_per_url_name(self):
+        self.client.force_authenticate(self.user)
+        executed = []
+
+        def log_sql(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        # connection.queries est vidé au début de chaque requête (request_started)
+        with connection.execute_wrapper(log_sql):
+            self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 200)
+
+        self.client.force_authenticate(self.staff)
+        entry = self.client.get(reverse('request-metrics')).json()['data']['transaction-list']
+        self.assertEqual((entry['requests'], entry['window']), (1, 1))
+        self.assertEqual(entry['queries']['max'], len(executed))
+        self.assertGreater(entry['duration_ms']['max'], 0)
+        self.assertGreaterEqual(entry['duration_ms']['max'], entry['db_ms']['max'])
+        self.assertGreater(entry['response_bytes']['max'], 0)
+        self.assertEqual(entry['query_budget'], metrics.get_setting('QUERY_BUDGET'))
+
+        self.assertEqual(self.client.delete(reverse('request-metrics')).status_code, 200)
+        # Seule la requête DELETE elle-même est mesurée après la remise à zéro
+        self.assertEqual(list(metrics.store.summary()), ['request-metrics'])
+
+    def test_serializers_patched_only_when_enabled(self):
+        metrics.uninstall_serializer_timer()
+        self.addCleanup(metrics.install_serializer_timer)
+        self.client.force_authenticate(self.user)
+
+        with override_settings(REQUEST_METRICS={'ENABLED': False}):
+            self.client.get(reverse('transaction-list'))
+        self.assertFalse(hasattr(serializers.Serializer.to_representation, 'metrics_timed'))
+        self.assertEqual(metrics.store.summary(), {})
+
+        # La liste des transactions n'utilise pas de sérialiseur DRF
+        Budget.objects.create(department='sciences', year=2026, allocated_amount=Decimal('1000'))
+        self.client.get(reverse('budget-list'))
+        self.assertTrue(serializers.Serializer.to_representation.metrics_timed)
+        self.assertGreater(metrics.store.summary()['budget-list']['serializer_ms']['max'], 0)
+
+    @override_settings(REQUEST_METRICS={'QUERY_BUDGETS': {'transaction-list': 0}})
+    def test_warning_over_query_budget(self):
+        self.client.force_authenticate(self.user)
+        with self.assertLogs('university_management.metrics', 'WARNING') as logs:
+            self.client.get(reverse('transaction-list'))
+        self.assertIn('transaction-list', logs.output[0])
+
+
+class SyncIndexesTest(TransactionTestCase):
+    """sync_indexes : index manquants recréés, index obsolètes supprimés"""
+
+    stale = models.Index(fields=['description'], name='fin_tx_description_idx')
+
+    # TransactionTestCase : le schema editor SQLite refuse de tourner dans un bloc atomique
+    def setUp(self):
+        self.declared = next(index for index in Transaction._meta.indexes if index.name == 'fin_tx_date_idx')
+        with connection.schema_editor() as schema_editor:
+            schema_editor.remove_index(Transaction, self.declared)
+            schema_editor.add_index(Transaction, self.stale)
+        self.addCleanup(self.restore)
+
+    def restore(self):
+        existing = existing_index_names(connection, Transaction._meta.db_table)
+        with connection.schema_editor() as schema_editor:
+            if self.declared.name not in existing:
+                schema_editor.add_index(Transaction, self.declared)
+            if self.stale.name in existing:
+                schema_editor.remove_index(Transaction, self.stale)
+
+    def test_report_then_sync(self):
+        [entry] = index_report()
+        self.assertEqual(entry['model'], Transaction)
+        self.assertEqual([index.name for index in entry['missing']], ['fin_tx_date_idx'])
+        self.assertEqual([(index.name, index.fields) for index in entry['stale']],
+                         [('fin_tx_description_idx', ['description'])])
+
+        with self.assertRaisesMessage(CommandError, '2 écart(s)'):
+            call_command('sync_indexes', stdout=io.StringIO(), stderr=io.StringIO())
+
+        out = io.StringIO()
+        call_command('sync_indexes', create_missing=True, drop_stale=True, stdout=out)
+        self.assertIn('Index créé : finance_transaction.fin_tx_date_idx', out.getvalue())
+        self.assertIn('Index supprimé : finance_transaction.fin_tx_description_idx', out.getvalue())
+        self.assertEqual(index_report(), [])
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
+from . import dashboard, views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,4 +11,9 @@ urlpatterns = [
     path('api/exams/', include('exams.urls')),
     path('api/finance/', include('finance.urls')),
     path('api/grades/', include('grades.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/metrics/', views.request_metrics, name='request-metrics'),
+    # Vues asynchrones (ASGI) du tableau de bord
+    path('api/dashboard/', dashboard.dashboard, name='dashboard'),
+    path('api/dashboard/<str:section>/', dashboard.section_statistics, name='dashboard-section'),
 ]
\ No newline at end of file
@@ -0,0 +1,19 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from . import metrics
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def request_metrics(request):
+    """Percentiles de coût par vue (GET) ou remise à zéro des mesures (DELETE)"""
+    if request.method == 'DELETE':
+        metrics.store.reset()
+        return Response({'success': True, 'message': 'Métriques réinitialisées'})
+
+    return Response({
+        'success': True,
+        'data': metrics.store.summary()
+    })
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_management.settings')
 
 application = get_wsgi_application()
+
+# Balayage quotidien des transactions en retard dans le processus serveur
+# seulement (OVERDUE_SWEEPER['RUN_IN_PROCESS'], voir finance/overdue.py)
+from finance import overdue  # noqa: E402
+
+overdue.start_runner_if_enabled()
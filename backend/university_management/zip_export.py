@@ -0,0 +1,57 @@
+# backend/university_management/zip_export.py
+"""
+Archives ZIP en streaming.
+
+``zipfile`` écrit dans un flux non « seekable » : chaque fichier est suivi
+d'un descripteur de données au lieu d'un en-tête réécrit après coup. Les
+octets produits après chaque fichier sont envoyés immédiatement ; seul le
+fichier en cours est gardé en mémoire, et le répertoire central (quelques
+dizaines d'octets par fichier) est écrit à la fin.
+"""
+
+import zipfile
+
+from django.http import StreamingHttpResponse
+
+
+class _ZipBuffer:
+    """Flux en écriture seule dont on récupère le contenu au fur et à mesure"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(files, compression=zipfile.ZIP_DEFLATED):
+    """Générer une archive ZIP à partir de paires (nom, contenu str|bytes)"""
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=compression) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+            data = buffer.take()
+            if data:
+                yield data
+    yield buffer.take()
+
+
+def streaming_zip_response(filename, files):
+    """Réponse HTTP ZIP en streaming, téléchargée sous ``filename``"""
+    response = StreamingHttpResponse(iter_zip(files), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
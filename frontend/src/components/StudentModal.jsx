@@ -95,10 +95,6 @@ const StudentModal = ({ isOpen, onClose, student, isEditing, onSave }) => {
       newErrors.department = "Le département est requis";
     }
     
-    if (formData.gpa < 0 || formData.gpa > 4) {
-      newErrors.gpa = "Le GPA doit être entre 0 et 4";
-    }
-    
     setErrors(newErrors);
     return Object.keys(newErrors).length === 0;
   };
@@ -137,7 +133,6 @@ const StudentModal = ({ isOpen, onClose, student, isEditing, onSave }) => {
         faculty: formData.faculty,
         department: formData.department,
         current_year: parseInt(formData.current_year),
-        gpa: parseFloat(formData.gpa) || 0.0,
         status: formData.status,
         first_name: formData.first_name,
         last_name: formData.last_name,
@@ -461,22 +456,11 @@ const StudentModal = ({ isOpen, onClose, student, isEditing, onSave }) => {
                     type="number"
                     name="gpa"
                     value={formData.gpa}
-                    onChange={handleChange}
-                    min="0"
-                    max="4"
-                    step="0.01"
-                    disabled={!isEditing || loading}
-                    className={`w-full px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent ${
-                      errors.gpa ? 'border-red-500' : 'border-gray-300'
-                    }`}
+                    readOnly
+                    disabled
+                    className="w-full px-4 py-2 border border-gray-300 rounded-lg bg-gray-50"
                   />
-                  {errors.gpa && (
-                    <p className="mt-1 text-sm text-red-600 flex items-center">
-                      <AlertCircle size={14} className="mr-1" />
-                      {errors.gpa}
-                    </p>
-                  )}
-                  <p className="text-xs text-gray-500 mt-1">Note entre 0.00 et 4.00</p>
+                  <p className="text-xs text-gray-500 mt-1">Calculée à partir des notes</p>
                 </div>
               </div>
             </div>
@@ -201,7 +201,6 @@ export const studentService = {
           faculty: studentData.faculty || '',
           department: studentData.department,
           current_year: parseInt(studentData.current_year) || 1,
-          gpa: parseFloat(studentData.gpa) || 0.00,
           status: studentData.status || 'active',
           // Données utilisateur
           first_name: studentData.first_name,
@@ -235,7 +234,6 @@ export const studentService = {
         if (studentData.faculty !== undefined) formattedData.faculty = studentData.faculty || '';
         if (studentData.department !== undefined) formattedData.department = studentData.department;
         if (studentData.current_year !== undefined) formattedData.current_year = parseInt(studentData.current_year) || 1;
-        if (studentData.gpa !== undefined) formattedData.gpa = parseFloat(studentData.gpa) || 0.00;
         if (studentData.status !== undefined) formattedData.status = studentData.status || 'active';
         
         // Champs utilisateur
@@ -1654,5 +1652,26 @@ updateTransaction: async (id, transactionData) => {
       }
     }
   };
-  
+
+// Statistiques du tableau de bord en une requête (vues asynchrones du backend)
+export const dashboardService = {
+  // data.finance, data.grades, data.exams, data.students, data.teachers :
+  // mêmes corps que les endpoints /statistics/ de chaque module
+  getStatistics: async (params = {}) => {
+    try {
+      return await api.get('/dashboard/', { params });
+    } catch (error) {
+      return handleApiError(error);
+    }
+  },
+
+  getSection: async (section, params = {}) => {
+    try {
+      return await api.get(`/dashboard/${section}/`, { params });
+    } catch (error) {
+      return handleApiError(error);
+    }
+  },
+};
+
 export default api;"// temp change" 